@@ -325,9 +325,14 @@ class PycrateGenerator(_Generator):
     """
     PycrateGenerator generates Python source code to be loaded into the pycrate
     ASN.1 runtime, located in pycrate_asn1rt
+    
+    When PER_FAST is set, the generated module also builds specialized PER 
+    codec functions for all its types when loaded (see pycrate_asn1rt.perfast)
     """
     _impl = 0
     
+    PER_FAST = False
+    
     def gen(self):
         #
         self.wrl('# -*- coding: UTF-8 -*-')
@@ -345,6 +350,8 @@ class PycrateGenerator(_Generator):
         self.wrl('from pycrate_asn1rt.asnobj_class     import *')
         self.wrl('from pycrate_asn1rt.asnobj_ext       import *')
         self.wrl('from pycrate_asn1rt.init             import init_modules')
+        if self.PER_FAST:
+            self.wrl('from pycrate_asn1rt.perfast          import init_per_fast')
         self.wrl('')
         #
         modlist = []
@@ -405,6 +412,8 @@ class PycrateGenerator(_Generator):
             self.wrl('')
         #
         self.wrl('init_modules(' + ', '.join(modlist) + ')')        
+        if self.PER_FAST:
+            self.wrl('init_per_fast(' + ', '.join(modlist) + ')')
     
     def gen_mod(self, Mod):
         obj_names = [obj_name for obj_name in Mod.keys() if obj_name[0:1] != '_']
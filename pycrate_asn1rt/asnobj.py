@@ -33,7 +33,79 @@ from .refobj  import *
 from .dictobj import *
 from .setobj  import *
 from .codecs  import *
+from .berscan import TLVArray, tlv_end
 
+from threading import RLock, local
+from copy      import deepcopy
+from itertools import islice
+import os
+import multiprocessing
+
+# decode_many() worker processes are forked, as they inherit the ASN.1 modules
+# already loaded
+if hasattr(multiprocessing, 'get_context'):
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _mp = multiprocessing.get_context('fork')
+    else:
+        _mp = None
+elif os.name != 'nt':
+    # Python 2, processes are always forked on *nix
+    _mp = multiprocessing
+else:
+    _mp = None
+
+# number of chunks per worker process submitted at once to a pool by
+# _mp_imap(), which bounds the number of items read in advance from its input
+_MP_BATCH = 4
+
+def _mp_imap(pool, workers, func, iterable, chunksize):
+    # like pool.imap(func, iterable, chunksize), but the iterable is consumed
+    # by batches of (workers * chunksize * _MP_BATCH) items, as results are
+    # yielded (at most two batches are in the pool at the same time)
+    size = max(1, workers * chunksize * _MP_BATCH)
+    iterable = iter(iterable)
+    batch = list(islice(iterable, size))
+    res = pool.imap(func, batch, chunksize)
+    while batch:
+        batch = list(islice(iterable, size))
+        if batch:
+            res_next = pool.imap(func, batch, chunksize)
+        for ret in res:
+            yield ret
+        if batch:
+            res = res_next
+
+
+# The runtime is not re-entrant: all objects store their value internally, in
+# the _val attribute (the codecs runtime state, e.g. ASN1CodecPER alignment and
+# offset stack, is local to each thread, see ASN1CodecCtx, hence threads
+# working on distinct objects, e.g. from distinct ASN.1 modules, do not
+# interfere).
+# Each group of ASN.1 modules initialized together with init_modules() (e.g.
+# all the modules of a specification compiled into a single Python module) has
+# its own lock in ASN1ModLock, returned by the get_lock() method of all their
+# objects: it protects any sequence of calls to those objects, e.g.
+# >>> with Obj.get_lock():
+# ...     Obj.from_aper(buf)
+# ...     val = get_val_at(Obj, path)
+# ASN1Lock is used for objects which do not belong to such a group.
+#
+# The decode() and encode() methods do not wait for this lock: when it is held
+# by another thread, they work on a copy of the object private to the calling
+# thread (see get_thread_obj()), hence several threads can decode and encode
+# PDUs of the same specification at the same time. The copy is made at the
+# first such call in each thread, and is kept for the lifetime of the thread.
+# Copies are made from a template taken once from the object while holding its
+# lock: this first copy is the only time decode() or encode() wait for it.
+ASN1Lock = RLock()
+
+# locks of the groups of ASN.1 modules, indexed by group name
+ASN1ModLock = {}
+
+# copies of objects private to each thread, and templates they are copied from,
+# indexed by id() of the original objects, see get_thread_obj()
+ASN1ThreadObj = local()
+ASN1ThreadTpl = {}
 
 ASN1Obj_docstring = """
 Common object attributes:
@@ -138,6 +210,26 @@ class ASN1Obj(Element):
     # this enables object's table constraint verification when using set_val() 
     # or set_val_unsafe()
     _SAFE_BNDTAB = True
+    # this enables object's constraints verification (_SAFE_BND and _SAFE_BNDTAB)
+    # when decoding with from_*(), disabling it corresponds to a trusted input
+    # decoding profile: decoded values can then be verified with validate()
+    _SAFE_DEC    = True
+    
+    # this enables the use of the specialized PER codec functions, when they
+    # were generated for the object (see pycrate_asn1rt.perfast)
+    _PER_FAST    = True
+    
+    # this enables the lazy decoding of OPEN / ANY objects and BIT STRING /
+    # OCTET STRING objects with a CONTAINING constraint: the inner value is set
+    # as an ASN1Lazy instance, decoded only when accessed
+    _LAZY        = False
+    
+    # this enables the caching of decoded values by from_uper(), from_aper() and
+    # from_ber() when called with a bytes buffer, keyed by (object, codec,
+    # _LAZY, _SAFE_DEC, buffer):
+    # it must be set to an LRUCache instance (see pycrate_core.utils), e.g.
+    # LRUCache(1024, copy_val) to never share decoded values with the cache
+    _DEC_CACHE   = None
     
     #--------------------------------------------------------------------------#
     # class attributes, initialization and safe checking methods
@@ -168,6 +260,9 @@ class ASN1Obj(Element):
     #_const_cont   = None
     #_const_cont_enc = None
     _const_tab    = None
+    # _fast_aper and _fast_uper are (decoder, encoder) specialized PER functions
+    _fast_aper    = None
+    _fast_uper    = None
     # _const_tab_id and _const_tab_at are only defined if _const_tab is not None
     #_const_tab_id = None
     #_const_tab_at = None
@@ -355,8 +450,8 @@ class ASN1Obj(Element):
     
     def _get_tab_obj(self):
         try:
-            IndIdent = self._get_obj_by_path(self._const_tab_at)._const_tab_id
-            IndVal = self._get_val_by_path(self._const_tab_at)
+            IndObj = self._get_obj_by_path(self._const_tab_at)
+            IndIdent, IndVal = IndObj._const_tab_id, IndObj._val
         except:
             raise(ASN1ObjErr('{0}: invalid table constraint @ path, {1!r}'\
                   .format(self.fullname(), self._const_tab_at)))
@@ -613,10 +708,209 @@ class ASN1Obj(Element):
         if self._SAFE_BND:
             self._safechk_bnd(self._val)
     
+    def validate(self, val=None):
+        """verifies the given value, or the internal value if None, against the
+        type of the object and its constraints, including table constraints
+        when _SAFE_BNDTAB is enabled
+        
+        This does not depend on _SAFE_VAL, _SAFE_BND and _SAFE_DEC, and is
+        typically used on values decoded with _SAFE_DEC disabled.
+        
+        Args:
+            val: value to be verified and set as the internal value, or None
+        
+        Returns:
+            None
+        
+        Raises:
+            ASN1ObjErr, if the value is invalid
+        """
+        if val is not None:
+            self._val = val
+        elif self._val is None:
+            raise(ASN1ObjErr('{0}: no value to validate'.format(self.fullname())))
+        self._safechk_val(self._val)
+        self._safechk_bnd(self._val)
+    
     #--------------------------------------------------------------------------#
     # encoding / decoding methods
     #--------------------------------------------------------------------------#
     
+    ###
+    # thread-safe decoding and encoding, working with values
+    ###
+    
+    # codecs supported by decode() and encode()
+    _CODECS = ('asn1', 'aper', 'uper', 'ber', 'cer', 'der', 'oer', 'coer')
+    
+    def get_lock(self):
+        """returns the lock of the group of ASN.1 modules the object belongs to,
+        or ASN1Lock if it does not belong to any
+        """
+        grp = getattr(self, '_modgrp', None)
+        if grp is None:
+            return ASN1Lock
+        try:
+            return ASN1ModLock[grp]
+        except KeyError:
+            # e.g. modules loaded from a snapshot
+            return ASN1ModLock.setdefault(grp, RLock())
+    
+    def get_thread_obj(self):
+        """returns a copy of the object private to the calling thread, together
+        with all the objects it depends on, created at the first call in each
+        thread
+        
+        Copies are made from a template, which is copied from the object once,
+        while holding the lock returned by get_lock(): only the first call
+        (from any thread) may have to wait for this lock.
+        
+        The specialized PER functions of the object, if any (see 
+        pycrate_asn1rt.perfast), are generated again for each copy.
+        """
+        try:
+            objs = ASN1ThreadObj.objs
+        except AttributeError:
+            objs = ASN1ThreadObj.objs = {}
+        try:
+            return objs[id(self)][1]
+        except KeyError:
+            pass
+        if id(self) not in ASN1ThreadTpl:
+            # the object must not be copied while another thread is working
+            # on it, e.g. with some of its components' _parent swapped
+            with self.get_lock():
+                if id(self) not in ASN1ThreadTpl:
+                    Tpl = deepcopy(self)
+                    # generated functions are bound to the original objects
+                    Tpl._val, Tpl._fast_aper, Tpl._fast_uper = None, None, None
+                    # the original is kept too, so that its id is not reused
+                    ASN1ThreadTpl[id(self)] = (self, Tpl)
+        Obj = deepcopy(ASN1ThreadTpl[id(self)][1])
+        if self._fast_aper is not None or self._fast_uper is not None:
+            from .perfast import gen_per_fast
+            if self._fast_aper is not None:
+                gen_per_fast(Obj, aligned=True)
+            if self._fast_uper is not None:
+                gen_per_fast(Obj, aligned=False)
+        objs[id(self)] = (self, Obj)
+        # the copy is its own copy in this thread
+        objs[id(Obj)] = (Obj, Obj)
+        return Obj
+    
+    def _acquire_obj(self):
+        # returns the object itself and its lock, acquired, when this lock is
+        # free or already held by the calling thread, or the copy of the
+        # object private to the calling thread and None otherwise
+        Lock = self.get_lock()
+        if Lock.acquire(False):
+            return self, Lock
+        else:
+            return self.get_thread_obj(), None
+    
+    def decode(self, buf, codec='aper'):
+        """decode buf with the given codec and return the decoded value
+        
+        This can be called concurrently from several threads: when the lock
+        returned by get_lock() is held by another thread, decoding is done with
+        the copy of the object private to the calling thread, returned by
+        get_thread_obj(). In all cases, the internal value of the object is
+        restored to its previous state before returning.
+        
+        Args:
+            buf: bytes, or str for the asn1 codec
+            codec: str in _CODECS
+        
+        Returns:
+            val: the decoded value
+        """
+        if codec not in self._CODECS:
+            raise(ASN1Err('{0}: invalid codec, {1!r}'.format(self.fullname(), codec)))
+        Obj, Lock = self._acquire_obj()
+        val_prev, off_len = Obj._val, len(ASN1CodecPER._off)
+        try:
+            getattr(Obj, 'from_' + codec)(buf)
+            return Obj._val
+        finally:
+            Obj._val = val_prev
+            # APER offsets are left in the stack when decoding fails
+            del ASN1CodecPER._off[off_len:]
+            if Lock is not None:
+                Lock.release()
+    
+    def encode(self, val, codec='aper'):
+        """encode val with the given codec and return the encoded buffer
+        
+        This can be called concurrently from several threads, in the same way
+        as decode().
+        
+        Args:
+            val: value to be encoded
+            codec: str in _CODECS
+        
+        Returns:
+            buf: bytes, or str for the asn1 codec
+        """
+        if codec not in self._CODECS:
+            raise(ASN1Err('{0}: invalid codec, {1!r}'.format(self.fullname(), codec)))
+        Obj, Lock = self._acquire_obj()
+        val_prev, off_len = Obj._val, len(ASN1CodecPER._off)
+        try:
+            return getattr(Obj, 'to_' + codec)(val)
+        finally:
+            Obj._val = val_prev
+            del ASN1CodecPER._off[off_len:]
+            if Lock is not None:
+                Lock.release()
+    
+    def decode_many(self, bufs, codec='aper', workers=0, chunksize=64):
+        """decode each buffer of bufs with the given codec, and yield 2-tuples
+        (index, value) for each, or (index, exception) in case the decoding
+        of the buffer failed
+        
+        When workers > 1, buffers are decoded in a pool of processes, forked
+        from the current one, hence sharing the ASN.1 modules already loaded.
+        Results are still yielded in the order of bufs, which is read in
+        advance by at most 2 * workers * chunksize * _MP_BATCH buffers.
+        
+        Args:
+            bufs: iterable of bytes, or str for the asn1 codec
+            codec: str in _CODECS
+            workers: int, number of worker processes (0 or 1 for none)
+            chunksize: int, number of buffers dispatched at once to a worker
+        
+        Yields:
+            (index, value or exception)
+        """
+        if codec not in self._CODECS:
+            raise(ASN1Err('{0}: invalid codec, {1!r}'.format(self.fullname(), codec)))
+        if workers > 1 and _mp is None:
+            asnlog('decode_many: fork not available, no worker process started')
+            workers = 0
+        if workers > 1:
+            pool = _mp.Pool(workers, initializer=_decode_many_init, initargs=(self, codec))
+            try:
+                for ret in _mp_imap(pool, workers, _decode_many_proc, enumerate(bufs), chunksize):
+                    yield ret
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            dec = getattr(self, 'from_' + codec)
+            for i, buf in enumerate(bufs):
+                with self.get_lock():
+                    val_prev, off_len = self._val, len(ASN1CodecPER._off)
+                    try:
+                        dec(buf)
+                    except Exception as err:
+                        ret = (i, err)
+                    else:
+                        ret = (i, self._val)
+                    self._val = val_prev
+                    # APER offsets are left in the stack when decoding fails
+                    del ASN1CodecPER._off[off_len:]
+                yield ret
+    
     ###
     # conversion between internal value and ASN.1 syntax
     ###
@@ -630,7 +924,7 @@ class ASN1Obj(Element):
     def from_asn1(self, txt):
         txt = clean_text(txt)
         ret = self._from_asn1(txt)
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
         return ret
     
@@ -645,6 +939,25 @@ class ASN1Obj(Element):
     def show(self):
         return '<~ASN1~: %s>' % self.to_asn1()
     
+    ###
+    # decoded values cache
+    ###
+    
+    def _get_dec_cache(self, codec, buf):
+        # sets the value decoded from buf with codec from the cache, if available
+        val = self._DEC_CACHE.get((self, codec, self._LAZY, self._SAFE_DEC, buf))
+        if val is None:
+            return False
+        else:
+            self._val = val
+            return True
+    
+    def _put_dec_cache(self, codec, buf):
+        # puts the value decoded from buf with codec into the cache
+        # values decoded lazily or without constraints verification are kept
+        # apart
+        self._DEC_CACHE.put((self, codec, self._LAZY, self._SAFE_DEC, buf), self._val)
+    
     ###
     # conversion between internal value and ASN.1 PER encoding
     ###
@@ -656,6 +969,9 @@ class ASN1Obj(Element):
         raise(ASN1NotSuppErr(self.fullname()))
     
     def from_uper(self, buf):
+        if self._DEC_CACHE is not None and isinstance(buf, bytes_types) \
+        and self._get_dec_cache('uper', buf):
+            return
         ASN1CodecPER.ALIGNED = False
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
@@ -663,7 +979,10 @@ class ASN1Obj(Element):
             char = buf
             #assert( char.len_bit() % 8 == 0 )
         off0 = char._cur
-        self._from_per(char)
+        if self._PER_FAST and self._fast_uper is not None:
+            self._val = self._fast_uper[0](char)
+        else:
+            self._from_per(char)
         off1 = char._cur
         if off1 == off0:
             # char was not consumed at all (all decoded values were implicit)
@@ -673,15 +992,20 @@ class ASN1Obj(Element):
         elif (off1 - off0) % 8:
             # realignement required for outer decoding
             char.forward(8 - ((off1 - off0)%8))
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
+        if self._DEC_CACHE is not None and isinstance(buf, bytes_types):
+            self._put_dec_cache('uper', buf)
     
     def to_uper(self, val=None):
         ASN1CodecPER.ALIGNED = False
         if val is not None:
             self.set_val(val)
         if self._val is not None:
-            ret = pack_val(*self._to_per())[0]
+            if self._PER_FAST and self._fast_uper is not None:
+                ret = pack_val(*self._fast_uper[1](self._val))[0]
+            else:
+                ret = pack_val(*self._to_per())[0]
             if ret:
                 return ret
             else:
@@ -690,6 +1014,9 @@ class ASN1Obj(Element):
             return None
     
     def from_aper(self, buf):
+        if self._DEC_CACHE is not None and isinstance(buf, bytes_types) \
+        and self._get_dec_cache('aper', buf):
+            return
         ASN1CodecPER.ALIGNED = True
         ASN1CodecPER._off.append(0)
         if isinstance(buf, bytes_types):
@@ -697,7 +1024,10 @@ class ASN1Obj(Element):
         else:
             char = buf
             assert( char.len_bit() % 8 == 0 )
-        self._from_per(char)
+        if self._PER_FAST and self._fast_aper is not None:
+            self._val = self._fast_aper[0](char)
+        else:
+            self._from_per(char)
         if ASN1CodecPER._off[-1] == 0:
             # char was not consumed at all (all decoded values were implicit)
             # hence a null byte must be consumed
@@ -707,8 +1037,10 @@ class ASN1Obj(Element):
             # realignement required for outer decoding
             char.forward(8 - (ASN1CodecPER._off[-1]%8))
         del ASN1CodecPER._off[-1]
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
+        if self._DEC_CACHE is not None and isinstance(buf, bytes_types):
+            self._put_dec_cache('aper', buf)
     
     def to_aper(self, val=None):
         ASN1CodecPER.ALIGNED = True
@@ -716,7 +1048,10 @@ class ASN1Obj(Element):
             self.set_val(val)
         if self._val is not None:
             ASN1CodecPER._off.append(0)
-            ret = pack_val(*self._to_per())[0]
+            if self._PER_FAST and self._fast_aper is not None:
+                ret = pack_val(*self._fast_aper[1](self._val))[0]
+            else:
+                ret = pack_val(*self._to_per())[0]
             if not ret:
                 ret = b'\0'
             del ASN1CodecPER._off[-1]
@@ -756,7 +1091,7 @@ class ASN1Obj(Element):
             pad._from_char(char)
             self._struct.append(pad)
             assert( pad() == 0 )
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
     
     def to_uper_ws(self, val=None):
@@ -797,7 +1132,7 @@ class ASN1Obj(Element):
             self._struct.append(pad)
             assert( pad() == 0 )
         del ASN1CodecPER._off[-1]
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
     
     def to_aper_ws(self, val=None):
@@ -840,12 +1175,20 @@ class ASN1Obj(Element):
         self._decode_ber_cont(char, tlv)
     
     def from_ber(self, buf, single=True):
+        if single and self._DEC_CACHE is not None and isinstance(buf, bytes_types) \
+        and self._get_dec_cache('ber', buf):
+            return
         if isinstance(buf, bytes_types):
             char = Charpy(buf)
         else:
             char = buf
         # decode the whole char buffer into tag, length and value boundary
-        if single:
+        if single and char is not buf:
+            # scan the single TLV with the flat TLV scanner, which is faster
+            tlvs = TLVArray(buf, 0, tlv_end(buf))
+            TLV = [tlvs.to_tlv(0)]
+            char._cur = 8*tlvs.tend[0]
+        elif single:
             TLV = [ASN1CodecBER.decode_single(char)[0]]
         else:
             TLV = ASN1CodecBER.decode_all(char)
@@ -853,8 +1196,10 @@ class ASN1Obj(Element):
         # decode all value content
         self._from_ber(char, TLV)
         char._cur, char._len_bit = char_cur, char_lb
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
+        if single and self._DEC_CACHE is not None and isinstance(buf, bytes_types):
+            self._put_dec_cache('ber', buf)
     
     def _to_ber(self):
         # 1) encode the most inner TLV part
@@ -959,7 +1304,7 @@ class ASN1Obj(Element):
         # decode all value content
         self._from_ber_ws(char, TLV)
         char._cur, char._len_bit = char_cur, char_lb
-        if self._SAFE_BND:
+        if self._SAFE_DEC and self._SAFE_BND:
             self._safechk_bnd(self._val)
     
     def _to_ber_ws(self):
@@ -1019,62 +1364,34 @@ class ASN1Obj(Element):
     ###
     
     def from_cer(self, buf):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = True
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_OSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.from_ber(buf)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_CER_PARAMS)
+        try:
+            return self.from_ber(buf)
+        finally:
+            _restore_ber_params()
     
     def to_cer(self, val=None):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = True
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_OSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.to_ber(val)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_CER_PARAMS)
+        try:
+            return self.to_ber(val)
+        finally:
+            _restore_ber_params()
     
     # methods generating complete transfer structure in _struct attributes
     
     def from_cer_ws(self, buf):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = True
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_OSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.from_ber_ws(buf)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_CER_PARAMS)
+        try:
+            return self.from_ber_ws(buf)
+        finally:
+            _restore_ber_params()
     
     def to_cer_ws(self, val=None):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = True
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_OSTR_FRAG  = 1000
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.to_ber_ws(val)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_CER_PARAMS)
+        try:
+            return self.to_ber_ws(val)
+        finally:
+            _restore_ber_params()
     
     ###
     # conversion between internal value and ASN.1 DER encoding
@@ -1082,62 +1399,87 @@ class ASN1Obj(Element):
     ###
     
     def from_der(self, buf):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = False
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 0
-        ASN1CodecBER.ENC_OSTR_FRAG  = 0
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.from_ber(buf)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_DER_PARAMS)
+        try:
+            return self.from_ber(buf)
+        finally:
+            _restore_ber_params()
     
     def to_der(self, val=None):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = False
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 0
-        ASN1CodecBER.ENC_OSTR_FRAG  = 0
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.to_ber(val)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_DER_PARAMS)
+        try:
+            return self.to_ber(val)
+        finally:
+            _restore_ber_params()
     
     # methods generating complete transfer structure in _struct attributes
     
     def from_der_ws(self, buf):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = False
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 0
-        ASN1CodecBER.ENC_OSTR_FRAG  = 0
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.from_ber_ws(buf)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_DER_PARAMS)
+        try:
+            return self.from_ber_ws(buf)
+        finally:
+            _restore_ber_params()
     
     def to_der_ws(self, val=None):
-        _save_ber_params()
-        ASN1CodecBER.ENC_LLONG      = 0
-        ASN1CodecBER.ENC_LUNDEF     = False
-        ASN1CodecBER.ENC_BOOLTRUE   = 0xff
-        ASN1CodecBER.ENC_REALNR     = 3
-        ASN1CodecBER.ENC_BSTR_FRAG  = 0
-        ASN1CodecBER.ENC_OSTR_FRAG  = 0
-        ASN1CodecBER.ENC_TIME_CANON = True
-        ASN1CodecBER.ENC_DEF_CANON  = True
-        ret = self.to_ber_ws(val)
-        _restore_ber_params()
-        return ret
+        _save_ber_params(_DER_PARAMS)
+        try:
+            return self.to_ber_ws(val)
+        finally:
+            _restore_ber_params()
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    def _from_oer(self, char):
+        raise(ASN1NotSuppErr(self.fullname()))
+    
+    def _to_oer(self):
+        raise(ASN1NotSuppErr(self.fullname()))
+    
+    def from_oer(self, buf):
+        set_codec_ctx(ASN1CodecOER, CANONICAL=False)
+        if isinstance(buf, bytes_types):
+            char = Charpy(buf)
+        else:
+            char = buf
+        self._from_oer(char)
+        if self._SAFE_DEC and self._SAFE_BND:
+            self._safechk_bnd(self._val)
+    
+    def to_oer(self, val=None):
+        set_codec_ctx(ASN1CodecOER, CANONICAL=False)
+        if val is not None:
+            self.set_val(val)
+        if self._val is not None:
+            return pack_val(*self._to_oer())[0]
+        else:
+            return None
+    
+    ###
+    # conversion between internal value and ASN.1 COER encoding
+    # reusing the OER encoder
+    ###
+    
+    def from_coer(self, buf):
+        set_codec_ctx(ASN1CodecOER, CANONICAL=True)
+        if isinstance(buf, bytes_types):
+            char = Charpy(buf)
+        else:
+            char = buf
+        self._from_oer(char)
+        if self._SAFE_DEC and self._SAFE_BND:
+            self._safechk_bnd(self._val)
+    
+    def to_coer(self, val=None):
+        set_codec_ctx(ASN1CodecOER, CANONICAL=True)
+        if val is not None:
+            self.set_val(val)
+        if self._val is not None:
+            return pack_val(*self._to_oer())[0]
+        else:
+            return None
     
     ###
     # convert internal value to ASN.1 GSER encoding
@@ -1152,39 +1494,41 @@ class ASN1Obj(Element):
 
 
 
-def _save_ber_params():
-    global __ber_enc_llong
-    global __ber_enc_lundef
-    global __ber_enc_booltrue
-    global __ber_enc_realnr
-    global __ber_enc_bstr_frag
-    global __ber_enc_ostr_frag
-    global __ber_enc_time_canon
-    global __ber_enc_def_canon
-    __ber_enc_llong      = ASN1CodecBER.ENC_LLONG
-    __ber_enc_lundef     = ASN1CodecBER.ENC_LUNDEF
-    __ber_enc_booltrue   = ASN1CodecBER.ENC_BOOLTRUE
-    __ber_enc_realnr     = ASN1CodecBER.ENC_REALNR
-    __ber_enc_bstr_frag  = ASN1CodecBER.ENC_BSTR_FRAG
-    __ber_enc_ostr_frag  = ASN1CodecBER.ENC_OSTR_FRAG
-    __ber_enc_time_canon = ASN1CodecBER.ENC_TIME_CANON
-    __ber_enc_def_canon  = ASN1CodecBER.ENC_DEF_CANON
+# decode_many() worker processes' state and processing function
+
+_decode_many_obj = None
+_decode_many_dec = None
+
+def _decode_many_init(Obj, codec):
+    global _decode_many_obj, _decode_many_dec
+    _decode_many_obj = Obj
+    _decode_many_dec = getattr(Obj, 'from_' + codec)
+
+def _decode_many_proc(arg):
+    i, buf = arg
+    try:
+        _decode_many_dec(buf)
+    except Exception as err:
+        del ASN1CodecPER._off[:]
+        return (i, err)
+    else:
+        return (i, _decode_many_obj._val)
+
+
+# BER parameters set for CER and DER, they override the process-wide BER
+# parameters in the codec context of the current thread only
+_CER_PARAMS = dict(ENC_LLONG=0, ENC_LUNDEF=True, ENC_BOOLTRUE=0xff, ENC_REALNR=3,
+                   ENC_BSTR_FRAG=1000, ENC_OSTR_FRAG=1000, ENC_TIME_CANON=True,
+                   ENC_DEF_CANON=True)
+_DER_PARAMS = dict(ENC_LLONG=0, ENC_LUNDEF=False, ENC_BOOLTRUE=0xff, ENC_REALNR=3,
+                   ENC_BSTR_FRAG=0, ENC_OSTR_FRAG=0, ENC_TIME_CANON=True,
+                   ENC_DEF_CANON=True)
+
+def _save_ber_params(params):
+    get_codec_ctx()._ber_saved.append( get_codec_ctx_over(ASN1CodecBER) )
+    set_codec_ctx(ASN1CodecBER, **params)
 
 def _restore_ber_params():
-    global __ber_enc_llong
-    global __ber_enc_lundef
-    global __ber_enc_booltrue
-    global __ber_enc_realnr
-    global __ber_enc_bstr_frag
-    global __ber_enc_ostr_frag
-    global __ber_enc_time_canon
-    global __ber_enc_def_canon
-    ASN1CodecBER.ENC_LLONG      = __ber_enc_llong
-    ASN1CodecBER.ENC_LUNDEF     = __ber_enc_lundef
-    ASN1CodecBER.ENC_BOOLTRUE   = __ber_enc_booltrue
-    ASN1CodecBER.ENC_REALNR     = __ber_enc_realnr
-    ASN1CodecBER.ENC_BSTR_FRAG  = __ber_enc_bstr_frag
-    ASN1CodecBER.ENC_OSTR_FRAG  = __ber_enc_ostr_frag
-    ASN1CodecBER.ENC_TIME_CANON = __ber_enc_time_canon
-    ASN1CodecBER.ENC_DEF_CANON  = __ber_enc_def_canon
+    reset_codec_ctx(ASN1CodecBER)
+    set_codec_ctx(ASN1CodecBER, **get_codec_ctx()._ber_saved.pop())
 
@@ -117,6 +117,16 @@ Single value: int 0
     
     def _encode_ber_cont(self):
         return 0, 0, []
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    def _from_oer(self, char):
+        self._val = 0
+    
+    def _to_oer(self):
+        return []
 
 
 class BOOL(ASN1Obj):
@@ -228,6 +238,27 @@ Single value: Python bool
             return 0, 1, [(T_UINT, ASN1CodecBER.ENC_BOOLTRUE, 8)]
         else:
             return 0, 1, [(T_UINT, 0, 8)]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    def _from_oer(self, char):
+        val = char.get_uint(8)
+        if val == 0:
+            self._val = False
+        elif val == 0xff or not ASN1CodecOER.CANONICAL:
+            self._val = True
+        else:
+            raise(ASN1OERDecodeErr('{0}: invalid BOOLEAN value, {1!r}'\
+                  .format(self.fullname(), val)))
+    
+    def _to_oer(self):
+        if self._val:
+            return [(T_UINT, 0xff, 8)]
+        else:
+            return [(T_UINT, 0, 8)]
+
 
 #------------------------------------------------------------------------------#
 # INTEGER and REAL
@@ -472,6 +503,20 @@ Specific attribute:
     def _encode_ber_cont(self):
         lval = int_bytelen(self._val)
         return 0, lval, [(T_INT, self._val, 8*lval)]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # the value is encoded in a fixed number of bytes when the root part of the
+    # value constraint fits in 1, 2, 4 or 8 bytes, and prefixed with a length
+    # determinant otherwise
+    
+    def _from_oer(self, char):
+        self._val = ASN1CodecOER.decode_int(char, self._const_val)
+    
+    def _to_oer(self):
+        return ASN1CodecOER.encode_int(self._val, self._const_val)
 
 
 class REAL(ASN1Obj):
@@ -801,6 +846,30 @@ Specific attribute:
         buf = self._encode_cont()
         lval = len(buf)
         return 0, lval, [(T_BYTES, buf, 8*lval)]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # content is encoded like the BER one, prefixed with a length determinant
+    
+    def _from_oer(self, char):
+        self._decode_cont( ASN1CodecOER.decode_buf(char) )
+    
+    def _to_oer(self):
+        if ASN1CodecOER.CANONICAL and ASN1CodecBER.ENC_REALNR != 3:
+            # COER requires the CER / DER encoding of the content
+            over = get_codec_ctx_over(ASN1CodecBER)
+            set_codec_ctx(ASN1CodecBER, ENC_REALNR=3)
+            try:
+                buf = self._encode_cont()
+            finally:
+                reset_codec_ctx(ASN1CodecBER, 'ENC_REALNR')
+                if 'ENC_REALNR' in over:
+                    set_codec_ctx(ASN1CodecBER, ENC_REALNR=over['ENC_REALNR'])
+        else:
+            buf = self._encode_cont()
+        return ASN1CodecOER.encode_buf(buf)
 
 
 #------------------------------------------------------------------------------#
@@ -1094,6 +1163,34 @@ Specific attribute:
             val = self._cont[self._val]
         lval = int_bytelen(val)
         return 0, lval, [ (T_INT, val, 8*lval) ]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # the enumeration value is encoded, not its index
+    
+    def _from_oer(self, char):
+        val = ASN1CodecOER.decode_enum(char)
+        if val not in self._cont_rev:
+            if self._ext is not None:
+                # unknown extension
+                if not self._SILENT:
+                    asnlog('ENUM._from_oer: %s, unknown extension value %r'\
+                           % (self._name, val))
+                self._val = '_ext_%r' % val
+            else:
+                raise(ASN1OERDecodeErr('{0}: invalid ENUMERATED value, {1!r}'\
+                      .format(self.fullname(), val)))
+        else:
+            self._val = self._cont_rev[val]
+    
+    def _to_oer(self):
+        if self._val[:5] == '_ext_':
+            val = int(self._val[5:])
+        else:
+            val = self._cont[self._val]
+        return ASN1CodecOER.encode_enum(val)
 
 
 class _OID(ASN1Obj):
@@ -1200,6 +1297,18 @@ class _OID(ASN1Obj):
         buf = self._encode_cont()
         lval = len(buf)
         return 0, lval, [ (T_BYTES, buf, 8*lval) ]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # content is encoded like the BER one, prefixed with a length determinant
+    
+    def _from_oer(self, char):
+        self._decode_cont( ASN1CodecOER.decode_buf(char) )
+    
+    def _to_oer(self):
+        return ASN1CodecOER.encode_buf( self._encode_cont() )
 
 
 class OID(_OID):
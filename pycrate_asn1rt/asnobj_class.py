@@ -82,6 +82,11 @@ Specific method:
     TYPE  = TYPE_CLASS
     TAG   = None
     
+    # hashed indexes of a values set, {ident: {field value: CLASS value}}, built
+    # at the first lookup for each identifier, and _val it was built from
+    _lut     = None
+    _lut_val = None
+    
     def _safechk_val(self, val):
         if not isinstance(val, dict) or not all([k in self._cont for k in val]):
             raise(ASN1ObjErr('{0}: invalid value, {1!r}'.format(self.fullname(), val)))
@@ -144,6 +149,13 @@ Specific method:
                             pass
                 return values
             else:
+                lut = self._get_lut(name)
+                if lut is not None:
+                    try:
+                        return lut.get(val, None)
+                    except TypeError:
+                        # unhashable value, e.g. an OID as list
+                        pass
                 if self._val.root:
                     for v in self._val.root:
                         try:
@@ -160,6 +172,29 @@ Specific method:
                             pass
                 return None
     
+    def _get_lut(self, name):
+        # returns the hashed index {field value: CLASS value} of the values set
+        # for the identifier `name', or None if some of its values are not 
+        # hashable
+        # the first CLASS value is kept in case of duplicated field values, as
+        # for the linear lookup
+        if self._lut_val is not self._val:
+            self._lut, self._lut_val = {}, self._val
+        try:
+            return self._lut[name]
+        except KeyError:
+            lut = {}
+            try:
+                for vals in (self._val.root, self._val.ext):
+                    if vals:
+                        for v in vals:
+                            if name in v and v[name] not in lut:
+                                lut[v[name]] = v
+            except TypeError:
+                lut = None
+            self._lut[name] = lut
+            return lut
+    
     # this is very experimental... and may certainly raise() in case of 
     # MODE_SET or MODE_TYPE field setting
     def from_asn1(self, txt):
@@ -548,6 +548,68 @@ Specific attributes:
         else:
             lval = sum([f[2] for f in TLV]) >> 3
             return 1, lval, TLV
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    # the chosen item is prefixed with its outermost tag, and encoded as an open
+    # type when in the extension part;
+    # an untagged CHOICE item encodes the tag of its own chosen item
+    
+    def _from_oer(self, char):
+        cur = char._cur
+        cl, tval = ASN1CodecOER.decode_tag(char)
+        if (cl, tval) not in self._cont_tags:
+            # decode unknown extension, if possible
+            if self._ext is not None:
+                # unknown extension
+                ident = '_ext_%r%r%r' % (cl, 0, tval)
+                if not self._SILENT:
+                    asnlog('CHOICE._from_oer: %s, unknown extension tag %r'\
+                           % (self.fullname(), (cl, tval)))
+                self._val = (ident, ASN1CodecOER.decode_buf(char))
+                return
+            else:
+                raise(ASN1OERDecodeErr('{0}: invalid CHOICE tag according to the content, {1!r}'\
+                      .format(self.fullname(), (cl, tval))))
+        path = self._cont_tags[(cl, tval)]
+        if isinstance(path, list):
+            # untagged choice, decoding its tag again
+            ident = path[0]
+            char._cur = cur
+        else:
+            ident = path
+        Cho = self._cont[ident]
+        _par = Cho._parent
+        Cho._parent = self
+        if self._ext and ident in self._ext and not isinstance(path, list):
+            # extended choice
+            self._val = (ident, ASN1CodecOER.decode_open(char, Cho))
+        else:
+            Cho._from_oer(char)
+            self._val = (ident, Cho._val)
+        Cho._parent = _par
+    
+    def _to_oer(self):
+        if self._val[0][:5] == '_ext_':
+            # unknown extension re-encoding
+            assert( self._ext is not None )
+            cl, tval = int(self._val[0][5:6]), int(self._val[0][7:])
+            return ASN1CodecOER.encode_tag(cl, tval) + ASN1CodecOER.encode_buf(self._val[1])
+        Cho = self._cont[self._val[0]]
+        Cho._val = self._val[1]
+        _par = Cho._parent
+        Cho._parent = self
+        if not Cho._tagc:
+            # untagged choice, encoding its own tag
+            GEN = Cho._to_oer()
+        elif self._ext and self._val[0] in self._ext:
+            # extended choice
+            GEN = ASN1CodecOER.encode_tag(*Cho._tagc[0]) + ASN1CodecOER.encode_open(Cho)
+        else:
+            GEN = ASN1CodecOER.encode_tag(*Cho._tagc[0]) + Cho._to_oer()
+        Cho._parent = _par
+        return GEN
 
 
 #------------------------------------------------------------------------------#
@@ -558,6 +620,47 @@ class _CONSTRUCT(ASN1Obj):
     
     # this class implements the methods that are common to SEQ and SET
     
+    # decoding plans, set by init_modules() or at the first decoding:
+    # _plan_root: tuple of (ident, Comp, mask) for the root components, in the 
+    #   order of the PER / OER encoding, with mask the bit of the optional
+    #   component in the preamble, or 0 for a mandatory component
+    # _plan_ext: tuple of (ident, Comp) for each extension bit, with ident None
+    #   and Comp the group object for a group of extended components
+    # _plan_tags: tuple of (Comp, tag, mand) for all components in the order of
+    #   the content, with tag the outermost tag of Comp or None if it is untagged
+    # _plan_mand: frozenset of idents of mandatory root components
+    _plan_root = None
+    _plan_ext  = None
+    _plan_tags = None
+    _plan_mand = None
+    
+    def _init_dec_plan(self):
+        # for SET, use self._root_canon which is the canonical order of root components
+        if self.TYPE == TYPE_SET:
+            root_canon = self._root_canon
+        else:
+            root_canon = self._root
+        opt_len, plan_root = len(self._root_opt), []
+        for ident in root_canon:
+            if ident in self._root_opt:
+                mask = 1 << (opt_len-1-self._root_opt.index(ident))
+            else:
+                mask = 0
+            plan_root.append( (ident, self._cont[ident], mask) )
+        plan_ext = []
+        if self._ext is not None:
+            for ext in self._ext_nest:
+                if isinstance(ext, list):
+                    plan_ext.append( (None, self._ext_group_obj[self._ext_ident[ext[0]]]) )
+                else:
+                    plan_ext.append( (ext, self._cont[ext]) )
+        self._plan_mand = frozenset(self._root_mand)
+        self._plan_tags = tuple([(Comp, Comp._tagc[0] if Comp._tagc else None,
+                                  Comp._name in self._plan_mand) for Comp in self._cont.values()])
+        self._plan_ext  = tuple(plan_ext)
+        # _plan_root is set last, as it is the one checked by decoders
+        self._plan_root = tuple(plan_root)
+    
     def _safechk_val(self, val):
         if not isinstance(val, dict):
             raise(ASN1ObjErr('{0}: invalid value, {1!r}'.format(self.fullname(), val)))
@@ -628,6 +731,8 @@ class _CONSTRUCT(ASN1Obj):
             # empty sequence
             self._struct = Envelope(self._name, GEN=tuple())
             return
+        elif self._plan_root is None:
+            self._init_dec_plan()
         #
         extended = False
         if self._ext is not None:
@@ -648,19 +753,13 @@ class _CONSTRUCT(ASN1Obj):
             if ASN1CodecPER.ALIGNED:
                 ASN1CodecPER._off[-1] += opt_len
             Bv = B()
-            opt_idents = [self._root_opt[i] for i in range(opt_len) if Bv & (1<<(opt_len-1-i))]
         else:
-            opt_idents = []
+            Bv = 0
         #
-        # decode components in the root part
-        # or SET, use self._root_canon which is the canonical order of root components
-        if self.TYPE == TYPE_SET:
-            root_canon = self._root_canon
-        else:
-            root_canon = self._root
-        for ident in root_canon:
-            Comp = self._cont[ident]
-            if ident in self._root_mand or ident in opt_idents:
+        # decode components in the root part, according to the decoding plan
+        # (which follows the canonical order of root components for SET)
+        for ident, Comp, mask in self._plan_root:
+            if not mask or Bv & mask:
                 # component present in the encoding
                 _par = Comp._parent
                 Comp._parent = self
@@ -708,17 +807,15 @@ class _CONSTRUCT(ASN1Obj):
             for i in range(ldet):
                 if Bv & (1<<(ldet-1-i)):
                     # extension present
-                    if i < len(self._ext_nest):
+                    if i < len(self._plan_ext):
                         # known extension
-                        ext = self._ext_nest[i]
-                        if isinstance(ext, list):
+                        ext, Comp = self._plan_ext[i]
+                        if ext is None:
                             # grouped extension
-                            Comp = self._ext_group_obj[self._ext_ident[ext[0]]]
                             val, _gen = ASN1CodecPER.decode_unconst_open_ws(char, wrapped=Comp)
                             self._val.update(val)
                         else:
                             # single extension, ident == ext
-                            Comp = self._cont[ext]
                             _par = Comp._parent
                             Comp._parent = self
                             val, _gen = ASN1CodecPER.decode_unconst_open_ws(char, wrapped=Comp)
@@ -739,6 +836,8 @@ class _CONSTRUCT(ASN1Obj):
             # empty sequence
             self._struct = Envelope(self._name, GEN=tuple())
             return
+        elif self._plan_root is None:
+            self._init_dec_plan()
         #
         extended = False
         if self._ext is not None:
@@ -754,19 +853,13 @@ class _CONSTRUCT(ASN1Obj):
             Bv = char.get_uint(opt_len)
             if ASN1CodecPER.ALIGNED:
                 ASN1CodecPER._off[-1] += opt_len
-            opt_idents = [self._root_opt[i] for i in range(opt_len) if Bv & (1<<(opt_len-1-i))]
         else:
-            opt_idents = []
+            Bv = 0
         #
-        # decode components in the root part
-        # for SET, use self._root_canon which is the canonical order of root components
-        if self.TYPE == TYPE_SET:
-            root_canon = self._root_canon
-        else:
-            root_canon = self._root
-        for ident in root_canon:
-            Comp = self._cont[ident]
-            if ident in self._root_mand or ident in opt_idents:
+        # decode components in the root part, according to the decoding plan
+        # (which follows the canonical order of root components for SET)
+        for ident, Comp, mask in self._plan_root:
+            if not mask or Bv & mask:
                 # component present in the encoding
                 _par = Comp._parent
                 Comp._parent = self
@@ -803,16 +896,14 @@ class _CONSTRUCT(ASN1Obj):
             for i in range(ldet):
                 if Bv & (1<<(ldet-1-i)):
                     # extension present
-                    if i < len(self._ext_nest):
+                    if i < len(self._plan_ext):
                         # known extension
-                        ext = self._ext_nest[i]
-                        if isinstance(ext, list):
+                        ext, Comp = self._plan_ext[i]
+                        if ext is None:
                             # grouped extension
-                            Comp = self._ext_group_obj[self._ext_ident[ext[0]]]
                             self._val.update(ASN1CodecPER.decode_unconst_open(char, wrapped=Comp))
                         else:
                             # single extension, ident == ext
-                            Comp = self._cont[ext]
                             _par = Comp._parent
                             Comp._parent = self
                             self._val[ext] = ASN1CodecPER.decode_unconst_open(char, wrapped=Comp)
@@ -1068,6 +1159,178 @@ class _CONSTRUCT(ASN1Obj):
             GEN.extend(_gen_ext)
         #
         return GEN
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    # the preamble contains the extension bit and the presence bitmap of the
+    # optional / default root components, extended components are encoded as
+    # open types after a presence bitmap encoded like a BIT STRING
+    
+    def _from_oer(self, char):
+        self._val = {}
+        if not self._cont:
+            # empty sequence
+            return
+        elif self._plan_root is None:
+            self._init_dec_plan()
+        #
+        # get the preamble
+        opt_len = len(self._root_opt)
+        if self._ext is not None:
+            pre_len = 1 + opt_len
+        else:
+            pre_len = opt_len
+        if pre_len:
+            pad = -pre_len % 8
+            Bv = char.get_uint(pre_len + pad) >> pad
+            extended = self._ext is not None and Bv >> opt_len
+        else:
+            extended, Bv = False, 0
+        #
+        # decode components in the root part, according to the decoding plan
+        # (which follows the canonical order of root components for SET)
+        for ident, Comp, mask in self._plan_root:
+            if not mask or Bv & mask:
+                # component present in the encoding
+                _par = Comp._parent
+                Comp._parent = self
+                Comp._from_oer(char)
+                self._val[ident] = Comp._val
+                Comp._parent = _par
+            elif Comp._def is not None and ASN1CodecOER.GET_DEFVAL:
+                # component absent of the encoding, but with default value
+                self._val[ident] = Comp._def
+        #
+        # decode components in the extension part
+        if extended:
+            # get the bitmap for extended (group of) components
+            l = ASN1CodecOER.decode_len(char)
+            if l == 0:
+                raise(ASN1OERDecodeErr('{0}: invalid extension bitmap length'\
+                      .format(self.fullname())))
+            bu = char.get_uint(8)
+            if bu > 7:
+                raise(ASN1OERDecodeErr('{0}: invalid extension bitmap counter for unused bits'\
+                      .format(self.fullname())))
+            ldet = 8*(l-1) - bu
+            Bv = char.get_uint(8*(l-1)) >> bu
+            #
+            for i in range(ldet):
+                if Bv & (1<<(ldet-1-i)):
+                    # extension present
+                    if i < len(self._plan_ext):
+                        # known extension
+                        ext, Comp = self._plan_ext[i]
+                        if ext is None:
+                            # grouped extension
+                            self._val.update(ASN1CodecOER.decode_open(char, Comp))
+                        else:
+                            # single extension, ident == ext
+                            _par = Comp._parent
+                            Comp._parent = self
+                            self._val[ext] = ASN1CodecOER.decode_open(char, Comp)
+                            Comp._parent = _par
+                    else:
+                        # unknown extension
+                        self._val['_ext_%r' % i] = ASN1CodecOER.decode_buf(char)
+    
+    def _to_oer(self):
+        GEN = []
+        if not self._cont:
+            # empty sequence
+            return GEN
+        #
+        extended, Bv, pre_len = False, 0, len(self._root_opt)
+        if self._ext is not None:
+            # check if some extended components are provided
+            for k in self._val:
+                if k in self._ext or k[:5] == '_ext_':
+                    extended = True
+                    break
+            Bv, pre_len = int(extended), 1 + pre_len
+        #
+        # generate the preamble, with the bitmap for optional / default
+        # components of the root part
+        def_idents = []
+        for ident in self._root_opt:
+            Bv <<= 1
+            if ident in self._val:
+                if ASN1CodecOER.CANONICAL and self._val[ident] == self._cont[ident]._def:
+                    # the value provided equals the default one
+                    # hence will not be encoded
+                    def_idents.append(ident)
+                else:
+                    # component present in the encoding
+                    Bv += 1
+        if pre_len:
+            pad = -pre_len % 8
+            GEN.append( (T_UINT, Bv << pad, pre_len + pad) )
+        #
+        # encode components in the root part
+        if self.TYPE == TYPE_SET:
+            root_canon = self._root_canon
+        else:
+            root_canon = self._root
+        for ident in root_canon:
+            if ident in self._val and ident not in def_idents:
+                # component present in the encoding
+                Comp = self._cont[ident]
+                _par = Comp._parent
+                Comp._parent = self
+                Comp._val = self._val[ident]
+                GEN.extend( Comp._to_oer() )
+                Comp._parent = _par
+        #
+        # encode components in the extension part
+        if extended:
+            # generate the structure for all known present extension
+            _gen_ext, Bm, cnt = [], [], 0
+            for ident in self._ext_nest:
+                if isinstance(ident, list):
+                    if any([i in self._val for i in ident]):
+                        # group of extension present in the encoding
+                        gid = self._ext_ident[ident[0]]
+                        Comp = self._ext_group_obj[gid]
+                        Comp._val = {k: self._val[k] for k in self._ext_group[gid] if k in self._val}
+                        _gen_ext.extend( ASN1CodecOER.encode_open(Comp) )
+                        Bm.append(cnt)
+                elif ident in self._val:
+                    # single extension present in the encoding
+                    Comp = self._cont[ident]
+                    _par = Comp._parent
+                    Comp._parent = self
+                    Comp._val = self._val[ident]
+                    _gen_ext.extend( ASN1CodecOER.encode_open(Comp) )
+                    Comp._parent = _par
+                    Bm.append(cnt)
+                cnt += 1
+            #
+            # generate the structure for all unknown present extension
+            unk_idents = [i for i in self._val if i[:5] == '_ext_']
+            if unk_idents:
+                # sort by index set to the ident
+                unk_idents.sort(key=lambda x:int(x[5:]))
+                for ident in unk_idents:
+                    ind = int(ident[5:])
+                    if ind >= cnt and ind not in Bm:
+                        _gen_ext.extend( ASN1CodecOER.encode_buf(self._val[ident]) )
+                        Bm.append(ind)
+                    elif not self._SILENT:
+                        asnlog('_CONSTRUCT._to_oer: %s.%s, invalid unknown extension index'\
+                               % (self.fullname(), ident))
+            #
+            # generate the bitmap for extended (group of) components, encoded
+            # like a BIT STRING
+            ldet = 1 + max(Bm)
+            pad  = -ldet % 8
+            GEN.extend( ASN1CodecOER.encode_len(1 + ((ldet + pad) >> 3)) )
+            GEN.append( (T_UINT, pad, 8) )
+            GEN.append( (T_UINT, sum([1<<(ldet-1-i) for i in Bm]) << pad, ldet + pad) )
+            # finally concat with all encoded extensions
+            GEN.extend(_gen_ext)
+        #
+        return GEN
 
 
 class SEQ(_CONSTRUCT):
@@ -1244,13 +1507,16 @@ Specific attributes:
             else:
                 return Envelope('V', GEN=tuple(TLV))
         #
+        if self._plan_tags is None:
+            self._init_dec_plan()
+        #
         Tag, cl, pc, tval, Len, lval = tlv[ind][0:6]
         tag = (cl, tval)
         #
         # 2) get over all components within the SEQUENCE content 1 by 1
         #    check if it corresponds to the current tlv
         #    decode the component
-        for Comp in self._cont.values():
+        for Comp, ctag, mand in self._plan_tags:
             #
             next = False
             if (cl, pc, tval, lval) == (0, 0, 0, 0):
@@ -1259,7 +1525,11 @@ Specific attributes:
                 break
             #
             else:
-                m = match_tag(Comp, tag)
+                if ctag is not None:
+                    # tagged component, check is easy
+                    m = 1 if tag == ctag else 0
+                else:
+                    m = match_tag(Comp, tag)
                 if m == 1:
                     next = True
                 elif m > 1:
@@ -1271,11 +1541,11 @@ Specific attributes:
                         if not self._SILENT:
                             asnlog('SEQUENCE._decode_ber_cont_ws: %s, unable to determine '\
                                    'if component %s is present (err %i)' % (self.fullname(), Comp._name, m))
-                        if Comp._name in self._root_mand:
+                        if mand:
                             # component is mandatory, so we will still try to decode it
                             next = True
             #
-            if not next and Comp._name in self._root_mand:
+            if not next and mand:
                 # missing mandatory component
                 raise(ASN1BERDecodeErr('{0}: missing mandatory component, {1}'\
                       .format(self.fullname(), Comp._name)))
@@ -1295,7 +1565,7 @@ Specific attributes:
                     tag = (cl, tval)
                 else:
                     # no more tlv to consume
-                    if Comp._name in self._root_mand and Comp._name != self._root_mand[-1]:
+                    if mand and Comp._name != self._root_mand[-1]:
                         # missing mandatory component
                         raise(ASN1BERDecodeErr('{0}: missing mandatory component, {1!r}'\
                               .format(self.fullname(), self._root_mand[self._root_mand.index(Comp._name):])))
@@ -1354,13 +1624,16 @@ Specific attributes:
             else:
                 return
         #
+        if self._plan_tags is None:
+            self._init_dec_plan()
+        #
         cl, pc, tval, lval = tlv[ind][0:4]
         tag = (cl, tval)
         #
         # 2) get over all components within the SEQUENCE content 1 by 1
         #    check if it corresponds to the current tlv
         #    decode the component
-        for Comp in self._cont.values():
+        for Comp, ctag, mand in self._plan_tags:
             #
             next = False
             if (cl, pc, tval, lval) == (0, 0, 0, 0):
@@ -1369,7 +1642,11 @@ Specific attributes:
                 break
             #
             else:
-                m = match_tag(Comp, tag)
+                if ctag is not None:
+                    # tagged component, check is easy
+                    m = 1 if tag == ctag else 0
+                else:
+                    m = match_tag(Comp, tag)
                 if m == 1:
                     next = True
                 elif m > 1:
@@ -1381,12 +1658,12 @@ Specific attributes:
                         if not self._SILENT:
                             asnlog('SEQUENCE._decode_ber_cont_ws: %s, unable to determine '\
                                    'if component %s is present (err %i)' % (self.fullname(), Comp._name, m))
-                        if Comp._name in self._root_mand:
+                        if mand:
                             # component is mandatory, so we will still try to decode it
                             next = True
             #
             if not next:
-                if Comp._name in self._root_mand:
+                if mand:
                     # missing mandatory component
                     raise(ASN1BERDecodeErr('{0}: missing mandatory component, {1}'\
                           .format(self.fullname(), Comp._name)))
@@ -1404,7 +1681,7 @@ Specific attributes:
                     tag = (cl, tval)
                 else:
                     # no more tlv to consume
-                    if Comp._name in self._root_mand and Comp._name != self._root_mand[-1]:
+                    if mand and Comp._name != self._root_mand[-1]:
                         # missing mandatory component
                         raise(ASN1BERDecodeErr('{0}: missing mandatory component, {1!r}'\
                               .format(self.fullname(), self._root_mand[self._root_mand.index(Comp._name):])))
@@ -2419,6 +2696,32 @@ class _CONSTRUCT_OF(ASN1Obj):
         #
         Comp._parent = _par
         return 1, lval, TLV
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    # the number of components is encoded first, in a length-prefixed quantity
+    # field
+    
+    def _from_oer(self, char):
+        cnt = ASN1CodecOER.decode_count(char)
+        Comp, self._val = self._cont, []
+        _par = Comp._parent
+        Comp._parent = self
+        for i in range(cnt):
+            Comp._from_oer(char)
+            self._val.append(Comp._val)
+        Comp._parent = _par
+    
+    def _to_oer(self):
+        Comp, GEN = self._cont, ASN1CodecOER.encode_count(len(self._val))
+        _par = Comp._parent
+        Comp._parent = self
+        for val in self._val:
+            Comp._val = val
+            GEN.extend( Comp._to_oer() )
+        Comp._parent = _par
+        return GEN
 
 
 class SEQ_OF(_CONSTRUCT_OF):
@@ -147,14 +147,15 @@ Alternative single value: Python 2-tuple
             return const_tr
     
     def _safechk_val(self, val):
-        if not isinstance(val, bytes_types):
+        if not isinstance(val, bytes_types) and not isinstance(val[1], ASN1Lazy):
             if isinstance(val[0], ASN1Obj):
                 val[0]._safechk_val(val[1])
             else:
                 self._get_val_obj(val[0])._safechk_val(val[1])
     
     def _safechk_bnd(self, val):
-        if not isinstance(val, bytes_types):
+        # lazy values are checked when decoded
+        if not isinstance(val, bytes_types) and not isinstance(val[1], ASN1Lazy):
             if isinstance(val[0], ASN1Obj):
                 val[0]._safechk_bnd(val[1])
             else:
@@ -211,7 +212,7 @@ Alternative single value: Python 2-tuple
             else:
                 ident = '.'.join(self._val[0])
             Obj = self._get_val_obj(self._val[0])
-            Obj._val = self._val[1]
+            Obj._val = get_lazy_val(self._val[1])
             return '%s: %s' % (ident, Obj.to_asn1())
     
     ###
@@ -269,7 +270,14 @@ Alternative single value: Python 2-tuple
             # until a correct one is found !!!
             Obj = None
         #
-        val = ASN1CodecPER.decode_unconst_open(char, wrapped=Obj)
+        if Obj is not None and self._LAZY:
+            # keep the open type buffer, to be decoded when accessed
+            if ASN1CodecPER.ALIGNED:
+                val = ASN1Lazy(Obj, ASN1CodecPER.decode_unconst_open(char), 'aper')
+            else:
+                val = ASN1Lazy(Obj, ASN1CodecPER.decode_unconst_open(char), 'uper')
+        else:
+            val = ASN1CodecPER.decode_unconst_open(char, wrapped=Obj)
         if Obj is None:
             if self._const_val:
                 asnlog('OPEN._from_per: %s, potential type constraint(s) available'\
@@ -292,7 +300,7 @@ Alternative single value: Python 2-tuple
             Obj = self._val[0]
         else:
             Obj = self._get_val_obj(self._val[0])
-        Obj._val = self._val[1]
+        Obj._val = get_lazy_val(self._val[1])
         GEN = ASN1CodecPER.encode_unconst_open_ws(Obj)
         #Obj._val = None
         self._struct = Envelope(self._name, GEN=tuple(GEN))
@@ -301,11 +309,19 @@ Alternative single value: Python 2-tuple
     def _to_per(self):
         if isinstance(self._val, bytes_types):
             return ASN1CodecPER.encode_unconst_buf(self._val)
-        elif isinstance(self._val[0], ASN1Obj):
+        elif isinstance(self._val[1], ASN1Lazy):
+            if ASN1CodecPER.ALIGNED:
+                lazy_buf = self._val[1].get_buf('aper')
+            else:
+                lazy_buf = self._val[1].get_buf('uper')
+            if lazy_buf is not None:
+                # lazy value not decoded yet, its buffer is reused as is
+                return ASN1CodecPER.encode_unconst_buf(lazy_buf[0])
+        if isinstance(self._val[0], ASN1Obj):
             Obj = self._val[0]
         else:
             Obj = self._get_val_obj(self._val[0])
-        Obj._val = self._val[1]
+        Obj._val = get_lazy_val(self._val[1])
         ret = ASN1CodecPER.encode_unconst_open(Obj)
         #Obj._val = None
         return ret
@@ -422,7 +438,14 @@ Alternative single value: Python 2-tuple
                 asnlog('OPEN._decode_ber_cont: %s, DEFINED BY lookup not supported' % self.fullname())
         #
         decoded = False
-        if Obj is not None:
+        if Obj is not None and self._LAZY:
+            # keep the TLV structure, to be decoded when accessed
+            if Obj._typeref is not None:
+                self._val = (Obj._typeref.called[1], ASN1Lazy(Obj, char._buf, 'ber', tlv=tlv))
+            else:
+                self._val = (Obj.TYPE, ASN1Lazy(Obj, char._buf, 'ber', tlv=tlv))
+            decoded = True
+        elif Obj is not None:
             # we found a defined object
             char_cur, char_lb = char._cur, char._len_bit
             try:
@@ -472,7 +495,7 @@ Alternative single value: Python 2-tuple
                 Obj = self._val[0]
             else:
                 Obj = self._get_val_obj(self._val[0])
-            Obj._val = self._val[1]
+            Obj._val = get_lazy_val(self._val[1])
             TLV = Obj._to_ber_ws()
         if ASN1CodecBER.ENC_LUNDEF:
             return 1, -1, TLV
@@ -494,13 +517,67 @@ Alternative single value: Python 2-tuple
                 Obj = self._val[0]
             else:
                 Obj = self._get_val_obj(self._val[0])
-            Obj._val = self._val[1]
+            Obj._val = get_lazy_val(self._val[1])
             TLV = Obj._to_ber()
         if ASN1CodecBER.ENC_LUNDEF:
             return 1, -1, TLV
         else:
             lval = sum([f[2] for f in TLV]) >> 3
             return 1, lval, TLV
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    def _from_oer(self, char):
+        # try to get a defined object from a table constraint
+        if self._TAB_LUT and self._const_tab and self._const_tab_at:
+            try:
+                Obj = self._get_tab_obj()
+            except Exception as err:
+                if not self._SILENT:
+                    asnlog('OPEN._from_oer: %s, unable to retrieve a defined object, %s'\
+                           % (self.fullname(), err))
+                Obj = None
+        else:
+            Obj = None
+        #
+        if Obj is not None and self._LAZY:
+            # keep the open type buffer, to be decoded when accessed
+            if ASN1CodecOER.CANONICAL:
+                val = ASN1Lazy(Obj, ASN1CodecOER.decode_buf(char), 'coer')
+            else:
+                val = ASN1Lazy(Obj, ASN1CodecOER.decode_buf(char), 'oer')
+        else:
+            val = ASN1CodecOER.decode_open(char, wrapped=Obj)
+        if Obj is None:
+            if self._const_val:
+                asnlog('OPEN._from_oer: %s, potential type constraint(s) available'\
+                       % self.fullname())
+            self._val = val
+        else:
+            if Obj._typeref is not None:
+                self._val = (Obj._typeref.called[1], val)
+            else:
+                self._val = (Obj.TYPE, val)
+    
+    def _to_oer(self):
+        if isinstance(self._val, bytes_types):
+            return ASN1CodecOER.encode_buf(self._val)
+        elif isinstance(self._val[1], ASN1Lazy):
+            if ASN1CodecOER.CANONICAL:
+                lazy_buf = self._val[1].get_buf('coer')
+            else:
+                lazy_buf = self._val[1].get_buf('oer')
+            if lazy_buf is not None:
+                # lazy value not decoded yet, its buffer is reused as is
+                return ASN1CodecOER.encode_buf(lazy_buf[0])
+        if isinstance(self._val[0], ASN1Obj):
+            Obj = self._val[0]
+        else:
+            Obj = self._get_val_obj(self._val[0])
+        Obj._val = get_lazy_val(self._val[1])
+        return ASN1CodecOER.encode_open(Obj)
 
 
 class ANY(OPEN):
@@ -125,7 +125,7 @@ Specific constraints attributes:
         if isinstance(val[0], integer_types):
             if not isinstance(val[1], integer_types):
                 raise(ASN1ObjErr('{0}: invalid value, {1!r}'.format(self.fullname(), val)))
-        else:
+        elif not isinstance(val[1], ASN1Lazy):
             self._get_val_obj(val[0])._safechk_val(val[1])
     
     def _safechk_bnd(self, val):
@@ -265,7 +265,7 @@ Specific constraints attributes:
             else:
                 ident = self._const_cont.TYPE 
             if self._val[0] == ident:
-                self._const_cont._val = self._val[1]
+                self._const_cont._val = get_lazy_val(self._val[1])
                 return '%s: %s' % (self._val[0], self._const_cont._to_asn1())
         raise(ASN1ASNEncodeErr('{0}: non-encodable value, {1!r}'\
               .format(self.fullname(), self._val)))
@@ -461,6 +461,16 @@ Specific constraints attributes:
                     asnlog('BIT_STR.__from_per_buf: %s, specific CONTAINING encoder unhandled'\
                            % self._name)
                 self._val = (bytes_to_uint(buf, bl), bl)
+            elif self._LAZY:
+                # keep the buffer, to be decoded when accessed
+                if self._const_cont._typeref:
+                    ident = self._const_cont._typeref.called[1]
+                else:
+                    ident = self._const_cont.TYPE
+                if ASN1CodecPER.ALIGNED:
+                    self._val = (ident, ASN1Lazy(self._const_cont, buf, 'aper', bl=bl))
+                else:
+                    self._val = (ident, ASN1Lazy(self._const_cont, buf, 'uper', bl=bl))
             else:
                 char = Charpy(buf)
                 char._len_bit = bl
@@ -544,7 +554,7 @@ Specific constraints attributes:
                 # TODO: different codec to be used
                 raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
                       .format(self.fullname())))
-            Cont._val = self._val[1]
+            Cont._val = get_lazy_val(self._val[1])
             if ASN1CodecPER.ALIGNED:
                 buf = Cont.to_aper_ws()
             else:
@@ -625,12 +635,20 @@ Specific constraints attributes:
         # convert the value into a buffer and length in bits
         if not isinstance(self._val[0], integer_types):
             # 1) value is for a contained object to be encoded 
+            if isinstance(self._val[1], ASN1Lazy):
+                if ASN1CodecPER.ALIGNED:
+                    lazy_buf = self._val[1].get_buf('aper')
+                else:
+                    lazy_buf = self._val[1].get_buf('uper')
+                if lazy_buf is not None:
+                    # lazy value not decoded yet, its buffer is reused as is
+                    return lazy_buf
             Cont = self._get_val_obj(self._val[0])
             if Cont == self._const_cont and self._const_cont_enc is not None:
                 # TODO: different codec to be used
                 raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
                       .format(self.fullname())))
-            Cont._val = self._val[1]
+            Cont._val = get_lazy_val(self._val[1])
             if ASN1CodecPER.ALIGNED:
                 buf = Cont.to_aper()
             else:
@@ -782,6 +800,13 @@ Specific constraints attributes:
                     asnlog('BIT_STR.__from_ber_buf: %s, specific CONTAINING encoder unhandled'\
                            % self._name)
                 self._val = (bytes_to_uint(buf, bl), bl)
+            elif self._LAZY:
+                # keep the buffer, to be decoded when accessed
+                if self._const_cont._typeref:
+                    ident = self._const_cont._typeref.called[1]
+                else:
+                    ident = self._const_cont.TYPE
+                self._val = (ident, ASN1Lazy(self._const_cont, buf, 'ber', bl=bl))
             else:
                 Obj, char = self._const_cont, Charpy(buf)
                 char._len_bit = bl
@@ -856,17 +881,122 @@ Specific constraints attributes:
         # convert the value into a buffer and length in bits
         if not isinstance(self._val[0], integer_types):
             # 1) value is for a contained object to be encoded 
+            if isinstance(self._val[1], ASN1Lazy):
+                lazy_buf = self._val[1].get_buf('ber')
+                if lazy_buf is not None:
+                    # lazy value not decoded yet, its buffer is reused as is
+                    return lazy_buf
             Cont = self._get_val_obj(self._val[0])
             if Cont == self._const_cont and self._const_cont_enc is not None:
                 # TODO: different codec to be used
                 raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
                       .format(self.fullname())))
-            Cont._val = self._val[1]
+            Cont._val = get_lazy_val(self._val[1])
             buf = Cont.to_ber()
             return buf, 8*len(buf)
         else:
             # 2) value is the standard (uint, bit length)
             return uint_to_bytes(self._val[0], self._val[1]), self._val[1]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # a fixed size BIT STRING is encoded without length determinant nor unused
+    # bits count
+    
+    def _from_oer(self, char):
+        if self._const_sz and self._const_sz.ext is None and self._const_sz.rdyn == 0:
+            # fixed size
+            bl = self._const_sz.lb
+            buf = char.get_bytes(bl + (-bl % 8))
+        else:
+            l = ASN1CodecOER.decode_len(char)
+            if l == 0:
+                raise(ASN1OERDecodeErr('{0}: invalid BIT STRING length'\
+                      .format(self.fullname())))
+            bu = char.get_uint(8)
+            if bu > 7 or (l == 1 and bu):
+                raise(ASN1OERDecodeErr('{0}: invalid BIT STRING counter for unused bits'\
+                      .format(self.fullname())))
+            buf = char.get_bytes(8*(l-1))
+            bl  = 8*(l-1) - bu
+        self.__from_oer_buf(buf, bl)
+    
+    def __from_oer_buf(self, buf, bl):
+        # set the BIT STRING value according to buf and bit length
+        if self._const_cont is not None:
+            if self._const_cont_enc is not None:
+                # TODO: different codec to be used
+                if not self._SILENT:
+                    asnlog('BIT_STR.__from_oer_buf: %s, specific CONTAINING encoder unhandled'\
+                           % self._name)
+                self._val = (bytes_to_uint(buf, bl), bl)
+            elif self._LAZY:
+                # keep the buffer, to be decoded when accessed
+                if self._const_cont._typeref:
+                    ident = self._const_cont._typeref.called[1]
+                else:
+                    ident = self._const_cont.TYPE
+                if ASN1CodecOER.CANONICAL:
+                    self._val = (ident, ASN1Lazy(self._const_cont, buf, 'coer', bl=bl))
+                else:
+                    self._val = (ident, ASN1Lazy(self._const_cont, buf, 'oer', bl=bl))
+            else:
+                Obj, char = self._const_cont, Charpy(buf)
+                char._len_bit = bl
+                _const_cont_par = Obj._parent
+                Obj._parent = self._parent
+                try:
+                    Obj._from_oer(char)
+                except:
+                    if not self._SILENT:
+                        asnlog('BIT_STR.__from_oer_buf: %s, CONTAINING object decoding failed'\
+                               % self._name)
+                    Obj._parent = _const_cont_par
+                    self._val = (bytes_to_uint(buf, bl), bl)
+                else:
+                    Obj._parent = _const_cont_par
+                    if Obj._typeref:
+                        ident = Obj._typeref.called[1]
+                    else:
+                        ident = Obj.TYPE
+                    self._val = (ident, Obj._val)
+        else:
+            self._val = (bytes_to_uint(buf, bl), bl)
+    
+    def _to_oer(self):
+        buf, bl = self.__to_oer_buf()
+        if self._const_sz and self._const_sz.ext is None and self._const_sz.rdyn == 0:
+            # fixed size
+            return [ (T_BYTES, buf, 8*len(buf)) ]
+        else:
+            return ASN1CodecOER.encode_len(1 + len(buf)) + \
+                   [ (T_UINT, -bl % 8, 8), (T_BYTES, buf, 8*len(buf)) ]
+    
+    def __to_oer_buf(self):
+        # convert the value into a buffer and length in bits
+        if not isinstance(self._val[0], integer_types):
+            # 1) value is for a contained object to be encoded
+            if isinstance(self._val[1], ASN1Lazy):
+                if ASN1CodecOER.CANONICAL:
+                    lazy_buf = self._val[1].get_buf('coer')
+                else:
+                    lazy_buf = self._val[1].get_buf('oer')
+                if lazy_buf is not None:
+                    # lazy value not decoded yet, its buffer is reused as is
+                    return lazy_buf
+            Cont = self._get_val_obj(self._val[0])
+            if Cont == self._const_cont and self._const_cont_enc is not None:
+                # TODO: different codec to be used
+                raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
+                      .format(self.fullname())))
+            Cont._val = get_lazy_val(self._val[1])
+            buf = pack_val(*Cont._to_oer())[0]
+            return buf, 8*len(buf)
+        else:
+            # 2) value is the standard (uint, bit length)
+            return uint_to_bytes(self._val[0], self._val[1]), self._val[1]
 
 
 class OCT_STR(ASN1Obj):
@@ -926,7 +1056,7 @@ Specific constraints attributes:
                       .format(self.fullname(), ref)))
     
     def _safechk_val(self, val):
-        if not isinstance(val, bytes_types):
+        if not isinstance(val, bytes_types) and not isinstance(val[1], ASN1Lazy):
             self._get_val_obj(val[0])._safechk_val(val[1])
     
     def _safechk_bnd(self, val):
@@ -1011,7 +1141,7 @@ Specific constraints attributes:
             else:
                 ident = self._const_cont.TYPE 
             if self._val[0] == ident:
-                self._const_cont._val = self._val[1]
+                self._const_cont._val = get_lazy_val(self._val[1])
                 return '%s: %s' % (self._val[0], self._const_cont._to_asn1())
         raise(ASN1ASNEncodeErr('{0}: non-encodable value, {1!r}'\
               .format(self.fullname(), self._val)))
@@ -1136,6 +1266,21 @@ Specific constraints attributes:
                     self._val = ASN1CodecPER.decode_unconst_open(char)
                 else:
                     self._val = ASN1CodecPER.decode_const_open(char, self._const_sz)
+            elif self._LAZY:
+                # keep the buffer, to be decoded when accessed
+                Obj = self._const_cont
+                if unconst:
+                    buf = ASN1CodecPER.decode_unconst_open(char)
+                else:
+                    buf = ASN1CodecPER.decode_const_open(char, self._const_sz)
+                if ASN1CodecPER.ALIGNED:
+                    val = ASN1Lazy(Obj, buf, 'aper')
+                else:
+                    val = ASN1Lazy(Obj, buf, 'uper')
+                if Obj._typeref is not None:
+                    self._val = (Obj._typeref.called[1], val)
+                else:
+                    self._val = (Obj.TYPE, val)
             else:
                 Obj = self._const_cont
                 _const_cont_par = Obj._parent
@@ -1212,7 +1357,7 @@ Specific constraints attributes:
             # TODO: different codec to be used
             raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
                   .format(self.fullname())))
-        Cont._val = self._val[1]
+        Cont._val = get_lazy_val(self._val[1])
         if ASN1CodecPER.ALIGNED:
             buf = Cont.to_aper_ws()
         else:
@@ -1222,7 +1367,7 @@ Specific constraints attributes:
     
     def _to_per(self):
         if not isinstance(self._val, bytes_types):
-            buf = self.__to_per_buf()
+            buf, wrapped = self.__to_per_buf()
         else:
             buf = self._val
         GEN = []
@@ -1265,11 +1410,19 @@ Specific constraints attributes:
     def __to_per_buf(self):
         # convert the contained object value into a buffer
         Cont = self._get_val_obj(self._val[0])
+        if isinstance(self._val[1], ASN1Lazy):
+            if ASN1CodecPER.ALIGNED:
+                lazy_buf = self._val[1].get_buf('aper')
+            else:
+                lazy_buf = self._val[1].get_buf('uper')
+            if lazy_buf is not None:
+                # lazy value not decoded yet, its buffer is reused as is
+                return lazy_buf[0], Cont
         if Cont == self._const_cont and self._const_cont_enc is not None:
             # TODO: different codec to be used
             raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
                   .format(self.fullname())))
-        Cont._val = self._val[1]
+        Cont._val = get_lazy_val(self._val[1])
         if ASN1CodecPER.ALIGNED:
             buf = Cont.to_aper()
         else:
@@ -1363,6 +1516,13 @@ Specific constraints attributes:
                     asnlog('OCT_STR.__from_ber_buf: %s, specific CONTAINING encoder unhandled'\
                            % self._name)
                 self._val = buf
+            elif self._LAZY:
+                # keep the buffer, to be decoded when accessed
+                Obj = self._const_cont
+                if Obj._typeref is not None:
+                    self._val = (Obj._typeref.called[1], ASN1Lazy(Obj, buf, 'ber'))
+                else:
+                    self._val = (Obj.TYPE, ASN1Lazy(Obj, buf, 'ber'))
             else:
                 Obj, char = self._const_cont, Charpy(buf)
                 _const_cont_par = Obj._parent
@@ -1422,17 +1582,107 @@ Specific constraints attributes:
         # convert the value into a buffer and length in bits
         if not isinstance(self._val, bytes_types):
             # 1) value is for a contained object to be encoded 
+            if isinstance(self._val[1], ASN1Lazy):
+                lazy_buf = self._val[1].get_buf('ber')
+                if lazy_buf is not None:
+                    # lazy value not decoded yet, its buffer is reused as is
+                    return lazy_buf[0]
             Cont = self._get_val_obj(self._val[0])
             if Cont == self._const_cont and self._const_cont_enc is not None:
                 # TODO: different codec to be used
                 raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
                       .format(self.fullname())))
-            Cont._val = self._val[1]
+            Cont._val = get_lazy_val(self._val[1])
             buf = Cont.to_ber()
             return buf
         else:
             # 2) value is the standard (uint, bit length)
             return self._val
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # a fixed size OCTET STRING is encoded without length determinant
+    
+    def _from_oer(self, char):
+        if self._const_sz and self._const_sz.ext is None and self._const_sz.rdyn == 0:
+            # fixed size
+            self.__from_oer_buf( char.get_bytes(8*self._const_sz.lb) )
+        else:
+            self.__from_oer_buf( ASN1CodecOER.decode_buf(char) )
+    
+    def __from_oer_buf(self, buf):
+        # set the OCTET STRING value according to buf
+        if self._const_cont is not None:
+            if self._const_cont_enc is not None:
+                # TODO: different codec to be used
+                if not self._SILENT:
+                    asnlog('OCT_STR.__from_oer_buf: %s, specific CONTAINING encoder unhandled'\
+                           % self._name)
+                self._val = buf
+            elif self._LAZY:
+                # keep the buffer, to be decoded when accessed
+                Obj = self._const_cont
+                if ASN1CodecOER.CANONICAL:
+                    val = ASN1Lazy(Obj, buf, 'coer')
+                else:
+                    val = ASN1Lazy(Obj, buf, 'oer')
+                if Obj._typeref is not None:
+                    self._val = (Obj._typeref.called[1], val)
+                else:
+                    self._val = (Obj.TYPE, val)
+            else:
+                Obj, char = self._const_cont, Charpy(buf)
+                _const_cont_par = Obj._parent
+                Obj._parent = self._parent
+                try:
+                    Obj._from_oer(char)
+                except:
+                    if not self._SILENT:
+                        asnlog('OCT_STR.__from_oer_buf: %s, CONTAINING object decoding failed'\
+                               % self._name)
+                    Obj._parent = _const_cont_par
+                    self._val = buf
+                else:
+                    Obj._parent = _const_cont_par
+                    if Obj._typeref is not None:
+                        self._val = (Obj._typeref.called[1], Obj._val)
+                    else:
+                        self._val = (Obj.TYPE, Obj._val)
+        else:
+            self._val = buf
+    
+    def _to_oer(self):
+        buf = self.__to_oer_buf()
+        if self._const_sz and self._const_sz.ext is None and self._const_sz.rdyn == 0:
+            # fixed size
+            return [ (T_BYTES, buf, 8*len(buf)) ]
+        else:
+            return ASN1CodecOER.encode_buf(buf)
+    
+    def __to_oer_buf(self):
+        # convert the value into a buffer
+        if not isinstance(self._val, bytes_types):
+            # 1) value is for a contained object to be encoded
+            if isinstance(self._val[1], ASN1Lazy):
+                if ASN1CodecOER.CANONICAL:
+                    lazy_buf = self._val[1].get_buf('coer')
+                else:
+                    lazy_buf = self._val[1].get_buf('oer')
+                if lazy_buf is not None:
+                    # lazy value not decoded yet, its buffer is reused as is
+                    return lazy_buf[0]
+            Cont = self._get_val_obj(self._val[0])
+            if Cont == self._const_cont and self._const_cont_enc is not None:
+                # TODO: different codec to be used
+                raise(ASN1NotSuppErr('{0}: specific CONTAINING encoder unhandled'\
+                      .format(self.fullname())))
+            Cont._val = get_lazy_val(self._val[1])
+            return pack_val(*Cont._to_oer())[0]
+        else:
+            # 2) value is the standard bytes
+            return self._val
 
 #------------------------------------------------------------------------------#
 # All *String
@@ -2244,6 +2494,45 @@ Virtual parent for any ASN.1 *String object
             return 1, lval, TLV
         else:
             return 0, len(buf), [ (T_BYTES, buf, 8*len(buf)) ]
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    # known-multiplier character strings (those with a fixed character length)
+    # with a fixed size are encoded without length determinant
+    
+    def _from_oer(self, char):
+        if self._codec is None:
+            raise(ASN1NotSuppErr('{0}: ISO 2022 codec not supported'\
+                  .format(self.fullname())))
+        if self._clen is not None and self._const_sz and \
+        self._const_sz.ext is None and self._const_sz.rdyn == 0:
+            # fixed size
+            buf = char.get_bytes(8 * self._const_sz.lb * ((self._clen + 7) >> 3))
+        else:
+            buf = ASN1CodecOER.decode_buf(char)
+        try:
+            self._val = buf.decode(self._codec)
+        except Exception as err:
+            raise(ASN1OERDecodeErr('{0}: invalid character, Python codec error, {1}'\
+                  .format(self.fullname(), err)))
+    
+    def _to_oer(self):
+        if self._codec is None:
+            raise(ASN1NotSuppErr('{0}: ISO 2022 codec not supported'\
+                  .format(self.fullname())))
+        try:
+            buf = self._val.encode(self._codec)
+        except Exception as err:
+            raise(ASN1OEREncodeErr('{0}: invalid character, Python codec error, {1}'\
+                  .format(self.fullname(), err)))
+        if self._clen is not None and self._const_sz and \
+        self._const_sz.ext is None and self._const_sz.rdyn == 0:
+            # fixed size
+            return [ (T_BYTES, buf, 8*len(buf)) ]
+        else:
+            return ASN1CodecOER.encode_buf(buf)
 
 
 class OBJ_DESC(_String):
@@ -2496,6 +2785,21 @@ VisibleString
         ret = _String._encode_ber_cont(self)
         self._val = val
         return ret
+    
+    ###
+    # conversion between internal value and ASN.1 OER encoding
+    ###
+    
+    def _from_oer(self, char):
+        _String._from_oer(self, char)
+        self._decode_cont(self._val)
+    
+    def _to_oer(self):
+        val = self._val
+        self._val = self._encode_cont(canon=True)
+        ret = _String._to_oer(self)
+        self._val = val
+        return ret
 
 
 class TIME_UTC(_Time):
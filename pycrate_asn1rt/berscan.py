@@ -0,0 +1,590 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_asn1rt/berscan.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+import sys
+from mmap   import mmap, ACCESS_READ
+from array  import array
+from struct import Struct
+
+from .utils  import *
+from .err    import *
+from .codecs import ASN1CodecBER
+
+
+# BER / CER / DER TLV scanner
+#
+# ASN1CodecBER.decode_tlv*() and ASN1Obj.from_ber() work on a Charpy instance
+# and build the whole nested TLV structure of their input.
+# Here, only tags and lengths are decoded, directly from a bytes-like buffer
+# (bytes, memoryview, mmap): values are jumped over, so that very large files
+# (e.g. CDR or TAP files, which are long series of BER-encoded records) can be
+# walked and indexed without loading them.
+
+if python_version < 3:
+    def _bytes_at(buf):
+        return lambda i: ord(buf[i])
+else:
+    def _bytes_at(buf):
+        return buf.__getitem__
+
+
+def decode_tl(buf, off=0, end=None):
+    """decodes the tag and length at offset `off' in the buffer `buf'
+
+    Args:
+        buf: bytes-like, BER-encoded buffer
+        off: int, offset of the tag in buf
+        end: int, offset of the end of the enclosing TLV in buf, or None
+
+    Returns:
+        cl, pc, tval, lval, hlen: tag class, primitive / constructed bit and
+            value, length (-1 for the undefinite form) and length of the tag and
+            length header in bytes
+
+    Raises:
+        ASN1BERDecodeErr, if the tag or length is invalid or truncated
+    """
+    if end is None:
+        end = len(buf)
+    byte = _bytes_at(buf)
+    cur = off
+    if cur >= end:
+        raise(ASN1BERDecodeErr('truncated tag at offset {0}'.format(off)))
+    b = byte(cur)
+    cl, pc, tval = b >> 6, (b >> 5) & 1, b & 0x1f
+    cur += 1
+    if tval == 31:
+        # extended value for the tag
+        tval, d = 0, 0
+        while True:
+            if cur >= end:
+                raise(ASN1BERDecodeErr('truncated tag at offset {0}'.format(off)))
+            b = byte(cur)
+            cur += 1
+            tval = (tval << 7) + (b & 0x7f)
+            if not b & 0x80:
+                break
+            d += 1
+            if d == ASN1CodecBER.DEC_MAXT:
+                raise(ASN1BERDecodeErr('tag too long at offset {0}'.format(off)))
+    if cur >= end:
+        raise(ASN1BERDecodeErr('truncated length at offset {0}'.format(off)))
+    b = byte(cur)
+    cur += 1
+    if b & 0x80:
+        ll = b & 0x7f
+        if ll == 0:
+            # undefinite length format
+            if not pc:
+                raise(ASN1BERDecodeErr('undefinite length for a primitive TLV at offset {0}'\
+                      .format(off)))
+            return cl, pc, tval, -1, cur - off
+        elif ll > ASN1CodecBER.DEC_MAXL:
+            raise(ASN1BERDecodeErr('length prefix too long at offset {0}'.format(off)))
+        elif cur + ll > end:
+            raise(ASN1BERDecodeErr('truncated length at offset {0}'.format(off)))
+        lval = 0
+        for i in range(cur, cur + ll):
+            lval = (lval << 8) + byte(i)
+        cur += ll
+    else:
+        lval = b
+    if cur + lval > end:
+        raise(ASN1BERDecodeErr('truncated value at offset {0}'.format(off)))
+    return cl, pc, tval, lval, cur - off
+
+
+def tlv_end(buf, off=0, end=None):
+    """returns the offset of the end of the TLV starting at offset `off' in the
+    buffer `buf', walking through inner TLVs only when the undefinite length
+    format is used
+
+    Raises:
+        ASN1BERDecodeErr, if the TLV is invalid or truncated
+    """
+    if end is None:
+        end = len(buf)
+    cl, pc, tval, lval, hlen = decode_tl(buf, off, end)
+    if lval >= 0:
+        return off + hlen + lval
+    # undefinite length: walk up to the EOC marker
+    off += hlen
+    while True:
+        cl, pc, tval, lval, hlen = decode_tl(buf, off, end)
+        if lval == 0 and cl == pc == tval == 0:
+            return off + hlen
+        elif lval >= 0:
+            off += hlen + lval
+        else:
+            off = tlv_end(buf, off, end)
+
+
+def iter_tlv(buf, off=0, end=None, depth=0):
+    """walks the BER-encoded buffer `buf' and yields an event for each TLV
+
+    Only tags and lengths are decoded: values are not read at all, and buf can
+    be a memoryview over a mapped file.
+
+    Args:
+        buf: bytes-like, BER-encoded buffer
+        off: int, offset of the first TLV in buf
+        end: int, offset of the end of the TLVs in buf, or None
+        depth: int, nesting level of the TLVs to yield (0 for the top-level
+            ones), or None to yield TLVs of all levels, including EOC markers,
+            in the order of the buffer
+
+    Yields:
+        (offset, (cl, pc, tval), lval, hlen): offset of the TLV in buf, its tag
+            class, primitive / constructed bit and value, its length (-1 for the
+            undefinite form) and the length of its tag and length header
+
+    Raises:
+        ASN1BERDecodeErr, if a TLV is invalid or truncated
+    """
+    if end is None:
+        end = len(buf)
+    # stack of (end offset, or None for undefinite length, limit) of the
+    # constructed TLVs walked through
+    stack, lim = [], end
+    while True:
+        if off >= lim:
+            if not stack:
+                return
+            elif stack[-1][0] is None:
+                raise(ASN1BERDecodeErr('missing EOC marker before offset {0}'.format(off)))
+            elif off > lim:
+                raise(ASN1BERDecodeErr('invalid length at offset {0}'.format(off)))
+            stack.pop()
+            lim = stack[-1][1] if stack else end
+            continue
+        cl, pc, tval, lval, hlen = decode_tl(buf, off, lim)
+        level = len(stack)
+        if lval == 0 and cl == pc == tval == 0 and stack and stack[-1][0] is None:
+            # EOC marker of an undefinite length TLV
+            if depth is None:
+                yield off, (0, 0, 0), 0, hlen
+            off += hlen
+            stack.pop()
+            lim = stack[-1][1] if stack else end
+            continue
+        if depth is None or level == depth:
+            yield off, (cl, pc, tval), lval, hlen
+        if pc and (depth is None or level < depth):
+            # walk through the constructed TLV
+            off += hlen
+            if lval >= 0:
+                lim = off + lval
+                stack.append( (lim, lim) )
+            else:
+                stack.append( (None, lim) )
+        elif lval >= 0:
+            off += hlen + lval
+        else:
+            off = tlv_end(buf, off, lim)
+
+
+class TLVArray(object):
+    """Flat representation of all the TLVs of a BER-encoded buffer
+
+    The buffer is walked once, and each TLV is described by its index in a set
+    of arrays, in the order of the buffer (parents before their children):
+    - tag[i]: tag of the TLV, packed as (tval << 3) + (cl << 1) + pc
+    - off[i]: offset of the tag in the buffer
+    - voff[i]: offset of the value in the buffer
+    - lval[i]: length of the value, -1 for the undefinite form
+    - tend[i]: offset of the end of the TLV, including its EOC marker
+    - par[i]: index of the enclosing TLV, -1 for top-level ones
+    EOC markers are not listed.
+
+    Nothing else is allocated per TLV, so that large buffers can be scanned and
+    filtered quickly, e.g.:
+    >>> tlvs = TLVArray(buf)
+    >>> [tlvs.value(i) for i in tlvs.find(2, 4)]
+
+    A TLV can be decoded with an ASN.1 object without scanning it again, with
+    decode().
+    """
+
+    def __init__(self, buf, off=0, end=None, depth=None):
+        """Walks the buffer and builds the arrays
+
+        Args:
+            buf: bytes-like, BER-encoded buffer
+            off: int, offset of the first TLV in buf
+            end: int, offset of the end of the TLVs in buf, or None
+            depth: int, deepest nesting level of the TLVs to be listed (0 for
+                the top-level ones), or None for all levels
+
+        Raises:
+            ASN1BERDecodeErr, if a TLV is invalid or truncated
+        """
+        if end is None:
+            end = len(buf)
+        self._buf   = buf
+        self._depth = depth
+        self.tag    = array('Q')
+        self.off    = array('Q')
+        self.voff   = array('Q')
+        self.lval   = array('q')
+        self.tend   = array('Q')
+        self.par    = array('q')
+        self._scan(off, end)
+
+    def _scan(self, off, end):
+        buf, depth, byte = self._buf, self._depth, _bytes_at(self._buf)
+        tag_app, off_app, voff_app, lval_app, tend_app, par_app = \
+            self.tag.append, self.off.append, self.voff.append, \
+            self.lval.append, self.tend.append, self.par.append
+        tend = self.tend
+        # stack of (index, limit) of the constructed TLVs walked through, with
+        # limit the offset of the end of their content
+        stack, lim, i = [], end, 0
+        while True:
+            if off >= lim:
+                if not stack:
+                    return
+                elif self.lval[stack[-1][0]] < 0:
+                    raise(ASN1BERDecodeErr('missing EOC marker before offset {0}'.format(off)))
+                elif off > lim:
+                    raise(ASN1BERDecodeErr('invalid length at offset {0}'.format(off)))
+                stack.pop()
+                lim = stack[-1][1] if stack else end
+                continue
+            b = byte(off)
+            if b & 0x1f != 0x1f and off + 1 < lim and not byte(off+1) & 0x80:
+                # short tag and length, the most common case
+                cl, pc, tval, lval, hlen = b >> 6, (b >> 5) & 1, b & 0x1f, byte(off+1), 2
+                if off + 2 + lval > lim:
+                    raise(ASN1BERDecodeErr('truncated value at offset {0}'.format(off)))
+            else:
+                cl, pc, tval, lval, hlen = decode_tl(buf, off, lim)
+            if b == 0 and lval == 0 and stack and self.lval[stack[-1][0]] < 0:
+                # EOC marker of an undefinite length TLV
+                off += hlen
+                tend[stack[-1][0]] = off
+                stack.pop()
+                lim = stack[-1][1] if stack else end
+                continue
+            tag_app( (tval << 3) + (cl << 1) + pc )
+            off_app(off)
+            voff_app(off + hlen)
+            lval_app(lval)
+            par_app(stack[-1][0] if stack else -1)
+            if pc and (depth is None or len(stack) < depth):
+                # walk through the constructed TLV
+                off += hlen
+                if lval >= 0:
+                    tend_app(off + lval)
+                    lim = off + lval
+                else:
+                    # set when the EOC marker is reached
+                    tend_app(0)
+                stack.append( (i, lim) )
+            elif lval >= 0:
+                off += hlen + lval
+                tend_app(off)
+            else:
+                off = tlv_end(buf, off, lim)
+                tend_app(off)
+            i += 1
+
+    def __len__(self):
+        return len(self.tag)
+
+    def get_tag(self, i):
+        """returns the tag class, primitive / constructed bit and value of TLV i
+        """
+        t = self.tag[i]
+        return (t >> 1) & 3, t & 1, t >> 3
+
+    def get_level(self, i):
+        """returns the nesting level of TLV i, 0 for a top-level one
+        """
+        level, par = 0, self.par
+        while par[i] >= 0:
+            i = par[i]
+            level += 1
+        return level
+
+    def value(self, i):
+        """returns the value of TLV i from the buffer, excluding the EOC marker
+        for the undefinite length form
+        """
+        if self.lval[i] >= 0:
+            return self._buf[self.voff[i]:self.voff[i] + self.lval[i]]
+        else:
+            # EOC marker has a minimal size of 2 bytes
+            return self._buf[self.voff[i]:self.tend[i] - 2]
+
+    def children(self, i):
+        """returns the list of indexes of the TLVs directly enclosed in TLV i
+        """
+        par, off, tend, ret = self.par, self.off, self.tend[i], []
+        for j in range(i+1, len(par)):
+            if off[j] >= tend:
+                break
+            elif par[j] == i:
+                ret.append(j)
+        return ret
+
+    def find(self, cl, tval, pc=None):
+        """yields the indexes of all TLVs with the given tag class and value,
+        and primitive / constructed bit if not None
+        """
+        if pc is None:
+            key = (tval << 2) + cl
+            for i, t in enumerate(self.tag):
+                if t >> 1 == key:
+                    yield i
+        else:
+            key = (tval << 3) + (cl << 1) + pc
+            for i, t in enumerate(self.tag):
+                if t == key:
+                    yield i
+
+    def to_tlv(self, i, base=0):
+        """returns the TLV i as the nested list produced by
+        ASN1CodecBER.decode_single(), with offsets in bits relative to the
+        offset `base' in the buffer
+
+        Raises:
+            ASN1Err, if TLV i has not been walked through entirely
+        """
+        cl, pc, tval = self.get_tag(i)
+        lval, ccur = self.lval[i], 8*(self.voff[i] - base)
+        if not pc:
+            if lval == 0 and cl == tval == 0:
+                return [cl, pc, tval, lval, 0, ccur]
+            else:
+                return [cl, pc, tval, lval, (ccur, ccur + 8*lval), ccur]
+        if self._depth is not None and self.get_level(i) >= self._depth:
+            raise(ASN1Err('TLV {0} was not walked through'.format(i)))
+        V = [self.to_tlv(j, base) for j in self.children(i)]
+        if lval < 0:
+            # EOC marker
+            V.append( [0, 0, 0, 0, 0, 8*(self.tend[i] - base)] )
+        return [cl, pc, tval, lval, V, ccur]
+
+    def decode(self, i, Obj):
+        """decodes TLV i with the ASN.1 object `Obj' and returns the decoded
+        value, without scanning the TLV again
+
+        As with Obj.decode(), the internal value of Obj is left unchanged.
+        """
+        base = self.off[i]
+        char = Charpy(self._buf[base:self.tend[i]])
+        with Obj.get_lock():
+            val_prev = Obj._val
+            try:
+                Obj._from_ber(char, [self.to_tlv(i, base)])
+                if Obj._SAFE_DEC and Obj._SAFE_BND:
+                    Obj._safechk_bnd(Obj._val)
+                return Obj._val
+            finally:
+                Obj._val = val_prev
+
+
+class BERFile(object):
+    """Random access to the BER / CER / DER-encoded records of a file
+
+    The file is mapped in memory when possible (use_mmap=True and a regular
+    file), otherwise it is read entirely.
+
+    Records are the TLVs at nesting level `depth' (0 for the top-level ones,
+    e.g. CDRs in a CDR file, or 2 for e.g. the call event details in a TAP
+    file). Their offsets are collected with index(), and can be saved to and
+    loaded from an index file with save_index() and load_index().
+
+    Then, record buffers are accessed by their number, and decoded one at a
+    time, e.g.:
+    >>> with BERFile('cdr.ber') as f:
+    ...     f.index()
+    ...     val = f.decode(1000, CDR.GPRSChargingDataTypes.GPRSRecord)
+
+    Record buffers are memoryviews, which are only valid until the file is
+    closed when it is mapped.
+    """
+
+    # index file header: magic, depth, start offset, file length, number of records
+    _IDX_MAGIC = b'BERI'
+    _IDX_HDR   = Struct('>4sHQQQ')
+
+    def __init__(self, f, off=0, depth=0, use_mmap=True):
+        """Initializes the access to the records of the file
+
+        Args:
+            f: str (file name) or file object opened in binary mode
+            off: int, offset of the first top-level TLV in the file
+            depth: int, nesting level of the records
+            use_mmap: bool, map the file in memory when possible
+        """
+        if isinstance(f, str_types):
+            self._fd, self._fd_own = open(f, 'rb'), True
+        else:
+            self._fd, self._fd_own = f, False
+        self._mmap = None
+        if use_mmap:
+            try:
+                self._mmap = mmap(self._fd.fileno(), 0, access=ACCESS_READ)
+            except (AttributeError, EnvironmentError, ValueError):
+                # not a regular file, or empty file
+                pass
+        if self._mmap is not None:
+            self._buf = memoryview(self._mmap)
+        else:
+            self._fd.seek(0)
+            self._buf = memoryview(self._fd.read())
+        self._off   = off
+        self._depth = depth
+        # records' start and end offsets
+        self._rec_off = array('Q')
+        self._rec_end = array('Q')
+        self._indexed = False
+
+    def close(self):
+        """Closes the file, and unmaps it
+        """
+        self._buf.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # record buffers are still referenced, the mapping will be
+                # released with them
+                pass
+            self._mmap = None
+        if self._fd_own:
+            self._fd.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def iter_tlv(self, depth=None):
+        """walks the file and yields TLV events, see iter_tlv()
+        """
+        return iter_tlv(self._buf, self._off, None, depth)
+
+    def tlv_array(self, depth=None):
+        """walks the file and returns the flat representation of its TLVs, see
+        TLVArray
+        """
+        return TLVArray(self._buf, self._off, None, depth)
+
+    def index(self):
+        """collects the start and end offsets of all records of the file
+
+        Returns:
+            int, number of records
+
+        Raises:
+            ASN1BERDecodeErr, if a TLV is invalid or truncated
+        """
+        if self._indexed:
+            return len(self._rec_off)
+        rec_off, rec_end, buf = array('Q'), array('Q'), self._buf
+        for off, tag, lval, hlen in iter_tlv(buf, self._off, None, self._depth):
+            rec_off.append(off)
+            if lval >= 0:
+                rec_end.append(off + hlen + lval)
+            else:
+                rec_end.append(tlv_end(buf, off))
+        self._rec_off, self._rec_end, self._indexed = rec_off, rec_end, True
+        return len(rec_off)
+
+    def save_index(self, path):
+        """saves the index of records in the file `path'
+        """
+        self.index()
+        rec_off, rec_end = array('Q', self._rec_off), array('Q', self._rec_end)
+        if sys.byteorder == 'little':
+            rec_off.byteswap()
+            rec_end.byteswap()
+        with open(path, 'wb') as fd:
+            fd.write( self._IDX_HDR.pack(self._IDX_MAGIC, self._depth, self._off,
+                                         len(self._buf), len(rec_off)) )
+            rec_off.tofile(fd)
+            rec_end.tofile(fd)
+
+    def load_index(self, path):
+        """loads the index of records from the file `path', previously saved
+        with save_index()
+
+        Raises:
+            ASN1Err, if the index does not correspond to the file
+        """
+        with open(path, 'rb') as fd:
+            try:
+                magic, depth, off, buflen, num = self._IDX_HDR.unpack(fd.read(self._IDX_HDR.size))
+            except Exception:
+                raise(ASN1Err('invalid BER index file header'))
+            if magic != self._IDX_MAGIC:
+                raise(ASN1Err('invalid BER index file header'))
+            elif (depth, off, buflen) != (self._depth, self._off, len(self._buf)):
+                raise(ASN1Err('BER index file does not correspond to the file'))
+            rec_off, rec_end = array('Q'), array('Q')
+            try:
+                rec_off.fromfile(fd, num)
+                rec_end.fromfile(fd, num)
+            except EOFError:
+                raise(ASN1Err('truncated BER index file'))
+        if sys.byteorder == 'little':
+            rec_off.byteswap()
+            rec_end.byteswap()
+        self._rec_off, self._rec_end, self._indexed = rec_off, rec_end, True
+
+    def __len__(self):
+        return self.index()
+
+    def get_off(self, n):
+        """returns the start and end offsets of record `n' in the file
+        """
+        self.index()
+        return self._rec_off[n], self._rec_end[n]
+
+    def __getitem__(self, n):
+        self.index()
+        return self._buf[self._rec_off[n]:self._rec_end[n]]
+
+    def __iter__(self):
+        self.index()
+        buf = self._buf
+        for off, end in zip(self._rec_off, self._rec_end):
+            yield buf[off:end]
+
+    def decode(self, n, Obj):
+        """decodes record `n' with the ASN.1 object `Obj' and returns the
+        decoded value
+
+        The rest of the file is not read. As with Obj.decode(), the internal
+        value of Obj is left unchanged.
+        """
+        return Obj.decode(Charpy(self[n]), 'ber')
@@ -30,6 +30,127 @@
 from .utils import *
 from .err   import *
 
+from threading import local as _thread_local
+
+
+#------------------------------------------------------------------------------#
+# codec context
+#------------------------------------------------------------------------------#
+# Some codec parameters are changed at runtime by the encoding and decoding
+# methods of ASN1Obj:
+# - ASN1CodecPER.ALIGNED, for switching between APER and UPER,
+# - ASN1CodecPER._off, the stack of APER offsets,
+# - ASN1CodecBER.ENC_* parameters, for switching to CER and DER,
+# - ASN1CodecOER.CANONICAL, for switching between OER and COER.
+# Those are handled through a codec context which is local to each thread, so
+# that APER, UPER, BER, CER, DER, OER and COER encoding / decoding can run
+# concurrently in several threads, as long as they work on distinct ASN.1
+# objects.
+#
+# ALIGNED and _off are pure runtime state, and are only kept in the codec
+# context: setting them as class attributes sets them for the current thread.
+#
+# The BER ENC_* parameters and the OER CANONICAL flag are configuration
+# parameters with a process-wide value: setting them as class attributes sets
+# the value for all threads. They can be overridden for the current thread only
+# with set_codec_ctx(), and restored to their process-wide value with
+# reset_codec_ctx(), e.g.
+# >>> set_codec_ctx(ASN1CodecBER, ENC_LUNDEF=True)
+# >>> Obj.to_ber() # indefinite length form, in this thread only
+# >>> reset_codec_ctx(ASN1CodecBER, 'ENC_LUNDEF')
+
+class ASN1CodecCtx(_thread_local):
+    """codec context, local to each thread
+    """
+    
+    def __init__(self):
+        # stack of offsets in bits, only used with APER
+        self._off = []
+        # stack of saved BER parameters
+        self._ber_saved = []
+
+# codec context of the current thread
+_ASN1CodecCtx = ASN1CodecCtx()
+
+def get_codec_ctx():
+    """returns the codec context of the current thread
+    """
+    return _ASN1CodecCtx
+
+
+def set_codec_ctx(cla, **kw):
+    """overrides the given configuration parameters of the codec cla for the
+    current thread only
+    
+    Args:
+        cla: ASN1Codec class, e.g. ASN1CodecBER
+        kw: parameters' name and value, e.g. ENC_LUNDEF=True
+    
+    Returns:
+        None
+    
+    Raises:
+        ASN1Err, if a parameter cannot be overridden per thread
+    """
+    for name, val in kw.items():
+        if name not in getattr(cla, '_CTX_ATTRS', ()):
+            raise(ASN1Err('{0}: {1} cannot be set per thread'.format(cla.__name__, name)))
+        setattr(_ASN1CodecCtx, name, val)
+
+
+def reset_codec_ctx(cla, *names):
+    """removes the overrides of the given configuration parameters of the codec
+    cla, or of all of them if no names is given, for the current thread, which
+    gets back their process-wide values
+    """
+    if not names:
+        names = getattr(cla, '_CTX_ATTRS', ())
+    for name in names:
+        if name not in getattr(cla, '_CTX_ATTRS', ()):
+            raise(ASN1Err('{0}: {1} cannot be set per thread'.format(cla.__name__, name)))
+        _ASN1CodecCtx.__dict__.pop(name, None)
+
+
+def get_codec_ctx_over(cla):
+    """returns a dict with the configuration parameters of the codec cla which
+    are overridden for the current thread, and their value
+    """
+    return dict([(name, _ASN1CodecCtx.__dict__[name]) for name in getattr(cla, '_CTX_ATTRS', ()) \
+                 if name in _ASN1CodecCtx.__dict__])
+
+
+class _ASN1CodecCtxAttr(object):
+    # codec class attribute, with a process-wide value which can be overridden
+    # in the codec context of the current thread, or only stored in the codec
+    # context of the current thread when local
+    
+    def __init__(self, name, default, local=False):
+        self._name    = name
+        self._default = default
+        self._local   = local
+    
+    def __get__(self, cla, meta=None):
+        return _ASN1CodecCtx.__dict__.get(self._name, self._default)
+    
+    def __set__(self, cla, val):
+        if self._local:
+            setattr(_ASN1CodecCtx, self._name, val)
+        else:
+            self._default = val
+
+
+def _set_ctx_attrs(cla, names=(), local=()):
+    # returns a copy of the codec class cla with a metaclass which handles the 
+    # given class attributes through the codec context, names being 
+    # configuration parameters and local runtime state
+    attrs = [(name, _ASN1CodecCtxAttr(name, cla.__dict__[name])) for name in names] + \
+            [(name, _ASN1CodecCtxAttr(name, cla.__dict__[name], True)) for name in local]
+    Meta = type('%sCtx' % cla.__name__, (type, ), dict(attrs))
+    dic = dict([(k, v) for (k, v) in cla.__dict__.items() \
+                if k not in names and k not in local and k not in ('__dict__', '__weakref__')])
+    dic['_CTX_ATTRS'] = tuple(names)
+    return Meta(cla.__name__, cla.__bases__, dic)
+
 
 class ASN1Codec(object):
     pass
@@ -1013,6 +1134,8 @@ class ASN1CodecPER(ASN1Codec):
         GEN.append( (T_BYTES, buf, 8*ldet) )
         return GEN
 
+ASN1CodecPER = _set_ctx_attrs(ASN1CodecPER, local=('ALIGNED', '_off'))
+
 
 class ASN1CodecBER(ASN1Codec):
     
@@ -1604,12 +1727,216 @@ class ASN1CodecBER(ASN1Codec):
             return char.get_bytes(ecur - char._cur)
 
 
+ASN1CodecBER = _set_ctx_attrs(ASN1CodecBER, ('ENC_LLONG', 'ENC_LUNDEF', 'ENC_BOOLTRUE',
+                                              'ENC_REALNR', 'ENC_BSTR_FRAG', 'ENC_OSTR_FRAG',
+                                              'ENC_TIME_CANON', 'ENC_DEF_CANON'))
+
+
 class ASN1CodecCER(ASN1CodecBER):
     pass
 
 class ASN1CodecDER(ASN1CodecBER):
     pass
 
+
+class ASN1CodecOER(ASN1Codec):
+    
+    # canonical OER (COER): DEFAULT values are never encoded in constructed
+    # objects, and REAL values are encoded like with CER / DER
+    CANONICAL = False
+    
+    # this is used to return default values, even when absent from the transfer syntax
+    GET_DEFVAL = True
+    
+    # maximum number of bytes the decoder accepts for a length determinant
+    # integral value
+    DEC_MAXLL = 8
+    # maximum number of bytes the decoder accepts for a tag integral value
+    DEC_MAXT = 32
+    
+    # fixed sizes in bytes for constrained integers
+    _INT_SZ = (1, 2, 4, 8)
+    
+    @classmethod
+    def decode_len(cla, char):
+        l = char.get_uint(8)
+        if l & 0x80:
+            # long form
+            ll = l & 0x7f
+            if ll == 0 or ll > cla.DEC_MAXLL:
+                raise(ASN1OERDecodeErr('invalid length determinant prefix, {0}'.format(ll)))
+            l = char.get_uint(8*ll)
+            if cla.CANONICAL and (l < 128 or l >> (8*(ll-1)) == 0):
+                raise(ASN1OERDecodeErr('non canonical length determinant, {0}'.format(l)))
+        if 8*l > char.len_bit():
+            raise(ASN1OERDecodeErr('length determinant overflow, {0}'.format(l)))
+        return l
+    
+    @classmethod
+    def encode_len(cla, l):
+        if l < 128:
+            # short form
+            return [(T_UINT, l, 8)]
+        else:
+            # long form
+            ll = uint_bytelen(l)
+            return [(T_UINT, 0x80 + ll, 8), (T_UINT, l, 8*ll)]
+    
+    @classmethod
+    def get_int_sz(cla, const_val):
+        """returns the size in bytes of the fixed-size encoding of an INTEGER
+        according to its value constraint, or 0 for a length-prefixed encoding,
+        and if the encoding is signed
+        
+        extensible constraints are not OER-visible
+        """
+        if const_val and const_val.ext is None and const_val.lb is not None:
+            lb, ub = const_val.lb, const_val.ub
+            if lb >= 0:
+                if ub is not None:
+                    for sz in cla._INT_SZ:
+                        if ub < 1 << (8*sz):
+                            return sz, False
+                return 0, False
+            elif ub is not None:
+                for sz in cla._INT_SZ:
+                    if -1 << (8*sz-1) <= lb and ub < 1 << (8*sz-1):
+                        return sz, True
+        return 0, True
+    
+    @classmethod
+    def decode_int(cla, char, const_val):
+        sz, signed = cla.get_int_sz(const_val)
+        if not sz:
+            sz = cla.decode_len(char)
+            if sz == 0:
+                raise(ASN1OERDecodeErr('invalid null length for INTEGER'))
+        if signed:
+            return char.get_int(8*sz)
+        else:
+            return char.get_uint(8*sz)
+    
+    @classmethod
+    def encode_int(cla, val, const_val):
+        sz, signed = cla.get_int_sz(const_val)
+        if signed:
+            if sz:
+                return [(T_INT, val, 8*sz)]
+            else:
+                sz = int_bytelen(val)
+                return cla.encode_len(sz) + [(T_INT, val, 8*sz)]
+        elif val < 0:
+            raise(ASN1OEREncodeErr('invalid negative INTEGER value, {0}'.format(val)))
+        elif sz:
+            return [(T_UINT, val, 8*sz)]
+        else:
+            sz = max(1, uint_bytelen(val))
+            return cla.encode_len(sz) + [(T_UINT, val, 8*sz)]
+    
+    @classmethod
+    def decode_enum(cla, char):
+        val = char.get_uint(8)
+        if val & 0x80:
+            # long form
+            l = val & 0x7f
+            if l == 0 or l > cla.DEC_MAXLL:
+                raise(ASN1OERDecodeErr('invalid ENUMERATED length, {0}'.format(l)))
+            return char.get_int(8*l)
+        else:
+            return val
+    
+    @classmethod
+    def encode_enum(cla, val):
+        if 0 <= val < 128:
+            return [(T_UINT, val, 8)]
+        else:
+            l = int_bytelen(val)
+            return [(T_UINT, 0x80 + l, 8), (T_INT, val, 8*l)]
+    
+    @classmethod
+    def decode_count(cla, char):
+        # quantity field for SEQUENCE OF / SET OF
+        l = cla.decode_len(char)
+        if l == 0:
+            raise(ASN1OERDecodeErr('invalid null length for quantity field'))
+        return char.get_uint(8*l)
+    
+    @classmethod
+    def encode_count(cla, cnt):
+        l = max(1, uint_bytelen(cnt))
+        return [(T_UINT, l, 8), (T_UINT, cnt, 8*l)]
+    
+    @classmethod
+    def decode_tag(cla, char):
+        cl, val = char.get_uint(2), char.get_uint(6)
+        if val == 63:
+            # tag value encoded with 7-bits chunks in the subsequent bytes
+            val, d = 0, 0
+            while True:
+                b = char.get_uint(8)
+                val = (val << 7) + (b & 0x7f)
+                if not b & 0x80:
+                    break
+                d += 1
+                if d == cla.DEC_MAXT:
+                    raise(ASN1OERDecodeErr('tag too long, more than {0!r} bytes'.format(d)))
+        return cl, val
+    
+    @classmethod
+    def encode_tag(cla, cl, val):
+        if val < 63:
+            return [(T_UINT, (cl<<6) + val, 8)]
+        else:
+            GEN = [(T_UINT, (cl<<6) + 63, 8)]
+            chunks = []
+            while val:
+                chunks.append(val & 0x7f)
+                val >>= 7
+            for c in reversed(chunks[1:]):
+                GEN.append( (T_UINT, 0x80 + c, 8) )
+            GEN.append( (T_UINT, chunks[0], 8) )
+            return GEN
+    
+    @classmethod
+    def decode_buf(cla, char):
+        # length-prefixed buffer
+        return char.get_bytes(8*cla.decode_len(char))
+    
+    @classmethod
+    def encode_buf(cla, buf):
+        return cla.encode_len(len(buf)) + [(T_BYTES, buf, 8*len(buf))]
+    
+    @classmethod
+    def decode_open(cla, char, wrapped=None):
+        """decodes a length-prefixed open type
+        
+        returns the buffer if wrapped is None, or the value of the ASN.1 object
+        wrapped decoded from the buffer otherwise
+        """
+        l = cla.decode_len(char)
+        if wrapped is None:
+            return char.get_bytes(8*l)
+        char_lb, end = char._len_bit, char._cur + 8*l
+        char._len_bit = end
+        try:
+            wrapped._from_oer(char)
+            if char._cur != end:
+                raise(ASN1OERDecodeErr('{0}: invalid open type length, {1}'\
+                      .format(wrapped.fullname(), l)))
+        finally:
+            char._len_bit = char_lb
+        return wrapped._val
+    
+    @classmethod
+    def encode_open(cla, wrapped):
+        """encodes the value of the ASN.1 object wrapped as a length-prefixed
+        open type
+        """
+        return cla.encode_buf( pack_val(*wrapped._to_oer())[0] )
+
+
+ASN1CodecOER = _set_ctx_attrs(ASN1CodecOER, ('CANONICAL', ))
+
 class ASN1CodecGSER(ASN1Codec):
     pass
 
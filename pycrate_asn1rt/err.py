@@ -73,6 +73,12 @@ class ASN1BEREncodeErr(ASN1CodecErr):
 class ASN1BERDecodeErr(ASN1CodecErr):
     pass
 
+class ASN1OEREncodeErr(ASN1CodecErr):
+    pass
+
+class ASN1OERDecodeErr(ASN1CodecErr):
+    pass
+
 #class ASN1GSEREncodeErr(ASN1CodecErr):
 #    pass
 #
@@ -32,8 +32,10 @@ from .glob   import *
 from .refobj import *
 from .setobj import *
 from .codecs import ASN1CodecBER
+from .asnobj import ASN1ModLock
 
 import inspect
+from threading import RLock
 
 def init_modules(*args, **kwargs):
     """
@@ -67,12 +69,17 @@ def init_modules(*args, **kwargs):
         for objname in Mod._obj_:
             GLOB.MOD[Mod._name_][objname] = getattr(Mod, name_to_defin(objname))
     #
+    # the group of modules shares a single lock, named after its first module
+    grp = args[0]._name_ if args else None
+    ASN1ModLock[grp] = RLock()
+    #
     # set special attributes for some objects
     for Mod in args:
         for Obj in Mod._all_:
             #
             # useful for debugging...
             Obj._mod = Mod.__name__
+            Obj._modgrp = grp
             #
             # setting additional attributes
             if Obj.TYPE == TYPE_INT:
@@ -248,6 +255,14 @@ def init_modules(*args, **kwargs):
             # add the canonical list of root components according to their tag
             Obj._root_canon = get_cont_tags_canon(Obj)
         #
+        if Obj.TYPE in (TYPE_SEQ, TYPE_SET) and Obj._cont is not None \
+        and hasattr(Obj, '_root_opt'):
+            # set the decoding plans of the content
+            Obj._init_dec_plan()
+            if Obj.TYPE == TYPE_SEQ and Obj._ext is not None:
+                for GSeq in Obj._ext_group_obj.values():
+                    GSeq._init_dec_plan()
+        #
         # additionally, we make safe checks on all generated objects
         if Obj._SAFE_INIT:
             Obj._safechk_obj()
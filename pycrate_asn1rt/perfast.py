@@ -0,0 +1,1025 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_asn1rt/perfast.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+from .utils  import *
+from .err    import *
+from .codecs import ASN1CodecPER
+from .asnobj import ASN1Obj
+
+
+# PER specialized codec functions
+#
+# The generic PER codec walks the ASN.1 objects and checks at each step the
+# kind of constraint and the PER variant (aligned or not) it has to deal with.
+# Here, for a given ASN.1 object and PER variant, Python source code is
+# generated with all constraints resolved, and then compiled:
+# - decoders are taking a Charpy instance and returning the decoded value,
+# - encoders are taking a value and returning a list to be passed to pack_val().
+#
+# Generated functions are attached to the ASN.1 objects in the _fast_aper and
+# _fast_uper attributes, as (decoder, encoder) pairs, and are then used by
+# from_aper(), to_aper(), from_uper() and to_uper() as long as
+# ASN1Obj._PER_FAST is True.
+#
+# Only the common paths are specialized (root part of constructed types,
+# INTEGER, ENUMERATED, BOOLEAN, NULL, BIT STRING and OCTET STRING): anything
+# else is delegated to the generic codec, so that the resulting encodings are
+# always identical to the generic ones.
+
+_FRAG_CNT = (65536, 49152, 32768, 16384)
+
+
+def _dec_fb(Obj, char):
+    # generic decoder fallback
+    Obj._from_per(char)
+    return Obj._val
+
+def _dec_fb_par(Obj, par, char):
+    # generic decoder fallback, within a parent object
+    _par = Obj._parent
+    Obj._parent = par
+    Obj._from_per(char)
+    Obj._parent = _par
+    return Obj._val
+
+def _enc_fb(Obj, val):
+    # generic encoder fallback
+    Obj._val = val
+    return Obj._to_per()
+
+def _enc_fb_par(Obj, par, val):
+    # generic encoder fallback, within a parent object
+    _par = Obj._parent
+    Obj._parent = par
+    Obj._val = val
+    GEN = Obj._to_per()
+    Obj._parent = _par
+    return GEN
+
+def _dec_enum_ext(Obj, char):
+    # ENUMERATED index in the extension part, E bit already consumed
+    big = char.get_uint(1)
+    if ASN1CodecPER.ALIGNED:
+        ASN1CodecPER._off[-1] += 2
+    if big:
+        ind = ASN1CodecPER.decode_intunconst(char, 0)
+    else:
+        ind = char.get_uint(6)
+        if ASN1CodecPER.ALIGNED:
+            ASN1CodecPER._off[-1] += 6
+    if ind < len(Obj._ext):
+        return Obj._ext[ind]
+    else:
+        if not Obj._SILENT:
+            asnlog('ENUM._from_per: %s, unknown extension index %r' % (Obj._name, ind))
+        return '_ext_%r' % ind
+
+
+class _FuncSrc(object):
+    # source code of a single generated function
+
+    def __init__(self, name, arg):
+        self.lines  = ['def %s(%s):' % (name, arg)]
+        self.indent = 4
+        self.pend   = 0 # pending APER offset increment, in bits
+
+
+class PERFastGen(object):
+    """
+    PERFastGen generates and compiles specialized PER decoders and encoders
+    for ASN.1 objects, for one of the PER variant (aligned or unaligned)
+
+    gen(Obj) generates the codec functions for Obj and all the objects it
+    depends on, and compile() builds all functions generated so far and attach
+    them to their ASN.1 objects
+
+    the complete generated source code is available with get_src()
+    """
+
+    def __init__(self, aligned=True):
+        self.aligned = aligned
+        if aligned:
+            self._attr = '_fast_aper'
+        else:
+            self._attr = '_fast_uper'
+        # namespace for the generated code
+        self._ns = {
+            'CPER'            : ASN1CodecPER,
+            'T_UINT'          : T_UINT,
+            'T_BYTES'         : T_BYTES,
+            'ASN1PERDecodeErr': ASN1PERDecodeErr,
+            'ASN1PEREncodeErr': ASN1PEREncodeErr,
+            'bytes_to_uint'   : bytes_to_uint,
+            'uint_to_bytes'   : uint_to_bytes,
+            'int_types'       : integer_types,
+            'bytes_types'     : bytes_types,
+            '_FRAG_CNT'       : _FRAG_CNT,
+            '_dec_fb'         : _dec_fb,
+            '_dec_fb_par'     : _dec_fb_par,
+            '_enc_fb'         : _enc_fb,
+            '_enc_fb_par'     : _enc_fb_par,
+            '_dec_enum_ext'   : _dec_enum_ext,
+            }
+        # names bound into the namespace
+        self._bnd = {}
+        # generated functions' names, {id(Obj): (Obj, dec name, enc name)}
+        self._fn  = {}
+        # source code of all finalized functions, and not yet compiled
+        self._src = []
+        self._src_all = []
+        # stack of functions in generation
+        self._stack = []
+        # objects to be attached their codec functions at compilation
+        self._entry = []
+        self._cnt = 0
+
+    #--------------------------------------------------------------------------#
+    # public methods
+    #--------------------------------------------------------------------------#
+
+    def gen(self, Obj):
+        """generates the PER decoder and encoder for Obj, and all objects it
+        depends on
+        """
+        self._get_fn(Obj)
+
+    def compile(self):
+        """compiles all codec functions generated so far, and attaches them to
+        their ASN.1 objects
+        """
+        if self._src:
+            src = '\n'.join(self._src) + '\n'
+            exec(compile(src, '<pycrate_asn1rt.perfast>', 'exec'), self._ns)
+            self._src_all.extend(self._src)
+            self._src = []
+        for Obj in self._entry:
+            _, dec, enc = self._fn[id(Obj)]
+            setattr(Obj, self._attr, (self._ns[dec], self._ns[enc]))
+        self._entry = []
+
+    def get_src(self):
+        """returns the Python source code of all generated functions
+        """
+        return '\n'.join(self._src_all + self._src) + '\n'
+
+    #--------------------------------------------------------------------------#
+    # source code helpers
+    #--------------------------------------------------------------------------#
+
+    def _new_name(self, pre):
+        self._cnt += 1
+        return '%s%i' % (pre, self._cnt)
+
+    def _bind(self, val):
+        # bind a Python object to a name into the namespace
+        if id(val) in self._bnd:
+            return self._bnd[id(val)][1]
+        name = self._new_name('_k')
+        self._ns[name] = val
+        # keep a ref to val, so that its id() stays unique
+        self._bnd[id(val)] = (val, name)
+        return name
+
+    def _wrl(self, s):
+        f = self._stack[-1]
+        f.lines.append(f.indent * ' ' + s)
+
+    def _off(self, bl):
+        # APER offset increment, merged with the following ones
+        if self.aligned:
+            self._stack[-1].pend += bl
+
+    def _flush(self):
+        f = self._stack[-1]
+        if f.pend:
+            f.lines.append('%soff[-1] += %i' % (f.indent * ' ', f.pend))
+            f.pend = 0
+
+    def _pass(self):
+        # ensure the current block is not empty
+        f = self._stack[-1]
+        if f.lines[-1][-1:] == ':':
+            f.lines.append(f.indent * ' ' + 'pass')
+
+    def _if(self, cond):
+        self._flush()
+        self._wrl('if %s:' % cond)
+        self._stack[-1].indent += 4
+
+    def _elif(self, cond):
+        self._flush()
+        self._pass()
+        self._stack[-1].indent -= 4
+        self._wrl('elif %s:' % cond)
+        self._stack[-1].indent += 4
+
+    def _else(self):
+        self._flush()
+        self._pass()
+        self._stack[-1].indent -= 4
+        self._wrl('else:')
+        self._stack[-1].indent += 4
+
+    def _end(self):
+        self._flush()
+        self._pass()
+        self._stack[-1].indent -= 4
+
+    def _dec_pad(self):
+        if self.aligned:
+            self._if('off[-1] % 8')
+            self._wrl('CPER.decode_pad(char)')
+            self._end()
+
+    def _enc_pad(self):
+        if self.aligned:
+            self._if('off[-1] % 8')
+            self._wrl('GEN.extend(CPER.encode_pad())')
+            self._end()
+
+    def _tmp(self):
+        return self._new_name('t')
+
+    #--------------------------------------------------------------------------#
+    # functions generation
+    #--------------------------------------------------------------------------#
+
+    def _get_fn(self, Obj):
+        # returns the names of the decoder and encoder functions for Obj,
+        # generate them if required
+        if id(Obj) in self._fn:
+            return self._fn[id(Obj)][1:]
+        dec, enc = self._new_name('_d'), self._new_name('_e')
+        self._fn[id(Obj)] = (Obj, dec, enc)
+        self._entry.append(Obj)
+        #
+        self._stack.append( _FuncSrc(dec, 'char') )
+        if self.aligned:
+            self._wrl('off = CPER._off')
+        if Obj.TYPE in (TYPE_SEQ, TYPE_SET):
+            self._gen_dec_seq(Obj)
+        elif Obj.TYPE == TYPE_CHOICE:
+            self._gen_dec_cho(Obj)
+        elif Obj.TYPE in (TYPE_SEQ_OF, TYPE_SET_OF):
+            self._gen_dec_seqof(Obj)
+        else:
+            self._gen_dec(Obj, None, 'v')
+            self._flush()
+            self._wrl('return v')
+        self._src.extend(self._stack.pop().lines)
+        #
+        self._stack.append( _FuncSrc(enc, 'val') )
+        if self.aligned:
+            self._wrl('off = CPER._off')
+        self._wrl('GEN = []')
+        if Obj.TYPE in (TYPE_SEQ, TYPE_SET):
+            self._gen_enc_seq(Obj)
+        elif Obj.TYPE == TYPE_CHOICE:
+            self._gen_enc_cho(Obj)
+        elif Obj.TYPE in (TYPE_SEQ_OF, TYPE_SET_OF):
+            self._gen_enc_seqof(Obj)
+        else:
+            self._gen_enc(Obj, None, 'val')
+        self._flush()
+        self._wrl('return GEN')
+        self._src.extend(self._stack.pop().lines)
+        #
+        # objects decoded through an OPEN type or a CONTAINING constraint are
+        # called with from_*per() / to_*per(), hence need their own functions
+        self._gen_dep(Obj)
+        return dec, enc
+
+    def _gen_dep(self, Obj):
+        if Obj.TYPE in (TYPE_OPEN, TYPE_ANY):
+            if Obj._TAB_LUT and Obj._const_tab and Obj._const_tab_at:
+                try:
+                    ObjsTab = Obj._const_tab(Obj._const_tab_id)
+                except Exception:
+                    ObjsTab = []
+                for ObjTab in ObjsTab:
+                    if isinstance(ObjTab, ASN1Obj) and not ObjTab._param:
+                        self._get_fn(ObjTab)
+        elif Obj.TYPE in (TYPE_BIT_STR, TYPE_OCT_STR) and \
+        Obj._const_cont is not None and Obj._const_cont_enc is None:
+            self._get_fn(Obj._const_cont)
+
+    def _is_tab_ind(self, Comp):
+        # components potentially referred by a table constraint @ path need
+        # their value to be set during the decoding
+        return Comp._const_tab is not None and hasattr(Comp, '_const_tab_id')
+
+    #--------------------------------------------------------------------------#
+    # decoders
+    #--------------------------------------------------------------------------#
+
+    def _gen_dec(self, Obj, par, tgt):
+        # generate the code decoding Obj into the target tgt,
+        # par is the parent object of Obj (or None)
+        if Obj.TYPE == TYPE_INT:
+            self._gen_dec_int(Obj, tgt)
+        elif Obj.TYPE == TYPE_ENUM:
+            self._gen_dec_enum(Obj, tgt)
+        elif Obj.TYPE == TYPE_BOOL:
+            self._wrl('%s = char.get_uint(1) == 1' % tgt)
+            self._off(1)
+        elif Obj.TYPE == TYPE_NULL:
+            self._wrl('%s = 0' % tgt)
+        elif Obj.TYPE == TYPE_BIT_STR and Obj._const_cont is None:
+            self._gen_dec_bitstr(Obj, tgt)
+        elif Obj.TYPE == TYPE_OCT_STR and Obj._const_cont is None:
+            self._gen_dec_octstr(Obj, tgt)
+        elif Obj.TYPE in (TYPE_SEQ, TYPE_SET, TYPE_CHOICE, TYPE_SEQ_OF, TYPE_SET_OF):
+            dec, _ = self._get_fn(Obj)
+            self._flush()
+            if par is not None and Obj._parent is not par:
+                obj, _par = self._bind(Obj), self._tmp()
+                self._wrl('%s = %s._parent' % (_par, obj))
+                self._wrl('%s._parent = %s' % (obj, self._bind(par)))
+                self._wrl('%s = %s(char)' % (tgt, dec))
+                self._wrl('%s._parent = %s' % (obj, _par))
+            else:
+                self._wrl('%s = %s(char)' % (tgt, dec))
+        else:
+            # generic decoder
+            self._gen_dep(Obj)
+            self._flush()
+            if par is not None:
+                self._wrl('%s = _dec_fb_par(%s, %s, char)' % (tgt, self._bind(Obj), self._bind(par)))
+            else:
+                self._wrl('%s = _dec_fb(%s, char)' % (tgt, self._bind(Obj)))
+
+    def _gen_dec_intconst(self, C, tgt):
+        if C.lb:
+            lb = ' + %r' % C.lb
+        else:
+            lb = ''
+        if not self.aligned or C.ra <= 255:
+            self._wrl('%s = char.get_uint(%i)%s' % (tgt, C.rdyn, lb))
+            self._off(C.rdyn)
+        elif C.ra <= 65536:
+            self._flush()
+            self._dec_pad()
+            bl = 8 if C.ra == 256 else 16
+            self._wrl('%s = char.get_uint(%i)%s' % (tgt, bl, lb))
+            self._off(bl)
+        else:
+            self._flush()
+            self._wrl('%s = CPER.decode_intconst(char, %s)' % (tgt, self._bind(C)))
+
+    def _gen_dec_int(self, Obj, tgt):
+        C = Obj._const_val
+        if C:
+            if C.ext is not None:
+                E = self._tmp()
+                self._wrl('%s = char.get_uint(1)' % E)
+                self._off(1)
+                self._if(E)
+                self._wrl('%s = CPER.decode_intunconst(char)' % tgt)
+                self._else()
+                self._gen_dec_int_root(C, tgt)
+                self._end()
+            else:
+                self._gen_dec_int_root(C, tgt)
+        else:
+            self._flush()
+            self._wrl('%s = CPER.decode_intunconst(char)' % tgt)
+
+    def _gen_dec_int_root(self, C, tgt):
+        if C.rdyn:
+            self._gen_dec_intconst(C, tgt)
+        elif C.rdyn == 0:
+            self._wrl('%s = %r' % (tgt, C.lb))
+        elif C.lb is not None and C.ub is None:
+            self._flush()
+            self._wrl('%s = CPER.decode_intunconst(char, %r)' % (tgt, C.lb))
+        else:
+            self._flush()
+            self._wrl('%s = CPER.decode_intunconst(char)' % tgt)
+
+    def _gen_dec_enum(self, Obj, tgt):
+        if Obj._ext is not None:
+            E = self._tmp()
+            self._wrl('%s = char.get_uint(1)' % E)
+            self._off(1)
+            self._if(E)
+            self._wrl('%s = _dec_enum_ext(%s, char)' % (tgt, self._bind(Obj)))
+            self._else()
+            self._gen_dec_enum_root(Obj, tgt)
+            self._end()
+        else:
+            self._gen_dec_enum_root(Obj, tgt)
+
+    def _gen_dec_enum_root(self, Obj, tgt):
+        if len(Obj._root) == 1:
+            self._wrl('%s = %r' % (tgt, Obj._root[0]))
+        else:
+            ind = self._tmp()
+            self._gen_dec_intconst(Obj._const_ind, ind)
+            self._wrl('%s = %s[%s]' % (tgt, self._bind(tuple(Obj._root)), ind))
+
+    def _gen_dec_bitstr(self, Obj, tgt):
+        S = Obj._const_sz
+        if S:
+            if S._ev is not None:
+                E = self._tmp()
+                self._wrl('%s = char.get_uint(1)' % E)
+                self._off(1)
+                self._if(E)
+                self._gen_dec_bitstr_unconst(tgt)
+                self._else()
+                self._gen_dec_bitstr_root(S, tgt)
+                self._end()
+            else:
+                self._gen_dec_bitstr_root(S, tgt)
+        else:
+            self._gen_dec_bitstr_unconst(tgt)
+
+    def _gen_dec_bitstr_root(self, S, tgt):
+        if S.rdyn and S.ub < 65536:
+            ldet = self._tmp()
+            self._gen_dec_intconst(S, ldet)
+            if self.aligned:
+                self._flush()
+                self._dec_pad()
+                self._wrl('off[-1] += %s' % ldet)
+            self._wrl('%s = (bytes_to_uint(char.get_bytes(%s), %s), %s)' % (tgt, ldet, ldet, ldet))
+        elif S.rdyn == 0 and S.ub < 65536:
+            ldet = S.lb
+            if self.aligned and ldet > 16:
+                self._flush()
+                self._dec_pad()
+            self._off(ldet)
+            if ldet:
+                self._wrl('%s = (char.get_uint(%i), %i)' % (tgt, ldet, ldet))
+            else:
+                self._wrl('%s = (0, 0)' % tgt)
+        else:
+            self._gen_dec_bitstr_unconst(tgt)
+
+    def _gen_dec_bitstr_unconst(self, tgt):
+        self._flush()
+        self._dec_pad()
+        ldet, buf = self._tmp(), self._tmp()
+        self._wrl('%s = CPER.decode_count(char)' % ldet)
+        self._if('%s in _FRAG_CNT' % ldet)
+        self._wrl('%s, %s = CPER.decode_fragbytes(char, %s, bits=True)' % (buf, ldet, ldet))
+        self._else()
+        self._wrl('%s = char.get_bytes(%s)' % (buf, ldet))
+        if self.aligned:
+            self._wrl('off[-1] += %s' % ldet)
+        self._end()
+        self._wrl('%s = (bytes_to_uint(%s, %s), %s)' % (tgt, buf, ldet, ldet))
+
+    def _gen_dec_octstr(self, Obj, tgt):
+        S = Obj._const_sz
+        if S:
+            if S._ev is not None:
+                E = self._tmp()
+                self._wrl('%s = char.get_uint(1)' % E)
+                self._off(1)
+                self._if(E)
+                self._flush()
+                self._wrl('%s = CPER.decode_unconst_open(char)' % tgt)
+                self._else()
+                self._gen_dec_octstr_root(S, tgt)
+                self._end()
+            else:
+                self._gen_dec_octstr_root(S, tgt)
+        else:
+            self._flush()
+            self._wrl('%s = CPER.decode_unconst_open(char)' % tgt)
+
+    def _gen_dec_octstr_root(self, S, tgt):
+        if S.rdyn and S.ub < 65536:
+            ldet = self._tmp()
+            self._gen_dec_intconst(S, ldet)
+            if self.aligned:
+                self._flush()
+                self._dec_pad()
+                self._wrl('off[-1] += 8*%s' % ldet)
+            self._wrl('%s = char.get_bytes(8*%s)' % (tgt, ldet))
+        elif S.rdyn == 0 and S.ub < 65536:
+            ldet = S.ub
+            if self.aligned and ldet > 2:
+                self._flush()
+                self._dec_pad()
+            self._off(8*ldet)
+            self._wrl('%s = char.get_bytes(%i)' % (tgt, 8*ldet))
+        else:
+            self._flush()
+            self._wrl('%s = CPER.decode_unconst_open(char)' % tgt)
+
+    def _gen_dec_rewind(self, Obj):
+        # restore the initial decoding state, and use the generic decoder
+        self._wrl('char._cur = c0')
+        if self.aligned:
+            self._wrl('off[-1] = o0')
+        self._wrl('return _dec_fb(%s, char)' % self._bind(Obj))
+        self._stack[-1].pend = 0
+
+    def _gen_dec_init_rewind(self):
+        self._wrl('c0 = char._cur')
+        if self.aligned:
+            self._wrl('o0 = off[-1]')
+
+    def _gen_dec_seq(self, Obj):
+        if not Obj._cont:
+            self._wrl('return {}')
+            return
+        if Obj._ext is not None:
+            self._gen_dec_init_rewind()
+        self._wrl('val = {}')
+        opt_len = len(Obj._root_opt) if Obj._root_opt else 0
+        if Obj._ext is not None:
+            # E bit and optional bitmap are decoded at once
+            self._wrl('B = char.get_uint(%i)' % (1+opt_len))
+            self._off(1+opt_len)
+            self._if('B >> %i' % opt_len)
+            # extension present: generic decoder
+            self._gen_dec_rewind(Obj)
+            self._end()
+        elif opt_len:
+            self._wrl('B = char.get_uint(%i)' % opt_len)
+            self._off(opt_len)
+        if Obj.TYPE == TYPE_SET:
+            root_canon = Obj._root_canon
+        else:
+            root_canon = Obj._root
+        for ident in root_canon:
+            Comp = Obj._cont[ident]
+            tgt = 'val[%r]' % ident
+            if ident in Obj._root_mand:
+                self._gen_dec(Comp, Obj, tgt)
+                if self._is_tab_ind(Comp):
+                    self._wrl('%s._val = %s' % (self._bind(Comp), tgt))
+            elif ident in Obj._root_opt:
+                self._if('B & %i' % (1<<(opt_len-1-Obj._root_opt.index(ident))))
+                self._gen_dec(Comp, Obj, tgt)
+                if self._is_tab_ind(Comp):
+                    self._wrl('%s._val = %s' % (self._bind(Comp), tgt))
+                if Comp._def is not None:
+                    self._elif('CPER.GET_DEFVAL')
+                    self._wrl('%s = %s' % (tgt, self._bind(Comp._def)))
+                self._end()
+        self._flush()
+        self._wrl('return val')
+
+    def _gen_dec_cho(self, Obj):
+        if Obj._ext is not None:
+            self._gen_dec_init_rewind()
+            self._wrl('E = char.get_uint(1)')
+            self._off(1)
+            self._if('E')
+            self._gen_dec_rewind(Obj)
+            self._end()
+        if len(Obj._root) == 1:
+            ident = Obj._root[0]
+            self._gen_dec(Obj._cont[ident], Obj, 'v')
+            self._flush()
+            self._wrl('return (%r, v)' % ident)
+        else:
+            self._gen_dec_intconst(Obj._const_ind, 'ind')
+            self._flush()
+            for i, ident in enumerate(Obj._root):
+                if i == 0:
+                    self._if('ind == 0')
+                else:
+                    self._elif('ind == %i' % i)
+                self._gen_dec(Obj._cont[ident], Obj, 'v')
+                self._flush()
+                self._wrl('return (%r, v)' % ident)
+            self._end()
+            self._wrl('raise(ASN1PERDecodeErr(\'%s: invalid CHOICE index, %%r\' %% ind))'\
+                      % Obj._name.replace('\'', ''))
+
+    def _gen_dec_seqof(self, Obj):
+        S, Cont = Obj._const_sz, Obj._cont
+        self._gen_dec_init_rewind()
+        if S and S.ext is not None:
+            self._wrl('E = char.get_uint(1)')
+            self._off(1)
+            self._if('E')
+            self._gen_dec_rewind(Obj)
+            self._end()
+        if S and S.rdyn and S.ub < 65536:
+            self._gen_dec_intconst(S, 'ldet')
+        elif S and S.rdyn == 0 and S.ub < 65536:
+            self._wrl('ldet = %i' % S.ub)
+        else:
+            self._flush()
+            self._dec_pad()
+            self._wrl('ldet = CPER.decode_count(char)')
+            self._if('ldet in _FRAG_CNT')
+            # fragmented content: generic decoder
+            self._gen_dec_rewind(Obj)
+            self._end()
+        self._flush()
+        dance = Cont._parent is not Obj
+        if dance:
+            self._wrl('_par = %s._parent' % self._bind(Cont))
+            self._wrl('%s._parent = %s' % (self._bind(Cont), self._bind(Obj)))
+        self._wrl('val = []')
+        self._wrl('for i in range(ldet):')
+        self._stack[-1].indent += 4
+        # no need to check the parent within the loop
+        self._gen_dec(Cont, None, 'v')
+        self._flush()
+        self._wrl('val.append(v)')
+        self._stack[-1].indent -= 4
+        if dance:
+            self._wrl('%s._parent = _par' % self._bind(Cont))
+        self._wrl('return val')
+
+    #--------------------------------------------------------------------------#
+    # encoders
+    #--------------------------------------------------------------------------#
+
+    def _gen_enc(self, Obj, par, src):
+        # generate the code encoding the value src for Obj into GEN,
+        # par is the parent object of Obj (or None)
+        if Obj.TYPE == TYPE_INT:
+            self._gen_enc_int(Obj, src)
+        elif Obj.TYPE == TYPE_ENUM:
+            self._gen_enc_enum(Obj, par, src)
+        elif Obj.TYPE == TYPE_BOOL:
+            self._wrl('GEN.append((T_UINT, 1 if %s else 0, 1))' % src)
+            self._off(1)
+        elif Obj.TYPE == TYPE_NULL:
+            pass
+        elif Obj.TYPE == TYPE_BIT_STR and Obj._const_cont is None:
+            self._gen_enc_bitstr(Obj, par, src)
+        elif Obj.TYPE == TYPE_OCT_STR and Obj._const_cont is None:
+            self._gen_enc_octstr(Obj, par, src)
+        elif Obj.TYPE in (TYPE_SEQ, TYPE_SET, TYPE_CHOICE, TYPE_SEQ_OF, TYPE_SET_OF):
+            _, enc = self._get_fn(Obj)
+            self._flush()
+            if par is not None and Obj._parent is not par:
+                obj, _par = self._bind(Obj), self._tmp()
+                self._wrl('%s = %s._parent' % (_par, obj))
+                self._wrl('%s._parent = %s' % (obj, self._bind(par)))
+                self._wrl('GEN.extend(%s(%s))' % (enc, src))
+                self._wrl('%s._parent = %s' % (obj, _par))
+            else:
+                self._wrl('GEN.extend(%s(%s))' % (enc, src))
+        else:
+            self._gen_dep(Obj)
+            self._gen_enc_fb(Obj, par, src)
+
+    def _gen_enc_fb(self, Obj, par, src):
+        # generic encoder
+        self._flush()
+        if par is not None:
+            self._wrl('GEN.extend(_enc_fb_par(%s, %s, %s))' % (self._bind(Obj), self._bind(par), src))
+        else:
+            self._wrl('GEN.extend(_enc_fb(%s, %s))' % (self._bind(Obj), src))
+
+    def _gen_enc_intconst(self, C, src):
+        if C.lb:
+            val = '%s - %r' % (src, C.lb)
+        else:
+            val = src
+        if not self.aligned or C.ra <= 255:
+            self._wrl('GEN.append((T_UINT, %s, %i))' % (val, C.rdyn))
+            self._off(C.rdyn)
+        elif C.ra <= 65536:
+            self._flush()
+            self._enc_pad()
+            bl = 8 if C.ra == 256 else 16
+            self._wrl('GEN.append((T_UINT, %s, %i))' % (val, bl))
+            self._off(bl)
+        else:
+            self._flush()
+            self._wrl('GEN.extend(CPER.encode_intconst(%s, %s))' % (src, self._bind(C)))
+
+    def _gen_enc_int(self, Obj, src):
+        C = Obj._const_val
+        x = self._tmp()
+        self._wrl('%s = %s' % (x, src))
+        if C:
+            if C.ext is not None:
+                self._if('not %s.in_root(%s)' % (self._bind(C), x))
+                self._wrl('GEN.append((T_UINT, 1, 1))')
+                self._off(1)
+                self._flush()
+                self._wrl('GEN.extend(CPER.encode_intunconst(%s))' % x)
+                self._else()
+                self._wrl('GEN.append((T_UINT, 0, 1))')
+                self._off(1)
+                self._gen_enc_int_root(C, x)
+                self._end()
+            else:
+                self._gen_enc_int_root(C, x)
+        else:
+            self._flush()
+            self._wrl('GEN.extend(CPER.encode_intunconst(%s))' % x)
+
+    def _gen_enc_int_root(self, C, x):
+        if C.rdyn:
+            self._gen_enc_intconst(C, x)
+        elif C.rdyn == 0:
+            pass
+        elif C.lb is not None and C.ub is None:
+            self._flush()
+            self._wrl('GEN.extend(CPER.encode_intunconst(%s, %r))' % (x, C.lb))
+        else:
+            self._flush()
+            self._wrl('GEN.extend(CPER.encode_intunconst(%s))' % x)
+
+    def _gen_enc_enum(self, Obj, par, src):
+        x = self._tmp()
+        self._wrl('%s = %s' % (x, src))
+        ind = {ident: i for i, ident in enumerate(Obj._root)}
+        if Obj._ext is not None:
+            self._if('%s not in %s' % (x, self._bind(ind)))
+            # extended index: generic encoder
+            self._gen_enc_fb(Obj, par, x)
+            self._else()
+            self._wrl('GEN.append((T_UINT, 0, 1))')
+            self._off(1)
+            if len(Obj._root) > 1:
+                self._gen_enc_intconst(Obj._const_ind, '%s[%s]' % (self._bind(ind), x))
+            self._end()
+        elif len(Obj._root) > 1:
+            self._gen_enc_intconst(Obj._const_ind, '%s[%s]' % (self._bind(ind), x))
+
+    def _gen_enc_bitstr(self, Obj, par, src):
+        S = Obj._const_sz
+        x, buf, ldet = self._tmp(), self._tmp(), self._tmp()
+        self._wrl('%s = %s' % (x, src))
+        self._if('not isinstance(%s[0], int_types)' % x)
+        # contained value: generic encoder
+        self._gen_enc_fb(Obj, par, x)
+        self._else()
+        self._wrl('%s, %s = uint_to_bytes(%s[0], %s[1]), %s[1]' % (buf, ldet, x, x, x))
+        if S:
+            if S._ev is not None:
+                self._if('not %s.in_root(%s)' % (self._bind(S), ldet))
+                self._wrl('GEN.append((T_UINT, 1, 1))')
+                self._off(1)
+                self._gen_enc_bitstr_unconst(buf, ldet)
+                self._else()
+                self._wrl('GEN.append((T_UINT, 0, 1))')
+                self._off(1)
+                self._gen_enc_bitstr_root(S, buf, ldet)
+                self._end()
+            else:
+                self._gen_enc_bitstr_root(S, buf, ldet)
+        else:
+            self._gen_enc_bitstr_unconst(buf, ldet)
+        self._end()
+
+    def _gen_enc_bitstr_root(self, S, buf, ldet):
+        if S.rdyn and S.ub < 65536:
+            self._gen_enc_intconst(S, ldet)
+            if self.aligned:
+                self._flush()
+                self._enc_pad()
+                self._wrl('off[-1] += %s' % ldet)
+            self._wrl('GEN.append((T_BYTES, %s, %s))' % (buf, ldet))
+        elif S.rdyn == 0 and S.ub < 65536:
+            if self.aligned:
+                self._flush()
+                self._if('%s > 16 and off[-1] %% 8' % ldet)
+                self._wrl('GEN.extend(CPER.encode_pad())')
+                self._end()
+                self._wrl('off[-1] += %s' % ldet)
+            self._wrl('GEN.append((T_BYTES, %s, %s))' % (buf, ldet))
+        else:
+            self._gen_enc_bitstr_unconst(buf, ldet)
+
+    def _gen_enc_bitstr_unconst(self, buf, ldet):
+        self._flush()
+        self._enc_pad()
+        self._if('%s >= 16384' % ldet)
+        self._wrl('GEN.extend(CPER.encode_fragbytes(%s, bits=%s))' % (buf, ldet))
+        self._else()
+        self._wrl('GEN.extend(CPER.encode_count(%s))' % ldet)
+        self._wrl('GEN.append((T_BYTES, %s, %s))' % (buf, ldet))
+        if self.aligned:
+            self._wrl('off[-1] += %s' % ldet)
+        self._end()
+
+    def _gen_enc_octstr(self, Obj, par, src):
+        S = Obj._const_sz
+        x = self._tmp()
+        self._wrl('%s = %s' % (x, src))
+        self._if('not isinstance(%s, bytes_types)' % x)
+        # contained value: generic encoder
+        self._gen_enc_fb(Obj, par, x)
+        self._else()
+        if S:
+            if S._ev is not None:
+                self._if('not %s.in_root(len(%s))' % (self._bind(S), x))
+                self._wrl('GEN.append((T_UINT, 1, 1))')
+                self._off(1)
+                self._flush()
+                self._wrl('GEN.extend(CPER.encode_unconst_buf(%s))' % x)
+                self._else()
+                self._wrl('GEN.append((T_UINT, 0, 1))')
+                self._off(1)
+                self._gen_enc_octstr_root(S, x)
+                self._end()
+            else:
+                self._gen_enc_octstr_root(S, x)
+        else:
+            self._flush()
+            self._wrl('GEN.extend(CPER.encode_unconst_buf(%s))' % x)
+        self._end()
+
+    def _gen_enc_octstr_root(self, S, x):
+        if S.rdyn and S.ub < 65536:
+            ldet = self._tmp()
+            self._wrl('%s = len(%s)' % (ldet, x))
+            self._gen_enc_intconst(S, ldet)
+            if self.aligned:
+                self._flush()
+                self._enc_pad()
+                self._wrl('off[-1] += 8*%s' % ldet)
+            self._wrl('GEN.append((T_BYTES, %s, 8*%s))' % (x, ldet))
+        elif S.rdyn == 0 and S.ub < 65536:
+            self._if('len(%s) != %i' % (x, S.ub))
+            self._wrl('raise(ASN1PEREncodeErr(\'invalid OCTET STRING length, %%r\' %% len(%s)))' % x)
+            self._end()
+            if self.aligned and S.ub > 2:
+                self._enc_pad()
+            self._off(8*S.ub)
+            self._wrl('GEN.append((T_BYTES, %s, %i))' % (x, 8*S.ub))
+        else:
+            self._flush()
+            self._wrl('GEN.extend(CPER.encode_unconst_buf(%s))' % x)
+
+    def _gen_enc_seq(self, Obj):
+        if not Obj._cont:
+            return
+        opt_len = len(Obj._root_opt) if Obj._root_opt else 0
+        if Obj._ext is not None:
+            self._if('not %s.issuperset(val)' % self._bind(frozenset(Obj._root)))
+            # extension present: generic encoder
+            self._wrl('return _enc_fb(%s, val)' % self._bind(Obj))
+            self._end()
+        if opt_len:
+            # optional bitmap, with the E bit in the msb if required
+            self._wrl('B = 0')
+            for i, ident in enumerate(Obj._root_opt):
+                Comp = Obj._cont[ident]
+                if Comp._def is not None:
+                    self._if('%r in val and not (CPER.CANONICAL and val[%r] == %s)'\
+                             % (ident, ident, self._bind(Comp._def)))
+                else:
+                    self._if('%r in val' % ident)
+                self._wrl('B |= %i' % (1<<(opt_len-1-i)))
+                self._end()
+        if Obj._ext is not None:
+            if opt_len:
+                self._wrl('GEN.append((T_UINT, B, %i))' % (1+opt_len))
+            else:
+                self._wrl('GEN.append((T_UINT, 0, 1))')
+            self._off(1+opt_len)
+        elif opt_len:
+            self._wrl('GEN.append((T_UINT, B, %i))' % opt_len)
+            self._off(opt_len)
+        if Obj.TYPE == TYPE_SET:
+            root_canon = Obj._root_canon
+        else:
+            root_canon = Obj._root
+        for ident in root_canon:
+            Comp = Obj._cont[ident]
+            src = 'val[%r]' % ident
+            if ident in Obj._root_mand:
+                if self._is_tab_ind(Comp):
+                    self._wrl('%s._val = %s' % (self._bind(Comp), src))
+                self._gen_enc(Comp, Obj, src)
+            elif ident in Obj._root_opt:
+                self._if('B & %i' % (1<<(opt_len-1-Obj._root_opt.index(ident))))
+                if self._is_tab_ind(Comp):
+                    self._wrl('%s._val = %s' % (self._bind(Comp), src))
+                self._gen_enc(Comp, Obj, src)
+                self._end()
+
+    def _gen_enc_cho(self, Obj):
+        self._wrl('ident = val[0]')
+        if Obj._ext is not None:
+            self._if('ident not in %s' % self._bind(frozenset(Obj._root)))
+            # extended alternative: generic encoder
+            self._wrl('return _enc_fb(%s, val)' % self._bind(Obj))
+            self._end()
+            self._wrl('GEN.append((T_UINT, 0, 1))')
+            self._off(1)
+        for i, ident in enumerate(Obj._root):
+            if i == 0:
+                self._if('ident == %r' % ident)
+            else:
+                self._elif('ident == %r' % ident)
+            if len(Obj._root) > 1:
+                self._gen_enc_intconst(Obj._const_ind, '%i' % i)
+            self._gen_enc(Obj._cont[ident], Obj, 'val[1]')
+        self._else()
+        self._wrl('raise(ASN1PEREncodeErr(\'%s: invalid CHOICE identifier, %%r\' %% ident))'\
+                  % Obj._name.replace('\'', ''))
+        self._end()
+
+    def _gen_enc_seqof(self, Obj):
+        S, Cont = Obj._const_sz, Obj._cont
+        self._wrl('ldet = len(val)')
+        if S and S.ext is not None:
+            self._if('not %s.in_root(ldet)' % self._bind(S))
+            # size in the extension part: generic encoder
+            self._wrl('return _enc_fb(%s, val)' % self._bind(Obj))
+            self._end()
+            self._wrl('GEN.append((T_UINT, 0, 1))')
+            self._off(1)
+        if S and S.rdyn and S.ub < 65536:
+            self._gen_enc_intconst(S, 'ldet')
+        elif S and S.rdyn == 0 and S.ub < 65536:
+            pass
+        else:
+            self._if('ldet >= 16384')
+            # fragmented content: generic encoder
+            self._stack[-1].pend = 0
+            self._wrl('return _enc_fb(%s, val)' % self._bind(Obj))
+            self._end()
+            self._enc_pad()
+            self._wrl('GEN.extend(CPER.encode_count(ldet))')
+        self._flush()
+        dance = Cont._parent is not Obj
+        if dance:
+            self._wrl('_par = %s._parent' % self._bind(Cont))
+            self._wrl('%s._parent = %s' % (self._bind(Cont), self._bind(Obj)))
+        self._wrl('for v in val:')
+        self._stack[-1].indent += 4
+        self._gen_enc(Cont, None, 'v')
+        self._flush()
+        self._pass()
+        self._stack[-1].indent -= 4
+        if dance:
+            self._wrl('%s._parent = _par' % self._bind(Cont))
+
+
+def gen_per_fast(*args, **kwargs):
+    """
+    generates and attaches specialized PER codec functions to the given ASN.1
+    objects and to all objects they depend on
+
+    args: ASN1Obj instances
+    kwargs:
+        aligned: True (APER), False (UPER) or None (both), default is None
+
+    returns the list of PERFastGen instances used
+    """
+    aligned = kwargs.get('aligned', None)
+    if aligned is None:
+        gens = [PERFastGen(aligned=True), PERFastGen(aligned=False)]
+    else:
+        gens = [PERFastGen(aligned=aligned)]
+    for Gen in gens:
+        for Obj in args:
+            Gen.gen(Obj)
+        Gen.compile()
+    return gens
+
+
+def init_per_fast(*args, **kwargs):
+    """
+    generates and attaches specialized PER codec functions to all ASN.1 types
+    defined in the given modules, which must have been initialized with
+    init_modules() before
+
+    args: the list of ASN.1 classes
+    kwargs:
+        aligned: True (APER), False (UPER) or None (both), default is None
+    """
+    objs = []
+    for Mod in args:
+        if not hasattr(Mod, '_type_'):
+            continue
+        for name in Mod._type_:
+            Obj = getattr(Mod, name_to_defin(name))
+            if not Obj._param and Obj._mode == MODE_TYPE:
+                objs.append(Obj)
+    return gen_per_fast(*objs, **kwargs)
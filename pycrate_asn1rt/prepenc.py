@@ -0,0 +1,319 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_asn1rt/prepenc.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+from .utils  import *
+from .err    import *
+from .codecs import ASN1CodecOER
+
+
+# Prepared encodings
+#
+# Many PDUs are sent repeatedly with the same value, except for a few leaf
+# fields (e.g. UE identifiers or GTP TEIDs in S1AP / RANAP responses).
+# Here, a template value is encoded once, and the position of each of those
+# leaf fields within the encoded buffer is located. Following encodings are
+# then made by patching the template buffer at those positions, as long as the
+# encoded fields keep the same size and their values are within their
+# constraints: otherwise, the whole value is encoded again.
+#
+# Leaf fields can be INTEGER, OCTET STRING or BIT STRING (without named bits
+# nor CONTAINING constraint), with the APER, UPER, BER, OER and COER codecs.
+#
+# When a leaf field is within a SEQUENCE / SET component having a DEFAULT
+# value, and the value of this component becomes equal to its default, the
+# canonical encoders remove it: the whole value is then encoded again too.
+
+
+def _get_val_at(val, path):
+    # walks within the value val along path, according to the value structure
+    for p in path:
+        if isinstance(val, tuple):
+            # CHOICE, OPEN / ANY or CONTAINING value
+            if val[0] != p:
+                raise(ASN1Err('invalid value selection with path {0!r}, from {1}'\
+                      .format(path, p)))
+            val = val[1]
+        else:
+            val = val[p]
+    return val
+
+
+def _set_val_at(val, path, leaf):
+    # returns a copy of the value val with leaf set at path, the containers
+    # outside of path are not copied
+    if not path:
+        return leaf
+    p = path[0]
+    if isinstance(val, tuple):
+        return (val[0], _set_val_at(val[1], path[1:], leaf))
+    elif isinstance(val, dict):
+        val = dict(val)
+    else:
+        val = list(val)
+    val[p] = _set_val_at(val[p], path[1:], leaf)
+    return val
+
+
+def _get_defaults(Obj, path):
+    # returns the list of (path, default value) for each SEQUENCE / SET
+    # component having a DEFAULT value, along path
+    defs = []
+    for i, p in enumerate(path):
+        if Obj.TYPE in (TYPE_SEQ, TYPE_SET) and p in Obj._cont \
+        and Obj._cont[p]._def is not None:
+            defs.append( (path[:i+1], Obj._cont[p]._def) )
+        Obj = get_obj_at(Obj, [p])
+    return defs
+
+
+def _in_const(Obj, val):
+    # checks the leaf value val against the value constraint of Obj, as done
+    # by the encoders
+    const_val = Obj._const_val
+    return not const_val or const_val.ext is not None or val in const_val
+
+
+def _int_enc(Obj, codec, val):
+    # returns the offset, signedness and length in bits of the encoded content
+    # of the INTEGER value val, or None if it is not encoded as a plain value
+    const_val = Obj._const_val
+    if codec in ('aper', 'uper'):
+        if const_val:
+            if const_val.ext is not None and not const_val.in_root(val):
+                return None
+            if const_val.rdyn:
+                if not const_val.lb <= val <= const_val.ub:
+                    return None
+                if codec == 'uper' or const_val.ra <= 255:
+                    return const_val.lb, False, const_val.rdyn
+                elif const_val.ra == 256:
+                    return const_val.lb, False, 8
+                elif const_val.ra <= 65536:
+                    return const_val.lb, False, 16
+                else:
+                    return const_val.lb, False, 8*max(1, uint_bytelen(val - const_val.lb))
+            elif const_val.rdyn == 0:
+                return None
+            elif const_val.lb is not None and const_val.ub is None:
+                if val < const_val.lb:
+                    return None
+                return const_val.lb, False, 8*uint_bytelen(val - const_val.lb)
+        return 0, True, 8*int_bytelen(val)
+    elif codec == 'ber':
+        return 0, True, 8*int_bytelen(val)
+    else:
+        sz, signed = ASN1CodecOER.get_int_sz(const_val)
+        if signed:
+            return 0, True, 8*(sz or int_bytelen(val))
+        elif val < 0:
+            return None
+        else:
+            return 0, False, 8*(sz or max(1, uint_bytelen(val)))
+
+
+def _field_cont(Obj, codec, val):
+    # returns the encoded content of the leaf value val as an uint and its
+    # length in bits, or None if it cannot be patched
+    if Obj.TYPE == TYPE_INT:
+        if not isinstance(val, integer_types):
+            return None
+        enc = _int_enc(Obj, codec, val)
+        if enc is None:
+            return None
+        return (val - enc[0]) & ((1<<enc[2])-1), enc[2]
+    elif Obj.TYPE == TYPE_OCT_STR:
+        if not isinstance(val, bytes_types):
+            return None
+        return bytes_to_uint(val, 8*len(val)), 8*len(val)
+    elif Obj.TYPE == TYPE_BIT_STR:
+        if not isinstance(val, tuple) or not isinstance(val[0], integer_types):
+            return None
+        return val
+    else:
+        return None
+
+
+def _field_val(Obj, codec, cont, bl, off=0, signed=False):
+    # returns the leaf value corresponding to the encoded content cont
+    if Obj.TYPE == TYPE_INT:
+        if signed and cont >> (bl-1):
+            return cont - (1<<bl)
+        else:
+            return cont + off
+    elif Obj.TYPE == TYPE_OCT_STR:
+        return uint_to_bytes(cont, bl)
+    else:
+        return (cont, bl)
+
+
+def _patch(buf, off, bl, cont):
+    # sets the uint cont on bl bits at offset off in bits, in the bytearray buf
+    end = off + bl
+    o0, o1 = off >> 3, (end + 7) >> 3
+    sh = 8*o1 - end
+    if sh == 0 and off % 8 == 0:
+        buf[o0:o1] = uint_to_bytes(cont, bl)
+    else:
+        nb = 8*(o1 - o0)
+        mask = ((1<<bl)-1) << sh
+        cur = bytes_to_uint(bytes(buf[o0:o1]), nb)
+        buf[o0:o1] = uint_to_bytes((cur & ~mask) | (cont << sh), nb)
+
+
+class ASN1PrepEnc(object):
+    """Prepared encoding of an ASN.1 object, for a template value where only
+    a few leaf fields change from one encoding to the other
+
+    Args:
+        Obj: ASN1Obj instance
+        val: template value of Obj
+        paths: list of paths (list of str or int, see get_val_at()) to the
+            leaf fields within val which are to be set at each encoding
+        codec: str, 'aper', 'uper', 'ber', 'oer' or 'coer'
+
+    Attributes:
+        patched: number of encodings made by patching the template buffer
+        full: number of encodings made from the whole value, because the size
+            of a leaf field was different from the one in the template, or
+            a component with a DEFAULT value was set to its default
+
+    Raises:
+        ASN1Err, if a leaf field cannot be located in the template encoding
+    """
+
+    CODECS = ('aper', 'uper', 'ber', 'oer', 'coer')
+
+    def __init__(self, Obj, val, paths, codec='aper'):
+        if codec not in self.CODECS:
+            raise(ASN1Err('{0}: invalid codec for a prepared encoding, {1!r}'\
+                  .format(Obj.fullname(), codec)))
+        self._obj    = Obj
+        self._val    = val
+        self._codec  = codec
+        self._enc    = getattr(Obj, 'to_%s' % codec)
+        self._buf    = self._enc(val)
+        self._fields = []
+        self._defs   = []
+        self.patched = 0
+        self.full    = 0
+        for path in paths:
+            path = list(path)
+            self._fields.append( self._prep_field(path) )
+            self._defs.extend( _get_defaults(Obj, path) )
+
+    def _prep_field(self, path):
+        Obj   = get_obj_at(self._obj, path)
+        fval  = _get_val_at(self._val, path)
+        cont  = _field_cont(Obj, self._codec, fval)
+        if cont is None or cont[1] == 0:
+            raise(ASN1Err('{0}: field at {1!r} cannot be patched'\
+                  .format(self._obj.fullname(), path)))
+        cont, bl = cont
+        if Obj.TYPE == TYPE_INT:
+            off, signed, _ = _int_enc(Obj, self._codec, fval)
+        else:
+            off, signed = 0, False
+        if Obj.TYPE == TYPE_BIT_STR and Obj._cont is not None:
+            # trailing zero bits of named bits may be removed when encoding
+            raise(ASN1Err('{0}: BIT STRING field at {1!r} has named bits'\
+                  .format(self._obj.fullname(), path)))
+        #
+        # flip the last bit of the field content to locate it in the encoding
+        buf = self._encode_val(path, _field_val(Obj, self._codec, cont^1, bl, off, signed))
+        if buf is None or len(buf) != len(self._buf):
+            raise(ASN1Err('{0}: field at {1!r} cannot be located'\
+                  .format(self._obj.fullname(), path)))
+        diff = bytes_to_uint(self._buf, 8*len(buf)) ^ bytes_to_uint(buf, 8*len(buf))
+        if diff == 0 or diff & (diff-1):
+            raise(ASN1Err('{0}: field at {1!r} cannot be located'\
+                  .format(self._obj.fullname(), path)))
+        pos = 8*len(buf) - diff.bit_length() + 1 - bl
+        field = (path, Obj, pos, bl)
+        #
+        # check the field with all its content bits flipped, when possible
+        for mask in ((1<<bl)-1, (1<<(bl-1))-1, (1<<(bl>>1))-1):
+            fval_chk = _field_val(Obj, self._codec, cont^mask, bl, off, signed)
+            cont_chk = _field_cont(Obj, self._codec, fval_chk)
+            if cont_chk is None or cont_chk[1] != bl:
+                continue
+            buf = self._encode_val(path, fval_chk)
+            if buf is None:
+                continue
+            buf_chk = bytearray(self._buf)
+            _patch(buf_chk, pos, bl, cont_chk[0])
+            if bytes(buf_chk) != buf:
+                raise(ASN1Err('{0}: field at {1!r} cannot be patched'\
+                      .format(self._obj.fullname(), path)))
+            break
+        return field
+
+    def _encode_val(self, path, fval):
+        # encodes the template value with only the leaf at path changed
+        try:
+            return self._enc(_set_val_at(self._val, path, fval))
+        except Exception:
+            return None
+
+    def encode(self, *vals):
+        """returns the encoding of the template value with the leaf fields set
+        to vals, in the order of the paths given at initialization
+        """
+        if len(vals) != len(self._fields):
+            raise(ASN1Err('{0}: invalid number of values, {1} instead of {2}'\
+                  .format(self._obj.fullname(), len(vals), len(self._fields))))
+        conts = []
+        for (path, Obj, pos, bl), fval in zip(self._fields, vals):
+            cont = _field_cont(Obj, self._codec, fval)
+            if cont is None or cont[1] != bl or not _in_const(Obj, fval):
+                # the encoded size of the field changes, or the value is out of
+                # constraint and the full encoder handles it (i.e. raises)
+                self.full += 1
+                return self._enc(self.get_val(*vals))
+            conts.append(cont[0])
+        if self._defs:
+            val = self.get_val(*vals)
+            for path, defval in self._defs:
+                if _get_val_at(val, path) == defval:
+                    # the component may not be encoded anymore
+                    self.full += 1
+                    return self._enc(val)
+        buf = bytearray(self._buf)
+        for (path, Obj, pos, bl), cont in zip(self._fields, conts):
+            _patch(buf, pos, bl, cont)
+        self.patched += 1
+        return bytes(buf)
+
+    def get_val(self, *vals):
+        """returns the template value with the leaf fields set to vals, in the
+        order of the paths given at initialization
+        """
+        val = self._val
+        for (path, Obj, pos, bl), fval in zip(self._fields, vals):
+            val = _set_val_at(val, path, fval)
+        return val
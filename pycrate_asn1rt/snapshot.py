@@ -0,0 +1,218 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_asn1rt/snapshot.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+import os
+import sys
+import stat
+import importlib
+from hashlib import sha256
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from .utils import *
+from .err   import *
+from .glob  import GLOBAL
+
+
+# Snapshot of initialized ASN.1 modules
+#
+# Importing a large compiled module from pycrate_asn1dir (e.g. RRCLTE, RANAP)
+# instantiates all its ASN.1 objects and runs init_modules() over all of them.
+# Here, the resulting GLOBAL.MOD entries, once initialized, are pickled into a
+# snapshot file, which is then loaded back much faster, e.g. in short-lived
+# tools or in process-pool workers.
+#
+# Only GLOBAL.MOD and GLOBAL.OID are restored: the Python classes of the
+# compiled module (e.g. S1AP.S1AP_PDU_Descriptions) are not available after
+# loading a snapshot, all ASN.1 objects must be accessed through GLOBAL.MOD.
+#
+# WNG: a snapshot must be taken before any runtime specialization of the
+# objects (e.g. with perfast.gen_per_fast()), as functions attached to objects
+# cannot be pickled.
+#
+# WNG: unpickling a file can run arbitrary code. Snapshot files are hence
+# written readable and writable by their owner only, by default in a cache
+# directory private to the user, and load_snapshot() refuses to load a file
+# which is not owned by the current user, or which is writable by others.
+
+# snapshot format version, to be incremented when the runtime objects change
+SNAPSHOT_VERS = 2
+
+# environment variable for the snapshot directory, only used by load_asn1dir()
+# when SNAPSHOT_DIR_FROM_ENV is set to True
+SNAPSHOT_DIR_ENV = 'PYCRATE_ASN1_SNAPSHOT_DIR'
+SNAPSHOT_DIR_FROM_ENV = False
+
+
+def get_snapshot_dir():
+    """returns the default snapshot directory, in the cache directory of the
+    current user
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or \
+               os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pycrate', 'asn1snap')
+
+
+def _snapshot_hdr(src=None):
+    # header identifying the runtime and the source a snapshot was built with
+    hdr = [SNAPSHOT_VERS, sys.version_info[:2]]
+    if src is not None:
+        with open(src, 'rb') as fd:
+            hdr.append( sha256(fd.read()).hexdigest() )
+    return tuple(hdr)
+
+
+def _check_snapshot_file(fd, path):
+    # the snapshot file must be owned by the current user, and not writable by
+    # anyone else
+    st = os.fstat(fd.fileno())
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        raise(ASN1Err('snapshot {0} not owned by the current user'.format(path)))
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise(ASN1Err('snapshot {0} writable by group or others'.format(path)))
+
+
+def save_snapshot(path, mods=None, GLOB=GLOBAL, src=None):
+    """pickles initialized ASN.1 modules into the snapshot file `path'
+
+    Args:
+        path: str, path of the snapshot file
+        mods: iterable of str, names of the ASN.1 modules in GLOB.MOD to be
+            saved, or None for all of them
+        GLOB: GLOBAL class containing the modules
+        src: str, path of the Python source of the modules, or None
+            when set, the snapshot is bound to the SHA-256 hash of its content
+
+    Returns:
+        None
+    """
+    if mods is None:
+        mods = list(GLOB.MOD.keys())
+    MOD, OIDs = [], set()
+    for name in mods:
+        Mod = GLOB.MOD[name]
+        MOD.append( (name, Mod) )
+        OIDs.update( [Mod[objname]._val for objname in Mod['_obj_'] \
+                      if Mod[objname].TYPE == TYPE_OID and Mod[objname]._mode == MODE_VALUE] )
+    OID = {k: v for k, v in GLOB.OID.items() if k in OIDs}
+    # the file is created with owner-only permissions, an existing one is
+    # replaced
+    if os.path.exists(path):
+        os.remove(path)
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | \
+                                 getattr(os, 'O_BINARY', 0), 0o600), 'wb') as fd:
+        pickle.dump(_snapshot_hdr(src), fd, protocol=2)
+        pickle.dump((MOD, OID), fd, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_snapshot(path, GLOB=GLOBAL, src=None):
+    """loads ASN.1 modules from the snapshot file `path' into GLOB
+
+    Args:
+        path: str, path of the snapshot file
+        GLOB: GLOBAL class to put the modules in
+        src: str, path of the Python source of the modules, or None
+            when set, the snapshot must have been saved with the same source
+
+    Returns:
+        list of str, names of the ASN.1 modules loaded
+
+    Raises:
+        ASN1Err, if the snapshot is outdated or was built with another runtime,
+            or if it is not owned by the current user or is writable by others
+    """
+    with open(path, 'rb') as fd:
+        _check_snapshot_file(fd, path)
+        hdr = pickle.load(fd)
+        if (src is None and hdr[:2] != _snapshot_hdr()) or \
+        (src is not None and hdr != _snapshot_hdr(src)):
+            raise(ASN1Err('outdated snapshot {0}'.format(path)))
+        MOD, OID = pickle.load(fd)
+    for name, Mod in MOD:
+        GLOB.MOD[name] = Mod
+    GLOB.OID.update(OID)
+    return [name for name, Mod in MOD]
+
+
+def load_asn1dir(name, snapshot_dir=None, GLOB=GLOBAL):
+    """loads the compiled module `name' from pycrate_asn1dir into GLOB, from its
+    snapshot when it is up to date, otherwise by importing it and then saving
+    its snapshot
+
+    Args:
+        name: str, name of the Python module in pycrate_asn1dir, e.g. 'RRCLTE'
+        snapshot_dir: str, directory for snapshot files, or None
+            when None, the PYCRATE_ASN1_SNAPSHOT_DIR environment variable is
+            used if set and SNAPSHOT_DIR_FROM_ENV is True, otherwise the
+            directory returned by get_snapshot_dir()
+        GLOB: GLOBAL class to put the modules in
+
+    Returns:
+        list of str, names of the ASN.1 modules made available in GLOB
+    """
+    modname = 'pycrate_asn1dir.%s' % name
+    if modname in sys.modules and GLOB is GLOBAL:
+        # already imported, nothing to do
+        return [v._name_ for v in vars(sys.modules[modname]).values() \
+                if isinstance(v, type) and hasattr(v, '_name_') and v._name_ in GLOB.MOD]
+    #
+    pkg = importlib.import_module('pycrate_asn1dir')
+    src = os.path.join(os.path.dirname(pkg.__file__), '%s.py' % name)
+    if snapshot_dir is None:
+        if SNAPSHOT_DIR_FROM_ENV and os.environ.get(SNAPSHOT_DIR_ENV):
+            snapshot_dir = os.environ[SNAPSHOT_DIR_ENV]
+        else:
+            snapshot_dir = get_snapshot_dir()
+    path = os.path.join(snapshot_dir, '%s.py%i%i.asn1snap' % ((name, ) + sys.version_info[:2]))
+    #
+    if os.path.exists(src) and os.path.exists(path):
+        try:
+            return load_snapshot(path, GLOB, src)
+        except Exception as err:
+            asnlog('load_asn1dir: unable to load snapshot %s, %s' % (path, err))
+    #
+    if GLOB is not GLOBAL:
+        raise(ASN1Err('compiled modules can only be imported into the generic GLOBAL'))
+    mods = set(GLOB.MOD.keys())
+    importlib.import_module(modname)
+    mods = [m for m in GLOB.MOD if m not in mods]
+    if os.path.exists(src):
+        try:
+            if not os.path.isdir(snapshot_dir):
+                os.makedirs(snapshot_dir, 0o700)
+            save_snapshot(path, mods, GLOB, src)
+        except Exception as err:
+            asnlog('load_asn1dir: unable to save snapshot %s, %s' % (path, err))
+    return mods
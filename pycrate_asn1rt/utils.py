@@ -504,6 +504,159 @@ def get_obj_by_tag(ObjOpen, tag):
                 return ConstObj
     return None
 
+#------------------------------------------------------------------------------#
+# lazy decoding
+#------------------------------------------------------------------------------#
+
+class ASN1Lazy(object):
+    """Value of an OPEN / ANY object, or of a BIT STRING / OCTET STRING object
+    with a CONTAINING constraint, which decoding is deferred
+    
+    It is set by the decoders in place of the inner value when the _LAZY
+    attribute of the OPEN / BIT STRING / OCTET STRING object is True, e.g.
+    the OPEN value becomes (ident, ASN1Lazy instance).
+    
+    The encoded buffer is kept together with the inner ASN.1 object and the
+    codec, and is decoded the first time the value is accessed: with get_val(),
+    get_val_at(), or when indexing, iterating or comparing it. Until then,
+    re-encoding it with the same PER or OER codec reuses the buffer as is.
+    
+    Decoding errors are raised when the value is accessed, and not during the
+    decoding of the outer object.
+    """
+    
+    __slots__ = ('_obj', '_buf', '_bl', '_codec', '_tlv', '_val')
+    
+    def __init__(self, Obj, buf, codec, bl=None, tlv=None):
+        # Obj: inner ASN1Obj
+        # buf: encoded buffer
+        # codec: 'aper', 'uper', 'ber', 'oer' or 'coer'
+        # bl: length in bits of buf, when not byte-aligned
+        # tlv: for BER, TLV structure of the inner object within buf, in case
+        #      buf is the whole outer buffer
+        self._obj   = Obj
+        self._buf   = buf
+        self._codec = codec
+        self._bl    = 8*len(buf) if bl is None else bl
+        self._tlv   = tlv
+        self._val   = None
+    
+    def is_decoded(self):
+        """returns True if the buffer has already been decoded
+        """
+        return self._obj is None
+    
+    def get_buf(self, codec):
+        """returns the encoded buffer and its length in bits, if it has not been
+        decoded yet and was encoded with codec, None otherwise
+        """
+        if self._obj is not None and self._tlv is None and codec == self._codec:
+            return self._buf, self._bl
+        else:
+            return None
+    
+    def get_val(self):
+        """decodes the buffer if not already done, and returns the inner value
+        """
+        if self._obj is not None:
+            # the decoding is done with the lock of the inner object, and the
+            # PER codec alignment and offsets, OER canonicity and inner object
+            # value are restored, as decoding can be triggered during the
+            # encoding of an outer object
+            from .codecs import ASN1CodecPER, ASN1CodecOER, get_codec_ctx_over, \
+                                set_codec_ctx, reset_codec_ctx
+            Obj = self._obj
+            with Obj.get_lock():
+                if self._obj is None:
+                    # decoded meanwhile by another thread
+                    return self._val
+                aligned, off_len, val_prev = ASN1CodecPER.ALIGNED, len(ASN1CodecPER._off), Obj._val
+                canon = get_codec_ctx_over(ASN1CodecOER)
+                try:
+                    char = Charpy(self._buf)
+                    if self._tlv is not None:
+                        Obj._from_ber(char, [self._tlv])
+                        if Obj._SAFE_DEC and Obj._SAFE_BND:
+                            Obj._safechk_bnd(Obj._val)
+                    else:
+                        char._len_bit = self._bl
+                        if self._codec == 'aper':
+                            Obj.from_aper(char)
+                        elif self._codec == 'uper':
+                            Obj.from_uper(char)
+                        elif self._codec == 'oer':
+                            Obj.from_oer(char)
+                        elif self._codec == 'coer':
+                            Obj.from_coer(char)
+                        else:
+                            Obj.from_ber(char, single=False)
+                    self._val = Obj._val
+                finally:
+                    Obj._val = val_prev
+                    ASN1CodecPER.ALIGNED = aligned
+                    del ASN1CodecPER._off[off_len:]
+                    reset_codec_ctx(ASN1CodecOER)
+                    set_codec_ctx(ASN1CodecOER, **canon)
+                self._obj, self._buf, self._tlv = None, None, None
+        return self._val
+    
+    def __getitem__(self, key):
+        return self.get_val()[key]
+    
+    def __iter__(self):
+        return iter(self.get_val())
+    
+    def __len__(self):
+        return len(self.get_val())
+    
+    def __contains__(self, item):
+        return item in self.get_val()
+    
+    def __eq__(self, other):
+        if isinstance(other, ASN1Lazy):
+            other = other.get_val()
+        return self.get_val() == other
+    
+    def __ne__(self, other):
+        return not self.__eq__(other)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        if self._obj is not None:
+            return '<ASN1Lazy %s: %s, %i bits>' % (self._obj._name, self._codec, self._bl)
+        else:
+            return repr(self._val)
+
+
+def get_lazy_val(val):
+    """returns the inner value of val if it is an ASN1Lazy instance, val itself
+    otherwise
+    """
+    if isinstance(val, ASN1Lazy):
+        return val.get_val()
+    else:
+        return val
+
+
+def copy_val(val):
+    """returns a copy of the ASN.1 value val, where all dict and list are new
+    instances, e.g. to be used as the copy function of an LRUCache
+    """
+    if isinstance(val, dict):
+        return {k: copy_val(v) for k, v in val.items()}
+    elif isinstance(val, list):
+        return [copy_val(v) for v in val]
+    elif isinstance(val, tuple):
+        return tuple([copy_val(v) for v in val])
+    elif isinstance(val, ASN1Lazy):
+        if val._obj is None:
+            return copy_val(val._val)
+        else:
+            return ASN1Lazy(val._obj, val._buf, val._codec, val._bl, val._tlv)
+    else:
+        return val
+
 #------------------------------------------------------------------------------#
 # selection by path
 #------------------------------------------------------------------------------#
@@ -548,6 +701,8 @@ def get_val_at(Obj, path):
         Obj: ASN1Obj instance
         path: list of str or int
     
+    Lazy values (see ASN1Lazy) along the path are decoded on the way.
+    
     Returns:
         value of an ASN1Obj instance
     
@@ -588,7 +743,7 @@ def get_val_at(Obj, path):
         except:
             raise(ASN1Err('invalid value selection with path {0!r}, from {1}'\
                   .format(path, p)))
-    return val
+    return get_lazy_val(val)
 
 
 #------------------------------------------------------------------------------#
@@ -35,7 +35,8 @@ __all__ = ['Buf', 'BufAuto', 'NullTermStr',
 
 from .utils  import *
 from .charpy import Charpy, CharpyErr
-from .elt    import Atom, EltErr, REPR_RAW, REPR_HEX, REPR_BIN, REPR_HD, REPR_HUM
+from .elt    import Atom, EltErr, REPR_RAW, REPR_HEX, REPR_BIN, REPR_HD, REPR_HUM, \
+                    _has_std_pack
 
 #------------------------------------------------------------------------------#
 # Basic types - bytes' buffers
@@ -166,6 +167,14 @@ class Buf(Atom):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Write the internal value into the CharpyWriter instance
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            w.write_bytes(self.get_val(), self.get_bl())
+    
     def _from_char(self, char):
         """Consume the charpy intance and set its internal value according to it
         """
@@ -307,6 +316,8 @@ class Uint(Atom):
     TYPENAMES   = get_typenames(*TYPES)
     DEFAULT_VAL = 0
     DEFAULT_BL  = 0
+    # struct format for fixed-length values, see Atom._FUSED
+    _FUSED      = ('>', {8:'B', 16:'H', 32:'I', 64:'Q'})
     
     #--------------------------------------------------------------------------#
     # format routines
@@ -345,6 +356,14 @@ class Uint(Atom):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Write the internal value into the CharpyWriter instance
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            w.write_uint(self.get_val(), self.get_bl())
+    
     def _from_char(self, char):
         """Consume the charpy intance and set its internal value according to
         it
@@ -396,6 +415,8 @@ class Int(Atom):
     TYPENAMES   = get_typenames(*TYPES)
     DEFAULT_VAL = 0
     DEFAULT_BL  = 0
+    # struct format for fixed-length values, see Atom._FUSED
+    _FUSED      = ('>', {8:'b', 16:'h', 32:'i', 64:'q'})
     
     #--------------------------------------------------------------------------#
     # format routines
@@ -436,6 +457,14 @@ class Int(Atom):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Write the internal value into the CharpyWriter instance
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            w.write_int(self.get_val(), self.get_bl())
+    
     def _from_char(self, char):
         """Consume the charpy intance and set its internal value according to
         it
@@ -487,6 +516,8 @@ class UintLE(Atom):
     TYPENAMES   = get_typenames(*TYPES)
     DEFAULT_VAL = 0
     DEFAULT_BL  = 0
+    # struct format for fixed-length values, see Atom._FUSED
+    _FUSED      = ('<', {8:'B', 16:'H', 32:'I', 64:'Q'})
     
     #--------------------------------------------------------------------------#
     # format routines
@@ -540,6 +571,14 @@ class UintLE(Atom):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Write the internal value into the CharpyWriter instance
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            w.write_uint_le(self.get_val(), self.get_bl())
+    
     def _from_char(self, char):
         """Consume the charpy intance and set its internal value according to
         it
@@ -591,6 +630,8 @@ class IntLE(Atom):
     TYPENAMES   = get_typenames(*TYPES)
     DEFAULT_VAL = 0
     DEFAULT_BL  = 0
+    # struct format for fixed-length values, see Atom._FUSED
+    _FUSED      = ('<', {8:'b', 16:'h', 32:'i', 64:'q'})
     
     #--------------------------------------------------------------------------#
     # format routines
@@ -644,6 +685,14 @@ class IntLE(Atom):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Write the internal value into the CharpyWriter instance
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            w.write_int_le(self.get_val(), self.get_bl())
+    
     def _from_char(self, char):
         """Consume the charpy intance and set its internal value according to
         it
@@ -27,7 +27,9 @@
 # *--------------------------------------------------------
 #*/
 
-__all__ = ['CharpyErr', 'Charpy']
+__all__ = ['CharpyErr', 'Charpy', 'CharpyWriter']
+
+from mmap   import mmap
 
 from .utils import *
 
@@ -38,6 +40,45 @@ from .utils import *
 class CharpyErr(PycrateErr):
     pass
 
+#------------------------------------------------------------------------------#
+# buffer conversion helper
+#------------------------------------------------------------------------------#
+
+# buffer types which are handled through a memoryview, without being copied
+_VIEW_TYPES = (bytearray, memoryview, mmap)
+
+if python_version < 3:
+    
+    def _buf_to_uint(buf, off, bitlen):
+        # return the unsigned integer of bitlen bits, at offset off in buf
+        off_byte, off_bit = off>>3, off%8
+        if off_bit == 0:
+            # aligned access
+            return bytes_to_uint(buf[off_byte:1+off_byte+(bitlen>>3)], bitlen)
+        else:
+            # unaligned access
+            # convert from a fully-aligned byte buffer with an extended length
+            # bytes_to_uint takes care of converting only `bitlen+off_bit' bits
+            # and finally zero the extra left-most bits
+            return bytes_to_uint(buf[off_byte:2+off_byte+(bitlen>>3)],
+                                 bitlen+off_bit) & ((1<<bitlen)-1)
+
+else:
+    
+    _from_bytes = int.from_bytes
+    
+    def _buf_to_uint(buf, off, bitlen):
+        # return the unsigned integer of bitlen bits, at offset off in buf
+        # the integer is read directly from the window of bytes covering the
+        # bits requested, which does not copy anything when buf is a memoryview
+        end = off + bitlen
+        val = _from_bytes(buf[off>>3:(end+7)>>3], 'big')
+        if end % 8:
+            val >>= 8 - (end%8)
+        if off % 8:
+            val &= (1<<bitlen)-1
+        return val
+
 #------------------------------------------------------------------------------#
 # Charpy object
 #------------------------------------------------------------------------------#
@@ -54,7 +95,9 @@ class Charpy(object):
       bitlist, unsigned integer, signed integer
     
     It uses the following attributes:
-    - _buf: bytes buffer
+    - _buf: bytes buffer, or memoryview over a bytearray, mmap or memoryview
+      buffer, in order to avoid copying it
+    - _view: bool, True when _buf is a memoryview
     - _len_bit: buffer length in bits
     - _cur: buffer cursor value in bits
     - _REPR: to configure the instance representation
@@ -64,12 +107,15 @@ class Charpy(object):
     _REPR = 'buf'
     _REPR_MAX = 512
     
+    _view = False
+    
     def __init__(self, buf=None):
         """Initialize the charpy instance
         
         Args:
-            buf (bytes or None): bytes buffer to initialize the charpy instance
-                _buf attribute; if None, _buf stays empty   
+            buf (bytes, bytearray, memoryview, mmap or None): buffer to 
+                initialize the charpy instance _buf attribute; if None, _buf 
+                stays empty
         """
         # initialize cursor
         self._cur = 0
@@ -88,9 +134,17 @@ class Charpy(object):
             return
         # concatenate the content in _concat at the end of the current instance
         cur = self._cur
-        self._cur = 0
-        self._concat.insert(0, (TYPE_BYTES, self._buf, self._len_bit))
-        self.set_bytes( *pack_val(*self._concat) )
+        if self._len_bit % 8 == 0 and \
+        all([c[0] == TYPE_BYTES and c[2] % 8 == 0 for c in self._concat]):
+            # byte-aligned content only: buffers can be joined directly
+            bufs = [self._buf[:self._len_bit>>3]]
+            bufs.extend([c[1][:c[2]>>3] for c in self._concat])
+            self.set_bytes( b''.join(bufs) )
+        else:
+            self._concat.insert(0, (TYPE_BYTES, self._buf, self._len_bit))
+            self.set_bytes( *pack_val(*[(c[0], c[1].tobytes(), c[2]) \
+                                        if isinstance(c[1], memoryview) else c \
+                                        for c in self._concat]) )
         self._concat = []
         self._cur = cur
     
@@ -248,8 +302,12 @@ class Charpy(object):
         """Reinitialize the charpy instance and its cursor by setting a Python 
         bytes buffer into it
         
+        bytearray, memoryview and mmap buffers are not copied: the charpy
+        instance works on a memoryview over them, and only copies the parts
+        of the buffer which are requested with the to_* / get_* methods
+        
         Args:
-            buf (bytes) : bytes buffer
+            buf (bytes, bytearray, memoryview or mmap) : bytes buffer
             bitlen (integer) : length in bits for the buffer
                 if None, the whole bytes buffer is taken as is
         
@@ -259,15 +317,26 @@ class Charpy(object):
         Raises:
             CharpyErr : if `buf' has not the correct type
         """
-        if not isinstance(buf, bytes_types):
+        if isinstance(buf, bytes_types):
+            self._view = False
+        elif isinstance(buf, _VIEW_TYPES):
+            try:
+                buf = memoryview(buf)
+                if buf.ndim != 1 or buf.itemsize != 1:
+                    buf = buf.cast('B')
+            except Exception as err:
+                raise(CharpyErr('invalid buffer: {0}'.format(err)))
+            self._view = True
+        else:
             raise(CharpyErr('invalid argument type: {0}, expecting bytes'\
                             .format(type(buf).__name__)))
-        elif bitlen is None or bitlen < 0 or bitlen > 8*len(buf):
+        if bitlen is None or bitlen < 0 or bitlen > 8*len(buf):
             self._len_bit = 8*len(buf)
             self._buf = buf
         elif bitlen == 0:
             self._len_bit = 0
             self._buf = b''
+            self._view = False
         else:
             self._len_bit = bitlen
             self._buf = buf
@@ -278,7 +347,8 @@ class Charpy(object):
         """Append a bytes buffer at the end of the charpy instance
         
         Args:
-            buf (bytes) : bytes buffer to be appended
+            buf (bytes, bytearray, memoryview or mmap) : bytes buffer to be 
+                appended
             bitlen (integer) : length in bits for the buffer to append
                 if None, the whole bytes buffer is taken as is
         
@@ -288,9 +358,13 @@ class Charpy(object):
         Raises:
             CharpyErr : if `buf' has not the correct type
         """
-        if not isinstance(buf, bytes_types):
+        if isinstance(buf, _VIEW_TYPES):
+            buf = memoryview(buf)
+            if buf.ndim != 1 or buf.itemsize != 1:
+                buf = buf.cast('B')
+        elif not isinstance(buf, bytes_types):
             raise(CharpyErr('invalid argument type: {0}'.format(type(buf))))
-        elif bitlen is None or bitlen > 8*len(buf):
+        if bitlen is None or bitlen > 8*len(buf):
             bitlen = 8*len(buf)
         elif bitlen <= 0:
             return
@@ -328,12 +402,17 @@ class Charpy(object):
             # aligned access
             if len_bit == 0:
                 # byte-aligned buffer
-                return self._buf[off_byte:off_byte+len_byte]
+                if self._view:
+                    return self._buf[off_byte:off_byte+len_byte].tobytes()
+                else:
+                    return self._buf[off_byte:off_byte+len_byte]
             else:
                 # byte-unaligned buffer
                 # need to zero last bits of the last byte
-                return bytes_zero_last_bits(
-                        self._buf[off_byte:off_byte+len_byte+1], 8-len_bit)
+                buf = self._buf[off_byte:off_byte+len_byte+1]
+                if self._view:
+                    buf = buf.tobytes()
+                return bytes_zero_last_bits(buf, 8-len_bit)
         else:
             # unaligned access
             if off_bit + len_bit > 8:
@@ -383,12 +462,17 @@ class Charpy(object):
             # aligned access
             if len_bit == 0:
                 # byte-aligned buffer
-                return self._buf[off_byte:off_byte+len_byte]
+                if self._view:
+                    return self._buf[off_byte:off_byte+len_byte].tobytes()
+                else:
+                    return self._buf[off_byte:off_byte+len_byte]
             else:
                 # byte-unaligned buffer
                 # need to zero last bits of the last byte
-                return bytes_zero_last_bits(
-                        self._buf[off_byte:off_byte+len_byte+1], 8-len_bit)
+                buf = self._buf[off_byte:off_byte+len_byte+1]
+                if self._view:
+                    buf = buf.tobytes()
+                return bytes_zero_last_bits(buf, 8-len_bit)
         else:
             # unaligned access
             if off_bit + len_bit > 8:
@@ -403,6 +487,62 @@ class Charpy(object):
             # need to zero last bits of the last byte
             return bytes_zero_last_bits(buf, 8-len_bit)
     
+    def to_view(self, bitlen=None):
+        """Provide a memoryview over the buffer of the charpy instance, starting
+        at the current cursor position and ending after the given bitlen
+        
+        Args:
+            bitlen (integer) : length in bits for the requested view
+                if None, the whole charpy buffer is returned
+        
+        Returns:
+            view (memoryview) : view over the current charpy buffer, without
+                copy
+        
+        Raises:
+            CharpyErr : if `bitlen' is negative or overflow the maximum bitlen,
+                or if the cursor or `bitlen' are not byte-aligned
+        """
+        if self._concat: self._pack()
+        if bitlen is None:
+            # get the whole charpy buffer
+            bitlen = self._len_bit - self._cur
+        elif bitlen < 0:
+            raise(CharpyErr('negative bitlen: {0}'.format(bitlen))) 
+        elif self._cur + bitlen > self._len_bit:
+            raise(CharpyErr('bitlen overflow: {0}, max {1}'\
+                            .format(bitlen, self._len_bit-self._cur)))
+        if self._cur % 8 or bitlen % 8:
+            raise(CharpyErr('unaligned access: cursor {0}, bitlen {1}'\
+                            .format(self._cur, bitlen)))
+        off_byte = self._cur >> 3
+        if self._view:
+            return self._buf[off_byte:off_byte+(bitlen>>3)]
+        else:
+            return memoryview(self._buf)[off_byte:off_byte+(bitlen>>3)]
+    
+    def get_view(self, bitlen=None):
+        """Consume a memoryview over the buffer of the charpy instance, starting
+        at the current cursor position and ending after the given bitlen
+        
+        the charpy instance's cursor is incremented according to bitlen
+        
+        Args:
+            bitlen (integer) : length in bits for the requested view
+                if None, the whole charpy buffer is returned
+        
+        Returns:
+            view (memoryview) : view over the current charpy buffer, without
+                copy
+        
+        Raises:
+            CharpyErr : if `bitlen' is negative or overflow the maximum bitlen,
+                or if the cursor or `bitlen' are not byte-aligned
+        """
+        view = self.to_view(bitlen)
+        self._cur += 8*len(view)
+        return view
+    
     def set_bytelist(self, bytelist=[], bitlen=None):
         """Reinitialize the charpy instance and its cursor by setting a list of
         uint8 integer values into it
@@ -736,17 +876,7 @@ class Charpy(object):
                             .format(bitlen, self._len_bit-self._cur)))
         elif bitlen == 0:
             return None
-        off_byte, off_bit = self._cur >>3, self._cur % 8
-        if off_bit == 0:
-            # aligned access
-            return bytes_to_uint(self._buf[off_byte:1+off_byte+(bitlen>>3)], bitlen)
-        else:
-            # unaligned access
-            # convert from a fully-aligned byte buffer with an extended length
-            # bytes_to_uint takes care of converting only `bitlen+off_bit' bits
-            # and finally zero the extra left-most bits
-            return bytes_to_uint(self._buf[off_byte:2+off_byte+(bitlen>>3)],
-                                 bitlen+off_bit) & ((1<<bitlen)-1)
+        return _buf_to_uint(self._buf, self._cur, bitlen)
     
     def get_uint(self, bitlen=None):
         """Consume the unsigned integer value of the charpy instance, starting 
@@ -776,18 +906,8 @@ class Charpy(object):
                             .format(bitlen, self._len_bit-self._cur)))
         elif bitlen == 0:
             return None
-        off_byte, off_bit = self._cur >>3, self._cur % 8
         self._cur += bitlen
-        if off_bit == 0:
-            # aligned access
-            return bytes_to_uint(self._buf[off_byte:1+off_byte+(bitlen>>3)], bitlen)
-        else:
-            # unaligned access
-            # convert from a fully-aligned byte buffer with an extended length
-            # bytes_to_uint takes care of converting only `bitlen+off_bit' bits
-            # and finally zero the extra left-most bits
-            return bytes_to_uint(self._buf[off_byte:2+off_byte+(bitlen>>3)],
-                                 bitlen+off_bit) & ((1<<bitlen)-1)
+        return _buf_to_uint(self._buf, self._cur-bitlen, bitlen)
     
     def set_int(self, val=0, bitlen=None):
         """Reinitialize the charpy instance and its cursor by setting an 
@@ -897,17 +1017,7 @@ class Charpy(object):
                             .format(bitlen, self._len_bit-self._cur)))
         elif bitlen == 0:
             return None
-        off_byte, off_bit = self._cur >>3, self._cur % 8
-        if off_bit == 0:
-            # aligned access
-            val = bytes_to_uint(self._buf[off_byte:1+off_byte+(bitlen>>3)], bitlen)
-        else:
-            # unaligned access
-            # convert from a fully-aligned byte buffer with an extended length
-            # bytes_to_uint takes care of converting only `bitlen+off_bit' bits
-            # and finally zero the extra left-most bits
-            val = bytes_to_uint(self._buf[off_byte:2+off_byte+(bitlen>>3)],
-                                bitlen+off_bit) & ((1<<bitlen)-1)
+        val = _buf_to_uint(self._buf, self._cur, bitlen)
         mask = 1<<(bitlen-1)
         if val & mask:
             # negative integer
@@ -944,18 +1054,8 @@ class Charpy(object):
                             .format(bitlen, self._len_bit-self._cur)))
         elif bitlen == 0:
             return None
-        off_byte, off_bit = self._cur >>3, self._cur % 8
         self._cur += bitlen
-        if off_bit == 0:
-            # aligned access
-            val = bytes_to_uint(self._buf[off_byte:1+off_byte+(bitlen>>3)], bitlen)
-        else:
-            # unaligned access
-            # convert from a fully-aligned byte buffer with an extended length
-            # bytes_to_uint takes care of converting only `bitlen+off_bit' bits
-            # and finally zero the extra left-most bits
-            val = bytes_to_uint(self._buf[off_byte:2+off_byte+(bitlen>>3)],
-                                bitlen+off_bit) & ((1<<bitlen)-1)
+        val = _buf_to_uint(self._buf, self._cur-bitlen, bitlen)
         mask = 1<<(bitlen-1)
         if val & mask:
             # negative integer
@@ -1435,3 +1535,203 @@ class Charpy(object):
         else:
             return self.__gt__(other)
 
+
+
+#------------------------------------------------------------------------------#
+# CharpyWriter object
+#------------------------------------------------------------------------------#
+
+if python_version < 3:
+    
+    def _uint_to_buf(val, bytelen):
+        return uint_to_bytes(val, bytelen<<3)
+    
+    def _uint_le_to_buf(val, bytelen):
+        return uint_le_to_bytes(val, bytelen<<3)
+
+else:
+    
+    def _uint_to_buf(val, bytelen):
+        return val.to_bytes(bytelen, 'big')
+    
+    def _uint_le_to_buf(val, bytelen):
+        return val.to_bytes(bytelen, 'little')
+
+
+class CharpyWriter(object):
+    """
+    CharpyWriter is a bit-stream writer, the counterpart of Charpy
+    
+    It concatenates bytes buffers and (un)signed integers of any length in bits
+    at the end of a bytearray, which can be provided by the caller in order to 
+    be reused from one encoding to the other. 
+    Bits not yet byte-aligned are kept in an integer accumulator, which is 
+    written in the bytearray by whole bytes each time it gets over _ACC_MAX 
+    bits, or when an aligned bytes buffer is written.
+    
+    It uses the following attributes:
+    - _buf: bytearray, receiving the bytes written
+    - _acc: integer accumulator for the bits not yet written into _buf
+    - _acc_bl: number of bits in the accumulator
+    """
+    
+    _ACC_MAX = 64
+    
+    def __init__(self, buf=None):
+        """Initialize the writer instance
+        
+        Args:
+            buf (bytearray or None): buffer the bytes get appended to; if None,
+                a new bytearray is created
+        """
+        if buf is None:
+            buf = bytearray()
+        elif not isinstance(buf, bytearray):
+            raise(CharpyErr('invalid buf type: {0}, expecting bytearray'\
+                  .format(type(buf).__name__)))
+        self._buf = buf
+        self._acc, self._acc_bl = 0, 0
+    
+    def reset(self):
+        """Empty the buffer and the accumulator, keeping the same bytearray
+        """
+        del self._buf[:]
+        self._acc, self._acc_bl = 0, 0
+    
+    def len_bit(self):
+        """Return the total length in bits written in the buffer and the 
+        accumulator
+        """
+        return (len(self._buf)<<3) + self._acc_bl
+    
+    __len__ = len_bit
+    
+    def _flush_acc(self):
+        # write the accumulated bytes, keeping only the remaining bits
+        rest = self._acc_bl % 8
+        self._buf += _uint_to_buf(self._acc >> rest, self._acc_bl >> 3)
+        self._acc &= (1<<rest) - 1
+        self._acc_bl = rest
+    
+    def flush(self):
+        """Write the accumulated bits in the buffer, with the last byte padded
+        with null bits, and return the buffer
+        
+        Returns:
+            buf (bytearray)
+        """
+        if self._acc_bl:
+            pad = -self._acc_bl % 8
+            self._acc <<= pad
+            self._acc_bl += pad
+            self._flush_acc()
+        return self._buf
+    
+    def to_bytes(self):
+        """Return the bytes written so far, with the last byte padded with null
+        bits, without modifying the buffer
+        
+        Returns:
+            buf (bytes)
+        """
+        if self._acc_bl:
+            pad = -self._acc_bl % 8
+            return bytes(self._buf) + _uint_to_buf(self._acc << pad,
+                                                   (self._acc_bl + pad) >> 3)
+        else:
+            return bytes(self._buf)
+    
+    #--------------------------------------------------------------------------#
+    # writing routines
+    #--------------------------------------------------------------------------#
+    
+    def write_uint(self, val, bitlen):
+        """Write the unsigned integer `val' of `bitlen' bits
+        """
+        if not bitlen:
+            return
+        elif val >> bitlen or val < 0:
+            raise(CharpyErr('uint {0} out of range for {1} bits'.format(val, bitlen)))
+        self._acc = (self._acc << bitlen) + val
+        self._acc_bl += bitlen
+        if self._acc_bl >= self._ACC_MAX:
+            self._flush_acc()
+    
+    def write_int(self, val, bitlen):
+        """Write the signed integer `val' of `bitlen' bits, in 2's complement
+        """
+        if not bitlen:
+            return
+        elif not -(1<<(bitlen-1)) <= val < 1<<(bitlen-1):
+            raise(CharpyErr('int {0} out of range for {1} bits'.format(val, bitlen)))
+        if val < 0:
+            val += 1<<bitlen
+        self._acc = (self._acc << bitlen) + val
+        self._acc_bl += bitlen
+        if self._acc_bl >= self._ACC_MAX:
+            self._flush_acc()
+    
+    def write_uint_le(self, val, bitlen):
+        """Write the little endian unsigned integer `val' of `bitlen' bits, 
+        bitlen being a multiple of 8
+        """
+        if bitlen % 8:
+            raise(CharpyErr('invalid bitlen for uint_le: {0}'.format(bitlen)))
+        elif val >> bitlen or val < 0:
+            raise(CharpyErr('uint {0} out of range for {1} bits'.format(val, bitlen)))
+        self.write_bytes(_uint_le_to_buf(val, bitlen>>3), bitlen)
+    
+    def write_int_le(self, val, bitlen):
+        """Write the little endian signed integer `val' of `bitlen' bits, in 2's
+        complement, bitlen being a multiple of 8
+        """
+        if bitlen % 8:
+            raise(CharpyErr('invalid bitlen for int_le: {0}'.format(bitlen)))
+        elif bitlen and not -(1<<(bitlen-1)) <= val < 1<<(bitlen-1):
+            raise(CharpyErr('int {0} out of range for {1} bits'.format(val, bitlen)))
+        if val < 0:
+            val += 1<<bitlen
+        self.write_bytes(_uint_le_to_buf(val, bitlen>>3), bitlen)
+    
+    def write_bytes(self, buf, bitlen=None):
+        """Write the `bitlen' first bits of the bytes buffer `buf', all of them 
+        if bitlen is None
+        """
+        if bitlen is None:
+            bitlen = len(buf) << 3
+        elif bitlen > len(buf) << 3:
+            raise(CharpyErr('bitlen {0} over the buffer length {1}'\
+                  .format(bitlen, len(buf) << 3)))
+        if not bitlen:
+            return
+        elif bitlen % 8 == 0 and self._acc_bl % 8 == 0:
+            # aligned access
+            if self._acc_bl:
+                self._flush_acc()
+            if len(buf) << 3 == bitlen:
+                self._buf += buf
+            else:
+                self._buf += buf[:bitlen>>3]
+        else:
+            # unaligned access, through the accumulator
+            bytelen = (bitlen + 7) >> 3
+            self.write_uint(bytes_to_uint(buf[:bytelen], bytelen<<3) >> ((bytelen<<3) - bitlen),
+                            bitlen)
+    
+    def write_pack(self, pack):
+        """Write the sequence of (type, value, bitlen) produced by the 
+        _to_pack() method of elements, see pack_val() from pycrate_core.utils
+        """
+        for (typ, val, bl) in pack:
+            if typ == TYPE_BYTES:
+                self.write_bytes(val, bl)
+            elif typ == TYPE_UINT:
+                self.write_uint(val, bl)
+            elif typ == TYPE_INT:
+                self.write_int(val, bl)
+            elif typ == TYPE_UINT_LE:
+                self.write_uint_le(val, bl)
+            elif typ == TYPE_INT_LE:
+                self.write_int_le(val, bl)
+            else:
+                raise(CharpyErr('invalid pack type: {0}'.format(typ)))
@@ -31,9 +31,10 @@ __all__ = ['EltErr', 'REPR_RAW', 'REPR_HEX', 'REPR_BIN', 'REPR_HD', 'REPR_HUM',
            'Element', 'Atom', 'Envelope', 'Array', 'Sequence']
 
 import platform
+from struct import Struct, error as StructErr
 
 from .utils  import *
-from .charpy import Charpy, CharpyErr
+from .charpy import Charpy, CharpyErr, CharpyWriter, _VIEW_TYPES
 
 #------------------------------------------------------------------------------#
 # Elt specific error
@@ -575,8 +576,8 @@ class Element(object):
         internal value according to it
         
         Args:
-            char (bytes or charpy): bytes buffer or charpy instance to be
-                consumed
+            char (bytes, bytearray, memoryview, mmap or charpy): bytes buffer 
+                or charpy instance to be consumed
         
         Returns:
             None
@@ -585,7 +586,7 @@ class Element(object):
             EltErr : if `char' has not the correct type
             CharpyErr
         """.format(self.__class__.__name__)
-        if isinstance(char, bytes_types):
+        if isinstance(char, bytes_types) or isinstance(char, _VIEW_TYPES):
             char = Charpy(char)
         elif self._SAFE_STAT and not isinstance(char, Charpy):
             raise(EltErr('{0} [from_bytes]: char type is {1}, expecting Charpy'\
@@ -604,6 +605,43 @@ class Element(object):
         """.format(self.__class__.__name__)
         return pack_val(*self._to_pack())[0]
     
+    def to_buf(self, buf=None):
+        """Produce the encoding of the internal value at the end of the 
+        bytearray `buf', which can be reused by the caller from one encoding to
+        the other
+        
+        Args:
+            buf (bytearray or None) : buffer to write into, if None a new 
+                bytearray is created
+        
+        Returns:
+            buf (bytearray) : buffer with the encoding appended, the last byte
+                being padded with null bits
+        """
+        w = CharpyWriter(buf)
+        self._to_writer(w)
+        return w.flush()
+    
+    def to_writer(self, w):
+        """Write the encoding of the internal value into the CharpyWriter `w',
+        without padding the last byte, so that several elements can be encoded
+        one after the other
+        
+        Args:
+            w (CharpyWriter) : writer instance
+        
+        Returns:
+            None
+        """
+        self._to_writer(w)
+    
+    def _to_writer(self, w):
+        """Write the internal value into the CharpyWriter instance, through
+        _to_pack(); it is overridden in core classes in order to write directly
+        into it, when _to_pack() is not overridden itself
+        """
+        w.write_pack(self._to_pack())
+    
     def from_uint(self, uint, bl=None):
         """Consume an unsigned integer or Charpy instance `uint' and sets the 
         internal value according to it
@@ -760,6 +798,11 @@ class Atom(Element):
     DEFAULT_TRANS   = False
     DEFAULT_DIC     = {}
     
+    # struct byte order and format characters per bit length, for integer atoms
+    # which can be decoded and encoded together with their fixed-length
+    # neighbours in an envelope, e.g. ('>', {8: 'B', 16: 'H'})
+    _FUSED          = None
+    
     # default attributes value
     _env        = None
     _hier       = 0
@@ -788,6 +831,16 @@ class Atom(Element):
                  '_dic',
                  '_dicauto')
     
+    # attributes transferred by clone(), automation ones are not
+    _CLONE_ATTRS = frozenset(('_name',
+                              '_desc',
+                              '_rep',
+                              '_hier',
+                              '_bl',
+                              '_val',
+                              '_trans',
+                              '_dic'))
+    
     def __init__(self, *args, **kw):
         """Initializes an instance of Atom
         
@@ -1285,6 +1338,15 @@ class Atom(Element):
         Returns:
             clone (self.__class__ instance)
         """
+        if _has_std_init(self.__class__, Atom):
+            # no specific initialization: the instance is created without 
+            # running __init__() and its checks again, and only gets the 
+            # attributes of self that override the class ones; all other 
+            # attributes are still shared through the class
+            clone = self.__class__.__new__(self.__class__)
+            attrs, clone_attrs = self.__dict__, self._CLONE_ATTRS
+            clone.__dict__.update([(a, attrs[a]) for a in attrs if a in clone_attrs])
+            return clone
         kw = {'rep': self._rep}
         if self._desc != self.__class__._desc:
             kw['desc'] = self._desc
@@ -1377,6 +1439,100 @@ class Atom(Element):
         # __iter__() calls __len__(), but here, get_bl() calls __iter__()
         __len__ = get_bl
 
+#------------------------------------------------------------------------------#
+# cloning helper
+#------------------------------------------------------------------------------#
+
+# class: bool, whether the class uses the __init__() of its Atom / Envelope 
+# base class
+_STD_INIT = {}
+
+def _has_std_init(cls, base):
+    try:
+        return _STD_INIT[cls]
+    except KeyError:
+        pass
+    std = True
+    for c in cls.__mro__:
+        if c is base:
+            break
+        elif '__init__' in c.__dict__ or '__new__' in c.__dict__:
+            std = False
+            break
+    _STD_INIT[cls] = std
+    return std
+
+# class: GEN, last class generator checked at initialization
+_GEN_CHK = {}
+
+#------------------------------------------------------------------------------#
+# writer helper
+#------------------------------------------------------------------------------#
+
+# class: bool, whether _to_writer() can be used for the class, i.e. the class 
+# which defines its _to_pack() also defines _to_writer()
+_STD_PACK = {}
+
+def _has_std_pack(cls):
+    try:
+        return _STD_PACK[cls]
+    except KeyError:
+        pass
+    std = False
+    for c in cls.__mro__:
+        if '_to_pack' in c.__dict__:
+            std = '_to_writer' in c.__dict__
+            break
+    _STD_PACK[cls] = std
+    return std
+
+#------------------------------------------------------------------------------#
+# fused decoding / encoding of fixed-length integer atoms in Envelope
+#------------------------------------------------------------------------------#
+
+# class: bool, whether the class can be decoded / encoded with struct
+_FUSED_CLS = {}
+
+def _get_fused_cls(cls):
+    try:
+        return _FUSED_CLS[cls]
+    except KeyError:
+        pass
+    ok = False
+    if getattr(cls, '_FUSED', None) is not None:
+        # the class must not override any of the methods involved in decoding
+        # and encoding after the _FUSED definition
+        for c in cls.__mro__:
+            if '_FUSED' in c.__dict__:
+                ok = True
+                break
+            elif any([m in c.__dict__ for m in ('_from_char', '_to_pack', 'get_bl', 'get_trans')]):
+                break
+    _FUSED_CLS[cls] = ok
+    return ok
+
+def _get_fused_fmt(elt):
+    # returns (byte order, struct format char) for elt, or None
+    # byte order is None for 8-bit atoms
+    if elt is None or not _get_fused_cls(type(elt)) or elt._blauto is not None \
+    or elt._transauto is not None or elt.get_trans() or elt._bl not in elt._FUSED[1]:
+        return None
+    elif elt._bl == 8:
+        return (None, elt._FUSED[1][8])
+    else:
+        return (elt._FUSED[0], elt._FUSED[1][elt._bl])
+
+def _fused_match(run, spec):
+    # checks the atoms of an envelope's instance still correspond to the spec
+    # of a run of its fused plan
+    if len(run) != len(spec):
+        return False
+    for elt, (cls, bl) in zip(run, spec):
+        if type(elt) is not cls or elt._bl != bl or elt._blauto is not None \
+        or elt._transauto is not None or elt._trans:
+            return False
+    return True
+
 #------------------------------------------------------------------------------#
 # Envelope parent class
 #------------------------------------------------------------------------------#
@@ -1412,6 +1568,10 @@ class Envelope(Element):
     # default transparency
     DEFAULT_TRANS = False
     
+    # decode and encode runs of contiguous fixed-length integer atoms of _GEN
+    # with a single struct call, see _get_fused_plan()
+    ENV_FUSED = True
+    
     # default attributes value
     _env       = None
     _hier      = 0
@@ -1433,6 +1593,12 @@ class Envelope(Element):
                  '_it'
                  '_it_saved')
     
+    # attributes transferred by clone(), automation and content ones are not
+    _CLONE_ATTRS = frozenset(('_name',
+                              '_desc',
+                              '_hier',
+                              '_trans'))
+    
     def __init__(self, *args, **kw):
         """Initializes an instance of Envelope
         
@@ -1486,14 +1652,23 @@ class Envelope(Element):
         if self._SAFE_STAT:
             self._chk_hier()
             self._chk_trans()
-            self._chk_gen(GEN)
+            if not clo:
+                self._chk_gen(GEN)
+            elif _GEN_CHK.get(self.__class__) is not GEN:
+                # class generator only checked once
+                self._chk_gen(GEN)
+                _GEN_CHK[self.__class__] = GEN
         
         # content list generation
-        self._content, self._by_id, self._by_name = [], [], []
+        # GEN has already been checked, hence no need to go through extend()
         if clo:
-            self.extend([elt.clone() for elt in GEN])
+            self._content = [elt.clone() for elt in GEN]
         else:
-            self.extend(GEN)
+            self._content = list(GEN)
+        self._by_id   = [id(elt) for elt in self._content]
+        self._by_name = [elt._name for elt in self._content]
+        for elt in self._content:
+            elt._env = self
         
         # if a content dict is passed as argument
         # broadcast it to the given content items
@@ -1634,27 +1809,152 @@ class Envelope(Element):
     # conversion routines
     #--------------------------------------------------------------------------#
     
+    @classmethod
+    def _get_fused_plan(cls):
+        """Returns the list of runs of contiguous fixed-length integer atoms
+        within the class _GEN, as 5-tuples (start index, stop index, 
+        struct.Struct, bit length, spec), spec being the tuple of (class, bl)
+        of each atom of the run
+        
+        The plan is computed once per class
+        """
+        try:
+            return cls.__dict__['_fused_plan']
+        except KeyError:
+            pass
+        plan, start, order, spec = [], 0, None, []
+        for ind, elt in enumerate(cls._GEN + (None, )):
+            fmt = _get_fused_fmt(elt)
+            if fmt is not None and (fmt[0] is None or order is None or fmt[0] == order):
+                if fmt[0] is not None:
+                    order = fmt[0]
+                spec.append( (type(elt), elt._bl, fmt[1]) )
+                continue
+            # end of the current run
+            if len(spec) > 1:
+                plan.append( (start, ind,
+                              Struct((order or '>') + ''.join([s[2] for s in spec])),
+                              sum([s[1] for s in spec]),
+                              tuple([s[:2] for s in spec])) )
+            if fmt is not None:
+                # new run, with a different byte order
+                start, order, spec = ind, fmt[0], [(type(elt), elt._bl, fmt[1])]
+            else:
+                start, order, spec = ind+1, None, []
+        cls._fused_plan = plan
+        return plan
+    
     def _to_pack(self):
         """Produces a list of tuples  (type, val, bl) ready to be packed with 
         pack_val()
         """
         if not self.get_trans():
             pl = []
-            [pl.extend(elt._to_pack()) for elt in self.__iter__()]
+            if self.ENV_FUSED:
+                plan = self._get_fused_plan()
+            else:
+                plan = None
+            if not plan:
+                [pl.extend(elt._to_pack()) for elt in self.__iter__()]
+                return pl
+            content, sel_trans, ind = self._content, self.ENV_SEL_TRANS, 0
+            for (start, stop, st, bl, spec) in plan:
+                while ind < start and ind < len(content):
+                    elt = content[ind]
+                    if sel_trans or not elt.get_trans():
+                        pl.extend(elt._to_pack())
+                    ind += 1
+                run = content[start:stop]
+                if ind == start and _fused_match(run, spec):
+                    try:
+                        pl.append( (TYPE_BYTES, st.pack(*[elt.get_val() for elt in run]), bl) )
+                    except StructErr:
+                        # e.g. value overflow, let the atoms handle it
+                        pass
+                    else:
+                        ind = stop
+            while ind < len(content):
+                elt = content[ind]
+                if sel_trans or not elt.get_trans():
+                    pl.extend(elt._to_pack())
+                ind += 1
             return pl
         else:
             return []
     
+    def _to_writer(self, w):
+        """Dispatch the writing into the CharpyWriter instance to the elements
+        within the content
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            if self.ENV_FUSED:
+                plan = self._get_fused_plan()
+            else:
+                plan = None
+            if not plan:
+                [elt._to_writer(w) for elt in self.__iter__()]
+                return
+            content, sel_trans, ind = self._content, self.ENV_SEL_TRANS, 0
+            for (start, stop, st, bl, spec) in plan:
+                while ind < start and ind < len(content):
+                    elt = content[ind]
+                    if sel_trans or not elt.get_trans():
+                        elt._to_writer(w)
+                    ind += 1
+                run = content[start:stop]
+                if ind == start and _fused_match(run, spec):
+                    try:
+                        buf = st.pack(*[elt.get_val() for elt in run])
+                    except StructErr:
+                        # e.g. value overflow, let the atoms handle it
+                        pass
+                    else:
+                        w.write_bytes(buf, bl)
+                        ind = stop
+            while ind < len(content):
+                elt = content[ind]
+                if sel_trans or not elt.get_trans():
+                    elt._to_writer(w)
+                ind += 1
+    
     def _from_char(self, char):
         """Dispatch the consumption of a Charpy intance to the elements within
         the content
+        
+        Runs of contiguous fixed-length integer atoms are unpacked in a single
+        shot when the charpy cursor is byte-aligned, see _get_fused_plan()
         """
-        # TODO: in cases some ranges of elt within self have a fixed _bl
-        # it would be more efficient to unpack them in a single shot, 
-        # especially if these are int / uint on 8, 16, 32, 64 bits
         if not self.get_trans():
-            for elt in self.__iter__():
-                elt._from_char(char)
+            if self.ENV_FUSED:
+                plan = self._get_fused_plan()
+            else:
+                plan = None
+            if not plan:
+                for elt in self.__iter__():
+                    elt._from_char(char)
+                return
+            content, sel_trans, ind = self._content, self.ENV_SEL_TRANS, 0
+            for (start, stop, st, bl, spec) in plan:
+                while ind < start and ind < len(content):
+                    elt = content[ind]
+                    if sel_trans or not elt.get_trans():
+                        elt._from_char(char)
+                    ind += 1
+                run = content[start:stop]
+                if ind == start and char._cur % 8 == 0 and char.len_bit() >= bl \
+                and _fused_match(run, spec):
+                    vals = st.unpack_from(char._buf, char._cur >> 3)
+                    char._cur += bl
+                    for elt, val in zip(run, vals):
+                        elt._val = val
+                    ind = stop
+            while ind < len(content):
+                elt = content[ind]
+                if sel_trans or not elt.get_trans():
+                    elt._from_char(char)
+                ind += 1
     
     #--------------------------------------------------------------------------#
     # copy / cloning routines
@@ -1734,6 +2034,21 @@ class Envelope(Element):
         Returns:
             clone (self.__class__ instance)
         """
+        if _has_std_init(self.__class__, Envelope):
+            # no specific initialization: the instance is created without 
+            # running __init__(), and directly gets the clones of the 
+            # current envelope's content
+            clone = self.__class__.__new__(self.__class__)
+            attrs, clone_attrs = self.__dict__, self._CLONE_ATTRS
+            clone.__dict__.update([(a, attrs[a]) for a in attrs if a in clone_attrs])
+            clone._it, clone._it_saved = 0, []
+            clone._content = [elt.clone() for elt in self._content]
+            clone._by_id   = [id(elt) for elt in clone._content]
+            clone._by_name = [elt._name for elt in clone._content]
+            for elt in clone._content:
+                elt._env = clone
+            return clone
+        #
         kw = {}
         if self._desc != self.__class__._desc:
             kw['desc'] = self._desc
@@ -2473,6 +2788,24 @@ class Array(Element):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Write the array's values into the CharpyWriter instance through the
+        template
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            if self._SAFE_STAT and self._num is not None and len(self._val) != self._num:
+                raise(EltErr('{0} [_to_writer] invalid number of values: {1} instead of {2}'\
+                      .format(self._name, len(self._val), self._num)))
+            for v in self._val:
+                if v == self._tmpl_val:
+                    w.write_pack(self._tmpl_pack)
+                else:
+                    self._tmpl.set_val(v)
+                    self._tmpl._to_writer(w)
+            self._tmpl.set_val(None)
+    
     def _from_char(self, char):
         """Dispatch the consumption of a Charpy intance to the values within the
         array through the template
@@ -3297,6 +3630,18 @@ class Sequence(Element):
         else:
             return []
     
+    def _to_writer(self, w):
+        """Dispatch the writing into the CharpyWriter instance to the elements 
+        within the sequence's content
+        """
+        if not _has_std_pack(self.__class__):
+            w.write_pack(self._to_pack())
+        elif not self.get_trans():
+            if self._SAFE_STAT and self._num is not None and len(self._content) != self._num:
+                raise(EltErr('{0} [_to_writer]: invalid number of repeated content: {1} instead of {2}'\
+                      .format(self._name, len(self._content), self._num)))
+            [elt._to_writer(w) for elt in self._content]
+    
     def _from_char(self, char):
         """Dispatch the consumption of a Charpy intance to the elements within
         the sequence's content
@@ -28,6 +28,8 @@
 #*/
 
 import sys
+from collections import OrderedDict
+from threading   import Lock
 
 if sys.version_info[0] < 3:
     from .utils_py2 import *
@@ -371,3 +373,85 @@ def uint_to_hex(uint, bitlen):
     else:
         return h
 
+
+#------------------------------------------------------------------------------#
+# bounded LRU cache
+#------------------------------------------------------------------------------#
+
+class LRUCache(object):
+    """Bounded least-recently-used cache, with hit / miss / eviction counters
+    
+    It is used to keep decoded values or parsed messages, keyed by their
+    encoded buffer, so that recurring buffers do not need to be parsed again
+    (e.g. ASN1Obj._DEC_CACHE in pycrate_asn1rt).
+    
+    Args:
+        maxsize: uint, maximum number of entries
+        copy: callable, or None
+            when set, it is applied to values when they are put in and got out
+            of the cache, so that cached values and returned values are never
+            shared, otherwise returned values are shared and must be handled as
+            read-only
+    """
+    
+    def __init__(self, maxsize=1024, copy=None):
+        self.maxsize   = maxsize
+        self.copy      = copy
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._dict     = OrderedDict()
+        self._lock     = Lock()
+    
+    def __len__(self):
+        return len(self._dict)
+    
+    def __contains__(self, key):
+        return key in self._dict
+    
+    def get(self, key, default=None):
+        """returns the value cached for key, and marks it as the most recently
+        used, or default if key is not in the cache
+        """
+        with self._lock:
+            try:
+                val = self._dict.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._dict[key] = val
+            self.hits += 1
+        if self.copy is not None:
+            return self.copy(val)
+        else:
+            return val
+    
+    def put(self, key, val):
+        """caches val for key, and evicts the least recently used entry if the
+        cache is full
+        """
+        if self.copy is not None:
+            val = self.copy(val)
+        with self._lock:
+            if key in self._dict:
+                del self._dict[key]
+            elif len(self._dict) >= self.maxsize:
+                self._dict.popitem(last=False)
+                self.evictions += 1
+            self._dict[key] = val
+    
+    def clear(self):
+        """empties the cache and resets its counters
+        """
+        with self._lock:
+            self._dict.clear()
+            self.hits, self.misses, self.evictions = 0, 0, 0
+    
+    def stats(self):
+        """returns the dict of counters of the cache
+        """
+        return {'size'     : len(self._dict),
+                'maxsize'  : self.maxsize,
+                'hits'     : self.hits,
+                'misses'   : self.misses,
+                'evictions': self.evictions}
@@ -302,6 +302,16 @@ class ENBd(object):
             self._log('WNG', 'no UE with S1 context-id %i to unset' % ctx_id)
     
     def get_ued(self, pdu_rx):
+        ident, enb_ue_id = self.get_ue_ident(pdu_rx)
+        if ident is None:
+            return None, enb_ue_id
+        else:
+            return self.Server.get_ued(**ident), enb_ue_id
+    
+    def get_ue_ident(self, pdu_rx):
+        """returns the UE identity provided in an initialUEMessage PDU as a
+        dict (imsi or mtmsi) or None, and the eNB UE context id
+        """
         enb_ue_id, nas_pdu, s_tmsi, tai = None, None, None, None
         for ie in pdu_rx[1]['value'][1]['protocolIEs']:
             if ie['id'] == 8:
@@ -322,7 +332,7 @@ class ENBd(object):
         plmn = plmn_buf_to_str(tai['pLMNidentity'])
         if s_tmsi:
             # use the S1AP S-TMSI
-            return self.Server.get_ued(mtmsi=bytes_to_uint(s_tmsi['m-TMSI'], 32)), enb_ue_id
+            return {'mtmsi': bytes_to_uint(s_tmsi['m-TMSI'], 32)}, enb_ue_id
         else:
             # use the EPSID within the NAS PDU
             TS24007.IE.DECODE_INNER = False
@@ -346,10 +356,10 @@ class ENBd(object):
                 EpsId.from_bytes(epsid)
                 ident = EpsId.decode()
                 if ident[0] == NAS.IDTYPE_IMSI:
-                    return self.Server.get_ued(imsi=ident[1]), enb_ue_id
+                    return {'imsi': ident[1]}, enb_ue_id
                 elif ident[0] == NAS.IDTYPE_GUTI:
                     # ensure PLMN, MME group, MMEC correspond
-                    return self.Server.get_ued(mtmsi=ident[4]), enb_ue_id
+                    return {'mtmsi': ident[4]}, enb_ue_id
                 else:
                     return None, enb_ue_id
             else:
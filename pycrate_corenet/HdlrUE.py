@@ -340,8 +340,7 @@ class UEd(SigStack):
             self._log('INF', 'unhandled identity, type %i, ident %s' % (idtype, ident))
     
     def get_new_tmsi(self):
-        # use the Python random generator
-        return random.getrandbits(32)
+        return self.Server.get_new_tmsi()
     
     def set_tmsi(self, tmsi):
         # delete current TMSI from the Server LUT
@@ -109,6 +109,7 @@ class EMMSigProc(NASSigProc):
             for p in self.EMM.Proc[ind+1:]:
                 p.abort()
             del self.EMM.Proc[ind:]
+        self.cancel_timer()
         if self._emm_preempt:
             # release the EMM stack
             self.EMM.ready.set()
@@ -118,6 +119,7 @@ class EMMSigProc(NASSigProc):
         # remove the procedure from the EMM stack of procedures
         if self.EMM.Proc[-1] == self:
             del self.EMM.Proc[-1]
+            self.cancel_timer()
         if self._emm_preempt:
             # release the EMM stack
             self.EMM.ready.set()
@@ -127,6 +129,15 @@ class EMMSigProc(NASSigProc):
             self.TimerValue = getattr(self.EMM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            # register to the Server scheduler for procedures in timeout
+            Timers = getattr(self.UE.Server, 'Timers', None)
+            if Timers is not None:
+                Timers.add(self, self.EMM.Proc)
+    
+    def cancel_timer(self):
+        Timers = getattr(self.UE.Server, 'Timers', None)
+        if Timers is not None:
+            Timers.cancel(self)
     
     def get_timer(self):
         if self.Timer is None:
@@ -107,6 +107,7 @@ class GMMSigProc(NASSigProc):
             for p in self.GMM.Proc[ind+1:]:
                 p.abort()
             del self.GMM.Proc[ind:]
+        self.cancel_timer()
         if self._gmm_preempt:
             # release the GMM stack
             self.GMM.ready.set()
@@ -116,6 +117,7 @@ class GMMSigProc(NASSigProc):
         # remove the procedure from the GMM stack of procedures
         if self.GMM.Proc[-1] == self:
             del self.GMM.Proc[-1]
+            self.cancel_timer()
         if self._gmm_preempt:
             # release the GMM stack
             self.GMM.ready.set()
@@ -125,6 +127,15 @@ class GMMSigProc(NASSigProc):
             self.TimerValue = getattr(self.GMM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            # register to the Server scheduler for procedures in timeout
+            Timers = getattr(self.UE.Server, 'Timers', None)
+            if Timers is not None:
+                Timers.add(self, self.GMM.Proc)
+    
+    def cancel_timer(self):
+        Timers = getattr(self.UE.Server, 'Timers', None)
+        if Timers is not None:
+            Timers.cancel(self)
     
     def get_timer(self):
         if self.Timer is None:
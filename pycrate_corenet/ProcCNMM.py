@@ -108,6 +108,7 @@ class MMSigProc(NASSigProc):
             for p in self.MM.Proc[ind+1:]:
                 p.abort()
             del self.MM.Proc[ind:]
+        self.cancel_timer()
         if self._mm_preempt:
             # release the MM stack
             self.MM.ready.set()
@@ -117,6 +118,7 @@ class MMSigProc(NASSigProc):
         # remove the procedure from the MM stack of procedures
         if self.MM.Proc[-1] == self:
             del self.MM.Proc[-1]
+            self.cancel_timer()
         if self._mm_preempt:
             # release the MM stack
             self.MM.ready.set()
@@ -126,6 +128,15 @@ class MMSigProc(NASSigProc):
             self.TimerValue = getattr(self.MM, self.Timer, self.TimerDefault)
             self.TimerStart = time()
             self.TimerStop  = self.TimerStart + self.TimerValue
+            # register to the Server scheduler for procedures in timeout
+            Timers = getattr(self.UE.Server, 'Timers', None)
+            if Timers is not None:
+                Timers.add(self, self.MM.Proc)
+    
+    def cancel_timer(self):
+        Timers = getattr(self.UE.Server, 'Timers', None)
+        if Timers is not None:
+            Timers.cancel(self)
     
     def get_timer(self):
         if self.Timer is None:
@@ -39,8 +39,8 @@
 #------------------------------------------------------------------------------#
 
 from .utils      import *
-from .HdlrHNB    import HNBd
-from .HdlrENB    import ENBd
+from .HdlrHNB    import HNBd, HNBAPErrorIndGW, RUAErrorInd
+from .HdlrENB    import ENBd, S1APErrorIndNonUECN
 from .HdlrUE     import UEd
 from .ServerAuC  import AuC
 from .ServerGTPU import ARPd, GTPUd, BLACKHOLE_LAN, BLACKHOLE_WAN
@@ -322,6 +322,8 @@ class CorenetServer(object):
         # init the UE procedure cleaner holder
         # (with a dummy thread, which will be overridden at runtime)
         self._clean_ue_proc = threadit( lambda: 1 )
+        # init the scheduler for NAS procedures timers
+        self.Timers = ProcTimers()
         #
         # clear LAI, RAI, TAI dict
         self.LAI.clear()
@@ -539,31 +541,28 @@ class CorenetServer(object):
         if not buf:
             # WNG: it may be required to handle SCTP notifications, at some point...
             return
-        # getting SCTP ppid, stream id and eNB/HNB handler
-        ppid, sid, ranid = ntohl(notif.ppid), notif.stream, self.SCTPCli[sk]
-        ran = self.RAN[ranid]
+        # getting SCTP ppid and stream id
+        ppid, sid = ntohl(notif.ppid), notif.stream
+        self.process_stream_msg(sk, ppid, sid, buf, decode_ran_pdu(ppid, buf))
+    
+    def process_stream_msg(self, sk, ppid, sid, buf, pdu_rx):
+        # process the PDU pdu_rx, decoded from the buffer buf received over 
+        # the connected SCTP client sk (pdu_rx is None if buf is invalid)
+        ran = self.RAN[self.SCTPCli[sk]]
         #
         if ppid == SCTP_PPID_HNBAP:
             assert( isinstance(ran, HNBd) )
             hnb = ran
-            if not asn_hnbap_acquire():
-                hnb._log('ERR', 'unable to acquire the HNBAP module')
-                return
-            try:
-                PDU_HNBAP.from_aper(buf)
-            except:
-                asn_hnbap_release()
+            if pdu_rx is None:
                 hnb._log('WNG', 'invalid HNBAP PDU transfer-syntax: %s'\
                          % hexlify(buf).decode('ascii'))
-                Err = hnb.init_hnbap_proc(HNBAPErrorIndCN,
+                Err = hnb.init_hnbap_proc(HNBAPErrorIndGW,
                                           Cause=('protocol', 'transfer-syntax-error'))
                 Err.recv(buf)
                 pdu_tx = Err.send()
             else:
-                pdu_rx = PDU_HNBAP()
                 if hnb.TRACE_ASN_HNBAP:
-                    hnb._log('TRACE_ASN_HNBAP_UL', PDU_HNBAP.to_asn1())
-                asn_hnbap_release()
+                    hnb._log('TRACE_ASN_HNBAP_UL', PDU_HNBAP.encode(pdu_rx, 'asn1'))
                 pdu_tx = hnb.process_hnbap_pdu(pdu_rx)
             for pdu in pdu_tx:
                 self.send_hnbap_pdu(hnb, pdu)
@@ -571,13 +570,7 @@ class CorenetServer(object):
         elif ppid == SCTP_PPID_RUA:
             assert( isinstance(ran, HNBd) )
             hnb = ran
-            if not asn_rua_acquire():
-                hnb._log('ERR', 'unable to acquire the RUA module')
-                return
-            try:
-                PDU_RUA.from_aper(buf)
-            except:
-                asn_rua_release()
+            if pdu_rx is None:
                 self._log('WNG', 'invalid RUA PDU transfer-syntax: %s'\
                           % hexlify(buf).decode('ascii'))
                 Err = hnb.init_rua_proc(RUAErrorInd,
@@ -585,10 +578,8 @@ class CorenetServer(object):
                 Err.recv(buf)
                 pdu_tx = Err.send()
             else:
-                pdu_rx = PDU_RUA()
                 if hnb.TRACE_ASN_RUA:
-                    hnb._log('TRACE_ASN_RUA_UL', PDU_HNBAP.to_asn1())
-                asn_rua_release()
+                    hnb._log('TRACE_ASN_RUA_UL', PDU_RUA.encode(pdu_rx, 'asn1'))
                 pdu_tx = hnb.process_rua_pdu(pdu_rx)
             for pdu in pdu_tx:
                 self.send_rua_pdu(hnb, pdu)
@@ -596,23 +587,15 @@ class CorenetServer(object):
         elif ppid == SCTP_PPID_S1AP:
             assert( isinstance(ran, ENBd) )
             enb = ran
-            if not asn_s1ap_acquire():
-                enb._log('ERR', 'unable to acquire the S1AP module')
-                return
-            try:
-                PDU_S1AP.from_aper(buf)
-            except:
-                asn_s1ap_release()
+            if pdu_rx is None:
                 enb._log('WNG', 'invalid S1AP PDU transfer-syntax: %s'\
                          % hexlify(buf).decode('ascii'))
-                Err = enb.init_hnbap_proc(S1APErrorIndNonUECN,
+                Err = enb.init_s1ap_proc(S1APErrorIndNonUECN,
                                           Cause=('protocol', 'transfer-syntax-error'))
                 pdu_tx = Err.send()
             else:
-                pdu_rx = PDU_S1AP()
                 if enb.TRACE_ASN_S1AP:
-                    enb._log('TRACE_ASN_S1AP_UL', PDU_S1AP.to_asn1())
-                asn_s1ap_release()
+                    enb._log('TRACE_ASN_S1AP_UL', PDU_S1AP.encode(pdu_rx, 'asn1'))
                 if sid == enb.SKSid:
                     # non-UE-associated signalling
                     pdu_tx = enb.process_s1ap_pdu(pdu_rx)
@@ -629,36 +612,21 @@ class CorenetServer(object):
             return
     
     def send_hnbap_pdu(self, hnb, pdu):
-        if not asn_hnbap_acquire():
-            hnb._log('ERR', 'unable to acquire the HNBAP module')
-            return
-        PDU_HNBAP.set_val(pdu)
         if hnb.TRACE_ASN_HNBAP:
-            hnb._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.to_asn1())
-        buf = PDU_HNBAP.to_aper()
-        asn_hnbap_release()
+            hnb._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.encode(pdu, 'asn1'))
+        buf = PDU_HNBAP.encode(pdu)
         return self._write_sk(hnb.SK, buf, ppid=SCTP_PPID_HNBAP)
     
     def send_rua_pdu(self, hnb, pdu):
-        if not asn_rua_acquire():
-            hnb._log('ERR', 'unable to acquire the RUA module')
-            return
-        PDU_RUA.set_val(pdu)
         if hnb.TRACE_ASN_RUA:
-            hnb._log('TRACE_ASN_RUA_DL', PDU_RUA.to_asn1())
-        buf = PDU_RUA.to_aper()
-        asn_rua_release()
+            hnb._log('TRACE_ASN_RUA_DL', PDU_RUA.encode(pdu, 'asn1'))
+        buf = PDU_RUA.encode(pdu)
         return self._write_sk(hnb.SK, buf, ppid=SCTP_PPID_RUA)
     
     def send_s1ap_pdu(self, enb, pdu, sid):
-        if not asn_s1ap_acquire():
-            enb._log('ERR', 'unable to acquire the S1AP module')
-            return
-        PDU_S1AP.set_val(pdu)
         if enb.TRACE_ASN_S1AP:
-            enb._log('TRACE_ASN_S1AP_DL', PDU_S1AP.to_asn1())
-        buf = PDU_S1AP.to_aper()
-        asn_s1ap_release()
+            enb._log('TRACE_ASN_S1AP_DL', PDU_S1AP.encode(pdu, 'asn1'))
+        buf = PDU_S1AP.encode(pdu)
         return self._write_sk(enb.SK, buf, ppid=SCTP_PPID_S1AP, stream=sid)
     
     #--------------------------------------------------------------------------#
@@ -705,14 +673,9 @@ class CorenetServer(object):
                 'procedureCode': 17,
                 'value': (('S1AP-PDU-Contents', 'S1SetupFailure'),
                           {'protocolIEs' : IEs})})
-        if not asn_s1ap_acquire():
-            self._log('ERR', 'unable to acquire the S1AP module')
-        else:
-            PDU_S1AP.set_val(pdu)
-            if ENBd.TRACE_ASN_S1AP:
-                self._log('TRACE_ASN_S1AP_DL', PDU_S1AP.to_asn1())
-            self._write_sk(sk, PDU_S1AP.to_aper(), ppid=SCTP_PPID_S1AP, stream=sid)
-            asn_s1ap_release()
+        if ENBd.TRACE_ASN_S1AP:
+            self._log('TRACE_ASN_S1AP_DL', PDU_S1AP.encode(pdu, 'asn1'))
+        self._write_sk(sk, PDU_S1AP.encode(pdu), ppid=SCTP_PPID_S1AP, stream=sid)
         if self.SERVER_ENB['errclo']:
             sk.close()
     
@@ -724,44 +687,43 @@ class CorenetServer(object):
         if not buf:
             # WNG: maybe required to handle SCTP notification, at some point
             return
-        # verifying SCTP Payload Protocol ID and setting stream ID for 
-        # non-UE-associated trafic
         ppid, sid = ntohl(notif.ppid), notif.stream
+        self.process_new_enb(sk, ppid, sid, buf, decode_ran_pdu(ppid, buf))
+    
+    def process_new_enb(self, sk, ppid, sid, buf, pdu_rx):
+        # process the initial PDU pdu_rx, decoded from the buffer buf received
+        # over the new SCTP client sk (pdu_rx is None if buf is invalid)
+        #
+        # verifying SCTP Payload Protocol ID, the stream ID is used for 
+        # non-UE-associated trafic
         if ppid != SCTP_PPID_S1AP:
             self._log('ERR', 'invalid S1AP PPID, %i' % ppid)
             if self.SERVER_ENB['errclo']:
                 sk.close()
             return
         #
-        if not asn_s1ap_acquire():
-            self._log('ERR', 'unable to acquire the S1AP module')
-            return
-        try:
-            PDU_S1AP.from_aper(buf)
-        except:
+        if pdu_rx is None:
             self._log('WNG', 'invalid S1AP PDU transfer-syntax: %s'\
                       % hexlify(buf).decode('ascii'))
             # return nothing, no need to bother
             return
         if ENBd.TRACE_ASN_S1AP:
-            self._log('TRACE_ASN_S1AP_UL', PDU_S1AP.to_asn1())
-        pdu_rx = PDU_S1AP()
-        asn_s1ap_release()
+            self._log('TRACE_ASN_S1AP_UL', PDU_S1AP.encode(pdu_rx, 'asn1'))
         #
         ENBId = self._parse_s1setup(pdu_rx)
         if ENBId is None:
             # send S1SetupReject
-            self._send_s1setuprej(sk, cause=('protocol', 'abstract-syntax-error-reject'))
+            self._send_s1setuprej(sk, sid, cause=('protocol', 'abstract-syntax-error-reject'))
             return
         elif ENBId not in self.RAN:
             if not self.RAN_CONNECT_ANY:
                 self._log('ERR', 'eNB %r not allowed to connect' % (ENBId, ))
                 # send S1SetupReject
-                self._send_s1setuprej(sk, cause=('radioNetwork', 'unspecified'))
+                self._send_s1setuprej(sk, sid, cause=('radioNetwork', 'unspecified'))
                 return
             elif ENBId[0] not in self.RAN_ALLOWED_PLMN:
                 self._log('ERR', 'eNB %r not allowed to connect, bad PLMN' % (ENBId, ))
-                self._send_s1setuprej(sk, cause=('radioNetwork', 'unspecified'))
+                self._send_s1setuprej(sk, sid, cause=('radioNetwork', 'unspecified'))
                 return
             else:
                 # creating an entry for this eNB
@@ -793,15 +755,10 @@ class CorenetServer(object):
             self._set_enb_loc(enb)
         #
         # send available PDU(s) back
-        if not asn_s1ap_acquire():
-           enb._log('ERR', 'unable to acquire the S1AP module')
-           return
         for pdu in pdu_tx:
-            PDU_S1AP.set_val(pdu)
             if ENBd.TRACE_ASN_S1AP:
-                enb._log('TRACE_ASN_S1AP_DL', PDU_S1AP.to_asn1())
-            self._write_sk(sk, PDU_S1AP.to_aper(), ppid=SCTP_PPID_S1AP, stream=sid)
-        asn_s1ap_release()
+                enb._log('TRACE_ASN_S1AP_DL', PDU_S1AP.encode(pdu, 'asn1'))
+            self._write_sk(sk, PDU_S1AP.encode(pdu), ppid=SCTP_PPID_S1AP, stream=sid)
     
     def _set_enb_loc(self, enb):
         for tai in enb.Config['TAIs']:
@@ -860,14 +817,9 @@ class CorenetServer(object):
                 'procedureCode': 1,
                 'value': (('HNBAP-PDU-Contents', 'HNBRegisterReject'),
                           {'protocolIEs' : IEs})})
-        if not asn_hnbap_acquire():
-            self._log('ERR', 'unable to acquire the HNBAP module')
-        else:
-            PDU_HNBAP.set_val(pdu)
-            if HNBd.TRACE_ASN_HNBAP:
-                self._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.to_asn1())
-            self._write_sk(sk, PDU_HNBAP.to_aper(), ppid=SCTP_PPID_HNBAP)
-            asn_hnbap_release()
+        if HNBd.TRACE_ASN_HNBAP:
+            self._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.encode(pdu, 'asn1'))
+        self._write_sk(sk, PDU_HNBAP.encode(pdu), ppid=SCTP_PPID_HNBAP)
         if self.SERVER_HNB['errclo']:
             sk.close()
     
@@ -879,28 +831,27 @@ class CorenetServer(object):
         if not buf:
             # WNG: maybe required to handle SCTP notification, at some point
             return
-        # verifying SCTP Payload Protocol ID
         ppid = ntohl(notif.ppid)
+        self.process_new_hnb(sk, ppid, buf, decode_ran_pdu(ppid, buf))
+    
+    def process_new_hnb(self, sk, ppid, buf, pdu):
+        # process the initial PDU pdu, decoded from the buffer buf received
+        # over the new SCTP client sk (pdu is None if buf is invalid)
+        #
+        # verifying SCTP Payload Protocol ID
         if ppid != SCTP_PPID_HNBAP:
             self._log('ERR', 'invalid HNBAP PPID, %i' % ppid)
             if self.SERVER_HNB['errclo']:
                 sk.close()
             return
         #
-        if not asn_hnbap_acquire():
-            self._log('ERR', 'unable to acquire the HNBAP module')
-            return
-        try:
-            PDU_HNBAP.from_aper(buf)
-        except:
+        if pdu is None:
             self._log('WNG', 'invalid HNBAP PDU transfer-syntax: %s'\
                       % hexlify(buf).decode('ascii'))
             # return nothing, no need to bother
             return
         if HNBd.TRACE_ASN_HNBAP:
-            self._log('TRACE_ASN_HNBAP_UL', PDU_HNBAP.to_asn1())
-        pdu = PDU_HNBAP()
-        asn_hnbap_release()
+            self._log('TRACE_ASN_HNBAP_UL', PDU_HNBAP.encode(pdu, 'asn1'))
         #
         # ensure we have a HNBRegisterRequest with PLMN and CellID provided
         HNBId = self._parse_hnbregreq(pdu)
@@ -948,15 +899,10 @@ class CorenetServer(object):
             self._set_hnb_loc(hnb)
         #
         # send available PDU(s) back
-        if not asn_hnbap_acquire():
-           hnb._log('ERR', 'unable to acquire the HNBAP module')
-           return
         for retpdu in ret:
-            PDU_HNBAP.set_val(retpdu)
             if HNBd.TRACE_ASN_HNBAP:
-                hnb._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.to_asn1())
-            self._write_sk(sk, PDU_HNBAP.to_aper(), ppid=SCTP_PPID_HNBAP)
-        asn_hnbap_release()
+                hnb._log('TRACE_ASN_HNBAP_DL', PDU_HNBAP.encode(retpdu, 'asn1'))
+            self._write_sk(sk, PDU_HNBAP.encode(retpdu), ppid=SCTP_PPID_HNBAP)
     
     def _set_hnb_loc(self, hnb):
         lai = (hnb.Config['PLMNidentity'], hnb.Config['LAC'])
@@ -1061,59 +1007,18 @@ class CorenetServer(object):
     
     def clean_ue_proc(self):
         #self._log('DBG', 'clean_ue_proc()')
-        # go over all UE and abort() NAS signalling procedures in timeout
-        T = time()
-        for ue in self.UE.values():
-            if ue.IuCS is not None:
-                if ue.IuCS.MM.Proc:
-                    for P in ue.IuCS.MM.Proc:
-                        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                            P._log('WNG', 'timeout: aborting')
-                            P.abort()
-                
-                #if ue.IuCS.CC.Proc:
-                #    for P in ue.IuCS.CC.Proc.values():
-                #        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                #            P._log('WNG', 'timeout: aborting')
-                #            P.abort()
-                
-                #if ue.IuCS.SMS.Proc:
-                #    for P in ue.IuCS.SMS.Proc.values():
-                #        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                #            P._log('WNG', 'timeout: aborting')
-                #            P.abort()
-                
-                #if ue.IuCS.SS.Proc:
-                #    for P in ue.IuCS.SS.Proc.values():
-                #        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                #            P._log('WNG', 'timeout: aborting')
-                #            P.abort()
-            
-            
-            if ue.IuPS is not None:
-            
-                if ue.IuPS.GMM.Proc:
-                    for P in ue.IuPS.GMM.Proc:
-                        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                            P._log('WNG', 'timeout: aborting')
-                            P.abort()
-                
-                #if ue.IuPS.SM.Proc:
-                #    for P in ue.IuCS.CC.Proc.values():
-                #        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                #            P._log('WNG', 'timeout: aborting')
-                #            P.abort()
-            
-            if ue.S1 is not None:
-            
-                if ue.S1.EMM.Proc:
-                    for P in ue.S1.EMM.Proc:
-                        if hasattr(P, 'TimerStop') and T > P.TimerStop:
-                            P._log('WNG', 'timeout: aborting')
-                            P.abort()
-                
-                #if ue.S1.ESM.Proc:
-                #    pass
+        # abort() NAS signalling procedures in timeout
+        # (MM, GMM and EMM procedures register their timer to self.Timers,
+        # hence only the expired timers are processed here)
+        for P, stack in self.Timers.pop_expired(time()):
+            # P may have been aborted together with an enclosing procedure
+            if P in stack:
+                P._log('WNG', 'timeout: aborting')
+                P.abort()
+    
+    def get_new_tmsi(self):
+        # use the Python random generator
+        return random.getrandbits(32)
     
     def get_sgw_addr(self):
         return self.GTPUd.GTP_IP
@@ -0,0 +1,601 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_corenet/ServerAsync.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+#------------------------------------------------------------------------------#
+# This is the corenet server running on an asyncio event loop (Python 3 only)
+#
+# A single event loop serves:
+# - the RAN associations (eNodeB and Home-NodeB), through a RAN transport:
+#   SCTP (with pysctp), or UDP and in-memory stand-ins for SCTP (e.g. for tests)
+# - the GTP-U and ARP sockets of the GTPUd and ARPd sub-servers
+# - the NAS procedures timers
+#
+# PDUs received over each association are handled in order by a dedicated
+# coroutine, and their decoding can be offloaded to an executor.
+# The RAN and UE handlers are synchronous and may block (e.g. on the AuC):
+# they are run in a single dedicated thread, one at a time as within the
+# CorenetServer, so that the event loop keeps serving sockets meanwhile.
+#------------------------------------------------------------------------------#
+
+import asyncio
+import queue
+import multiprocessing
+from threading          import get_ident
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .utils      import *
+from .Server     import CorenetServer
+from .ServerGTPU import ARPd, GTPUd
+
+
+#------------------------------------------------------------------------------#
+# RAN transports
+#------------------------------------------------------------------------------#
+
+class RANAssoc(object):
+    """association with a RAN node (eNodeB or Home-NodeB), used in place of the
+    SCTP client socket by CorenetServerAsync and the RAN handlers
+    """
+    
+    def __init__(self, transport, addr):
+        self.Transport = transport
+        self.Addr      = addr
+        # queue of (buf, ppid, stream) received, None when closed
+        self.Queue     = asyncio.Queue()
+        # coroutine task handling the queue
+        self.Task      = None
+        self._closed   = False
+    
+    def getpeername(self):
+        return self.Addr
+    
+    def send(self, buf, ppid=0, stream=0):
+        """sends buf with the given SCTP payload protocol identifier and stream
+        id, returns the number of bytes sent
+        
+        It can be called from any thread
+        """
+        if self.Transport.in_loop():
+            return self._send(buf, ppid, stream)
+        else:
+            self.Transport.Loop.call_soon_threadsafe(self._send, buf, ppid, stream)
+            return len(buf)
+    
+    def close(self):
+        """closes the association, it can be called from any thread
+        """
+        if not self.Transport.in_loop():
+            self.Transport.Loop.call_soon_threadsafe(self.close)
+        elif not self._closed:
+            self._closed = True
+            self._close()
+            self.Transport._assoc_lost(self)
+    
+    def is_closed(self):
+        return self._closed
+    
+    def _send(self, buf, ppid, stream):
+        raise(CorenetErr('not implemented'))
+    
+    def _close(self):
+        pass
+
+
+class RANTransport(object):
+    """listening endpoint for associations from RAN nodes
+    
+    Args:
+        server: CorenetServerAsync instance
+        config: dict, SERVER_ENB or SERVER_HNB config of the server
+        name: str, 'ENB' or 'HNB'
+    """
+    
+    def __init__(self, server, config, name):
+        self.Server = server
+        self.Config = config
+        self.Name   = name
+        self.Loop   = None
+        self.Assoc  = set()
+        self._tid   = None
+    
+    async def start(self, loop):
+        self.Loop = loop
+        self._tid = get_ident()
+    
+    def close(self):
+        for assoc in list(self.Assoc):
+            assoc.close()
+    
+    def in_loop(self):
+        return get_ident() == self._tid
+    
+    def _assoc_new(self, assoc):
+        self.Assoc.add(assoc)
+        self.Server.assoc_new(assoc, self)
+    
+    def _assoc_recv(self, assoc, buf, ppid, stream):
+        self.Server.assoc_recv(assoc, buf, ppid, stream)
+    
+    def _assoc_lost(self, assoc):
+        self.Assoc.discard(assoc)
+        self.Server.assoc_lost(assoc)
+
+
+# SCTP, with pysctp one-to-one sockets
+
+class SCTPAssoc(RANAssoc):
+    
+    def __init__(self, transport, addr, sk):
+        RANAssoc.__init__(self, transport, addr)
+        self.SK = sk
+    
+    def _send(self, buf, ppid, stream):
+        if ppid:
+            ppid = htonl(ppid)
+        return self.SK.sctp_send(buf, ppid=ppid, stream=stream)
+    
+    def _close(self):
+        self.Transport.Loop.remove_reader(self.SK.fileno())
+        self.SK.close()
+
+
+class SCTPTransport(RANTransport):
+    """SCTP server for RAN associations
+    """
+    
+    async def start(self, loop):
+        await RANTransport.start(self, loop)
+        server_addr = (self.Config['IP'], self.Config['port'])
+        try:
+            self.SK = sctp.sctpsocket_tcp(self.Config['INET'])
+            self.Server.sctp_set_events(self.SK)
+        except Exception as err:
+            raise(CorenetErr('cannot create SCTP socket: {0}'.format(err)))
+        try:
+            self.SK.bind(server_addr)
+        except Exception as err:
+            raise(CorenetErr('cannot bind SCTP socket on address {0!r}: {1}'\
+                  .format(server_addr, err)))
+        try:
+            self.SK.listen(self.Config['MAXCLI'])
+        except Exception as err:
+            raise(CorenetErr('cannot listen to SCTP connection: {0}'.format(err)))
+        loop.add_reader(self.SK.fileno(), self._accept)
+        #
+        self.Server._log('INF', 'SCTP %s server started on address %r' % (self.Name, server_addr))
+    
+    def close(self):
+        RANTransport.close(self)
+        self.Loop.remove_reader(self.SK.fileno())
+        self.SK.close()
+    
+    def _accept(self):
+        sk, addr = self.SK.accept()
+        assoc = SCTPAssoc(self, addr, sk)
+        self.Loop.add_reader(sk.fileno(), self._read, assoc)
+        self._assoc_new(assoc)
+    
+    def _read(self, assoc):
+        # the socket is readable, hence sctp_recv() returns straight
+        try:
+            addr, flags, buf, notif = assoc.SK.sctp_recv(self.Server.SERVER_BUFLEN)
+        except Exception as err:
+            # the client disconnected, or something went bad with the endpoint
+            self.Server._log('ERR', 'sctp_recv() failed, err: {0}'.format(err))
+            assoc.close()
+            return
+        if not buf:
+            if flags & sctp.FLAG_NOTIFICATION:
+                # SCTP notification
+                self.Server.sctp_handle_notif(assoc, notif)
+            else:
+                # the client just disconnected
+                assoc.close()
+        else:
+            if not flags & sctp.FLAG_EOR:
+                self.Server._log('WNG', 'SCTP message truncated')
+            self._assoc_recv(assoc, buf, ntohl(notif.ppid), notif.stream)
+
+
+# UDP stand-in for SCTP
+# each datagram starts with a 6 bytes header with the SCTP payload protocol
+# identifier (uint32) and the stream id (uint16), followed by the PDU
+# a datagram with only the header closes the association
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    
+    def __init__(self, transport):
+        self.Transport = transport
+    
+    def datagram_received(self, data, addr):
+        self.Transport._recv(data, addr)
+    
+    def error_received(self, exc):
+        self.Transport.Server._log('ERR', 'UDP %s server error: %s' % (self.Transport.Name, exc))
+
+
+class UDPAssoc(RANAssoc):
+    
+    def _send(self, buf, ppid, stream):
+        self.Transport.EP.sendto(pack('>IH', ppid, stream) + buf, self.Addr)
+        return len(buf)
+    
+    def _close(self):
+        del self.Transport.Peers[self.Addr]
+
+
+class UDPTransport(RANTransport):
+    """UDP server for RAN associations, as a stand-in for SCTP
+    """
+    
+    async def start(self, loop):
+        await RANTransport.start(self, loop)
+        server_addr = (self.Config['IP'], self.Config['port'])
+        # associations, indexed by peer address
+        self.Peers = {}
+        try:
+            self.EP = (await loop.create_datagram_endpoint(lambda: _UDPProtocol(self),
+                                                           local_addr=server_addr,
+                                                           family=self.Config['INET']))[0]
+        except Exception as err:
+            raise(CorenetErr('cannot bind UDP socket on address {0!r}: {1}'\
+                  .format(server_addr, err)))
+        #
+        self.Server._log('INF', 'UDP %s server started on address %r' % (self.Name, server_addr))
+    
+    def close(self):
+        RANTransport.close(self)
+        self.EP.close()
+    
+    def _recv(self, data, addr):
+        if len(data) < 6:
+            return
+        ppid, stream = unpack('>IH', data[:6])
+        if addr in self.Peers:
+            assoc = self.Peers[addr]
+        elif len(data) == 6:
+            return
+        else:
+            assoc = UDPAssoc(self, addr)
+            self.Peers[addr] = assoc
+            self._assoc_new(assoc)
+        if len(data) == 6:
+            assoc.close()
+        else:
+            self._assoc_recv(assoc, data[6:], ppid, stream)
+
+
+# in-memory transport
+# RAN nodes are emulated with LocalPeer instances, returned by .connect()
+
+class LocalPeer(object):
+    """RAN node side of an in-memory association, its methods can be called
+    from any thread
+    """
+    
+    def __init__(self, transport, addr):
+        self.Transport = transport
+        self.Addr      = addr
+        self.Assoc     = None
+        self.closed    = False
+        # queue of (buf, ppid, stream) sent by the server, None when closed
+        self._rx       = queue.Queue()
+    
+    def send(self, buf, ppid=0, stream=0):
+        """sends buf to the server
+        """
+        self.Transport.Loop.call_soon_threadsafe(self._send, buf, ppid, stream)
+    
+    def _send(self, buf, ppid, stream):
+        if not self.Assoc.is_closed():
+            self.Transport._assoc_recv(self.Assoc, buf, ppid, stream)
+    
+    def recv(self, timeout=None):
+        """returns the next (buf, ppid, stream) sent by the server, or None in
+        case of timeout or if the association is closed
+        """
+        try:
+            return self._rx.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def close(self):
+        """closes the association
+        """
+        self.Transport.Loop.call_soon_threadsafe(self.Assoc.close)
+
+
+class LocalAssoc(RANAssoc):
+    
+    def __init__(self, transport, addr, peer):
+        RANAssoc.__init__(self, transport, addr)
+        self.Peer = peer
+    
+    def _send(self, buf, ppid, stream):
+        self.Peer._rx.put( (buf, ppid, stream) )
+        return len(buf)
+    
+    def _close(self):
+        self.Peer.closed = True
+        self.Peer._rx.put(None)
+
+
+class LocalTransport(RANTransport):
+    """in-memory server for RAN associations, e.g. for testing
+    """
+    
+    async def start(self, loop):
+        await RANTransport.start(self, loop)
+        self._cnt = 0
+        self.Server._log('INF', 'local %s server started' % self.Name)
+    
+    def connect(self, addr=None):
+        """returns a new LocalPeer, associated to the server
+    
+        It can be called from any thread
+        """
+        self._cnt += 1
+        if addr is None:
+            addr = ('local', self._cnt)
+        peer = LocalPeer(self, addr)
+        self.Loop.call_soon_threadsafe(self._connect, peer)
+        return peer
+    
+    def _connect(self, peer):
+        peer.Assoc = LocalAssoc(self, peer.Addr, peer)
+        self._assoc_new(peer.Assoc)
+
+
+#------------------------------------------------------------------------------#
+# GTP-U and ARP sub-servers
+#------------------------------------------------------------------------------#
+# their sockets are served by the event loop of the CorenetServerAsync
+
+class ARPdAsync(ARPd):
+    THREADED = False
+
+
+class GTPUdAsync(GTPUd):
+    THREADED = False
+    ARPd     = ARPdAsync
+
+
+#------------------------------------------------------------------------------#
+# CorenetServerAsync
+#------------------------------------------------------------------------------#
+
+class CorenetServerAsync(CorenetServer):
+    """CorenetServer running on an asyncio event loop
+    
+    It is configured like the CorenetServer, in addition:
+    - TRANSPORT sets the RAN transport: SCTPTransport, UDPTransport or
+      LocalTransport; the transports are available in ._sk_enb and ._sk_hnb
+    - DECODE_EXECUTOR offloads the decoding of RAN PDUs to a pool of
+      DECODE_WORKERS threads ('thread') or forked processes ('process'),
+      otherwise they are decoded within the event loop (None)
+    - HANDLER_THREAD runs the processing of RAN PDUs by the RAN handlers, and
+      the UE procedures timers, in a single dedicated thread (True), otherwise
+      within the event loop, which is then blocked meanwhile (False)
+    
+    The event loop runs in the thread serving the CorenetServerAsync.
+    The methods of the RAN handlers and UE handlers can still be called from
+    other threads, PDUs sent to RAN nodes are then passed to the event loop.
+    """
+    
+    # RAN transport
+    TRANSPORT       = SCTPTransport
+    #
+    # GTPU trafic forwarder
+    GTPUd           = GTPUdAsync
+    #
+    # RAN PDUs decoding executor: None, 'thread' or 'process'
+    # WNG: with 'process', worker processes are forked at the first decoding,
+    # any ASN.1 object used by another thread at that time may stay locked
+    # in the workers
+    DECODE_EXECUTOR = None
+    DECODE_WORKERS  = 2
+    #
+    # RAN PDUs and UE procedures timers handled in a dedicated thread
+    HANDLER_THREAD  = True
+    
+    #--------------------------------------------------------------------------#
+    # event loop
+    #--------------------------------------------------------------------------#
+    
+    def _start_hnb_server(self):
+        # the transport is started within the event loop
+        self._sk_hnb = self.TRANSPORT(self, self.SERVER_HNB, 'HNB')
+    
+    def _start_enb_server(self):
+        # the transport is started within the event loop
+        self._sk_enb = self.TRANSPORT(self, self.SERVER_ENB, 'ENB')
+    
+    def _serve(self):
+        # Main server loop, running the event loop until stop() is called
+        self._loop     = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._stopped  = asyncio.Event()
+        self._done     = Event()
+        # tasks handling RAN associations, until they end
+        self._tasks    = set()
+        if self.DECODE_EXECUTOR == 'thread':
+            self._executor = ThreadPoolExecutor(self.DECODE_WORKERS)
+        elif self.DECODE_EXECUTOR == 'process':
+            self._executor = ProcessPoolExecutor(self.DECODE_WORKERS,
+                                                 mp_context=multiprocessing.get_context('fork'))
+        else:
+            self._executor = None
+        if self.HANDLER_THREAD:
+            self._handler = ThreadPoolExecutor(1)
+        else:
+            self._handler = None
+        self._running = True
+        try:
+            self._loop.run_until_complete(self._serve_async())
+        finally:
+            self._running = False
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            if self._handler is not None:
+                self._handler.shutdown(wait=False)
+            self._loop.close()
+            self._done.set()
+    
+    async def _serve_async(self):
+        loop = self._loop
+        for tr in self.SCTPServ:
+            await tr.start(loop)
+        #
+        # serve GTP-U and ARP sockets
+        readers = []
+        if self.GTPUd and not self.GTPUd.THREADED:
+            for sk in self.GTPUd.sk_list:
+                loop.add_reader(sk, self.GTPUd._handle_sk, sk)
+                readers.append(sk)
+            if not self.GTPUd.arpd.THREADED:
+                for sk in self.GTPUd.arpd.sk_list:
+                    loop.add_reader(sk, self.GTPUd.arpd._handle_sk, sk)
+                    readers.append(sk)
+        #
+        # clean-up potential signalling procedures in timeout
+        if self.SCHED_UE_TO:
+            loop.call_later(self.SCHED_UE_TO, self._clean_ue_proc_tick)
+        #
+        await self._stopped.wait()
+        #
+        for sk in readers:
+            loop.remove_reader(sk)
+        # close all RAN associations, and wait for their handlers to end,
+        # including those of associations already closed
+        for tr in self.SCTPServ:
+            tr.close()
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=1.0)
+    
+    def _clean_ue_proc_tick(self):
+        if self._handler is None:
+            self._clean_ue_proc()
+        else:
+            self._handler.submit(self._clean_ue_proc)
+        if self._running:
+            self._loop.call_later(self.SCHED_UE_TO, self._clean_ue_proc_tick)
+    
+    def _clean_ue_proc(self):
+        try:
+            self.clean_ue_proc()
+        except Exception as err:
+            self._log('ERR', 'clean_ue_proc() error: %s' % err)
+    
+    def stop(self):
+        if self._running:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            self._done.wait(self.SCHED_RES + 1.0)
+        self.SCTPCli.clear()
+        #
+        # stop sub-servers
+        if self.AUCd:
+            self.AUCd.stop()
+        if self.GTPUd:
+            self.GTPUd.stop()
+    
+    #--------------------------------------------------------------------------#
+    # RAN associations handler
+    #--------------------------------------------------------------------------#
+    
+    def assoc_new(self, assoc, transport):
+        self._log('DBG', 'New %s client from address %r' % (transport.Name, assoc.Addr))
+        assoc.Task = self._loop.create_task(self._serve_assoc(assoc, transport))
+        self._tasks.add(assoc.Task)
+        assoc.Task.add_done_callback(self._tasks.discard)
+    
+    def assoc_recv(self, assoc, buf, ppid, stream):
+        if self.TRACE_SK:
+            self._log('TRACE_SK_UL', buf)
+        assoc.Queue.put_nowait( (buf, ppid, stream) )
+    
+    def assoc_lost(self, assoc):
+        assoc.Queue.put_nowait(None)
+    
+    async def _serve_assoc(self, assoc, transport):
+        # handle all PDUs received over the association, in order
+        while True:
+            msg = await assoc.Queue.get()
+            if msg is None:
+                # association closed
+                await self.run_handler(self._process_assoc_lost, assoc)
+                return
+            buf, ppid, sid = msg
+            pdu_rx = await self.decode_pdu(ppid, buf)
+            await self.run_handler(self._process_assoc_msg, assoc, transport, ppid, sid,
+                                   buf, pdu_rx)
+    
+    def _process_assoc_lost(self, assoc):
+        if assoc in self.SCTPCli:
+            self._rem_sk(assoc)
+    
+    def _process_assoc_msg(self, assoc, transport, ppid, sid, buf, pdu_rx):
+        try:
+            if assoc in self.SCTPCli:
+                self.process_stream_msg(assoc, ppid, sid, buf, pdu_rx)
+            elif transport is self._sk_enb:
+                # new eNodeB client (S1SetupRequest)
+                self.process_new_enb(assoc, ppid, sid, buf, pdu_rx)
+            else:
+                # new Home-NodeB client (HNBRegisterRequest)
+                self.process_new_hnb(assoc, ppid, buf, pdu_rx)
+        except Exception as err:
+            self._log('ERR', 'unable to process PDU from %s client at address %r: %s'\
+                      % (transport.Name, assoc.Addr, err))
+    
+    async def run_handler(self, func, *args):
+        """runs func(*args) in the handler thread if HANDLER_THREAD is set,
+        otherwise within the event loop, and returns its result
+        """
+        if self._handler is None:
+            return func(*args)
+        else:
+            return await self._loop.run_in_executor(self._handler, func, *args)
+    
+    async def decode_pdu(self, ppid, buf):
+        """decodes the RAN PDU buf, within the decoding executor if set
+        """
+        if self._executor is None:
+            return decode_ran_pdu(ppid, buf)
+        else:
+            return await self._loop.run_in_executor(self._executor, decode_ran_pdu, ppid, buf)
+    
+    def _write_sk(self, sk, buf, ppid=0, stream=0):
+        if self.TRACE_SK:
+            self._log('TRACE_SK_DL', buf)
+        try:
+            return sk.send(buf, ppid=ppid, stream=stream)
+        except Exception as err:
+            self._log('ERR', 'cannot send buf to %s client at address %r: %s'\
+                      % (sk.Transport.Name, sk.getpeername(), err))
+            return 0
@@ -55,6 +55,11 @@ GTPUd.WL_ACTIVE     = True or False, to allow specific IP packets to be forwarde
 GTPUd.WL_PORTS      = [('UDP', 53), ('UDP', 123)], to specify to list of IP protocol / port to allow in case WL_ACTIVE is True
 GTPUd.DPI           = True or False, to store packet statistics (protocol / port / DNS requests, see the class DPI) in GTPUd.stats 
 
+-> some forwarding performance parameters
+GTPUd.BURST         = 64, maximum number of packets read from a socket each time it is readable
+GTPUd.WORKERS       = 1, number of forwarding processes, packets are shared between them by the kernel
+                      (UL packets per RAN node: the UL traffic of a single eNB / RNC is never spread)
+
 2) To use the GTPUd, you need to be root or have the capability to start raw sockets:
 
 -> launch the demon, and add_mobile() / rem_mobile() to add or remove GTPU tunnel endpoint.
@@ -74,6 +79,9 @@ You can also set all parameters when calling add_mobile() method
 Two example modules DNSRESP and TCPSYNACK are provided.
 >>> gsn.MOD.append( TCPSYNACK )
 
+-> packets and bytes counters of each forwarding worker are available with get_counters()
+>>> gsn.get_counters()
+
 3) That's all !
 '''
 
@@ -82,6 +90,9 @@ __all__ = ['ARPd', 'GTPUd', 'DPI', 'MOD', 'DNSRESP', 'TCPSYNACK']
 
 import os
 import signal
+import multiprocessing
+from errno  import EAGAIN, EWOULDBLOCK
+from struct import pack_into, unpack_from
 #
 if os.name != 'nt':
     from fcntl  import ioctl
@@ -95,6 +106,16 @@ from .utils           import *
 from pycrate_core.elt import Envelope
 from pycrate_ether.IP import *
 
+# GTP-U forwarding workers are forked, as they inherit the whole GTPUd instance
+if os.name != 'nt' and hasattr(multiprocessing, 'get_context'):
+    _mp = multiprocessing.get_context('fork')
+else:
+    _mp = multiprocessing
+
+# with Python 3, packets are received into reusable buffers and handled as
+# memoryview, then sent with scatter-gather sendmsg() calls
+_ZEROCOPY = python_version >= 3 and hasattr(socket.socket, 'sendmsg')
+
 #------------------------------------------------------------------------------#
 # GTP-U handler works with Linux PF_PACKET RAW socket on the Internet side
 # and with standard GTP-U 3GPP protocol on the RNC / eNB side
@@ -117,6 +138,9 @@ SOL_PACKET             = 263
 PACKET_MR_PROMISC      = 1
 PACKET_ADD_MEMBERSHIP  = 1
 PACKET_DROP_MEMBERSHIP = 2
+PACKET_FANOUT          = 18
+PACKET_FANOUT_HASH     = 0
+SO_REUSEPORT           = getattr(socket, 'SO_REUSEPORT', 15)
 
 def get_if(iff, cmd):
     """Ease SIOCGIF* ioctl calls"""
@@ -136,6 +160,11 @@ def set_promisc(sk, iff, val=1):
         cmd = PACKET_DROP_MEMBERSHIP
     sk.setsockopt(SOL_PACKET, cmd, mreq)
 
+def set_fanout(sk, group, mode=PACKET_FANOUT_HASH):
+    # all PF_PACKET sockets bound to the same IF and protocol, and set in the
+    # same fanout group, share the received packets
+    sk.setsockopt(SOL_PACKET, PACKET_FANOUT, group | (mode << 16))
+
 
 #------------------------------------------------------------------------------#
 # ARPd                                                                         #
@@ -171,6 +200,13 @@ class ARPd(object):
     - incoming IP packets (thanks to promiscous mode) to update the ARP_RESOLV_TABLE
       with new MAC addresses opportunistically
     sends ARP request when needed to be able then to forward IP packets from mobile
+
+    When the class attribute THREADED is False, the background thread is not
+    started, and ._handle_sk(sk) has to be called each time one of the sockets
+    in .sk_list is readable (e.g. from an event loop).
+    
+    When reply is False, ARP requests for the IP_POOL are not answered (e.g.
+    in GTPUd forwarding workers, where only the main process answers them).
     '''
     #
     # verbosity level: list of log types to display when calling 
@@ -183,6 +219,9 @@ class ARPd(object):
     SELECT_TO       = 0.1
     SELECT_SLEEP    = 0.05
     #
+    # to run the listening loop in a background thread
+    THREADED        = True
+    #
     # all Gi interface parameters
     # Our GGSN ethernet parameters (IF, MAC and IP addresses)
     # (and also the MAC address to be used for any mobiles through our GGSN)
@@ -204,8 +243,9 @@ class ARPd(object):
     #
     CATCH_SIGINT = False
     
-    def __init__(self, opportunist=False):
+    def __init__(self, opportunist=False, reply=True):
         #
+        self._reply         = reply
         self.GGSN_MAC_BUF   = mac_aton(self.GGSN_MAC_ADDR)
         self.GGSN_IP_BUF    = inet_aton(self.GGSN_IP_ADDR)
         self.ROUTER_MAC_BUF = mac_aton(self.ROUTER_MAC_ADDR)
@@ -249,7 +289,8 @@ class ARPd(object):
         self.set_opportunist(opportunist)
         # starting main listening loop in background
         self._listening  = True
-        self._listener_t = threadit(self.listen)
+        if self.THREADED:
+            self._listener_t = threadit(self.listen)
         self._log('INF', 'ARP resolver started')
         #
         # .resolve(ip) method is available for ARP resolution by GTPUd
@@ -281,33 +322,37 @@ class ARPd(object):
             r = []
             r = select(self.sk_list, [], [], self.SELECT_TO)[0]
             for sk in r:
-                try:
-                    buf = sk.recvfrom(self.BUFLEN)[0]
-                except Exception as err:
-                    self._log('ERR', 'external network error (recvfrom): %s' % err)
-                    buf = b''
-                # dipatch ARP request / IP response
-                if sk != self.sk_arp:
-                    # sk == self.sk_ip
-                    if len(buf) >= 34 and buf[12:14] == b'\x08\x00':
-                        self._process_ipbuf(buf)
-                else:
-                    # sk == self.sk_arp
-                    if len(buf) >= 42 and buf[12:14] == b'\x08\x06':
-                        self._process_arpbuf(buf)
+                self._handle_sk(sk)
             #
             # if select() timeouts, take a little rest
             if len(r) == 0:
                 sleep(self.SELECT_SLEEP)
         self._log('INF', 'ARP resolver stopped')
     
+    def _handle_sk(self, sk):
+        # read the readable socket sk
+        try:
+            buf = sk.recvfrom(self.BUFLEN)[0]
+        except Exception as err:
+            self._log('ERR', 'external network error (recvfrom): %s' % err)
+            return
+        # dipatch ARP request / IP response
+        if sk != self.sk_arp:
+            # sk == self.sk_ip
+            if len(buf) >= 34 and buf[12:14] == b'\x08\x00':
+                self._process_ipbuf(buf)
+        else:
+            # sk == self.sk_arp
+            if len(buf) >= 42 and buf[12:14] == b'\x08\x06':
+                self._process_arpbuf(buf)
+    
     def _process_arpbuf(self, buf):
         # this is an ARP request or response:
         arpop = ord(buf[21:22])
         # 1) check if it requests for one of our IP
         if arpop == 1:
             ipreq = inet_ntoa(buf[38:42])
-            if ipreq in self.IP_POOL:
+            if self._reply and ipreq in self.IP_POOL:
                 # reply to it with our MAC ADDR
                 try:
                     self.sk_arp.sendto(
@@ -370,7 +415,11 @@ class ARPd(object):
             # wait for the answer
             cnt = 0
             while ip not in self.ARP_RESOLV_TABLE:
-                sleep(self.SELECT_SLEEP)
+                if self.THREADED:
+                    sleep(self.SELECT_SLEEP)
+                elif select((self.sk_arp, ), (), (), self.SELECT_SLEEP)[0]:
+                    # no listening thread, read the answer here
+                    self._handle_sk(self.sk_arp)
                 cnt += 1
                 if cnt >= 3:
                     break
@@ -422,6 +471,33 @@ class GTPUd(object):
     by looking into the class attribute:
     WL_PORTS = [('UDP', 53), ('UDP', 123), ('TCP', 80), ...]
     This is bypassing the blackholing feature.
+
+    Each time a socket is readable, up to BURST packets are read from it.
+    To spread the forwarding over several CPU, the class attribute WORKERS
+    can be set to the number of forwarding processes: additional worker
+    processes are forked, each with its own sockets, and the kernel shares
+    the packets between them (SO_REUSEPORT on the GTP-U UDP socket, hashed
+    per RAN endpoint, and a PACKET_FANOUT hash group on the Gi interface,
+    hashed per IP flow).
+    WNG: UL packets are hashed on the UDP 4-tuple (RAN IP and port, GTP_IP
+    and GTP_PORT), which is the same for all the tunnels of a given RAN
+    node, as GTP-U uses the port 2152 on both sides: the UL traffic of a
+    single eNodeB or RNC is always forwarded by the same worker, hence WORKERS
+    only brings UL parallelism with several RAN nodes. DL packets are spread
+    per IP flow, whatever the RAN node.
+    Mobiles' contexts set with add_mobile(),
+    set_mobile_dl() and rem_mobile() are forwarded to all workers, however
+    .stats and MOD only apply to the worker they are in.
+    Packets and bytes counters of each worker are returned by get_counters().
+
+    With Python 3, packets are read into reusable buffers and are passed as
+    memoryview to the MOD handlers and DPI: what needs to be kept after the
+    handler returns must be copied.
+
+    When the class attribute THREADED is False, the listening loop is not
+    started in a background thread, and ._handle_sk(sk) has to be called each
+    time one of the sockets in .sk_list (and .arpd.sk_list) is readable (e.g.
+    from an event loop). Forwarding workers always run their own loop.
     '''
     #
     # verbosity level: list of log types to display when calling 
@@ -432,6 +508,15 @@ class GTPUd(object):
     BUFLEN        = 2048
     # select loop settings
     SELECT_TO     = 0.1
+    # maximum number of packets read from a socket each time it is readable
+    BURST         = 64
+    # number of forwarding processes (including the main one)
+    WORKERS       = 1
+    # to run the listening loop in a background thread
+    THREADED      = True
+    #
+    # ARP resolver
+    ARPd          = ARPd
     #
     # Gi interface, with GGSN ethernet IF and mobile IP address
     EXT_IF        = ARPd.GGSN_ETH_IF
@@ -480,25 +565,20 @@ class GTPUd(object):
         # initialize the list of modules that can act on GTP-U payloads
         self.MOD           = []
         #
-        # create two RAW PF_PACKET sockets on the `Internet` side (1 for IPv4, 1 for IPv6)
-        self.sk_ext_v4     = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
-        self.sk_ext_v4.settimeout(0.001)
-        #self.sk_ext_v4.setblocking(0)
-        self.sk_ext_v4.bind((self.EXT_IF, 0x0800))
-        set_promisc(self.sk_ext_v4, self.EXT_IF, 1)
+        # packets and bytes counters, 4 per worker:
+        # UL packets, UL bytes, DL packets, DL bytes
+        self._cnt          = _mp.RawArray('L', 4*self.WORKERS)
+        # worker index, 0 for the main process
+        self._wk           = 0
+        self._wk_proc      = []
+        self._wk_conn      = []
+        self._fanout       = os.getpid() & 0x7fff
         #
-        self.sk_ext_v6     = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, ntohs(0x86dd))
-        self.sk_ext_v6.settimeout(0.001)
-        #self.sk_ext_v6.setblocking(0)
-        self.sk_ext_v6.bind((self.EXT_IF, 0x86dd))
-        set_promisc(self.sk_ext_v6, self.EXT_IF, 1)
+        self._init_sk()
         #
-        # create an UDP socket on the RNC / eNB side
-        self.sk_int        = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sk_int.settimeout(0.001)
-        #self.sk_int.setblocking(0)
-        self.sk_int.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.sk_int.bind((self.GTP_IP, self.GTP_PORT))
+        # fork the additional forwarding workers, before any thread is started
+        for i in range(1, self.WORKERS):
+            self._start_worker(i)
         #
         # interrupt handler
         if self.CATCH_SIGINT:
@@ -509,18 +589,126 @@ class GTPUd(object):
             signal.signal(signal.SIGINT, sigint_handler)
         #
         # and start listening and transferring packets in background
-        self.sk_list = (self.sk_ext_v4, self.sk_ext_v6, self.sk_int)
         self._listening = True
-        self._listener_t = threadit(self.listen)
+        if self.THREADED:
+            self._listener_t = threadit(self.listen)
         self._log('INF', 'GTP-U tunnels handler started')
         #
         # and finally start ARP resolver
-        self.arpd = ARPd()
+        self.arpd = self.ARPd()
     
     def _log(self, logtype='DBG', msg=''):
         # logtype: 'ERR', 'WNG', 'INF', 'DBG'
         if logtype in self.DEBUG:
-            log('[%s] [GTPUd] %s' % (logtype, msg))
+            if self._wk:
+                log('[%s] [GTPUd %i] %s' % (logtype, self._wk, msg))
+            else:
+                log('[%s] [GTPUd] %s' % (logtype, msg))
+    
+    def _init_sk(self):
+        # create two RAW PF_PACKET sockets on the `Internet` side (1 for IPv4, 1 for IPv6)
+        # all sockets are non-blocking, to be read in bursts after select()
+        self.sk_ext_v4     = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+        self.sk_ext_v4.setblocking(0)
+        self.sk_ext_v4.bind((self.EXT_IF, 0x0800))
+        set_promisc(self.sk_ext_v4, self.EXT_IF, 1)
+        #
+        self.sk_ext_v6     = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, ntohs(0x86dd))
+        self.sk_ext_v6.setblocking(0)
+        self.sk_ext_v6.bind((self.EXT_IF, 0x86dd))
+        set_promisc(self.sk_ext_v6, self.EXT_IF, 1)
+        #
+        # create an UDP socket on the RNC / eNB side
+        self.sk_int        = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sk_int.setblocking(0)
+        self.sk_int.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.WORKERS > 1:
+            # share the packets between all workers' sockets
+            self.sk_int.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
+            set_fanout(self.sk_ext_v4, self._fanout)
+            set_fanout(self.sk_ext_v6, self._fanout + 1)
+        self.sk_int.bind((self.GTP_IP, self.GTP_PORT))
+        #
+        self.sk_list = [self.sk_ext_v4, self.sk_ext_v6, self.sk_int]
+        #
+        self._init_bufs()
+    
+    def _init_bufs(self):
+        # reusable receive buffers, for a burst of packets
+        self._ring   = [memoryview(bytearray(self.BUFLEN)) for i in range(self.BURST)]
+        # reusable GTP-U header, and Ethernet headers per destination MAC
+        self._gtphdr = bytearray(8)
+        self._ethhdr = {}
+    
+    #--------------------------------------------------------------------------#
+    # forwarding workers
+    #--------------------------------------------------------------------------#
+    
+    def _start_worker(self, i):
+        conn, conn_wk = _mp.Pipe()
+        proc = _mp.Process(target=self._run_worker, args=(i, conn_wk))
+        proc.daemon = True
+        proc.start()
+        conn_wk.close()
+        self._wk_proc.append(proc)
+        self._wk_conn.append(conn)
+    
+    def _run_worker(self, i, conn):
+        # main function of a forked forwarding worker
+        for sk in self.sk_list:
+            sk.close()
+        for c in self._wk_conn:
+            c.close()
+        self._wk, self._wk_proc, self._wk_conn = i, [], []
+        self._init_sk()
+        # commands from the main process are read within the listening loop
+        self._conn = conn
+        self.sk_list.append(conn)
+        # local ARP resolver, ARP requests for the mobiles' IP addresses are
+        # only answered by the main process
+        self.arpd = self.ARPd(reply=False)
+        if not self.arpd.THREADED:
+            self.arpd._listener_t = threadit(self.arpd.listen)
+        self._listening = True
+        self._log('INF', 'GTP-U forwarding worker started')
+        try:
+            self.listen()
+        finally:
+            self.arpd.stop()
+            for sk in self.sk_list[:3]:
+                try:
+                    sk.close()
+                except Exception:
+                    pass
+    
+    def _wk_send(self, *cmd):
+        # forward a command to all the workers
+        for conn in self._wk_conn:
+            try:
+                conn.send(cmd)
+            except Exception as err:
+                self._log('ERR', 'unable to send command to a worker: %s' % err)
+    
+    def _process_cmd(self):
+        # process a command received by a worker from the main process
+        try:
+            cmd = self._conn.recv()
+        except EOFError:
+            # main process is gone
+            self._listening = False
+            return
+        if cmd[0] == 'stop':
+            self._listening = False
+        elif cmd[0] in ('add_mobile', 'set_mobile_dl', 'rem_mobile'):
+            getattr(self, cmd[0])(*cmd[1:])
+    
+    def get_counters(self):
+        """returns the list of packets and bytes counters of each worker, as
+        dict with keys 'ul_pkts', 'ul_bytes', 'dl_pkts' and 'dl_bytes'
+        """
+        cnt = self._cnt[:]
+        return [{'ul_pkts' : cnt[i], 'ul_bytes': cnt[i+1],
+                 'dl_pkts' : cnt[i+2], 'dl_bytes': cnt[i+3]} for i in range(0, len(cnt), 4)]
     
     def init_stats(self, ip):
         stats = {
@@ -538,6 +726,10 @@ class GTPUd(object):
     def stop(self):
         # stop ARP resolver
         self.arpd.stop()
+        # stop forwarding workers
+        self._wk_send('stop')
+        for proc in self._wk_proc:
+            proc.join(self.SELECT_TO * 4)
         # stop local GTPU handler
         if self._listening:
             self._listening = False
@@ -556,58 +748,77 @@ class GTPUd(object):
         # select() until we receive something on 1 side
         while self._listening:
             r = select(self.sk_list, [], [], self.SELECT_TO)[0]
-            # read ext and int sockets until they are empty
             for sk in r:
-                #
-                if sk == self.sk_ext_v4:
-                    # DL IPv4
-                    try:
-                        buf = sk.recvfrom(self.BUFLEN)[0]
-                    #except timeout:
-                    #    pass
-                    except Exception as err:
-                        self._log('ERR', 'sk_ext_v4 IF error (recvfrom): %s' % err)
-                    else:
-                        #self._log('DBG', 'sk_ext_v4, recvfrom()')
-                        if len(buf) >= 34 and buf[:6] == self.GGSN_MAC_BUF \
-                        and buf[30:34] in self._mobiles_addr:
-                            # IPv4 of a mobile, transfer over GTP-U
-                            # after removing the Ethernet header
-                            self.transfer_v4_to_int(buf[14:])
-                            #threadit(self.transfer_v4_to_int, buf[14:])
-                #
-                elif sk == self.sk_ext_v6:
-                    # DL IPv6
-                    try:
-                        buf = sk.recvfrom(self.BUFLEN)[0]
-                    #except timeout:
-                    #    pass
-                    except Exception as err:
-                        self._log('ERR', 'sk_ext_v6 IF error (recvfrom): %s' % err)
-                    else:
-                        #self._log('DBG', 'sk_ext_v6, recvfrom()')
-                        if len(buf) >= 54 and buf[:6] == self.GGSN_MAC_BUF \
-                        and buf[38:54] in self._mobiles_addr:
-                            # IPv6 of a mobile, transfer over GTP-U
-                            # after removing the Ethernet header
-                            self.transfer_v6_to_int(buf[14:])
-                            #threadit(self.transfer_v6_to_int, buf[14:])
-                #
-                else:
-                    #sk == self.sk_int
-                    # UL, both IPv4 and IPv6 packets
-                    try:
-                        buf = sk.recv(self.BUFLEN)
-                    #except timeout:
-                    #    pass
-                    except Exception as err:
-                        self._log('ERR', 'sk_int IF error (recv): %s' % err)
-                    else:
-                        self.transfer_to_ext(buf)
-                        #threadit(self.transfer_to_ext, buf)
+                self._handle_sk(sk)
         #
         self._log('INF', 'GTPU handler stopped')
     
+    def _handle_sk(self, sk):
+        # read ext and int sockets until they are empty, or up to BURST
+        # packets for each
+        cnt, off = self._cnt, 4*self._wk
+        #
+        if sk == self.sk_ext_v4:
+            # DL IPv4
+            pkts, octs = 0, 0
+            for buf in self._recv_burst(sk, 'sk_ext_v4'):
+                if len(buf) >= 34 and buf[:6] == self.GGSN_MAC_BUF \
+                and bytes(buf[30:34]) in self._mobiles_addr:
+                    # IPv4 of a mobile, transfer over GTP-U
+                    # after removing the Ethernet header
+                    self.transfer_v4_to_int(buf[14:])
+                    pkts += 1
+                    octs += len(buf) - 14
+            cnt[off+2] += pkts
+            cnt[off+3] += octs
+        #
+        elif sk == self.sk_ext_v6:
+            # DL IPv6
+            pkts, octs = 0, 0
+            for buf in self._recv_burst(sk, 'sk_ext_v6'):
+                if len(buf) >= 54 and buf[:6] == self.GGSN_MAC_BUF \
+                and bytes(buf[38:54]) in self._mobiles_addr:
+                    # IPv6 of a mobile, transfer over GTP-U
+                    # after removing the Ethernet header
+                    self.transfer_v6_to_int(buf[14:])
+                    pkts += 1
+                    octs += len(buf) - 14
+            cnt[off+2] += pkts
+            cnt[off+3] += octs
+        #
+        elif sk == self.sk_int:
+            # UL, both IPv4 and IPv6 packets
+            pkts, octs = 0, 0
+            for buf in self._recv_burst(sk, 'sk_int'):
+                self.transfer_to_ext(buf)
+                pkts += 1
+                octs += len(buf)
+            cnt[off] += pkts
+            cnt[off+1] += octs
+        #
+        else:
+            # command from the main process to a worker
+            self._process_cmd()
+    
+    def _recv_burst(self, sk, name):
+        # returns the list of packets read from the non-blocking socket sk,
+        # until it is empty or BURST packets were read
+        # packets are read into the reusable buffers of the ring, they are
+        # only valid until the next call
+        bufs = []
+        for mv in self._ring:
+            try:
+                ln = sk.recv_into(mv)
+            except socket.error as err:
+                if err.errno not in (EAGAIN, EWOULDBLOCK):
+                    self._log('ERR', '%s IF error (recv): %s' % (name, err))
+                break
+            if _ZEROCOPY:
+                bufs.append( mv[:ln] )
+            else:
+                bufs.append( mv[:ln].tobytes() )
+        return bufs
+    
     def resolve_mac(self, ipdst):
         if len(ipdst) == 4:
             return self.arpd.resolve(inet_ntoa(ipdst))
@@ -622,7 +833,7 @@ class GTPUd(object):
     def transfer_to_ext(self, buf):
         try:
             # extract the GTP header
-            flags, msgtype, msglen, teid_ul = unpack('>BBHI', buf[:8])
+            flags, msgtype, msglen, teid_ul = unpack_from('>BBHI', buf)
             # in case GTP TEID is not correct, drop it
             
             ran_ip, teid_dl, ipaddr, ctx_num = self._mobiles_teid[teid_ul]
@@ -636,7 +847,7 @@ class GTPUd(object):
                 msglen -= 4
             ipbuf = buf[-msglen:]
             # get the IP version
-            ipvers = ord(ipbuf[0:1])>>4
+            ipvers = unpack_from('>B', ipbuf)[0]>>4
             if ipvers == 4:
                 ipsrc = ipbuf[12:16]
                 ipdst = ipbuf[16:20]
@@ -699,13 +910,14 @@ class GTPUd(object):
                     self._log('WNG', 'spoofed IPv6 src prefix, teid_ul 0x%.8x' % teid_ul)
                     return
                 # update local db with the full IPv6
+                ipsrc = bytes(ipsrc)
                 self._mobiles_teid[teid_ul][2] = ipsrc
                 self._mobiles_addr[ipsrc] = teid_ul
             elif self.DROP_SPOOF and ipsrc != ipaddr:
                 self._log('WNG', 'spoofed IPv6 src addr, teid_ul 0x%.8x' % teid_ul)
                 return
             if self.DPI:
-                self._analyze(ipvers, inet_pton(AF_INET6, ipsrc), ipbuf)
+                self._analyze(ipvers, inet_ntop(AF_INET6, ipsrc), ipbuf)
             if self.MOD:
                 try:
                     for mod in self.MOD:
@@ -741,19 +953,36 @@ class GTPUd(object):
             else:
                 self._transfer_to_ext_v6(macdst, ipbuf)
     
+    def _get_ethhdr(self, macdst, ethtype):
+        # returns the Ethernet header toward macdst, from the cache of headers
+        try:
+            return self._ethhdr[(macdst, ethtype)]
+        except KeyError:
+            hdr = b''.join((macdst, self.GGSN_MAC_BUF, ethtype))
+            self._ethhdr[(macdst, ethtype)] = hdr
+            return hdr
+    
     def _transfer_to_ext_v4(self, macdst, ipbuf):
         # forward to the external PF_PACKET socket, over the Gi interface
         try:
-            self.sk_ext_v4.sendto(b''.join((macdst, self.GGSN_MAC_BUF, b'\x08\0', ipbuf)),
-                                  (self.EXT_IF, 0x0800))
+            if _ZEROCOPY:
+                self.sk_ext_v4.sendmsg((self._get_ethhdr(macdst, b'\x08\0'), ipbuf), (), 0,
+                                       (self.EXT_IF, 0x0800))
+            else:
+                self.sk_ext_v4.sendto(self._get_ethhdr(macdst, b'\x08\0') + ipbuf,
+                                      (self.EXT_IF, 0x0800))
         except Exception as err:
             self._log('ERR', 'sk_ext_v4 IF error (sendto): %s' % err)
     
     def _transfer_to_ext_v6(self, macdst, ipbuf):
         # forward to the external PF_PACKET socket, over the Gi interface
         try:
-            self.sk_ext_v6.sendto(b''.join((macdst, self.GGSN_MAC_BUF, b'\x86\xdd', ipbuf)),
-                                  (self.EXT_IF, 0x86dd))
+            if _ZEROCOPY:
+                self.sk_ext_v6.sendmsg((self._get_ethhdr(macdst, b'\x86\xdd'), ipbuf), (), 0,
+                                       (self.EXT_IF, 0x86dd))
+            else:
+                self.sk_ext_v6.sendto(self._get_ethhdr(macdst, b'\x86\xdd') + ipbuf,
+                                      (self.EXT_IF, 0x86dd))
         except Exception as err:
             self._log('ERR', 'sk_ext_v6 IF error (sendto): %s' % err)
     
@@ -812,16 +1041,12 @@ class GTPUd(object):
             except Exception as err:
                 self._log('ERR', 'MOD error: %s' % err)        
         #
-        teid_ul = self._mobiles_addr[buf[16:20]]
+        teid_ul = self._mobiles_addr[bytes(buf[16:20])]
         ran_ip, teid_dl, ipaddr, ctx_num = self._mobiles_teid[teid_ul]
         #
         # prepend GTP header and forward to the RAN IP
         if ran_ip and teid_dl is not None:
-            gtphdr = pack('>BBHI', 0x30, 0xff, len(buf), teid_dl)
-            try:
-                ret = self.sk_int.sendto(gtphdr + buf, (ran_ip, self.GTP_PORT))
-            except Exception as err:
-                self._log('ERR', 'sk_int IF error (sendto): %s' % err)
+            self._transfer_to_int(ran_ip, teid_dl, buf)
         else:
             self._log('WNG', 'teid_ul 0x%.8x, downlink GTP parameters not set' % teid_ul)
     
@@ -840,19 +1065,27 @@ class GTPUd(object):
             except Exception as err:
                 self._log('ERR', 'MOD error: %s' % err)        
         #
-        teid_ul = self._mobiles_addr[buf[24:40]]
+        teid_ul = self._mobiles_addr[bytes(buf[24:40])]
         ran_ip, teid_dl, ipaddr, ctx_num = self._mobiles_teid[teid_ul]
         #
         # prepend GTP header and forward to the RAN IP
         if ran_ip and teid_dl is not None:
-            gtphdr = pack('>BBHI', 0x30, 0xff, len(buf), teid_dl)
-            try:
-                ret = self.sk_int.sendto(gtphdr + buf, (ran_ip, self.GTP_PORT))
-            except Exception as err:
-                self._log('ERR', 'sk_int IF error (sendto): %s' % err)
+            self._transfer_to_int(ran_ip, teid_dl, buf)
         else:
             self._log('WNG', 'teid_ul 0x%.8x, downlink GTP parameters not set' % teid_ul)
     
+    def _transfer_to_int(self, ran_ip, teid_dl, buf):
+        # prepend GTP header and forward to the RAN IP
+        try:
+            if _ZEROCOPY:
+                pack_into('>BBHI', self._gtphdr, 0, 0x30, 0xff, len(buf), teid_dl)
+                self.sk_int.sendmsg((self._gtphdr, buf), (), 0, (ran_ip, self.GTP_PORT))
+            else:
+                self.sk_int.sendto(pack('>BBHI', 0x30, 0xff, len(buf), teid_dl) + buf,
+                                   (ran_ip, self.GTP_PORT))
+        except Exception as err:
+            self._log('ERR', 'sk_int IF error (sendto): %s' % err)
+    
     #--------------------------------------------------------------------------#
     # UE management
     #--------------------------------------------------------------------------#
@@ -878,6 +1111,7 @@ class GTPUd(object):
         else:
             self._log('ERR', 'invalid mobile addr %r' % (mobile_addr, ))
         #
+        self._wk_send('add_mobile', teid_ul, mobile_addr, ran_ip, teid_dl)
         if teid_ul in self._mobiles_teid:
             # just increment the ctx_num
             self._mobiles_teid[teid_ul][3] += 1
@@ -891,6 +1125,7 @@ class GTPUd(object):
     
     def set_mobile_dl(self, teid_ul, ran_ip=None, teid_dl=None):
         # enables to reconfigure the DL parameters (RAN IP, DL TEID)
+        self._wk_send('set_mobile_dl', teid_ul, ran_ip, teid_dl)
         try:
             ran_ip_ori, teid_dl_ori, ipbuf, ctx_num = self._mobiles_teid[teid_ul]
         except Exception as err:
@@ -904,6 +1139,7 @@ class GTPUd(object):
             self._mobiles_teid[teid_ul] = [ran_ip, teid_dl, ipbuf, ctx_num]
     
     def rem_mobile(self, teid_ul):
+        self._wk_send('rem_mobile', teid_ul)
         if teid_ul in self._mobiles_teid:
             mobile_ctx = self._mobiles_teid[teid_ul]
             if mobile_ctx[-1] > 1:
@@ -1052,6 +1288,9 @@ class MOD(object):
     # with TYPE = 1
     TYPE = 0
     
+    # With Python 3, IP packets are passed as memoryview of reused buffers:
+    # they can be read like bytes, but must be copied to be kept.
+    
     # reference to the GTPUd instance
     GTPUd = None
     
@@ -1088,7 +1327,7 @@ class DNSRESP(MOD):
     @classmethod
     def handle_ul(self, ipbuf):
         # check if we have an UDP/53 request
-        ip_proto, (udpsrc, udpdst) = ord(ipbuf[9]), unpack('!HH', ipbuf[20:24])
+        ip_proto, udpsrc, udpdst = unpack_from('!B10xHH', ipbuf, 9)
         if ip_proto != 17:
             # not UDP
             return
@@ -1140,7 +1379,7 @@ class TCPSYNACK(MOD):
     @classmethod
     def handle_ul(self, ipbuf):
         # check if we have a TCP SYN
-        ip_proto, ip_pay = ord(ipbuf[9:10]), ipbuf[20:]
+        ip_proto, ip_pay = unpack_from('!B', ipbuf, 9)[0], ipbuf[20:]
         if ip_proto != 6:
             # not TCP
             return
@@ -0,0 +1,429 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_corenet/ServerShard.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+#------------------------------------------------------------------------------#
+# This is the corenet server with UE contexts partitioned over several
+# processes (shards)
+#
+# The front process:
+# - owns the SCTP associations with the RAN nodes (eNodeB and Home-NodeB)
+# - handles non-UE-associated procedures (S1Setup, HNBAP, ...), and the
+#   Home-NodeB UE-associated signalling (RUA)
+# - forwards decoded UE-associated S1AP PDUs to the shard owning the UE, over
+#   a multiprocessing pipe, and sends back S1AP PDUs encoded by the shards
+# - runs the GTPUd sub-server, driven by the shards
+#
+# Each shard process runs its own UE handlers, NAS procedures timers and AuC.
+# The shard owning a UE is selected at initialUEMessage:
+# - from its M-TMSI: M-TMSIs are allocated by each shard so that they map back
+#   to it (as GTP TEIDs, which are partitioned between the shards),
+# - from its IMSI: shards report each IMSI they register a UE context for, so
+#   that a UE first seen with an M-TMSI keeps its shard when attaching again
+#   with its IMSI; IMSIs never seen before are hashed.
+# Then, S1AP PDUs having an ENB-UE-S1AP-ID are routed from their
+# (eNB, ENB-UE-S1AP-ID), whatever the SCTP stream they are received on.
+#
+# WNG: procedures from the front process which act on UE contexts (e.g. an S1
+# Reset sent by an eNB) do not reach the shards; paging and UE-related
+# interactive commands must be run within the shards.
+#------------------------------------------------------------------------------#
+
+import multiprocessing
+
+from .utils      import *
+from .HdlrENB    import ENBd
+from .Server     import CorenetServer
+
+
+#------------------------------------------------------------------------------#
+# shard-side proxies
+#------------------------------------------------------------------------------#
+
+class ShardSK(object):
+    """stands for the SCTP socket of an eNodeB within a shard: S1AP PDUs sent to
+    it are passed to the front process
+    """
+    
+    def __init__(self, conn, ranid, addr):
+        self.Conn  = conn
+        self.RANId = ranid
+        self.Addr  = addr
+    
+    def getpeername(self):
+        return self.Addr
+    
+    def sctp_send(self, buf, ppid=0, stream=0):
+        self.Conn.send( ('send', self.RANId, buf, ntohl(ppid), stream) )
+        return len(buf)
+    
+    def close(self):
+        pass
+
+
+class ShardUE(dict):
+    """stands for the Server UE dict within a shard: each new IMSI set in it
+    is reported to the front process
+    """
+    
+    def __init__(self, conn, *args):
+        dict.__init__(self, *args)
+        self.Conn = conn
+    
+    def __setitem__(self, imsi, ued):
+        if imsi and imsi not in self:
+            self.Conn.send( ('ue', imsi) )
+        dict.__setitem__(self, imsi, ued)
+
+
+class ShardGTPUd(object):
+    """stands for the GTPUd sub-server of the front process within a shard:
+    mobiles' tunnels management is passed to the front process
+    """
+    
+    def __init__(self, conn, gtp_ip):
+        self.Conn   = conn
+        self.GTP_IP = gtp_ip
+    
+    def add_mobile(self, *args):
+        self.Conn.send( ('gtpu', 'add_mobile', args) )
+    
+    def set_mobile_dl(self, *args):
+        self.Conn.send( ('gtpu', 'set_mobile_dl', args) )
+    
+    def rem_mobile(self, *args):
+        self.Conn.send( ('gtpu', 'rem_mobile', args) )
+    
+    def stop(self):
+        pass
+
+
+#------------------------------------------------------------------------------#
+# CorenetServerSharded
+#------------------------------------------------------------------------------#
+
+class CorenetServerSharded(CorenetServer):
+    """Corenet server with the LTE UE contexts partitioned over SHARDS worker
+    processes
+    
+    The instance is forked into each shard before starting, hence the whole
+    configuration (class and instance attributes) is shared with the shards.
+    Within a shard, ShardIdx is the index of the shard, it is None within the
+    front process.
+    """
+    
+    # number of shard processes
+    SHARDS = 2
+    
+    
+    def __init__(self, serving=True, threaded=True):
+        self.ShardIdx = None
+        # pipes to the shards
+        self._shard_conn = []
+        # shard processes
+        self._shard_proc = []
+        # routing table for UE-associated S1AP PDUs:
+        # (ENBId, ENB-UE-S1AP-ID) -> shard index
+        self._shard_route = {}
+        # shards owning the UE contexts: IMSI -> shard index
+        self._shard_ue = {}
+        # eNB configurations sent to the shards
+        self._shard_enb = {}
+        #
+        # fork the shards before any sub-server gets started
+        ctx = multiprocessing.get_context('fork')
+        for i in range(self.SHARDS):
+            conn, conn_shard = ctx.Pipe()
+            proc = ctx.Process(target=self._run_shard, args=(i, conn_shard))
+            proc.daemon = True
+            proc.start()
+            conn_shard.close()
+            self._shard_conn.append(conn)
+            self._shard_proc.append(proc)
+        #
+        CorenetServer.__init__(self, serving, threaded)
+    
+    #--------------------------------------------------------------------------#
+    # shard process
+    #--------------------------------------------------------------------------#
+    
+    def _run_shard(self, idx, conn):
+        # entry point of the shard process idx, conn being its pipe to the front
+        for c in self._shard_conn:
+            c.close()
+        self.ShardIdx    = idx
+        self._shard_conn = []
+        self._shard_proc = []
+        self._conn       = conn
+        # UE contexts registered within the shard are reported to the front
+        self.UE          = ShardUE(conn, self.UE)
+        # each shard needs its own random sequence for producing TMSI
+        random.seed(random.SystemRandom().randint(0, 1<<64))
+        #
+        # no SCTP server and no GTPUd sub-server within a shard
+        self.SERVER_HNB, self.SERVER_ENB = {}, {}
+        gtpud, self.GTPUd = self.GTPUd, None
+        self.start(serving=False)
+        if gtpud:
+            self.GTPUd = ShardGTPUd(conn, gtpud.GTP_IP)
+        #
+        self._log('INF', 'shard %i started' % idx)
+        self._running, T0 = True, time()
+        while self._running:
+            try:
+                if conn.poll(self.SCHED_RES):
+                    self.handle_front_msg(conn.recv())
+            except (EOFError, OSError):
+                # the front process is gone
+                self._running = False
+            #
+            # timeout running UE NAS procedures
+            if self.SCHED_UE_TO and time() - T0 > self.SCHED_UE_TO:
+                self.clean_ue_proc()
+                T0 = time()
+        #
+        if self.AUCd:
+            self.AUCd.stop()
+        self._log('INF', 'shard %i stopped' % idx)
+    
+    def handle_front_msg(self, msg):
+        """process a message sent by the front process to the shard:
+        
+        ('s1ap', ENBId, sid, pdu_rx): UE-associated S1AP PDU
+        ('enb', ENBId, ID, addr, sid, Config): eNB connected or reconfigured
+        ('enb_rem', ENBId): eNB disconnected
+        ('stop', ): stop the shard
+        """
+        if msg[0] == 's1ap':
+            ranid, sid, pdu_rx = msg[1:]
+            enb = self.RAN.get(ranid)
+            if enb is None or not enb.is_connected():
+                self._log('WNG', 'S1AP PDU for unknown eNB %r' % (ranid, ))
+                return
+            if enb.TRACE_ASN_S1AP:
+                enb._log('TRACE_ASN_S1AP_UL', PDU_S1AP.encode(pdu_rx, 'asn1'))
+            try:
+                pdu_tx = enb.process_s1ap_ue_pdu(pdu_rx, sid)
+            except Exception as err:
+                self._log('ERR', 'unable to process S1AP PDU, %r' % err)
+                return
+            for pdu in pdu_tx:
+                self.send_s1ap_pdu(enb, pdu, sid)
+        #
+        elif msg[0] == 'enb':
+            ranid, ID, addr, sid, config = msg[1:]
+            enb = self.RAN.get(ranid)
+            if enb is not None and enb.is_connected():
+                if enb.Config:
+                    self._unset_enb_loc(enb)
+            elif enb is not None:
+                enb.__init__(self, ShardSK(self._conn, ranid, addr), sid)
+            else:
+                enb = ENBd(self, ShardSK(self._conn, ranid, addr), sid)
+                self.RAN[ranid] = enb
+            enb.ID, enb.Config = ID, config
+            if enb.Config:
+                self._set_enb_loc(enb)
+        #
+        elif msg[0] == 'enb_rem':
+            enb = self.RAN.get(msg[1])
+            if enb is not None and enb.is_connected():
+                if enb.Config:
+                    self._unset_enb_loc(enb)
+                enb.disconnect()
+        #
+        elif msg[0] == 'stop':
+            self._running = False
+    
+    def get_new_tmsi(self):
+        if self.ShardIdx is None:
+            return CorenetServer.get_new_tmsi(self)
+        else:
+            # M-TMSI mapping back to the shard
+            return random.randrange((1<<32) // self.SHARDS) * self.SHARDS + self.ShardIdx
+    
+    def get_gtp_teid(self):
+        # TEIDs are partitioned between the front process (residue 0) and the
+        # shards (residue ShardIdx + 1)
+        if self.ShardIdx is None:
+            res = 0
+        else:
+            res = self.ShardIdx + 1
+        if self.GTP_TEID_UL > 4294967294 - self.SHARDS:
+            self.GTP_TEID_UL = randint(1, 200000)
+        self.GTP_TEID_UL += 1
+        self.GTP_TEID_UL += (res - self.GTP_TEID_UL) % (self.SHARDS + 1)
+        return self.GTP_TEID_UL
+    
+    #--------------------------------------------------------------------------#
+    # front process
+    #--------------------------------------------------------------------------#
+    
+    def _serve(self):
+        # the shards' pipes are served together with the SCTP sockets
+        self.SCTPServ += tuple(self._shard_conn)
+        CorenetServer._serve(self)
+    
+    def stop(self):
+        for conn in self._shard_conn:
+            try:
+                conn.send( ('stop', ) )
+            except (EOFError, OSError):
+                pass
+        for proc in self._shard_proc:
+            proc.join(self.SCHED_RES + 1)
+        CorenetServer.stop(self)
+    
+    def get_shard(self, imsi=None, mtmsi=None):
+        """returns the index of the shard owning the UE with the given M-TMSI
+        or IMSI
+        """
+        if mtmsi is not None:
+            return mtmsi % self.SHARDS
+        elif imsi and imsi.isdigit():
+            if imsi not in self._shard_ue:
+                # UE never seen before
+                self._shard_ue[imsi] = int(imsi) % self.SHARDS
+            return self._shard_ue[imsi]
+        else:
+            return 0
+    
+    def handle_stream_msg(self, sk):
+        if sk in self._shard_conn:
+            self.handle_shard_msg(sk)
+        else:
+            CorenetServer.handle_stream_msg(self, sk)
+    
+    def handle_shard_msg(self, conn):
+        """process a message sent by a shard to the front process:
+        
+        ('send', ENBId, buf, ppid, stream): buffer to be sent to the eNB
+        ('gtpu', method, args): call to the GTPUd sub-server
+        ('ue', IMSI): UE context registered within the shard
+        """
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            self._log('ERR', 'shard %i is gone' % self._shard_conn.index(conn))
+            self.SCTPServ = tuple([sk for sk in self.SCTPServ if sk != conn])
+            return
+        #
+        if msg[0] == 'send':
+            enb = self.RAN.get(msg[1])
+            if enb is not None and enb.is_connected():
+                self._write_sk(enb.SK, *msg[2:])
+        #
+        elif msg[0] == 'gtpu':
+            if self.GTPUd:
+                getattr(self.GTPUd, msg[1])(*msg[2])
+        #
+        elif msg[0] == 'ue':
+            idx = self._shard_conn.index(conn)
+            if self._shard_ue.get(msg[1], idx) != idx:
+                self._log('WNG', 'UE with IMSI %s moved from shard %i to %i'\
+                          % (msg[1], self._shard_ue[msg[1]], idx))
+            self._shard_ue[msg[1]] = idx
+    
+    def _shard_send(self, msg, idx=None):
+        # send msg to the shard idx, or to all shards
+        if idx is None:
+            conns = self._shard_conn
+        else:
+            conns = (self._shard_conn[idx], )
+        for conn in conns:
+            try:
+                conn.send(msg)
+            except (EOFError, OSError) as err:
+                self._log('ERR', 'unable to send to shard %i, %r'\
+                          % (self._shard_conn.index(conn), err))
+    
+    def _shard_set_enb(self, ranid):
+        # send the eNB and its configuration to all shards, when it changed
+        enb = self.RAN[ranid]
+        if self._shard_enb.get(ranid) != enb.Config:
+            self._shard_enb[ranid] = cpdict(enb.Config)
+            self._shard_send( ('enb', ranid, enb.ID, enb.SK.getpeername(), enb.SKSid, enb.Config) )
+    
+    def process_new_enb(self, sk, ppid, sid, buf, pdu_rx):
+        CorenetServer.process_new_enb(self, sk, ppid, sid, buf, pdu_rx)
+        if sk in self.SCTPCli:
+            # S1 setup successful
+            self._shard_enb[self.SCTPCli[sk]] = None
+            self._shard_set_enb(self.SCTPCli[sk])
+    
+    def _rem_sk(self, sk):
+        ranid = self.SCTPCli.get(sk)
+        CorenetServer._rem_sk(self, sk)
+        if ranid in self._shard_enb:
+            del self._shard_enb[ranid]
+            self._shard_send( ('enb_rem', ranid) )
+            for key in [key for key in self._shard_route if key[0] == ranid]:
+                del self._shard_route[key]
+    
+    def process_stream_msg(self, sk, ppid, sid, buf, pdu_rx):
+        ranid = self.SCTPCli[sk]
+        if ppid == SCTP_PPID_S1AP and pdu_rx is not None and \
+        self.route_s1ap_ue_pdu(ranid, sid, pdu_rx):
+            # UE-associated signalling, processed by a shard
+            return
+        CorenetServer.process_stream_msg(self, sk, ppid, sid, buf, pdu_rx)
+        if ppid == SCTP_PPID_S1AP and sk in self.SCTPCli:
+            # the eNB configuration may have been updated
+            self._shard_set_enb(ranid)
+    
+    def route_s1ap_ue_pdu(self, ranid, sid, pdu_rx):
+        """forward the UE-associated S1AP PDU pdu_rx received from the eNB ranid
+        to the shard owning the UE
+        
+        returns False if the PDU is not UE-associated (i.e. has no ENB-UE-S1AP-ID)
+        or if no shard can be selected, the PDU being then processed within the
+        front process
+        """
+        enb = self.RAN[ranid]
+        if pdu_rx[0] == 'initiatingMessage' and pdu_rx[1]['procedureCode'] == 12:
+            # initialUEMessage, select the shard from the UE identity
+            ident, ctx_id = enb.get_ue_ident(pdu_rx)
+            if ident is None or ctx_id is None:
+                return False
+            idx = self.get_shard(**ident)
+            self._shard_route[(ranid, ctx_id)] = idx
+        else:
+            ctx_id = enb.get_enb_ue_ctx_id(pdu_rx)
+            if ctx_id is None:
+                # non-UE-associated signalling
+                return False
+            try:
+                idx = self._shard_route[(ranid, ctx_id)]
+            except KeyError:
+                return False
+            if pdu_rx[0] == 'successfulOutcome' and pdu_rx[1]['procedureCode'] == 23:
+                # UEContextReleaseComplete, the eNB UE context is released
+                del self._shard_route[(ranid, ctx_id)]
+        self._shard_send( ('s1ap', ranid, sid, pdu_rx), idx )
+        return True
+    
\ No newline at end of file
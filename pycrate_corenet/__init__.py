@@ -27,7 +27,8 @@
 # *--------------------------------------------------------
 #*/
 
-__all__ = ['utils', 'Server', 'ServerAuC', 'ServerGTPU',
+__all__ = ['utils', 'Server', 'ServerAsync',
+           'ServerShard', 'ServerAuC', 'ServerGTPU',
            'HdlrENB', 'HdlrHNB',
            'HdlrUE', 'HdlrUEIu', 'HdlrUEIuCS', 'HdlrUEIuPS', 'HdlrUES1', 'HdlrUESMS',
            'ProcProto', 'ProcCNHnbap', 'ProcCNRua', 'ProcCNRanap', 'ProcCNS1ap',
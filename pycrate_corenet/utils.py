@@ -35,6 +35,7 @@ import re
 #import traceback
 from select    import select
 from threading import Thread, Lock, Event
+from heapq     import heappush, heappop
 from random    import SystemRandom, randint
 from time      import time, sleep
 from datetime  import datetime
@@ -116,80 +117,62 @@ PDU_RANAP = RANAP.RANAP_PDU_Descriptions.RANAP_PDU
 # objects' value will be mixed in case a thread ctxt switch occurs between 
 # the fg interpreter and the bg CorenetServer loop, and both accesses the same
 # ASN.1 modules / objects
-ASN_READY_S1AP  = Event()
-ASN_READY_HNBAP = Event()
-ASN_READY_RUA   = Event()
-ASN_READY_RANAP = Event()
-ASN_READY_S1AP.set()
-ASN_READY_HNBAP.set()
-ASN_READY_RUA.set()
-ASN_READY_RANAP.set()
-
-ASN_ACQUIRE_TO = 0.01 # in sec
+# PDU_*.decode() and PDU_*.encode() return values, without changing the PDU_*
+# objects' internal value, and can be called from several threads at the same
+# time: when the lock of the ASN.1 specification is busy, they work on a copy
+# of the PDU_* object private to the calling thread
+#
+# asn_*_acquire() and asn_*_release() are kept for protecting other sequences
+# of calls to the ASN.1 runtime: they rely on the lock of each specification,
+# and wait for it at most ASN_ACQUIRE_TO seconds
+ASN_ACQUIRE_TO = 1.0 # in sec
+
+def _asn_acquire(lock):
+    if python_version < 3:
+        # no timeout available
+        return lock.acquire()
+    else:
+        return lock.acquire(timeout=ASN_ACQUIRE_TO)
 
 def asn_s1ap_acquire():
-    if ASN_READY_S1AP.is_set():
-        ASN_READY_S1AP.clear()
-        return True
-    else:
-        ready = ASN_READY_S1AP.wait(ASN_ACQUIRE_TO)
-        if not ready:
-            # timeout, module is still locked
-            return False
-        else:
-            ASN_READY_S1AP.clear()
-            return True
+    return _asn_acquire(PDU_S1AP.get_lock())
 
 def asn_s1ap_release():
-    ASN_READY_S1AP.set()
+    PDU_S1AP.get_lock().release()
 
 def asn_hnbap_acquire():
-    if ASN_READY_HNBAP.is_set():
-        ASN_READY_HNBAP.clear()
-        return True
-    else:
-        ready = ASN_READY_HNBAP.wait(ASN_ACQUIRE_TO)
-        if not ready:
-            # timeout, module is still locked
-            return False
-        else:
-            ASN_READY_HNBAP.clear()
-            return True
+    return _asn_acquire(PDU_HNBAP.get_lock())
 
 def asn_hnbap_release():
-    ASN_READY_HNBAP.set()
+    PDU_HNBAP.get_lock().release()
 
 def asn_rua_acquire():
-    if ASN_READY_RUA.is_set():
-        ASN_READY_RUA.clear()
-        return True
-    else:
-        ready = ASN_READY_RUA.wait(ASN_ACQUIRE_TO)
-        if not ready:
-            # timeout, module is still locked
-            return False
-        else:
-            ASN_READY_RUA.clear()
-            return True
+    return _asn_acquire(PDU_RUA.get_lock())
 
 def asn_rua_release():
-    ASN_READY_RUA.set()
+    PDU_RUA.get_lock().release()
 
 def asn_ranap_acquire():
-    if ASN_READY_RANAP.is_set():
-        ASN_READY_RANAP.clear()
-        return True
-    else:
-        ready = ASN_READY_RANAP.wait(ASN_ACQUIRE_TO)
-        if not ready:
-            # timeout, module is still locked
-            return False
-        else:
-            ASN_READY_RANAP.clear()
-            return True
+    return _asn_acquire(PDU_RANAP.get_lock())
 
 def asn_ranap_release():
-    ASN_READY_RANAP.set()
+    PDU_RANAP.get_lock().release()
+
+
+def decode_ran_pdu(ppid, buf):
+    """decodes the RAN PDU buf received over SCTP with payload protocol
+    identifier ppid, returns None if buf is not a valid PDU
+    """
+    try:
+        if ppid == SCTP_PPID_S1AP:
+            return PDU_S1AP.decode(buf)
+        elif ppid == SCTP_PPID_RUA:
+            return PDU_RUA.decode(buf)
+        elif ppid == SCTP_PPID_HNBAP:
+            return PDU_HNBAP.decode(buf)
+    except:
+        pass
+    return None
 
 
 def decode_ue_rad_cap(buf):
@@ -297,6 +280,71 @@ def threadit(f, *args, **kwargs):
     return t
 
 
+# NAS procedures timers scheduler
+#
+# Each NAS procedure started with a timer registers itself with its stop time
+# and its stack of procedures (e.g. EMM.Proc), and cancels its registration when
+# it completes or is aborted.
+# Timers are stored in a heap ordered by stop time, so that checking for
+# procedures in timeout only processes the expired timers, instead of going over
+# all UE and all their ongoing procedures.
+class ProcTimers(object):
+    
+    def __init__(self):
+        self._heap = []
+        self._cnt  = 0
+        self._lock = Lock()
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def add(self, Proc, stack):
+        """registers the procedure Proc, from the list of procedures stack,
+        to expire at Proc.TimerStop, and cancels its previous registration
+        """
+        with self._lock:
+            self._cancel(Proc)
+            self._cnt += 1
+            ent = [Proc.TimerStop, self._cnt, Proc, stack]
+            Proc._timer = ent
+            heappush(self._heap, ent)
+    
+    def cancel(self, Proc):
+        """cancels the registration of the procedure Proc, if any
+        """
+        with self._lock:
+            self._cancel(Proc)
+    
+    def _cancel(self, Proc):
+        ent = getattr(Proc, '_timer', None)
+        if ent is not None:
+            # the entry stays in the heap, until it expires
+            ent[2], ent[3] = None, None
+            Proc._timer = None
+    
+    def pop_expired(self, T):
+        """returns the list of (procedure, stack of procedures) whose timer
+        expired before T, for procedures still in their stack
+        """
+        expired = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] < T:
+                stop, cnt, Proc, stack = heappop(heap)
+                if Proc is not None:
+                    Proc._timer = None
+                    if Proc in stack:
+                        expired.append( (Proc, stack) )
+        return expired
+    
+    def clear(self):
+        with self._lock:
+            for ent in self._heap:
+                if ent[2] is not None:
+                    ent[2]._timer = None
+            self._heap = []
+
+
 #------------------------------------------------------------------------------#
 # global constants
 #------------------------------------------------------------------------------#
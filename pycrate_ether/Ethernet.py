@@ -35,6 +35,7 @@ from pycrate_core.repr import *
 # EthernetPacket decoder requires basic L2 / L3 objects for decoding
 from .IP import IPv4, ICMP, IPv6, UDP, TCP
 from .ARP import ARP
+from .SCTP import SCTPPacket
 
 EtherType_dict = {
     0x0800 : 'IPv4',
@@ -178,6 +179,11 @@ class EthernetPacket(Envelope):
             hier += 1
             udp._from_char(char)
             self.append(udp)
+        elif typ == 132:
+            sctp = SCTPPacket(hier=hier)
+            hier += 1
+            sctp._from_char(char)
+            self.append(sctp)
         data = Buf('Data', hier=hier)
         hier += 1
         data._from_char(char)
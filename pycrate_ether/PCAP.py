@@ -27,9 +27,19 @@
 # *--------------------------------------------------------
 #*/ 
 
-from pycrate_core.elt import Envelope, REPR_RAW, REPR_HEX, REPR_BIN
-from pycrate_core.base import *
-from pycrate_core.repr import *
+from struct   import Struct, error as StructErr
+from mmap     import mmap, ACCESS_READ
+from time     import time as _time
+from binascii import hexlify
+
+from pycrate_core.utils import PycrateErr, str_types
+from pycrate_core.elt   import Envelope, REPR_RAW, REPR_HEX, REPR_BIN
+from pycrate_core.base  import *
+from pycrate_core.repr  import *
+
+from .Ethernet import EthernetPacket
+from .IP       import IPv4, IPv6
+from .SCTP     import SCTPPacket
 
 # pcap headers format:
 # from http://wiki.wireshark.org/Development/LibpcapFileFormat
@@ -144,3 +154,413 @@ class pcaprec_hdr(Envelope):
         Uint32LE('len_orig') # actual length of packet
         )
 
+
+#------------------------------------------------------------------------------#
+# streaming reader and writer
+#------------------------------------------------------------------------------#
+# those do not instantiate any Envelope per record:
+# records are returned as memoryview over the file content, and only decoded 
+# into an Element on demand, through decode_rec()
+
+class PCAPErr(PycrateErr):
+    pass
+
+
+# pcap file magic numbers, as read in big endian:
+# (endianness, timestamp resolution)
+_PCAP_MAGIC = {
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9)
+    }
+
+# pcapng section header block type, and byte order magic
+_PCAPNG_SHB = b'\x0a\x0d\x0d\x0a'
+_PCAPNG_BOM = {
+    b'\x1a\x2b\x3c\x4d': '>',
+    b'\x4d\x3c\x2b\x1a': '<'
+    }
+
+
+# decoders per data link type, used by decode_rec()
+LinkType_decoder = {
+    1   : EthernetPacket,
+    228 : IPv4,
+    229 : IPv6,
+    248 : SCTPPacket
+    }
+
+def decode_rec(linktype, buf):
+    """decodes the record buffer `buf' with the decoder corresponding to 
+    `linktype' in LinkType_decoder
+    
+    Args:
+        linktype: int, data link type
+        buf: bytes or memoryview, record buffer
+    
+    Returns:
+        pkt: Element instance, or None if no decoder is available for linktype
+    
+    Raises:
+        CharpyErr or EltErr, if the decoding fails
+    """
+    try:
+        Pkt = LinkType_decoder[linktype]
+    except KeyError:
+        return None
+    pkt = Pkt()
+    pkt.from_bytes(buf)
+    return pkt
+
+
+# data link types carrying IP packets directly
+_LINKTYPE_IP = (12, 14, 101, 228, 229)
+
+_u16 = Struct('>H')
+_ipv4_hdr = Struct('>BBHHHBB')
+
+def ip_payload(linktype, buf):
+    """extracts the IP addresses, protocol and payload from the record buffer 
+    `buf', without instantiating any Envelope
+    
+    Ethernet (with VLAN tags), Linux cooked capture and raw IP data link types 
+    are supported. IPv4 fragments and IPv6 extension headers are not.
+    
+    Args:
+        linktype: int, data link type
+        buf: bytes or memoryview, record buffer
+    
+    Returns:
+        (src, dst, proto, payload) with src and dst being the IP addresses 
+            (bytes), proto the IP protocol (int) and payload a slice of buf, 
+            or None if the record is not an IP packet or is not supported
+    """
+    if not isinstance(buf, memoryview):
+        buf = memoryview(buf)
+    try:
+        if linktype == 1:
+            # Ethernet
+            off = 12
+            typ = _u16.unpack_from(buf, off)[0]
+            while typ in (0x8100, 0x88a8):
+                off += 4
+                typ = _u16.unpack_from(buf, off)[0]
+            off += 2
+        elif linktype == 113:
+            # Linux cooked capture
+            typ, off = _u16.unpack_from(buf, 14)[0], 16
+        elif linktype == 276:
+            # Linux cooked capture v2
+            typ, off = _u16.unpack_from(buf, 0)[0], 20
+        elif linktype in _LINKTYPE_IP:
+            typ, off = 0, 0
+        else:
+            return None
+        #
+        vers = bytearray(buf[off:off+1])[0] >> 4
+        if vers == 4 and typ in (0, 0x0800):
+            ihl, _, tlen, _, frag, _, proto = _ipv4_hdr.unpack_from(buf, off)
+            if frag & 0x3fff:
+                # MF bit or fragment offset
+                return None
+            return buf[off+12:off+16].tobytes(), buf[off+16:off+20].tobytes(), proto, \
+                   buf[off+4*(ihl&0xf):off+tlen]
+        elif vers == 6 and typ in (0, 0x86dd):
+            plen = _u16.unpack_from(buf, off+4)[0]
+            return buf[off+8:off+24].tobytes(), buf[off+24:off+40].tobytes(), \
+                   bytearray(buf[off+6:off+7])[0], buf[off+40:off+40+plen]
+    except (StructErr, IndexError):
+        pass
+    return None
+
+
+class PcapReader(object):
+    """Streaming reader for pcap and pcapng files
+    
+    Iterating over it yields (ts, linktype, buf) for each packet record, 
+    where ts is the timestamp in seconds (float), linktype the data link type 
+    (int) and buf a memoryview over the packet data.
+    
+    The file is mapped in memory when possible (use_mmap=True and a regular 
+    file), otherwise it is read by chunks of CHUNK_LEN bytes. In both cases, 
+    record buffers are not copied: in case the file is mapped, they are only 
+    valid until the reader is closed.
+    
+    Truncated records at the end of the file are ignored.
+    """
+    
+    CHUNK_LEN = 1<<20
+    
+    def __init__(self, f, use_mmap=True):
+        """Initializes a reader
+        
+        Args:
+            f: str (file name) or file object opened in binary mode
+            use_mmap: bool, map the file in memory when possible
+        """
+        if isinstance(f, str_types):
+            self._fd, self._fd_own = open(f, 'rb'), True
+        else:
+            self._fd, self._fd_own = f, False
+        self._mmap = None
+        if use_mmap:
+            try:
+                self._mmap = mmap(self._fd.fileno(), 0, access=ACCESS_READ)
+            except (AttributeError, EnvironmentError, ValueError):
+                # not a regular file, or empty file
+                pass
+        # format: 'pcap' or 'pcapng', set when reading the file header
+        self.fmt = None
+        # pcap: (linktype, timestamp resolution)
+        # pcapng: list of (linktype, timestamp resolution) per interface
+        self._iface = None
+        self._off = 0
+    
+    def close(self):
+        """Closes the file, and unmaps it
+        """
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # record buffers are still referenced, the mapping will be 
+                # released with them
+                pass
+            self._mmap = None
+        if self._fd_own:
+            self._fd.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def __iter__(self):
+        if self._mmap is not None:
+            self._off = 0
+            for rec in self._parse(memoryview(self._mmap)):
+                yield rec
+        else:
+            rest = b''
+            while True:
+                chunk = self._fd.read(self.CHUNK_LEN)
+                if not chunk:
+                    break
+                if rest:
+                    buf = memoryview(rest + chunk)
+                else:
+                    buf = memoryview(chunk)
+                self._off = 0
+                for rec in self._parse(buf):
+                    yield rec
+                rest = buf[self._off:].tobytes()
+    
+    def iter_decoded(self):
+        """Yields (ts, linktype, pkt) for each packet record, pkt being the 
+        Element returned by decode_rec(), the memoryview buffer when no decoder
+        is available, or the exception raised when decoding it
+        """
+        for ts, linktype, buf in self:
+            try:
+                pkt = decode_rec(linktype, buf)
+            except Exception as err:
+                pkt = err
+            else:
+                if pkt is None:
+                    pkt = buf
+            yield ts, linktype, pkt
+    
+    def _parse(self, buf):
+        if self.fmt is None:
+            if len(buf) < 4:
+                return
+            magic = buf[:4].tobytes()
+            if magic in _PCAP_MAGIC:
+                if len(buf) < 24:
+                    return
+                self.fmt = 'pcap'
+                end, res = _PCAP_MAGIC[magic]
+                self._rec_hdr = Struct(end + 'IIII')
+                self._iface = (Struct(end + 'I').unpack_from(buf, 20)[0], res)
+                self._off = 24
+            elif magic == _PCAPNG_SHB:
+                self.fmt = 'pcapng'
+            else:
+                raise(PCAPErr('invalid pcap / pcapng magic: 0x{0}'\
+                      .format(hexlify(magic).decode())))
+        if self.fmt == 'pcap':
+            for rec in self._parse_pcap(buf):
+                yield rec
+        else:
+            for rec in self._parse_pcapng(buf):
+                yield rec
+    
+    def _parse_pcap(self, buf):
+        unpack_from, (linktype, res) = self._rec_hdr.unpack_from, self._iface
+        off, buflen = self._off, len(buf)
+        while off + 16 <= buflen:
+            ts_sec, ts_frac, len_incl, _ = unpack_from(buf, off)
+            end = off + 16 + len_incl
+            if end > buflen:
+                break
+            yield ts_sec + ts_frac*res, linktype, buf[off+16:end]
+            off = self._off = end
+    
+    def _set_endian(self, end):
+        self._end = end
+        self._blk_hdr = Struct(end + 'II')
+        self._epb_hdr = Struct(end + 'IIIII')
+        self._idb_hdr = Struct(end + 'HHI')
+        self._opb_hdr = Struct(end + 'HHIIII')
+        self._opt_hdr = Struct(end + 'HH')
+    
+    def _parse_pcapng(self, buf):
+        off, buflen = self._off, len(buf)
+        while off + 12 <= buflen:
+            if buf[off:off+4] == _PCAPNG_SHB:
+                # new section, which can change the endianness
+                bom = buf[off+8:off+12].tobytes()
+                if bom not in _PCAPNG_BOM:
+                    raise(PCAPErr('invalid pcapng byte-order magic: 0x{0}'\
+                          .format(hexlify(bom).decode())))
+                self._set_endian(_PCAPNG_BOM[bom])
+                self._iface = []
+            typ, blen = self._blk_hdr.unpack_from(buf, off)
+            if blen < 12 or blen % 4:
+                raise(PCAPErr('invalid pcapng block length: {0}'.format(blen)))
+            end = off + blen
+            if end > buflen:
+                break
+            #
+            if typ == 6:
+                # enhanced packet block
+                iid, ts_h, ts_l, len_cap, _ = self._epb_hdr.unpack_from(buf, off+8)
+                try:
+                    linktype, res = self._iface[iid]
+                except IndexError:
+                    raise(PCAPErr('undefined pcapng interface: {0}'.format(iid)))
+                yield ((ts_h<<32) + ts_l)*res, linktype, buf[off+28:off+28+len_cap]
+            elif typ == 1:
+                # interface description block
+                self._iface.append( self._parse_idb(buf, off, end) )
+            elif typ == 3:
+                # simple packet block, without timestamp
+                if not self._iface:
+                    raise(PCAPErr('undefined pcapng interface: 0'))
+                len_orig = self._blk_hdr.unpack_from(buf, off+4)[1]
+                yield None, self._iface[0][0], buf[off+12:off+12+min(len_orig, blen-16)]
+            elif typ == 2:
+                # obsolete packet block
+                iid, _, ts_h, ts_l, len_cap, _ = self._opb_hdr.unpack_from(buf, off+8)
+                try:
+                    linktype, res = self._iface[iid]
+                except IndexError:
+                    raise(PCAPErr('undefined pcapng interface: {0}'.format(iid)))
+                yield ((ts_h<<32) + ts_l)*res, linktype, buf[off+28:off+28+len_cap]
+            # other blocks are ignored
+            off = self._off = end
+    
+    def _parse_idb(self, buf, off, end):
+        linktype = self._idb_hdr.unpack_from(buf, off+8)[0]
+        res = 1e-6
+        # options, looking for if_tsresol
+        off, end = off+16, end-4
+        while off + 4 <= end:
+            code, optlen = self._opt_hdr.unpack_from(buf, off)
+            if code == 0:
+                break
+            elif code == 9 and optlen >= 1:
+                tsresol = bytearray(buf[off+4:off+5])[0]
+                if tsresol & 0x80:
+                    res = 2.0**-(tsresol & 0x7f)
+                else:
+                    res = 10.0**-tsresol
+            off += 4 + optlen + (-optlen % 4)
+        return linktype, res
+
+
+class PcapWriter(object):
+    """Buffered writer for pcap files
+    
+    Records are accumulated in a bytearray, which is written to the file each 
+    time it gets over BUF_LEN bytes, and when the writer is flushed or closed.
+    """
+    
+    BUF_LEN = 1<<20
+    
+    def __init__(self, f, linktype=1, snaplen=0xffff, nsec=False):
+        """Initializes a writer, and writes the pcap file header
+        
+        Args:
+            f: str (file name) or file object opened in binary mode
+            linktype: int, data link type
+            snaplen: int, maximum length of packet data saved in a record
+            nsec: bool, if True, timestamps have a nanosecond resolution, 
+                otherwise a microsecond one
+        """
+        if isinstance(f, str_types):
+            self._fd, self._fd_own = open(f, 'wb'), True
+        else:
+            self._fd, self._fd_own = f, False
+        self._snaplen = snaplen
+        self._res = 1000000000 if nsec else 1000000
+        self._rec_hdr = Struct('<IIII')
+        hdr = pcap_hdr(val={'magic_number': 0xa1b23c4d if nsec else 0xa1b2c3d4,
+                            'snaplen': snaplen,
+                            'network': linktype})
+        self._buf = bytearray(hdr.to_bytes())
+    
+    def write(self, buf, ts=None, len_orig=None):
+        """Writes a record
+        
+        Args:
+            buf: bytes, bytearray or memoryview, packet data
+            ts: float, timestamp in seconds, if None the current time is used
+            len_orig: int, original length of the packet, if None len(buf) is
+                used
+        """
+        if ts is None:
+            ts = _time()
+        ts_sec = int(ts)
+        ts_frac = int(round((ts - ts_sec) * self._res))
+        if ts_frac >= self._res:
+            ts_sec, ts_frac = ts_sec+1, ts_frac-self._res
+        if len_orig is None:
+            len_orig = len(buf)
+        len_incl = min(len(buf), self._snaplen)
+        self._buf += self._rec_hdr.pack(ts_sec, ts_frac, len_incl, len_orig)
+        if len_incl < len(buf):
+            self._buf += buf[:len_incl]
+        else:
+            self._buf += buf
+        if len(self._buf) >= self.BUF_LEN:
+            self.flush()
+    
+    def write_many(self, recs):
+        """Writes all (ts, buf) records from the iterable `recs'
+        """
+        for ts, buf in recs:
+            self.write(buf, ts)
+    
+    def flush(self):
+        """Writes the buffered records to the file
+        """
+        if self._buf:
+            self._fd.write(self._buf)
+            del self._buf[:]
+        self._fd.flush()
+    
+    def close(self):
+        """Flushes the buffered records, and closes the file
+        """
+        self.flush()
+        if self._fd_own:
+            self._fd.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
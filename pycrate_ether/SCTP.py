@@ -0,0 +1,296 @@
+# −*− coding: UTF−8 −*−
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_ether/SCTP.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+from struct      import Struct
+from collections import deque
+
+from pycrate_core.elt  import Envelope, REPR_RAW, REPR_HEX, REPR_BIN
+from pycrate_core.base import *
+from pycrate_core.repr import *
+
+
+# SCTP headers format:
+# from RFC 4960
+
+SCTPChunkType_dict = {
+    0 : 'DATA',
+    1 : 'INIT',
+    2 : 'INIT ACK',
+    3 : 'SACK',
+    4 : 'HEARTBEAT',
+    5 : 'HEARTBEAT ACK',
+    6 : 'ABORT',
+    7 : 'SHUTDOWN',
+    8 : 'SHUTDOWN ACK',
+    9 : 'ERROR',
+    10 : 'COOKIE ECHO',
+    11 : 'COOKIE ACK',
+    12 : 'ECNE',
+    13 : 'CWR',
+    14 : 'SHUTDOWN COMPLETE',
+    15 : 'AUTH',
+    64 : 'I-DATA',
+    128 : 'ASCONF ACK',
+    130 : 'RE-CONFIG',
+    132 : 'PAD',
+    192 : 'FORWARD TSN',
+    193 : 'ASCONF',
+    194 : 'I-FORWARD TSN'
+    }
+
+# payload protocol identifiers, from IANA
+SCTPPPID_dict = {
+    0 : 'reserved',
+    2 : 'M2UA',
+    3 : 'M3UA',
+    4 : 'SUA',
+    5 : 'M2PA',
+    18 : 'S1AP',
+    19 : 'RUA',
+    20 : 'HNBAP',
+    24 : 'SBc-AP',
+    25 : 'NBAP',
+    27 : 'X2AP',
+    43 : 'M2AP',
+    44 : 'M3AP',
+    46 : 'Diameter',
+    47 : 'Diameter DTLS',
+    60 : 'NGAP',
+    61 : 'XnAP'
+    }
+
+class SCTP(Envelope):
+    _GEN = (
+        Uint16('src'),
+        Uint16('dst'),
+        Uint32('vtag', rep=REPR_HEX),
+        Uint32('cs', rep=REPR_HEX)
+        )
+
+class SCTPChunk(Envelope):
+    _GEN = (
+        Uint8('type', dic=SCTPChunkType_dict),
+        Uint8('flags', rep=REPR_BIN),
+        Uint16('len'), # val automated
+        Buf('val', val=b'', rep=REPR_HEX),
+        Buf('pad', rep=REPR_HEX) # val and bl automated
+        )
+    def __init__(self, *args, **kwargs):
+        Envelope.__init__(self, *args, **kwargs)
+        self[2].set_valauto(lambda: 4 + self[3].get_len())
+        self[3].set_blauto(lambda: 8*(self[2].get_val() - 4))
+        self[4].set_valauto(lambda: (-self[3].get_len() % 4) * b'\0')
+        self[4].set_blauto(lambda: 8*(-self[3].get_len() % 4))
+
+class SCTPData(Envelope):
+    _GEN = (
+        Uint8('type', val=0, dic=SCTPChunkType_dict),
+        Uint('res', bl=5, rep=REPR_BIN),
+        Uint('U', bl=1),
+        Uint('B', bl=1),
+        Uint('E', bl=1),
+        Uint16('len'), # val automated
+        Uint32('TSN'),
+        Uint16('SID'),
+        Uint16('SSN'),
+        Uint32('PPID', dic=SCTPPPID_dict),
+        Buf('data', val=b'', rep=REPR_HEX),
+        Buf('pad', rep=REPR_HEX) # val and bl automated
+        )
+    def __init__(self, *args, **kwargs):
+        Envelope.__init__(self, *args, **kwargs)
+        self[5].set_valauto(lambda: 16 + self[10].get_len())
+        self[10].set_blauto(lambda: 8*(self[5].get_val() - 16))
+        self[11].set_valauto(lambda: (-self[10].get_len() % 4) * b'\0')
+        self[11].set_blauto(lambda: 8*(-self[10].get_len() % 4))
+
+class SCTPPacket(Envelope):
+    """SCTP packet, with its common header followed by all its chunks, DATA
+    chunks being decoded as SCTPData and others as SCTPChunk
+    """
+    _GEN = (
+        SCTP(),
+        )
+    def _from_char(self, char):
+        self.__init__()
+        self[0]._from_char(char)
+        while char.len_byte() >= 4:
+            hdr = char.to_uint(32)
+            typ, clen = hdr >> 24, hdr & 0xffff
+            if clen < 4 or clen > char.len_byte():
+                # e.g. padding of the link layer
+                break
+            if typ == 0 and clen >= 16:
+                chk = SCTPData(hier=1)
+            else:
+                chk = SCTPChunk(hier=1)
+            chk._from_char(char)
+            self.append(chk)
+
+
+#------------------------------------------------------------------------------#
+# fast SCTP DATA chunks processing
+#------------------------------------------------------------------------------#
+# those work with struct on bytes / memoryview buffers, without instantiating
+# any Envelope, in order to process large traces
+
+_SCTPHdr_st   = Struct('>HHII')
+_SCTPChunk_st = Struct('>BBH')
+_SCTPData_st  = Struct('>IHHI')
+
+def parse_sctp(buf):
+    """parses the SCTP packet `buf' and returns its source and destination
+    ports and the list of its DATA chunks
+
+    Args:
+        buf: bytes or memoryview, SCTP packet
+
+    Returns:
+        src, dst, data: source and destination port, and list of DATA chunks
+            (flags, TSN, SID, SSN, PPID, data), data being a slice of buf
+
+    Raises:
+        struct.error, if the SCTP packet is too short
+    """
+    src, dst, _, _ = _SCTPHdr_st.unpack_from(buf, 0)
+    off, buflen, data = 12, len(buf), []
+    while off + 4 <= buflen:
+        typ, flags, clen = _SCTPChunk_st.unpack_from(buf, off)
+        if clen < 4:
+            break
+        if typ == 0 and clen >= 16:
+            tsn, sid, ssn, ppid = _SCTPData_st.unpack_from(buf, off+4)
+            data.append( (flags, tsn, sid, ssn, ppid, buf[off+16:off+clen]) )
+        off += clen + (-clen % 4)
+    return src, dst, data
+
+
+class SCTPReassembler(object):
+    """Reassembles user messages from SCTP DATA chunks, per association
+    direction and stream, and drops retransmitted chunks
+
+    Associations are identified by the caller-provided key, e.g. the tuple
+    (src addr, dst addr, src port, dst port).
+
+    Ordered messages are delivered in the order of their stream sequence
+    number (SSN), the first one seen in each stream giving the initial SSN:
+    messages received ahead of a missing one are held, at most SSN_WIN per
+    stream, after which the missing ones are skipped. Unordered messages (U
+    flag set) are delivered as soon as they are complete.
+    """
+
+    # number of TSN kept per association direction to detect retransmissions
+    TSN_WIN = 1024
+    # number of ordered messages held per stream, waiting for a missing one
+    SSN_WIN = 16
+
+    def __init__(self):
+        # (key, sid): list of (TSN, data) fragments
+        self._frag = {}
+        # key: (set of recent TSN, deque of recent TSN)
+        self._tsn  = {}
+        # (key, sid): [next SSN, {SSN: held message or None if lost}]
+        self._ssn  = {}
+
+    def _is_dup(self, key, tsn):
+        try:
+            tsn_set, tsn_lst = self._tsn[key]
+        except KeyError:
+            tsn_set, tsn_lst = set(), deque(maxlen=self.TSN_WIN)
+            self._tsn[key] = (tsn_set, tsn_lst)
+        if tsn in tsn_set:
+            return True
+        if len(tsn_lst) == self.TSN_WIN:
+            tsn_set.remove(tsn_lst.popleft())
+        tsn_set.add(tsn)
+        tsn_lst.append(tsn)
+        return False
+
+    def _order(self, key, sid, ssn, msg):
+        # returns the list of ordered messages which can be delivered once the
+        # message ssn is complete (or lost, msg being None)
+        try:
+            state = self._ssn[(key, sid)]
+        except KeyError:
+            state = self._ssn[(key, sid)] = [ssn, {}]
+        held = state[1]
+        if (ssn - state[0]) & 0xffff >= 0x8000:
+            # older than the next SSN, e.g. received after being skipped
+            return [] if msg is None else [msg]
+        held[ssn] = msg
+        if state[0] not in held and len(held) > self.SSN_WIN:
+            # give up waiting, and restart from the first message held
+            state[0] = min(held, key=lambda s: (s - state[0]) & 0xffff)
+        ret = []
+        while state[0] in held:
+            msg = held.pop(state[0])
+            if msg is not None:
+                ret.append(msg)
+            state[0] = (state[0] + 1) & 0xffff
+        return ret
+
+    def feed(self, key, flags, tsn, sid, ssn, ppid, data):
+        """processes a DATA chunk, as returned by parse_sctp()
+
+        Returns:
+            list of (sid, ppid, msg) with msg being a complete user message as
+            bytes, empty if the chunk is a retransmission, a fragment of a
+            message not complete yet, or an ordered message waiting for a
+            previous one
+        """
+        if self._is_dup(key, tsn):
+            return []
+        if flags & 3 == 3:
+            # B and E flags, unfragmented
+            msg = sid, ppid, data.tobytes() if isinstance(data, memoryview) else data
+        elif flags & 2:
+            # first fragment
+            self._frag[(key, sid)] = [(tsn, data)]
+            return []
+        else:
+            try:
+                frag = self._frag[(key, sid)]
+            except KeyError:
+                # first fragment missing
+                return [] if flags & 4 else self._order(key, sid, ssn, None)
+            if tsn != frag[-1][0] + 1 & 0xffffffff:
+                # fragment missing, or out of order
+                del self._frag[(key, sid)]
+                return [] if flags & 4 else self._order(key, sid, ssn, None)
+            frag.append( (tsn, data) )
+            if not flags & 1:
+                return []
+            # last fragment
+            del self._frag[(key, sid)]
+            msg = sid, ppid, b''.join([bytes(f[1]) for f in frag])
+        if flags & 4:
+            # U flag, unordered
+            return [msg]
+        else:
+            return self._order(key, sid, ssn, msg)
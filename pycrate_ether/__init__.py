@@ -27,5 +27,5 @@
 # *--------------------------------------------------------
 #*/
 #
-__all__ = ['Ethernet', 'ARP', 'IP', 'PCAP']
+__all__ = ['Ethernet', 'ARP', 'IP', 'SCTP', 'PCAP']
 __version__ = '0.2.0'
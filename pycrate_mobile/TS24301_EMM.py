@@ -684,6 +684,7 @@ else:
         _GEN = (
             Uint('SecHdr', val=12, bl=4, dic=SecHdrType_dict),
             Uint('ProtDisc', val=7, bl=4, dic=ProtDisc_dict),
+            Uint8('Type', val=0, trans=True), # transparent field, only to ease message handling
             Uint('KSI', bl=3, dic={7:'no key available'}),
             Uint('SeqnShort', bl=5),
             Buf('MACShort', val=b'\0\0', bl=16, rep=REPR_HEX)
@@ -0,0 +1,319 @@
+# −*− coding: UTF−8 −*−
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software; you can redistribute it and/or
+# * modify it under the terms of the GNU General Public License
+# * as published by the Free Software Foundation; either version 2
+# * of the License, or (at your option) any later version.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# * GNU General Public License for more details.
+# *
+# * You should have received a copy of the GNU General Public License
+# * along with this program; if not, write to the Free Software
+# * Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# * 02110-1301, USA.
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_mobile/Trace.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+from socket   import AF_INET, AF_INET6
+from struct   import error as StructErr
+from binascii import hexlify
+try:
+    from socket import inet_ntop
+except ImportError:
+    from win_inet_pton import inet_ntop
+
+from pycrate_core.utils import *
+from pycrate_core.elt   import Element, Envelope, Array, Sequence
+
+from pycrate_ether.PCAP import PcapReader, ip_payload
+from pycrate_ether.SCTP import parse_sctp, SCTPReassembler
+
+from pycrate_asn1rt.asnobj import _mp, _mp_imap
+
+from .NAS import parse_NAS_MO, parse_NAS_MT, parse_NASLTE_MO, parse_NASLTE_MT
+
+#------------------------------------------------------------------------------#
+# S1AP / HNBAP / RUA / RANAP over SCTP traces decoding
+#------------------------------------------------------------------------------#
+# a trace is processed in 2 stages:
+# 1) packet records are read, SCTP DATA chunks are reassembled per
+#    association and stream into user messages: iter_sctp_msgs()
+# 2) each user message is decoded according to its PPID, together with the
+#    RANAP and NAS messages it contains: decode_msg()
+# decode_trace() chains both, and fans the 2nd stage out to a pool of worker
+# processes, while keeping the order of the trace
+
+# SCTP PPID: protocol name
+SCTP_PPID_proto = {
+    18 : 'S1AP',
+    19 : 'RUA',
+    20 : 'HNBAP'
+    }
+
+# SCTP port of the HNB-GW, to get the direction of RUA messages
+SCTP_PORT_HNBGW = 29169
+
+# S1AP messages carrying uplink NAS PDU
+S1AP_NAS_MO = ('InitialUEMessage', 'UplinkNASTransport')
+
+
+# protocol name: ASN.1 PDU object, loaded with load_pdus()
+_PDU = {}
+
+def load_pdus():
+    """loads the S1AP, HNBAP, RUA and RANAP ASN.1 modules, and returns the
+    dict of protocol name: ASN.1 PDU object
+    """
+    if not _PDU:
+        from pycrate_asn1dir import S1AP, HNBAP, RUA, RANAP
+        _PDU['S1AP']  = S1AP.S1AP_PDU_Descriptions.S1AP_PDU
+        _PDU['HNBAP'] = HNBAP.HNBAP_PDU_Descriptions.HNBAP_PDU
+        _PDU['RUA']   = RUA.RUA_PDU_Descriptions.RUA_PDU
+        _PDU['RANAP'] = RANAP.RANAP_PDU_Descriptions.RANAP_PDU
+    return _PDU
+
+
+def _addr_to_str(addr):
+    if not addr:
+        return None
+    elif len(addr) == 4:
+        return inet_ntop(AF_INET, addr)
+    else:
+        return inet_ntop(AF_INET6, addr)
+
+
+def iter_sctp_msgs(f, use_mmap=True):
+    """reads the pcap or pcapng file `f' and yields each SCTP user message
+    reassembled from DATA chunks, retransmitted chunks being dropped, and
+    ordered messages being yielded in the order of their stream sequence number
+    (hence with the timestamp of the packet which completed the sequence)
+
+    Args:
+        f: str (file name) or file object
+        use_mmap: bool, passed to PcapReader
+
+    Yields:
+        (info, msg): info being a dict with the timestamp, IP addresses (None
+            for the SCTP data link type), SCTP ports, stream id and PPID, and
+            msg being the user message (bytes)
+    """
+    reasm = SCTPReassembler()
+    with PcapReader(f, use_mmap) as r:
+        for ts, linktype, buf in r:
+            if linktype == 248:
+                # SCTP packets, without any IP header
+                ip = (b'', b'', 132, buf)
+            else:
+                ip = ip_payload(linktype, buf)
+            if ip is None or ip[2] != 132:
+                continue
+            try:
+                sport, dport, chunks = parse_sctp(ip[3])
+            except StructErr:
+                continue
+            key = (ip[0], ip[1], sport, dport)
+            for chunk in chunks:
+                for msg in reasm.feed(key, *chunk):
+                    yield {'ts'   : ts,
+                           'src'  : _addr_to_str(ip[0]),
+                           'dst'  : _addr_to_str(ip[1]),
+                           'sport': sport,
+                           'dport': dport,
+                           'sid'  : msg[0],
+                           'ppid' : msg[1]}, msg[2]
+
+
+#------------------------------------------------------------------------------#
+# conversion of values to JSON-compliant ones
+#------------------------------------------------------------------------------#
+
+def asn_to_jval(val):
+    """converts an ASN.1 value to a JSON-compliant value: bytes are converted
+    to hexadecimal strings, and tuples to lists
+    """
+    if isinstance(val, dict):
+        return dict([(k, asn_to_jval(v)) for (k, v) in val.items()])
+    elif isinstance(val, (tuple, list)):
+        return [asn_to_jval(v) for v in val]
+    elif isinstance(val, bytes_types):
+        return hexlify(val).decode()
+    elif isinstance(val, (set, frozenset)):
+        return [asn_to_jval(v) for v in sorted(val)]
+    else:
+        return val
+
+
+def elt_to_jval(elt):
+    """converts an Element to a JSON-compliant value: Envelope's content is
+    converted to a dict, Sequence's content to a list, and atomic values as
+    with asn_to_jval(); transparent elements are not kept
+    """
+    if isinstance(elt, Envelope):
+        return dict([(e._name, elt_to_jval(e)) for e in elt._content \
+                     if not e.get_trans()])
+    elif isinstance(elt, Sequence):
+        return [elt_to_jval(e) for e in elt._content if not e.get_trans()]
+    else:
+        return asn_to_jval(elt.get_val())
+
+
+#------------------------------------------------------------------------------#
+# decoding of user messages
+#------------------------------------------------------------------------------#
+
+def _find_bytes(val, names):
+    # yields all bytes values which are within an OPEN / CHOICE value or a
+    # SEQUENCE component with a name in names
+    if isinstance(val, dict):
+        for k, v in val.items():
+            if k in names and isinstance(v, bytes_types):
+                yield v
+            else:
+                for b in _find_bytes(v, names):
+                    yield b
+    elif isinstance(val, (tuple, list)):
+        if len(val) == 2 and val[0] in names and isinstance(val[1], bytes_types):
+            yield val[1]
+        else:
+            for v in val:
+                for b in _find_bytes(v, names):
+                    yield b
+
+
+def _err_to_str(err):
+    return '{0}: {1}'.format(type(err).__name__, err)
+
+
+def _decode_nas(bufs, parse):
+    ret = []
+    for buf in bufs:
+        try:
+            Msg, err = parse(buf)
+        except Exception as exc:
+            ret.append( {'err': _err_to_str(exc), 'data': hexlify(buf).decode()} )
+        else:
+            if Msg is None:
+                ret.append( {'err': 'NAS error {0}'.format(err),
+                             'data': hexlify(buf).decode()} )
+            else:
+                ret.append( {Msg._name: elt_to_jval(Msg)} )
+    return ret
+
+
+def decode_msg(info, buf, nas=True):
+    """decodes the SCTP user message `buf' according to the PPID in `info', and
+    the RANAP and NAS messages it contains if `nas' is True
+
+    Args:
+        info: dict, as yielded by iter_sctp_msgs()
+        buf: bytes, user message
+        nas: bool
+
+    Returns:
+        rec: dict, JSON-compliant, updated from info with:
+            proto: protocol name (if PPID is supported)
+            pdu: decoded PDU
+            ranap: list of decoded RANAP PDU (for RUA)
+            nas: list of decoded NAS messages
+            err: error string, if the PDU decoding failed
+            data: hexadecimal user message, if it is not decoded
+    """
+    rec = dict(info)
+    proto = SCTP_PPID_proto.get(info['ppid'])
+    if proto is None:
+        rec['data'] = hexlify(buf).decode()
+        return rec
+    rec['proto'] = proto
+    PDU = load_pdus()
+    try:
+        val = PDU[proto].decode(buf)
+    except Exception as err:
+        rec['err']  = _err_to_str(err)
+        rec['data'] = hexlify(buf).decode()
+        return rec
+    rec['pdu'] = asn_to_jval(val)
+    #
+    if proto == 'RUA':
+        ranap = []
+        for ranap_buf in _find_bytes(val, ('RANAP-Message', )):
+            try:
+                ranap.append( PDU['RANAP'].decode(ranap_buf) )
+            except Exception as err:
+                rec['err'] = _err_to_str(err)
+        rec['ranap'] = [asn_to_jval(v) for v in ranap]
+        if nas:
+            if info['dport'] == SCTP_PORT_HNBGW:
+                parse = parse_NAS_MO
+            else:
+                parse = parse_NAS_MT
+            bufs = []
+            for v in ranap:
+                bufs.extend( _find_bytes(v, ('NAS-PDU', )) )
+            rec['nas'] = _decode_nas(bufs, parse)
+    elif proto == 'S1AP' and nas:
+        try:
+            mo = val[1]['value'][0] in S1AP_NAS_MO
+        except (KeyError, IndexError, TypeError):
+            mo = False
+        rec['nas'] = _decode_nas(list(_find_bytes(val, ('NAS-PDU', 'nAS-PDU'))),
+                                 parse_NASLTE_MO if mo else parse_NASLTE_MT)
+    return rec
+
+
+_decode_trace_nas = True
+
+def _decode_trace_init(nas):
+    global _decode_trace_nas
+    _decode_trace_nas = nas
+
+def _decode_trace_proc(arg):
+    return decode_msg(arg[0], arg[1], _decode_trace_nas)
+
+
+def decode_trace(f, workers=0, chunksize=64, nas=True, use_mmap=True):
+    """reads the pcap or pcapng file `f', and yields the decoding of each SCTP
+    user message, in the order of the trace
+
+    When workers > 1, messages are decoded in a pool of processes, forked
+    from the current one after the ASN.1 modules have been loaded, the trace
+    being read in advance by bounded batches of messages only.
+
+    Args:
+        f: str (file name) or file object
+        workers: int, number of worker processes (0 or 1 for none)
+        chunksize: int, number of messages dispatched at once to a worker
+        nas: bool, decode the NAS messages
+        use_mmap: bool, passed to PcapReader
+
+    Yields:
+        rec: dict, as returned by decode_msg()
+    """
+    load_pdus()
+    msgs = iter_sctp_msgs(f, use_mmap)
+    if workers > 1 and _mp is None:
+        log('decode_trace: fork not available, no worker process started')
+        workers = 0
+    if workers > 1:
+        pool = _mp.Pool(workers, initializer=_decode_trace_init, initargs=(nas, ))
+        try:
+            for rec in _mp_imap(pool, workers, _decode_trace_proc, msgs, chunksize):
+                yield rec
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        for info, buf in msgs:
+            yield decode_msg(info, buf, nas)
@@ -23,6 +23,7 @@ setup(
     scripts=["tools/pycrate_asn1compile.py",
              "tools/pycrate_berdecode.py",
              "tools/pycrate_showmedia.py",
+             "tools/pycrate_tracedecode.py",
              ],
     
     # no dependency yet
@@ -1329,9 +1329,27 @@ def _test_rt_base():
     
     return 0
 
+def _test_rt_prepenc():
+    from pycrate_asn1rt.prepenc import ASN1PrepEnc
+    Mod = GLOBAL.MOD['Test-Asn1rt']
+    
+    # Seq01 ::= SEQUENCE { --check test_asn1rt_mod.asn file-- }
+    # int is a DEFAULT 10 component
+    Seq01 = Mod['Seq01']
+    for codec in ('aper', 'uper', 'ber', 'oer', 'coer'):
+        PE  = ASN1PrepEnc(Seq01, {'boo': False, 'int': 3}, [['int']], codec)
+        enc = getattr(Seq01, 'to_%s' % codec)
+        for v in (4, 10, 11):
+            assert( PE.encode(v) == enc(PE.get_val(v)) )
+        # int set to its default value is encoded again from the whole value
+        assert( (PE.patched, PE.full) == (2, 1) )
+    Seq01.set_val({'boo': False})
+    assert( PE.encode(10) == Seq01.to_coer() )
+
 def test_rt_base():
     _load_rt_base()
     _test_rt_base()
+    _test_rt_prepenc()
 
 
 pkts_rrc3g = tuple(map(unhexlify, (
@@ -1495,12 +1513,18 @@ pkts_x2ap = tuple(map(unhexlify, (
     )))
 
 def _load_lteran():
+    # modules need to be reloaded when already imported, to get fresh ASN.1
+    # objects (e.g. without the specialized PER functions attached by perfast)
+    from importlib import reload
     try:
         GLOBAL.clear()
     except:
         pass
     from pycrate_asn1dir import S1AP
     from pycrate_asn1dir import X2AP
+    if 'S1AP-PDU-Descriptions' not in GLOBAL.MOD:
+        reload(S1AP)
+        reload(X2AP)
 
 def _test_lteran():
     S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
@@ -1541,6 +1565,518 @@ def test_lteran():
     _load_lteran()
     _test_lteran()
 
+def _test_lteran_perfast():
+    from pycrate_asn1rt.perfast import gen_per_fast
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    X2PDU = GLOBAL.MOD['X2AP-PDU-Descriptions']['X2AP-PDU']
+    ref = []
+    ASN1Obj._PER_FAST = False
+    for PDU, pkts in ((S1PDU, pkts_s1ap), (X2PDU, pkts_x2ap)):
+        for p in pkts:
+            PDU.from_aper(p)
+            val = PDU()
+            ref.append( (PDU, p, val, PDU.to_uper()) )
+    ASN1Obj._PER_FAST = True
+    gen_per_fast(S1PDU, X2PDU)
+    assert( S1PDU._fast_aper is not None and S1PDU._fast_uper is not None )
+    for (PDU, p, val, pu) in ref:
+        PDU.from_aper(p)
+        assert( PDU() == val )
+        assert( PDU.to_aper() == p )
+        assert( PDU.to_uper() == pu )
+        PDU.from_uper(pu)
+        assert( PDU() == val )
+
+def test_lteran_perfast():
+    _load_lteran()
+    _test_lteran_perfast()
+
+def _test_lteran_threads():
+    from threading import Thread
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    vals = [S1PDU.decode(p) for p in pkts_s1ap]
+    val_prev = S1PDU._val
+    errs = []
+    def run():
+        try:
+            for i in range(20):
+                for p, val in zip(pkts_s1ap, vals):
+                    assert( S1PDU.decode(p) == val )
+                    assert( S1PDU.encode(val) == p )
+                    assert( S1PDU.decode(S1PDU.encode(val, 'uper'), 'uper') == val )
+        except Exception as err:
+            errs.append(err)
+    threads = [Thread(target=run) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert( not errs )
+    # the internal value of the object is left untouched
+    assert( S1PDU._val is val_prev )
+    # APER offsets are not left over when decoding fails
+    for i in range(10):
+        try:
+            S1PDU.decode(b'\xff\xff\0')
+        except Exception:
+            pass
+    assert( ASN1CodecPER._off == [] )
+    # each specification has its own lock
+    X2PDU = GLOBAL.MOD['X2AP-PDU-Descriptions']['X2AP-PDU']
+    assert( S1PDU.get_lock() is GLOBAL.MOD['S1AP-IEs']['ENB-UE-S1AP-ID'].get_lock() )
+    assert( S1PDU.get_lock() is not X2PDU.get_lock() )
+    # once a copy of the object has been made, decode() and encode() do not
+    # wait for the lock held by another thread, and work on the copy of the
+    # object private to the calling thread
+    assert( S1PDU.get_thread_obj() is not S1PDU )
+    ret = []
+    def run_copy():
+        Obj = S1PDU.get_thread_obj()
+        ret.append(Obj is not S1PDU and Obj is S1PDU.get_thread_obj())
+        ret.append([S1PDU.decode(p) for p in pkts_s1ap] == vals)
+        ret.append([S1PDU.encode(val) for val in vals] == list(pkts_s1ap))
+        ret.append(Obj.decode(pkts_s1ap[0]) == vals[0] and Obj._val is None)
+    with S1PDU.get_lock():
+        S1PDU.from_aper(pkts_s1ap[0])
+        t = Thread(target=run_copy)
+        t.start()
+        t.join(30)
+        assert( not t.is_alive() )
+        assert( S1PDU._val == vals[0] )
+    assert( ret == [True, True, True, True] )
+
+def test_lteran_threads():
+    _load_lteran()
+    _test_lteran_threads()
+
+def _test_lteran_codec_ctx():
+    import sys
+    from threading import Thread
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    X2PDU = GLOBAL.MOD['X2AP-PDU-Descriptions']['X2AP-PDU']
+    # S1AP in APER and X2AP in UPER, decoded concurrently without any lock
+    s1_ref = [(p, S1PDU.decode(p)) for p in pkts_s1ap]
+    x2_ref = [(X2PDU.encode(X2PDU.decode(p), 'uper'), X2PDU.decode(p)) for p in pkts_x2ap]
+    errs = []
+    def run(PDU, dec, enc, ref):
+        try:
+            for i in range(20):
+                for buf, val in ref:
+                    dec(buf)
+                    assert( PDU._val == val )
+                    assert( enc() == buf )
+        except Exception as err:
+            errs.append(err)
+    sw = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        threads = [Thread(target=run, args=(S1PDU, S1PDU.from_aper, S1PDU.to_aper, s1_ref)),
+                   Thread(target=run, args=(X2PDU, X2PDU.from_uper, X2PDU.to_uper, x2_ref))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(sw)
+    assert( not errs )
+    # BER parameters set as class attributes apply to all threads
+    val = s1_ref[0][1]
+    buf_def = S1PDU.encode(val, 'ber')
+    ASN1CodecBER.ENC_LUNDEF = True
+    try:
+        buf_undef = S1PDU.encode(val, 'ber')
+        assert( buf_undef != buf_def )
+        ret = []
+        t = Thread(target=lambda: ret.append(S1PDU.encode(val, 'ber')))
+        t.start()
+        t.join()
+        assert( ret == [buf_undef] )
+    finally:
+        ASN1CodecBER.ENC_LUNDEF = False
+    # and they can be overridden for a single thread
+    def run_over():
+        set_codec_ctx(ASN1CodecBER, ENC_LUNDEF=True)
+        ret.append(S1PDU.encode(val, 'ber'))
+        reset_codec_ctx(ASN1CodecBER, 'ENC_LUNDEF')
+        ret.append(S1PDU.encode(val, 'ber'))
+    ret = []
+    t = Thread(target=run_over)
+    t.start()
+    t.join()
+    assert( ret == [buf_undef, buf_def] )
+    assert( ASN1CodecBER.ENC_LUNDEF is False )
+    assert( S1PDU.encode(val, 'ber') == buf_def )
+    # CER encoding does not change the process-wide parameters
+    S1PDU.encode(val, 'cer')
+    assert( ASN1CodecBER.ENC_LUNDEF is False and not get_codec_ctx_over(ASN1CodecBER) )
+
+def test_lteran_codec_ctx():
+    _load_lteran()
+    _test_lteran_codec_ctx()
+
+def _test_lteran_many():
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    vals = [S1PDU.decode(p) for p in pkts_s1ap]
+    # an invalid buffer must not interrupt the batch
+    bufs = list(pkts_s1ap) + [b'\xff\xff\0'] + list(pkts_s1ap)
+    for workers in (0, 2):
+        ret = list(S1PDU.decode_many(bufs, workers=workers, chunksize=4))
+        assert( [r[0] for r in ret] == list(range(len(bufs))) )
+        assert( [r[1] for r in ret[:len(vals)]] == vals )
+        assert( isinstance(ret[len(vals)][1], ASN1Err) )
+        assert( [r[1] for r in ret[1+len(vals):]] == vals )
+        # APER offsets are not left over by the invalid buffer
+        assert( ASN1CodecPER._off == [] )
+    # buffers are read in advance by bounded batches only
+    from pycrate_asn1rt.asnobj import _MP_BATCH
+    cnt = [0]
+    def gen_bufs():
+        for i in range(1000):
+            cnt[0] += 1
+            yield pkts_s1ap[i % len(pkts_s1ap)]
+    ret = S1PDU.decode_many(gen_bufs(), workers=2, chunksize=4)
+    assert( next(ret) == (0, vals[0]) )
+    assert( cnt[0] <= 2 * 2 * 4 * _MP_BATCH )
+    assert( [r[0] for r in ret] == list(range(1, 1000)) )
+    assert( cnt[0] == 1000 )
+
+def test_lteran_many():
+    _load_lteran()
+    _test_lteran_many()
+
+def _test_lteran_trace():
+    from io import BytesIO
+    from pycrate_ether.PCAP   import PcapWriter
+    from pycrate_mobile.Trace import decode_trace
+    from test.test_ether      import sctp_frame
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    # S1AP trace, with the 3rd packet fragmented in 2 DATA chunks, and the 
+    # 2nd retransmitted
+    fd, tsn = BytesIO(), 1
+    with PcapWriter(fd) as w:
+        for i, p in enumerate(pkts_s1ap):
+            if i == 2:
+                w.write(sctp_frame([(2, tsn, 1, i, 18, p[:40])]), ts=i)
+                w.write(sctp_frame([(1, tsn+1, 1, i, 18, p[40:])]), ts=i)
+                tsn += 2
+            else:
+                for j in range(1 + (i == 1)):
+                    w.write(sctp_frame([(3, tsn, 1, i, 18, p)]), ts=i)
+                tsn += 1
+        w.flush()
+        buf = fd.getvalue()
+    for workers in (0, 2):
+        recs = list(decode_trace(BytesIO(buf), workers=workers, chunksize=2))
+        assert( [r['ts'] for r in recs] == list(range(len(pkts_s1ap))) )
+        assert( all([r['proto'] == 'S1AP' and 'err' not in r for r in recs]) )
+        assert( recs[2]['pdu'][1]['value'][0] == 'InitialUEMessage' )
+        # uplink NAS, with its ESM container
+        nas = recs[2]['nas'][0]['EMMSecProtNASMessage']['EMMAttachRequest']
+        assert( 'ESMPDNConnectivityRequest' in nas['ESMContainer'] )
+        # downlink NAS
+        assert( 'EMMAuthenticationRequest' in recs[3]['nas'][0] )
+    # SCTP data link type, without IP header
+    fd = BytesIO()
+    with PcapWriter(fd, linktype=248) as w:
+        for i, p in enumerate(pkts_s1ap):
+            w.write(sctp_frame([(3, i, 1, i, 18, p)])[34:], ts=i)
+        w.flush()
+        buf = fd.getvalue()
+    recs_sctp = list(decode_trace(BytesIO(buf)))
+    assert( [r['pdu'] for r in recs_sctp] == [r['pdu'] for r in recs] )
+    assert( recs_sctp[0]['src'] is None and recs_sctp[0]['sport'] == 36412 )
+
+def test_lteran_trace():
+    _load_lteran()
+    _test_lteran_trace()
+
+def _test_lteran_lazy():
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    X2PDU = GLOBAL.MOD['X2AP-PDU-Descriptions']['X2AP-PDU']
+    for PDU, pkts in ((S1PDU, pkts_s1ap), (X2PDU, pkts_x2ap)):
+        for p in pkts:
+            val = PDU.decode(p)
+            pu  = PDU.encode(val, 'uper')
+            ASN1Obj._LAZY = True
+            try:
+                val_lazy = PDU.decode(p)
+                ident, val_open = val_lazy[1]['value']
+                assert( isinstance(val_open, ASN1Lazy) )
+                # re-encoding with the same codec reuses the buffer
+                assert( PDU.encode(val_lazy) == p )
+                assert( not val_open.is_decoded() )
+                PDU._val = val_lazy
+                ies = get_val_at(PDU, [val_lazy[0], 'value', ident, 'protocolIEs'])
+                assert( ies == val[1]['value'][1]['protocolIEs'] )
+                assert( val_open.is_decoded() )
+                assert( val_lazy == val )
+                assert( PDU.encode(val_lazy, 'uper') == pu )
+                assert( PDU.decode(pu, 'uper') == val )
+                assert( PDU.to_asn1(PDU.decode(pu, 'uper')) == PDU.to_asn1(val) )
+            finally:
+                ASN1Obj._LAZY = False
+    # lazy values are decoded safely while other threads decode PDUs
+    from threading import Thread
+    vals = [S1PDU.decode(p) for p in pkts_s1ap]
+    ASN1Obj._LAZY = True
+    try:
+        vals_lazy = [S1PDU.decode(p) for p in pkts_s1ap]
+    finally:
+        ASN1Obj._LAZY = False
+    errs = []
+    def run_dec():
+        try:
+            for i in range(20):
+                for p, val in zip(pkts_s1ap, vals):
+                    assert( S1PDU.decode(p) == val )
+        except Exception as err:
+            errs.append(err)
+    def run_lazy():
+        try:
+            for val_lazy, val in zip(vals_lazy, vals):
+                assert( val_lazy[1]['value'][1].get_val() == val[1]['value'][1] )
+        except Exception as err:
+            errs.append(err)
+    threads = [Thread(target=run_dec), Thread(target=run_lazy), Thread(target=run_lazy)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert( not errs )
+
+def test_lteran_lazy():
+    _load_lteran()
+    _test_lteran_lazy()
+
+def _test_lteran_oer():
+    Com = GLOBAL.MOD['S1AP-CommonDataTypes']
+    IEs = GLOBAL.MOD['S1AP-IEs']
+    # basic OER encodings, from X.696
+    for Obj, val, buf in (
+        (Com['ProcedureCode'], 17, b'\x11'),
+        (Com['ProtocolIE-ID'], 8, b'\x00\x08'),
+        (Com['Criticality'], 'ignore', b'\x01'),
+        (IEs['MME-UE-S1AP-ID'], 1, b'\x00\x00\x00\x01'),
+        (IEs['PLMNidentity'], b'\x02\xf8\x39', b'\x02\xf8\x39'),
+        (IEs['ENBname'], 'ab', b'\x02ab'),
+        (IEs['Cause'], ('radioNetwork', 'unspecified'), b'\x80\x00')):
+        Obj.set_val(val)
+        assert( Obj.to_oer() == Obj.to_coer() == buf )
+        Obj.from_oer(buf)
+        assert( Obj() == val )
+        Obj.from_coer(buf)
+        assert( Obj() == val )
+    # a malformed open type leaves the outer buffer length untouched
+    char = Charpy(b'\x02\x11\x00\x00')
+    try:
+        ASN1CodecOER.decode_open(char, Com['ProcedureCode'])
+    except ASN1Err:
+        pass
+    else:
+        assert()
+    assert( char._len_bit == 32 )
+    #
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    X2PDU = GLOBAL.MOD['X2AP-PDU-Descriptions']['X2AP-PDU']
+    for PDU, pkts in ((S1PDU, pkts_s1ap), (X2PDU, pkts_x2ap)):
+        for p in pkts:
+            val = PDU.decode(p)
+            po  = PDU.encode(val, 'oer')
+            assert( PDU.decode(po, 'oer') == val )
+            pc  = PDU.encode(val, 'coer')
+            assert( PDU.decode(pc, 'coer') == val )
+            ASN1Obj._LAZY = True
+            try:
+                val_lazy = PDU.decode(po, 'oer')
+                assert( PDU.encode(val_lazy, 'oer') == po )
+                assert( val_lazy == val )
+            finally:
+                ASN1Obj._LAZY = False
+
+def test_lteran_oer():
+    _load_lteran()
+    _test_lteran_oer()
+
+def _test_lteran_snapshot():
+    import os, tempfile
+    from pycrate_asn1rt.snapshot import save_snapshot, load_snapshot
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    fd, src = tempfile.mkstemp()
+    os.write(fd, b'# ASN.1 modules source')
+    os.close(fd)
+    try:
+        save_snapshot(path, src=src)
+        GLOB = make_GLOBAL()
+        mods = load_snapshot(path, GLOB, src)
+        assert( mods == list(GLOBAL.MOD.keys()) )
+        if os.name != 'nt':
+            assert( os.stat(path).st_mode & 0o777 == 0o600 )
+            # snapshots writable by others are not loaded
+            os.chmod(path, 0o620)
+            try:
+                load_snapshot(path, make_GLOBAL(), src)
+            except ASN1Err:
+                pass
+            else:
+                assert()
+            os.chmod(path, 0o600)
+        # snapshots are bound to the content of their source
+        with open(src, 'wb') as fd:
+            fd.write(b'# ASN.1 modules sourcf')
+        try:
+            load_snapshot(path, make_GLOBAL(), src)
+        except ASN1Err:
+            pass
+        else:
+            assert()
+    finally:
+        os.remove(path)
+        os.remove(src)
+    for name, pkts in (('S1AP', pkts_s1ap), ('X2AP', pkts_x2ap)):
+        PDU      = GLOBAL.MOD['%s-PDU-Descriptions' % name]['%s-PDU' % name]
+        PDU_snap = GLOB.MOD['%s-PDU-Descriptions' % name]['%s-PDU' % name]
+        assert( PDU_snap is not PDU )
+        for p in pkts:
+            PDU.from_aper(p)
+            PDU_snap.from_aper(p)
+            assert( PDU_snap() == PDU() )
+            assert( PDU_snap.to_aper() == p )
+
+def test_lteran_snapshot():
+    _load_lteran()
+    _test_lteran_snapshot()
+
+def _test_lteran_trusted():
+    # out of constraint value, INTEGER (0..255)
+    PC = GLOBAL.MOD['S1AP-CommonDataTypes']['ProcedureCode']
+    buf = b'\x02\x02\x01\x00'
+    err = False
+    try:
+        PC.from_ber(buf)
+    except ASN1ObjErr:
+        err = True
+    assert( err )
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    ASN1Obj._SAFE_DEC = False
+    try:
+        PC.from_ber(buf)
+        assert( PC() == 256 )
+        err = False
+        try:
+            PC.validate()
+        except ASN1ObjErr:
+            err = True
+        assert( err )
+        for p in pkts_s1ap:
+            S1PDU.from_aper(p)
+            S1PDU.validate()
+            assert( S1PDU.to_aper() == p )
+    finally:
+        ASN1Obj._SAFE_DEC = True
+
+def test_lteran_trusted():
+    _load_lteran()
+    _test_lteran_trusted()
+
+def _test_lteran_class_lut():
+    EP = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-ELEMENTARY-PROCEDURES']
+    vals = EP._val.root + EP._val.ext
+    for v in vals:
+        assert( EP('procedureCode', v['procedureCode']) is v )
+    assert( EP('procedureCode', 255) is None )
+    # the index is rebuilt when the values set changes
+    val = EP._val
+    EP._val = ASN1Set(rv=vals[1:], ev=None)
+    try:
+        assert( EP('procedureCode', vals[0]['procedureCode']) is None )
+        assert( EP('procedureCode', vals[1]['procedureCode']) is vals[1] )
+    finally:
+        EP._val = val
+    assert( EP('procedureCode', vals[0]['procedureCode']) is vals[0] )
+
+def test_lteran_class_lut():
+    _load_lteran()
+    _test_lteran_class_lut()
+
+def _test_lteran_cache():
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    vals = []
+    for p in pkts_s1ap:
+        S1PDU.from_aper(p)
+        vals.append( S1PDU() )
+    cache = LRUCache(len(pkts_s1ap)-1, copy_val)
+    ASN1Obj._DEC_CACHE = cache
+    try:
+        for i in range(2):
+            for p, v in zip(pkts_s1ap, vals):
+                S1PDU.from_aper(p)
+                assert( S1PDU() == v )
+                # values returned are never shared with the cache
+                S1PDU._val = ('initiatingMessage', {})
+                S1PDU.from_aper(p)
+                assert( S1PDU() == v )
+                assert( S1PDU.to_aper() == p )
+        n = len(pkts_s1ap)
+        assert( cache.stats() == {'size': n-1, 'maxsize': n-1, 'hits': 2*n,
+                                  'misses': 2*n, 'evictions': n+1} )
+        # PDU decoded with another codec are cached separately
+        S1PDU.from_aper(pkts_s1ap[-1])
+        S1PDU.from_ber(S1PDU.to_ber())
+        assert( S1PDU() == vals[-1] )
+        assert( cache.misses == 2*n+1 )
+        # and so are PDU decoded lazily or without constraints verification
+        ASN1Obj._SAFE_DEC = False
+        S1PDU.from_aper(pkts_s1ap[-1])
+        assert( cache.misses == 2*n+2 )
+        ASN1Obj._SAFE_DEC, ASN1Obj._LAZY = True, True
+        S1PDU.from_aper(pkts_s1ap[-1])
+        assert( cache.misses == 2*n+3 )
+    finally:
+        ASN1Obj._DEC_CACHE = None
+        ASN1Obj._SAFE_DEC, ASN1Obj._LAZY = True, False
+
+def test_lteran_cache():
+    _load_lteran()
+    _test_lteran_cache()
+
+def _test_lteran_prepenc():
+    from pycrate_asn1rt.prepenc import ASN1PrepEnc
+    S1PDU = GLOBAL.MOD['S1AP-PDU-Descriptions']['S1AP-PDU']
+    # InitialContextSetupResponse
+    S1PDU.from_aper(pkts_s1ap[7])
+    val = S1PDU()
+    ies = ['successfulOutcome', 'value', 'InitialContextSetupResponse', 'protocolIEs']
+    paths = [ies + [0, 'value', 'MME-UE-S1AP-ID'],
+             ies + [1, 'value', 'ENB-UE-S1AP-ID'],
+             ies + [2, 'value', 'E-RABSetupListCtxtSURes', 0, 'value',
+                    'E-RABSetupItemCtxtSURes', 'gTP-TEID']]
+    vals = [(0, 0, b'\0\0\0\0'), (127, 127, b'\xff\xff\xff\xff'),
+            (17, 42, b'\x01\x02\x03\x04'), (100000, 42, b'\x01\x02\x03\x04')]
+    for codec in ('aper', 'uper', 'ber', 'oer', 'coer'):
+        PE = ASN1PrepEnc(S1PDU, val, paths, codec)
+        enc = getattr(S1PDU, 'to_%s' % codec)
+        for v in vals:
+            assert( PE.encode(*v) == enc(PE.get_val(*v)) )
+        if codec in ('aper', 'ber'):
+            # MME-UE-S1AP-ID encoded size changes for the last value
+            assert( (PE.patched, PE.full) == (3, 1) )
+        else:
+            assert( (PE.patched, PE.full) == (4, 0) )
+        # values out of constraint are never patched
+        for v in ((1<<32, 42, b'\0\0\0\0'), (17, 1<<24, b'\0\0\0\0')):
+            try:
+                PE.encode(*v)
+            except ASN1ObjErr:
+                pass
+            else:
+                assert()
+    assert( PE.encode(*vals[0]) != PE.encode(*vals[1]) )
+
+def test_lteran_prepenc():
+    _load_lteran()
+    _test_lteran_prepenc()
+
 
 # https://wiki.wireshark.org/SampleCaptures?action=AttachFile&do=view&target=gsm_map_with_ussd_string.pcap
 pkts_tcap_map = tuple(map(unhexlify, (
@@ -1577,6 +2113,84 @@ def test_tcap_map():
     _load_tcap_map()
     _test_tcap_map()
 
+def _test_tcap_map_file():
+    import os
+    from tempfile               import mkstemp
+    from pycrate_asn1rt.berscan import BERFile, iter_tlv, tlv_end
+    M = GLOBAL.MOD['TCAP-MAP-Messages']['TCAP-MAP-Message']
+    vals = [M.decode(p, 'ber') for p in pkts_tcap_map]
+    # messages as top-level records, then wrapped into an undefinite length
+    # SEQUENCE, as level 1 records
+    bufs = [b''.join(pkts_tcap_map),
+            b'\x30\x80' + b''.join(pkts_tcap_map) + b'\0\0']
+    for depth, buf in enumerate(bufs):
+        assert( tlv_end(buf) == len(buf) )
+        fd, path = mkstemp()
+        os.write(fd, buf)
+        os.close(fd)
+        try:
+            with BERFile(path, depth=depth) as f:
+                assert( len(f) == len(pkts_tcap_map) )
+                for i, p in enumerate(pkts_tcap_map):
+                    assert( f[i] == p )
+                    assert( f.decode(i, M) == vals[i] )
+                f.save_index(path + '.idx')
+            with BERFile(path, depth=depth, use_mmap=False) as f:
+                f.load_index(path + '.idx')
+                assert( [bytes(r) for r in f] == list(pkts_tcap_map) )
+        finally:
+            os.remove(path)
+            if os.path.exists(path + '.idx'):
+                os.remove(path + '.idx')
+    # all levels events, including EOC
+    evts = list(iter_tlv(bufs[1], depth=None))
+    assert( evts[0] == (0, (0, 1, 16), -1, 2) )
+    assert( evts[-1] == (len(bufs[1])-2, (0, 0, 0), 0, 2) )
+    try:
+        list(iter_tlv(bufs[1][:-2]))
+    except ASN1BERDecodeErr:
+        err = True
+    else:
+        err = False
+    assert( err )
+
+def test_tcap_map_file():
+    _load_tcap_map()
+    if 'TCAP-MAP-Messages' not in GLOBAL.MOD:
+        from importlib import reload
+        from pycrate_asn1dir import TCAP_MAP
+        reload(TCAP_MAP)
+    _test_tcap_map_file()
+
+def _test_tcap_map_tlvarray():
+    from pycrate_asn1rt.berscan import TLVArray
+    M = GLOBAL.MOD['TCAP-MAP-Messages']['TCAP-MAP-Message']
+    for p in pkts_tcap_map:
+        val = M.decode(p, 'ber')
+        for buf in (p, M.to_cer(val)):
+            # definite and undefinite length forms
+            tlvs = TLVArray(buf)
+            assert( tlvs.to_tlv(0) == ASN1CodecBER.decode_single(Charpy(buf))[0] )
+            assert( tlvs.decode(0, M) == val )
+            assert( tlvs.par[0] == -1 and tlvs.tend[0] == len(buf) )
+            for i in tlvs.find(0, 6):
+                # OBJECT IDENTIFIER
+                assert( tlvs.get_tag(i) == (0, 0, 6) )
+                assert( tlvs.lval[i] == len(tlvs.value(i)) )
+            for i in tlvs.children(0):
+                assert( tlvs.get_level(i) == 1 )
+        # walking the top-level TLV only
+        tlvs = TLVArray(p + p, depth=0)
+        assert( len(tlvs) == 2 and tlvs.off[1] == len(p) )
+
+def test_tcap_map_tlvarray():
+    _load_tcap_map()
+    if 'TCAP-MAP-Messages' not in GLOBAL.MOD:
+        from importlib import reload
+        from pycrate_asn1dir import TCAP_MAP
+        reload(TCAP_MAP)
+    _test_tcap_map_tlvarray()
+
 
 # https://wiki.wireshark.org/SampleCaptures?action=AttachFile&do=get&target=camel.pcap
 # https://wiki.wireshark.org/SampleCaptures?action=AttachFile&do=get&target=camel2.pcap
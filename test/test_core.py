@@ -192,6 +192,22 @@ def test_pack():
     assert( pack_val(*val2) == ( \
              b'\x89\x05\x07\xff\xff\xff`\x00\x00\x00\x00\x00\x01\x00 \x00\x00\x00\x00\x00\x00N"\x84\x84\x84\x84\x84\xc2\xc4\xc6\xc8\xca\xcf\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xfc\x9c\xa3e#\xa2\x16\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x06a\xef\xdf.;\x19\xf7\xc0E\xf1V66666666666666666666666666666666666666666666666660',
              3228) )
+    
+    # same results with the CharpyWriter
+    for val in (val0, val1, val2):
+        w = CharpyWriter()
+        w.write_pack(val)
+        assert( w.len_bit() == pack_val(*val)[1] )
+        assert( w.to_bytes() == bytes(w.flush()) == pack_val(*val)[0] )
+    # caller-provided buffer
+    buf = bytearray(b'\xff')
+    w = CharpyWriter(buf)
+    w.write_uint(1, 1)
+    w.write_int_le(-2, 16)
+    w.write_bytes(b'AB', 12)
+    assert( w.flush() is buf and buf == b'\xff\xff\x7f\xa0\xa0' )
+    w.reset()
+    assert( buf == b'' and w.len_bit() == 0 )
 
 def test_charpy():
     
@@ -285,6 +301,25 @@ def test_charpy():
     A.set_int_le(-1816384134241655602, 15*8)
     assert( A.to_bytes() == b'\xce\xe4\xde\xe6@\xe8\xca\xe6\xff\xff\xff\xff\xff\xff\xff' )
     
+    # bytearray and memoryview buffers are not copied
+    A = Charpy( bytes_long )
+    for buf in (bytearray(bytes_long), memoryview(bytes_long)):
+        B = Charpy( buf )
+        assert( B._view )
+        for i in range(1, 8):
+            A._cur, B._cur = i, i
+            assert( B.to_bytes() == A.to_bytes() )
+            assert( B.to_uint() == A.to_uint() )
+            assert( B.to_int() == A.to_int() )
+            assert( B.get_uint(3*i) == A.get_uint(3*i) )
+            assert( B.get_bytes(11*i) == A.get_bytes(11*i) )
+        B.rewind()
+        view = B.get_view(80)
+        assert( isinstance(view, memoryview) and view.obj is B._buf.obj )
+        assert( view.tobytes() == bytes_long[:10] )
+        B.append_bytes( b'test' )
+        assert( B.to_bytes() == bytes_long[10:] + b'test' )
+    
 
 def test_elt_1():
     
@@ -480,6 +515,95 @@ def test_elt_2():
     
     return t
 
+def test_elt_fused():
+    
+    class TestF(Envelope):
+        
+        _GEN = (
+            Uint8('U8'),
+            Uint16('U16'),
+            Int32('I32'),
+            Uint64('U64'),
+            Uint('F', bl=4),
+            Uint('res', bl=4),
+            Uint8LE('U8LE'),
+            Uint16LE('U16LE'),
+            Int64LE('I64LE'),
+            Uint16('U16_2'),
+            Uint8('L'),
+            Buf('V')
+            )
+        
+        def __init__(self, *args, **kwargs):
+            Envelope.__init__(self, *args, **kwargs)
+            self['L'].set_valauto(lambda: self['V'].get_len())
+            self['V'].set_blauto(lambda: 8*self['L'].get_val())
+    
+    plan = TestF._get_fused_plan()
+    assert( [(r[0], r[1], r[2].format, r[3]) for r in plan] == \
+            [(0, 4, '>BHiQ', 120), (6, 9, '<BHq', 88), (9, 11, '>HB', 24)] )
+    
+    val = [1, 2000, -3, 2**63, 5, 0, 6, 7000, -8, 9000, 4, b'test']
+    t = TestF(val=val)
+    buf = t.to_bytes()
+    assert( buf == b'\x01\x07\xd0\xff\xff\xff\xfd\x80\x00\x00\x00\x00\x00\x00\x00P\x06X\x1b\xf8'\
+                   b'\xff\xff\xff\xff\xff\xff\xff#(\x04test' )
+    t1 = TestF()
+    t1.from_bytes(buf)
+    assert( t1.get_val() == val )
+    assert( t1.to_buf(bytearray(b'\x00')) == b'\x00' + buf )
+    # same results with the generic codec
+    Envelope.ENV_FUSED = False
+    try:
+        t2 = TestF()
+        t2.from_bytes(buf)
+        assert( t2.get_val() == val )
+        assert( t2.to_bytes() == buf )
+    finally:
+        Envelope.ENV_FUSED = True
+    # instance changes and unaligned content fall back to the generic codec
+    t1['U16'].set_bl(12)
+    t1['U16'].set_val(4000)
+    buf = t1.to_bytes()
+    assert( len(buf) == 34 )
+    t2 = TestF()
+    t2['U16'].set_bl(12)
+    t2.from_bytes(buf)
+    assert( t2.get_val() == [1, 4000] + val[2:] )
+    assert( t2.to_bytes() == buf )
+
+def test_elt_clone():
+    
+    class TestC(Envelope):
+        _GEN = (
+            Uint8('U8'),
+            Envelope('E', GEN=(
+                Uint16('U16', val=10),
+                Buf('B', val=b'ab', bl=16)
+                ), hier=1),
+            Uint32('U32', hier=2)
+            )
+    
+    t1 = TestC()
+    t2 = TestC()
+    # instances do not share their content, but still share class attributes
+    assert( t1['E'] is not t2['E'] and t1[1][0] is not t2[1][0] )
+    assert( t1[1][0]._env is t1['E'] and t1['E']._env is t1 )
+    assert( '_GEN' not in t1.__dict__ and '_fmt' not in t1[0].__dict__ )
+    assert( t1.get_val() == t2.get_val() == [0, [10, b'ab'], 0] )
+    assert( t1['E'].get_hier() == 1 and t1['U32'].get_hier() == 2 )
+    t1['E']['U16'].set_val(20)
+    t1['E'].set_trans(True)
+    t3 = t1.clone()
+    assert( t3['E'].get_val() == [20, b'ab'] and t3['E'].get_trans() )
+    assert( t3._by_name == t1._by_name and t3._by_id != t1._by_id )
+    t3['E']['U16'].set_val(30)
+    t3['E'].set_trans(False)
+    assert( t1['E']['U16'].get_val() == 20 and t2['E']['U16'].get_val() == 10 )
+    assert( t1['E'].get_trans() and t1.to_bytes() == b'\x00\x00\x00\x00\x00' )
+    assert( t3.to_bytes() == b'\x00\x00\x1eab\x00\x00\x00\x00' )
+    assert( t3.to_buf() == t3.to_bytes() )
+
 
 #------------------------------------------------------------------------------#
 # performance tests
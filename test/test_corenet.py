@@ -0,0 +1,450 @@
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software: you can redistribute it and/or modify
+# * it under the terms of the GNU General Public License version 2 as published
+# * by the Free Software Foundation.
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# * GNU General Public License for more details.
+# *
+# * You will find a copy of the terms and conditions of the GNU General Public
+# * License version 2 in the "license.txt" file or
+# * see http://www.gnu.org/licenses/ or write to the Free Software Foundation,
+# * Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+# *
+# *--------------------------------------------------------
+# * File Name : test/test_corenet.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+# pycrate_corenet requires the pysctp and CryptoMobile libraries
+
+import asyncio
+import multiprocessing
+import socket
+from errno     import EAGAIN
+from struct    import pack
+from threading import Event, get_ident
+
+from pycrate_mobile              import NAS
+from pycrate_corenet.utils       import *
+from pycrate_corenet.HdlrENB     import ENBd
+from pycrate_corenet.Server      import CorenetServer
+from pycrate_corenet.ServerShard import CorenetServerSharded, ShardUE
+from pycrate_corenet.ServerAsync import CorenetServerAsync, LocalTransport
+from pycrate_corenet             import ServerGTPU
+from pycrate_corenet.ServerGTPU  import GTPUd, _mp as _gtpu_mp
+from pycrate_core.elt            import Envelope
+from pycrate_core.base           import Buf
+from pycrate_ether.IP            import IPv4, UDP
+
+
+# S1AP PDUs, as values
+def _s1ap_s1setup():
+    # S1SetupRequest
+    ies = [{'id': 59, 'criticality': 'reject',
+            'value': ('Global-ENB-ID', {'pLMNidentity': b'\x00\xf1\x10',
+                                        'eNB-ID': ('macroENB-ID', (1, 20))})},
+           {'id': 64, 'criticality': 'reject',
+            'value': ('SupportedTAs', [{'tAC': b'\x00\x01',
+                                        'broadcastPLMNs': [b'\x00\xf1\x10']}])},
+           {'id': 137, 'criticality': 'ignore', 'value': ('PagingDRX', 'v128')}]
+    return ('initiatingMessage', {'procedureCode': 17, 'criticality': 'reject',
+                                  'value': ('S1SetupRequest', {'protocolIEs': ies})})
+
+def _s1ap_initue(enb_ue_id, nas_pdu, mtmsi=None):
+    # InitialUEMessage
+    ies = [{'id': 8, 'criticality': 'reject', 'value': ('ENB-UE-S1AP-ID', enb_ue_id)},
+           {'id': 26, 'criticality': 'reject', 'value': ('NAS-PDU', nas_pdu)},
+           {'id': 67, 'criticality': 'reject', 'value': ('TAI', {'pLMNidentity': b'\x00\xf1\x10',
+                                                                   'tAC': b'\x00\x01'})}]
+    if mtmsi is not None:
+        ies.append({'id': 96, 'criticality': 'reject',
+                    'value': ('S-TMSI', {'mMEC': b'\x01', 'm-TMSI': uint_to_bytes(mtmsi, 32)})})
+    return ('initiatingMessage', {'procedureCode': 12, 'criticality': 'ignore',
+                                  'value': ('InitialUEMessage', {'protocolIEs': ies})})
+
+def _s1ap_ulnas(mme_ue_id, enb_ue_id, nas_pdu):
+    # UplinkNASTransport
+    ies = [{'id': 0, 'criticality': 'reject', 'value': ('MME-UE-S1AP-ID', mme_ue_id)},
+           {'id': 8, 'criticality': 'reject', 'value': ('ENB-UE-S1AP-ID', enb_ue_id)},
+           {'id': 26, 'criticality': 'reject', 'value': ('NAS-PDU', nas_pdu)}]
+    return ('initiatingMessage', {'procedureCode': 13, 'criticality': 'ignore',
+                                  'value': ('UplinkNASTransport', {'protocolIEs': ies})})
+
+def _s1ap_relcompl(mme_ue_id, enb_ue_id):
+    # UEContextReleaseComplete
+    ies = [{'id': 0, 'criticality': 'ignore', 'value': ('MME-UE-S1AP-ID', mme_ue_id)},
+           {'id': 8, 'criticality': 'ignore', 'value': ('ENB-UE-S1AP-ID', enb_ue_id)}]
+    return ('successfulOutcome', {'procedureCode': 23, 'criticality': 'reject',
+                                  'value': ('UEContextReleaseComplete', {'protocolIEs': ies})})
+
+def _s1ap_enbconf():
+    # ENBConfigurationUpdate, non-UE-associated
+    ies = [{'id': 60, 'criticality': 'ignore', 'value': ('ENBname', 'enb')}]
+    return ('initiatingMessage', {'procedureCode': 29, 'criticality': 'reject',
+                                  'value': ('ENBConfigurationUpdate', {'protocolIEs': ies})})
+
+def _nas_attach(imsi):
+    # EMM Attach Request with the IMSI
+    EpsId = NAS.EPSID()
+    EpsId.encode(NAS.IDTYPE_IMSI, imsi)
+    return NAS.EMMAttachRequest(val={'EPSID': EpsId.to_bytes(),
+                                     'UENetCap': b'\xe0\xe0',
+                                     'ESMContainer': b'\x02\x01\xd0\x00'}).to_bytes()
+
+# NAS EMM Tracking Area Update Request
+nas_tau = unhexlify('0748610bf602f8108003c8c2e65e9a5804e060c0')
+# NAS EMM Attach Complete
+nas_attach_compl = unhexlify('074300035200c2')
+
+
+def _get_shard_front(shards):
+    # front process of a sharded server, without starting it
+    Srv = CorenetServerSharded.__new__(CorenetServerSharded)
+    Srv.SHARDS = shards
+    Srv._shard_route, Srv._shard_ue, Srv._shard_conn, conns = {}, {}, [], []
+    for i in range(shards):
+        conn, conn_shard = multiprocessing.Pipe()
+        Srv._shard_conn.append(conn)
+        conns.append(conn_shard)
+    Srv.RAN = {('00101', '00001'): ENBd.__new__(ENBd)}
+    Srv.SCTPCli = {'sk': ('00101', '00001')}
+    return Srv, conns
+
+def _route(Srv, conns, pdu, sid=1):
+    # processes pdu received from the eNB on the SCTP stream sid, and returns
+    # the index of the shard it has been forwarded to
+    Srv.process_stream_msg('sk', SCTP_PPID_S1AP, sid, b'', pdu)
+    idx = [i for i, conn in enumerate(conns) if conn.poll()]
+    assert( len(idx) == 1 )
+    assert( conns[idx[0]].recv() == ('s1ap', ('00101', '00001'), sid, pdu) )
+    return idx[0]
+
+def _register_ue(Srv, conns, idx, imsi):
+    # the shard idx registers a UE context for imsi
+    UE = ShardUE(conns[idx])
+    UE[imsi] = None
+    Srv.handle_shard_msg(Srv._shard_conn[idx])
+
+def test_shard_route():
+    Srv, conns = _get_shard_front(4)
+    imsi = '001010123456789'
+    #
+    # attach with the IMSI
+    idx = _route(Srv, conns, _s1ap_initue(1, _nas_attach(imsi)))
+    assert( idx == int(imsi) % 4 )
+    _register_ue(Srv, conns, idx, imsi)
+    assert( _route(Srv, conns, _s1ap_ulnas(10, 1, nas_attach_compl)) == idx )
+    assert( _route(Srv, conns, _s1ap_relcompl(10, 1)) == idx )
+    assert( Srv._shard_route == {} )
+    #
+    # TAU with the M-TMSI allocated by the shard, on the common stream too
+    Shard = CorenetServerSharded.__new__(CorenetServerSharded)
+    Shard.SHARDS, Shard.ShardIdx = 4, idx
+    mtmsi = Shard.get_new_tmsi()
+    assert( _route(Srv, conns, _s1ap_initue(2, nas_tau, mtmsi), sid=0) == idx )
+    assert( _route(Srv, conns, _s1ap_ulnas(11, 2, nas_tau), sid=0) == idx )
+    #
+    # non-UE-associated PDUs stay in the front process, whatever the stream
+    assert( not Srv.route_s1ap_ue_pdu(('00101', '00001'), 1, _s1ap_enbconf()) )
+    #
+    # UE first seen with an M-TMSI not allocated by any shard
+    imsi = '001010123456790'
+    mtmsi = 4*0x1000 + (int(imsi) + 1) % 4
+    idx = _route(Srv, conns, _s1ap_initue(3, nas_tau, mtmsi))
+    assert( idx == mtmsi % 4 )
+    _register_ue(Srv, conns, idx, imsi)
+    assert( _route(Srv, conns, _s1ap_relcompl(12, 3)) == idx )
+    # attach again with the IMSI, in the shard owning the UE context
+    assert( _route(Srv, conns, _s1ap_initue(4, _nas_attach(imsi))) == idx )
+
+
+class CorenetServerLocal(CorenetServerAsync):
+    # eNodeBs are LocalPeer, and no sub-server is started
+    TRANSPORT  = LocalTransport
+    SERVER_HNB = {}
+    SERVER_ENB = {'INET': socket.AF_INET, 'IP': '127.0.0.1', 'port': 36412,
+                  'MAXCLI': 4, 'errclo': False}
+    AUCd       = None
+    GTPUd      = None
+    SMSd       = None
+    DEBUG      = ()
+    RAN_CONNECT_ANY  = True
+    RAN_ALLOWED_PLMN = ['00101']
+
+def _s1ap_recv(peer):
+    # returns the S1AP PDU sent by the server to the LocalPeer and its stream
+    msg = peer.recv(5)
+    assert( msg is not None and msg[1] == SCTP_PPID_S1AP )
+    return PDU_S1AP.decode(msg[0]), msg[2]
+
+def test_async_local():
+    s1setup  = PDU_S1AP.encode(_s1ap_s1setup())
+    ulnas    = PDU_S1AP.encode(_s1ap_ulnas(10, 1, nas_attach_compl))
+    Srv = CorenetServerLocal()
+    try:
+        while not Srv._running or Srv._sk_enb.Loop is None:
+            sleep(0.01)
+        peer = Srv._sk_enb.connect()
+        #
+        # S1 setup, on the common stream
+        peer.send(s1setup, SCTP_PPID_S1AP, 0)
+        pdu, sid = _s1ap_recv(peer)
+        assert( pdu[0] == 'successfulOutcome' and pdu[1]['procedureCode'] == 17 )
+        assert( sid == 0 )
+        assert( list(Srv.SCTPCli.values()) == [('00101', '00001')] )
+        #
+        # UE-associated signalling, for an eNB UE context unknown to the MME
+        peer.send(ulnas, SCTP_PPID_S1AP, 1)
+        pdu, sid = _s1ap_recv(peer)
+        assert( pdu[0] == 'initiatingMessage' and pdu[1]['procedureCode'] == 15 )
+        ies = dict([(ie['id'], ie['value'][1]) for ie in pdu[1]['value'][1]['protocolIEs']])
+        assert( ies[2] == ('radioNetwork', 'unknown-enb-ue-s1ap-id') )
+        #
+        peer.close()
+        assert( peer.recv(5) is None and peer.closed )
+    finally:
+        Srv.stop()
+
+def test_async_handler():
+    # RAN handlers are run out of the event loop, which is not blocked by them
+    Srv = CorenetServerLocal()
+    release, tid = Event(), []
+    def process_new_enb(sk, ppid, sid, buf, pdu):
+        tid.append(get_ident())
+        release.wait(5)
+    Srv.process_new_enb = process_new_enb
+    try:
+        while not Srv._running or Srv._sk_enb.Loop is None:
+            sleep(0.01)
+        peer = Srv._sk_enb.connect()
+        peer.send(PDU_S1AP.encode(_s1ap_s1setup()), SCTP_PPID_S1AP, 0)
+        while not tid:
+            sleep(0.01)
+        fut = asyncio.run_coroutine_threadsafe(asyncio.sleep(0, 'loop'), Srv._loop)
+        assert( fut.result(1) == 'loop' )
+        assert( tid[0] != Srv._sk_enb._tid )
+    finally:
+        release.set()
+        Srv.stop()
+
+
+class _FakeSk(object):
+    # socket stand-in, returning the packets of rx with recv_into(), and
+    # recording in tx the packets sent with sendmsg() or sendto()
+    
+    def __init__(self, rx=()):
+        self.rx, self.tx = list(rx), []
+    
+    def recv_into(self, buf):
+        if not self.rx:
+            raise(socket.error(EAGAIN, 'no packet'))
+        pkt = self.rx.pop(0)
+        buf[:len(pkt)] = pkt
+        return len(pkt)
+    
+    def sendmsg(self, bufs, anc, flags, addr):
+        self.tx.append( (b''.join([bytes(b) for b in bufs]), addr) )
+    
+    def sendto(self, buf, addr):
+        self.tx.append( (bytes(buf), addr) )
+
+
+class _FakeARPd(object):
+    ROUTER_MAC_BUF = b'\x02\0\0\0\0\x01'
+    def resolve(self, ip):
+        return self.ROUTER_MAC_BUF
+
+
+def _get_gtpud(cnt=None):
+    # GTPUd without any socket nor ARP resolver, for the main process or a
+    # forwarding worker sharing the counters cnt
+    G = GTPUd.__new__(GTPUd)
+    G.DEBUG, G.BURST, G.WORKERS = (), 4, 2
+    G.GGSN_MAC_BUF = mac_aton(G.GGSN_MAC_ADDR)
+    G._mobiles_addr, G._mobiles_teid, G.stats, G.MOD = {}, {}, {}, []
+    G._prot_dict = {1:'ICMP', 6:'TCP', 17:'UDP'}
+    G._cnt = _gtpu_mp.RawArray('L', 8) if cnt is None else cnt
+    G._wk, G._wk_proc, G._wk_conn = 0, [], []
+    G.sk_ext_v4, G.sk_ext_v6, G.sk_int = _FakeSk(), _FakeSk(), _FakeSk()
+    G._init_bufs()
+    G.arpd = _FakeARPd()
+    return G
+
+def _ip_udp(src, dst, data):
+    # IPv4 / UDP packet
+    return Envelope('pkt', GEN=(IPv4(val={'src': src, 'dst': dst}, hier=0),
+                                UDP(val={'src': 5000, 'dst': 5001}, hier=1),
+                                Buf('data', val=data, hier=2))).to_bytes()
+
+def _gtpu_ul(teid, ip):
+    return pack('>BBHI', 0x30, 0xff, len(ip), teid) + ip
+
+def _run_gtpu_worker(W, pkts):
+    # forwarding worker: processes the commands from the main process until
+    # told to stop, then forwards the UL packets pkts and sends its state back
+    W._listening = True
+    while W._listening:
+        W._process_cmd()
+    W.sk_int.rx = pkts
+    while W.sk_int.rx:
+        W._handle_sk(W.sk_int)
+    W._conn.send( (W._mobiles_teid, W._mobiles_addr, W.sk_ext_v4.tx) )
+
+def test_gtpu_workers():
+    G = _get_gtpud()
+    W = _get_gtpud(G._cnt)
+    conn, W._conn = _gtpu_mp.Pipe()
+    G._wk_conn, W._wk = [conn], 1
+    pkts = [_gtpu_ul(0x10, _ip_udp('10.0.0.1', '10.1.0.1', i*b'A')) for i in range(6)]
+    proc = _gtpu_mp.Process(target=_run_gtpu_worker, args=(W, pkts))
+    proc.start()
+    try:
+        # mobiles' contexts are forwarded to the worker
+        G.add_mobile(0x10, (1, '10.0.0.1'), '127.0.1.1', 0x20)
+        G.add_mobile(0x11, (1, '10.0.0.2'), '127.0.1.1', 0x21)
+        G.rem_mobile(0x11)
+        G.set_mobile_dl(0x10, teid_dl=0x30)
+        G._wk_send('stop')
+        assert( conn.poll(10) )
+        mobiles_teid, mobiles_addr, tx = conn.recv()
+        assert( mobiles_teid == G._mobiles_teid == {0x10: ['127.0.1.1', 0x30, b'\x0a\0\0\x01', 1]} )
+        assert( mobiles_addr == G._mobiles_addr == {b'\x0a\0\0\x01': 0x10} )
+        assert( len(tx) == 6 )
+    finally:
+        proc.join(5)
+    # UL packets are counted in the worker's counters
+    assert( G.get_counters() == [
+        {'ul_pkts': 0, 'ul_bytes': 0, 'dl_pkts': 0, 'dl_bytes': 0},
+        {'ul_pkts': 6, 'ul_bytes': sum(map(len, pkts)), 'dl_pkts': 0, 'dl_bytes': 0}] )
+    # the worker stops when the main process is gone
+    conn.close()
+    W._listening = True
+    W._process_cmd()
+    assert( not W._listening )
+
+def test_gtpu_forward():
+    zerocopy = ServerGTPU._ZEROCOPY
+    try:
+        for zc in set((zerocopy, False)):
+            ServerGTPU._ZEROCOPY = zc
+            G = _get_gtpud()
+            G.add_mobile(0x10, (1, '10.0.0.1'), '127.0.1.1', 0x20)
+            # more packets than BURST, of different lengths, read in the same
+            # reusable buffers
+            ips_ul = [_ip_udp('10.0.0.1', '10.1.0.%i' % i, i*b'U') for i in range(10)]
+            ips_dl = [_ip_udp('10.1.0.%i' % i, '10.0.0.1', (10-i)*b'D') for i in range(10)]
+            G.sk_int.rx = [_gtpu_ul(0x10, ip) for ip in ips_ul]
+            # a packet from an unknown UE, and another with a spoofed source
+            G.sk_int.rx.insert(3, _gtpu_ul(0x11, ips_ul[0]))
+            G.sk_int.rx.insert(6, _gtpu_ul(0x10, _ip_udp('10.0.0.2', '10.1.0.1', b'S')))
+            ul_bytes = sum(map(len, G.sk_int.rx))
+            ethhdr = G.GGSN_MAC_BUF + b'\x02\0\0\0\0\x02\x08\0'
+            G.sk_ext_v4.rx = [ethhdr + ip for ip in ips_dl]
+            # DL packet to another IP address
+            G.sk_ext_v4.rx.insert(5, ethhdr + _ip_udp('10.1.0.1', '10.0.0.2', b'X'))
+            while G.sk_int.rx or G.sk_ext_v4.rx:
+                G._handle_sk(G.sk_int)
+                G._handle_sk(G.sk_ext_v4)
+            #
+            ethhdr_ul = _FakeARPd.ROUTER_MAC_BUF + G.GGSN_MAC_BUF + b'\x08\0'
+            assert( G.sk_ext_v4.tx == [(ethhdr_ul + ip, (G.EXT_IF, 0x0800)) for ip in ips_ul] )
+            assert( G.sk_int.tx == [(pack('>BBHI', 0x30, 0xff, len(ip), 0x20) + ip,
+                                     ('127.0.1.1', G.GTP_PORT)) for ip in ips_dl] )
+            assert( G.stats['10.0.0.1']['UDP'] == set([('10.1.0.%i' % i, 5001) for i in range(10)]) )
+            # all GTP-U packets received are counted in UL, only the forwarded
+            # IP packets in DL
+            assert( G.get_counters()[0] == {
+                'ul_pkts' : 12,
+                'ul_bytes': ul_bytes,
+                'dl_pkts' : 10,
+                'dl_bytes': sum(map(len, ips_dl))} )
+    finally:
+        ServerGTPU._ZEROCOPY = zerocopy
+
+
+class _FakeProc(object):
+    
+    def __init__(self, stop):
+        self.TimerStop = stop
+        self.aborted   = 0
+    
+    def _log(self, logtype, msg):
+        pass
+    
+    def abort(self):
+        self.aborted += 1
+
+
+class _FakeServer(object):
+    
+    clean_ue_proc = CorenetServer.clean_ue_proc
+    
+    def __init__(self):
+        self.Timers = ProcTimers()
+
+
+def test_proc_timers():
+    T = ProcTimers()
+    P1, P2, P3 = _FakeProc(3), _FakeProc(1), _FakeProc(2)
+    stack = [P1, P2, P3]
+    for P in stack:
+        T.add(P, stack)
+    assert( len(T) == 3 )
+    # expiry order, and each timer expires only once
+    assert( T.pop_expired(2.5) == [(P2, stack), (P3, stack)] )
+    assert( T.pop_expired(2.5) == [] )
+    assert( T.pop_expired(4) == [(P1, stack)] )
+    assert( len(T) == 0 )
+    #
+    # cancellation
+    T.add(P1, stack)
+    T.add(P2, stack)
+    T.cancel(P1)
+    T.cancel(P1)
+    assert( T.pop_expired(10) == [(P2, stack)] )
+    #
+    # re-registration with a later expiry cancels the previous one
+    P1.TimerStop = 1
+    T.add(P1, stack)
+    P1.TimerStop = 5
+    T.add(P1, stack)
+    assert( T.pop_expired(2) == [] )
+    assert( T.pop_expired(6) == [(P1, stack)] )
+    # and with an earlier expiry
+    T.add(P1, stack)
+    P1.TimerStop = 2
+    T.add(P1, stack)
+    assert( T.pop_expired(3) == [(P1, stack)] )
+    assert( T.pop_expired(6) == [] )
+    #
+    # procedures not in their stack anymore are not returned
+    T.add(P3, stack)
+    stack.remove(P3)
+    assert( T.pop_expired(10) == [] )
+    #
+    # clear
+    T.add(P1, stack)
+    T.clear()
+    assert( len(T) == 0 and P1._timer is None )
+    assert( T.pop_expired(10) == [] )
+    #
+    # the server aborts procedures in timeout once
+    S = _FakeServer()
+    P1, P2 = _FakeProc(time()-1), _FakeProc(time()+60)
+    stack = [P1, P2]
+    S.Timers.add(P1, stack)
+    S.Timers.add(P2, stack)
+    S.clean_ue_proc()
+    S.clean_ue_proc()
+    assert( P1.aborted == 1 and P2.aborted == 0 )
@@ -28,10 +28,14 @@
 
 from timeit   import timeit
 from binascii import unhexlify
+from io       import BytesIO
+from struct   import pack
 
+from pycrate_core.elt         import Envelope
 from pycrate_ether.Ethernet import *
 from pycrate_ether.ARP      import *
 from pycrate_ether.IP       import *
+from pycrate_ether.SCTP     import *
 from pycrate_ether.PCAP     import *
 
 # enable TCP / UDP checksum calculation
@@ -59,6 +63,103 @@ def test_eth(eth_frames=eth_frames):
         pkt = EthernetPacket()
         pkt.from_bytes(f)
 
+def test_pcap(eth_frames=eth_frames):
+    # pcap, written then read by chunks
+    fd = BytesIO()
+    with PcapWriter(fd) as w:
+        for i, f in enumerate(eth_frames):
+            w.write(f, ts=1000+i+0.25)
+        w.flush()
+        buf = fd.getvalue()
+    r = PcapReader(BytesIO(buf))
+    r.CHUNK_LEN = 64
+    assert( [(ts, lt, rec.tobytes()) for (ts, lt, rec) in r] == \
+            [(1000+i+0.25, 1, f) for i, f in enumerate(eth_frames)] )
+    assert( r.fmt == 'pcap' )
+    r = PcapReader(BytesIO(buf[:-10]))
+    for ts, lt, pkt in r.iter_decoded():
+        assert( isinstance(pkt, EthernetPacket) )
+    assert( pkt.to_bytes() == eth_frames[-2] )
+    #
+    # pcapng, with nanosecond resolution, enhanced and simple packet blocks
+    def blk(typ, body):
+        body += (-len(body)%4) * b'\0'
+        return pack('<II', typ, 12+len(body)) + body + pack('<I', 12+len(body))
+    buf = blk(0x0A0D0D0A, pack('<IHHq', 0x1A2B3C4D, 1, 0, -1)) + \
+          blk(1, pack('<HHIHHB3sI', 1, 0, 0, 9, 1, 9, b'', 0))
+    for i, f in enumerate(eth_frames):
+        ts = (2000+i) * 10**9 + 500
+        buf += blk(6, pack('<IIIII', 0, ts>>32, ts & 0xffffffff, len(f), len(f)) + f)
+    buf += blk(3, pack('<I', len(eth_frames[0])) + eth_frames[0])
+    r = PcapReader(BytesIO(buf))
+    recs = [(ts, lt, rec.tobytes()) for (ts, lt, rec) in r]
+    assert( r.fmt == 'pcapng' )
+    assert( [rec[1:] for rec in recs] == [(1, f) for f in eth_frames + eth_frames[:1]] )
+    assert( [int(rec[0]) for rec in recs[:-1]] == [2000, 2001, 2002] and recs[-1][0] is None )
+
+def sctp_frame(chunks, src='10.0.0.1', dst='10.0.0.2', sport=36412, dport=36412):
+    # chunks: list of (flags, TSN, SID, SSN, PPID, data)
+    pkt = Envelope('frame', GEN=(
+        Ethernet(hier=0),
+        IPv4(val={'src': src, 'dst': dst, 'proto': 132}, hier=1),
+        SCTP(val={'src': sport, 'dst': dport}, hier=2)) + \
+        tuple([SCTPData(val={'U': (c[0]>>2)&1, 'B': (c[0]>>1)&1, 'E': c[0]&1,
+                             'TSN': c[1], 'SID': c[2],
+                             'SSN': c[3], 'PPID': c[4], 'data': c[5]}, hier=3) \
+               for c in chunks]))
+    return pkt.to_bytes()
+
+def test_sctp():
+    msgs = [b'A'*17, b'BBBB', b'C'*100]
+    frames = [sctp_frame([(3, 10, 0, 0, 18, msgs[0]), (3, 11, 1, 0, 18, msgs[1])]),
+              # retransmission
+              sctp_frame([(3, 11, 1, 0, 18, msgs[1])]),
+              # fragmented message
+              sctp_frame([(2, 12, 1, 1, 18, msgs[2][:30])]),
+              sctp_frame([(0, 13, 1, 1, 18, msgs[2][30:60])]),
+              sctp_frame([(1, 14, 1, 1, 18, msgs[2][60:])], sport=1000)]
+    reasm, ret = SCTPReassembler(), []
+    for f in frames:
+        src, dst, proto, pay = ip_payload(1, f)
+        assert( (src, dst, proto) == (b'\x0a\0\0\x01', b'\x0a\0\0\x02', 132) )
+        sport, dport, chunks = parse_sctp(pay)
+        for c in chunks:
+            ret.extend( reasm.feed((src, dst, sport, dport), *c) )
+    # last fragment is from another association
+    assert( ret == [(0, 18, msgs[0]), (1, 18, msgs[1])] )
+    data = SCTPData()
+    data.from_bytes(ip_payload(1, frames[3])[3][12:])
+    assert( data['TSN'].get_val() == 13 and data['data'].get_val() == msgs[2][30:60] )
+    # SCTP packets decoded within Ethernet frames, and with the SCTP data link
+    # type
+    pkt = decode_rec(1, frames[0])
+    assert( pkt.to_bytes() == frames[0] )
+    sctp = pkt['SCTPPacket']
+    assert( [c['data'].get_val() for c in sctp[1:]] == msgs[:2] )
+    pkt = decode_rec(248, ip_payload(1, frames[0])[3])
+    assert( pkt.to_bytes() == sctp.to_bytes() )
+    assert( pkt[2]['SID'].get_val() == 1 )
+    #
+    # ordered messages are delivered in SSN order, unordered ones at once
+    def feed(chunks):
+        sport, dport, chunks = parse_sctp(ip_payload(1, sctp_frame(chunks))[3])
+        ret = []
+        for c in chunks:
+            ret.extend( [m[2] for m in reasm.feed('key', *c)] )
+        return ret
+    reasm = SCTPReassembler()
+    reasm.SSN_WIN = 2
+    assert( feed([(3, 1, 2, 10, 18, b'a'), (3, 3, 2, 12, 18, b'c')]) == [b'a'] )
+    assert( feed([(7, 4, 2, 0, 18, b'u')]) == [b'u'] )
+    assert( feed([(3, 2, 2, 11, 18, b'b')]) == [b'b', b'c'] )
+    # 13 is lost, and is given up once more than SSN_WIN messages are held
+    assert( feed([(3, 6, 2, 14, 18, b'e'), (3, 7, 2, 15, 18, b'f')]) == [] )
+    assert( feed([(3, 8, 2, 16, 18, b'g')]) == [b'e', b'f', b'g'] )
+    # late message, delivered at once
+    assert( feed([(3, 5, 2, 13, 18, b'd')]) == [b'd'] )
+    # 17 has its first fragment lost, 18 is not held
+    assert( feed([(1, 10, 2, 17, 18, b'h'), (3, 11, 2, 18, 18, b'i')]) == [b'i'] )
+
 def test_perf_ip(eth_frames=eth_frames):
     
     print('[+] instantiating and parsing Ethernet frames')
@@ -66,6 +66,8 @@ class TestPycrate(unittest.TestCase):
         test_charpy()
         test_elt_1()
         test_elt_2()
+        test_elt_fused()
+        test_elt_clone()
     
     # fmt_media objects
     def test_media(self):
@@ -82,6 +84,8 @@ class TestPycrate(unittest.TestCase):
     def test_ether(self):
         print('[<>] testing pycrate_ether')
         test_ip(eth_frames)
+        test_pcap(eth_frames)
+        test_sctp()
     
     # asn1c
     def test_asn1c(self):
@@ -125,7 +129,21 @@ class TestPycrate(unittest.TestCase):
         test_rt_base()
         test_rrc3g()
         test_lteran()
+        test_lteran_perfast()
+        test_lteran_threads()
+        test_lteran_codec_ctx()
+        test_lteran_many()
+        test_lteran_trace()
+        test_lteran_lazy()
+        test_lteran_oer()
+        test_lteran_snapshot()
+        test_lteran_trusted()
+        test_lteran_class_lut()
+        test_lteran_cache()
+        test_lteran_prepenc()
         test_tcap_map()
+        test_tcap_map_file()
+        test_tcap_map_tlvarray()
         test_tcap_cap()
         test_X509()
     
@@ -140,6 +158,23 @@ class TestPycrate(unittest.TestCase):
         print('[<>] testing pycrate_mobile')
         test_nas_mo(nas_pdu_mo)
         test_nas_mt(nas_pdu_mt)
+    
+    # corenet
+    def test_corenet(self):
+        try:
+            from test.test_corenet import test_shard_route, test_async_local, \
+                                          test_async_handler, test_gtpu_workers, \
+                                          test_gtpu_forward, test_proc_timers
+        except ImportError:
+            # pysctp and CryptoMobile libraries are required
+            self.skipTest('pycrate_corenet not available')
+        print('[<>] testing pycrate_corenet')
+        test_shard_route()
+        test_async_local()
+        test_async_handler()
+        test_gtpu_workers()
+        test_gtpu_forward()
+        test_proc_timers()
 
 
 def test_perf_all():
@@ -45,6 +45,7 @@ from pycrate_asn1c.proc import compile_text, compile_spec, compile_all, \
 # -fautotags: force AUTOMATIC TAGS behaviour for all modules
 # -fextimpl: force EXTENSIBILITY IMPLIED behaviour for all modules
 # -fverifwarn: force warning instead of raising during the verification stage
+# -perfast: generated module builds specialized PER codec functions when loaded
 
 # output:
 # destination file or directory
@@ -72,6 +73,8 @@ def main():
                         help='force EXTENSIBILITY IMPLIED for all ASN.1 modules')
     parser.add_argument('-fverifwarn', action='store_true',
                         help='force warning instead of raising during the verification stage')
+    parser.add_argument('-perfast', action='store_true',
+                        help='build specialized PER codec functions when loading the output module')
     #
     args = parser.parse_args()
     #
@@ -136,6 +139,7 @@ def main():
         print('%s, args error: missing ASN.1 input(s) or specification name' % sys.argv[0])
         return 0
     
+    PycrateGenerator.PER_FAST = args.perfast
     generate_modules(PycrateGenerator, args.output + '.py')
     if args.json:
         generate_modules(JSONDepGraphGenerator, args.output + '.json')
@@ -33,10 +33,13 @@ import sys
 import argparse
 import pprint
 
+from io       import BytesIO
 from binascii import unhexlify, hexlify
 from pycrate_core.utils    import python_version, str_types, bytes_types
 from pycrate_core.charpy   import Charpy
+from pycrate_asn1rt.err    import ASN1Err
 from pycrate_asn1rt.codecs import ASN1CodecBER
+from pycrate_asn1rt.berscan import BERFile
         
 
 pprint.stdprinter = pprint.PrettyPrinter
@@ -60,8 +63,19 @@ def main():
     
     parser.add_argument('-i', dest='input', type=str,
                         help='file containing the binary encoded objects')
-    parser.add_argument('-s', dest='stream', type=bytes,
+    parser.add_argument('-s', dest='stream', type=str,
                         help='hexadecimal string encoding the objects')
+    parser.add_argument('-o', dest='offset', type=int, default=0,
+                        help='offset of the first object in the file or stream')
+    parser.add_argument('-d', dest='depth', type=int, default=0,
+                        help='nesting level of the objects to be printed (default 0)')
+    parser.add_argument('-l', dest='list', action='store_true',
+                        help='only list the objects, with their offset, tag and length')
+    parser.add_argument('-r', dest='record', type=int, action='append',
+                        help='print only the given object(s), by number')
+    parser.add_argument('-t', dest='tag', type=str,
+                        help='only list the TLVs with the given tag class and value, '\
+                             'e.g. 2.1 for [1], at any nesting level')
     #
     args = parser.parse_args()
     if args.input:
@@ -69,28 +83,64 @@ def main():
             fd = open(args.input, 'rb')
         except:
             print('%s, args error: file %s not found' % (sys.argv[0], args.input))
-            return 0
-        buf = fd.read()
-        fd.close()
+            return 1
     elif args.stream:
         try:
-            buf = unhexlify(args.stream)
+            fd = BytesIO(unhexlify(args.stream))
         except:
-            print('%s, args error: invalid hex stream' % (sys.argv[0], args.stream))
-            return 0
+            print('%s, args error: invalid hex stream %s' % (sys.argv[0], args.stream))
+            return 1
     else:
         print('%s, args error: missing input encoded object' % sys.argv[0])
-        return 0
+        return 1
+    if args.tag:
+        try:
+            tag = tuple(map(int, args.tag.split('.')))
+            assert( len(tag) == 2 )
+        except:
+            print('%s, args error: invalid tag %s' % (sys.argv[0], args.tag))
+            return 1
     #
+    # the file is mapped in memory and objects are scanned one at a time,
+    # hence the whole file is never loaded
+    ret = 0
+    with BERFile(fd, off=args.offset, depth=args.depth) as f:
+        try:
+            if args.tag:
+                tlvs = f.tlv_array()
+                for i in tlvs.find(*tag):
+                    print('TLV %i: offset %i, level %i, tag %r, length %i'\
+                          % (i, tlvs.off[i], tlvs.get_level(i), tlvs.get_tag(i), tlvs.lval[i]))
+            elif args.list:
+                cnt = 0
+                for off, tag, lval, hlen in f.iter_tlv(args.depth):
+                    print('object %i: offset %i, tag %r, header %i, length %i'\
+                          % (cnt, off, tag, hlen, lval))
+                    cnt += 1
+            elif args.record:
+                for cnt in args.record:
+                    if not 0 <= cnt < len(f):
+                        print('%s, args error: object %i not found, %i object(s) available'\
+                              % (sys.argv[0], cnt, len(f)))
+                        ret = 1
+                        break
+                    print_obj(cnt, f[cnt])
+            else:
+                for cnt, buf in enumerate(f):
+                    print_obj(cnt, buf)
+        except ASN1Err as err:
+            print('%s, decoding error: %s' % (sys.argv[0], err))
+            ret = 1
+    fd.close()
+    return ret
+
+
+def print_obj(cnt, buf):
     char = Charpy(buf)
-    cnt  = 0 
-    while char.len_bit() >= 16:
-        Obj, V = ASN1CodecBER.decode_tlv_ws(char)
-        print('\n' + 14*'--' + ' object %i' % cnt + 14*'--' + '\n')
-        pprint.pprint(V)
-        cnt += 1
-    return 0
-    
+    Obj, V = ASN1CodecBER.decode_tlv_ws(char)
+    print('\n' + 14*'--' + ' object %i' % cnt + 14*'--' + '\n')
+    pprint.pprint(V)
+
 if __name__ == '__main__':
     sys.exit(main())
 
@@ -0,0 +1,78 @@
+#!/usr/bin/python
+
+# -*- coding: UTF-8 -*-
+#/**
+# * Software Name : pycrate
+# * Version : 0.2
+# *
+# * Copyright 2026.
+# *
+# * This program is free software: you can redistribute it and/or modify
+# * it under the terms of the GNU General Public License version 2 as published
+# * by the Free Software Foundation. 
+# *
+# * This program is distributed in the hope that it will be useful,
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# * GNU General Public License for more details. 
+# *
+# * You will find a copy of the terms and conditions of the GNU General Public
+# * License version 2 in the "license.txt" file or
+# * see http://www.gnu.org/licenses/ or write to the Free Software Foundation,
+# * Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301 USA
+# *
+# *--------------------------------------------------------
+# * File Name : pycrate_tracedecode.py
+# * Created : 2026-10-18
+# * Authors : agent
+# *--------------------------------------------------------
+#*/
+
+import sys
+import argparse
+import json
+
+from pycrate_mobile.Trace import decode_trace
+
+
+def main():
+    
+    parser = argparse.ArgumentParser(description='decode S1AP, HNBAP, RUA and RANAP messages, '\
+             'and the NAS messages they contain, from a pcap or pcapng trace, '\
+             'and print them as JSON lines')
+    
+    parser.add_argument('-i', dest='input', type=str, required=True,
+                        help='pcap or pcapng file')
+    parser.add_argument('-o', dest='output', type=str,
+                        help='output file (default: stdout)')
+    parser.add_argument('-w', dest='workers', type=int, default=0,
+                        help='number of worker processes (default: 0, no worker)')
+    parser.add_argument('-c', dest='chunksize', type=int, default=64,
+                        help='number of messages dispatched at once to a worker (default: 64)')
+    parser.add_argument('--no-nas', dest='nas', action='store_false',
+                        help='do not decode NAS messages')
+    #
+    args = parser.parse_args()
+    if args.output:
+        try:
+            out = open(args.output, 'w')
+        except Exception as err:
+            print('%s, args error: unable to open output file %s: %s' % (sys.argv[0], args.output, err))
+            return 1
+    else:
+        out = sys.stdout
+    #
+    try:
+        for rec in decode_trace(args.input, args.workers, args.chunksize, args.nas):
+            out.write(json.dumps(rec))
+            out.write('\n')
+    except EnvironmentError as err:
+        print('%s, unable to read input file %s: %s' % (sys.argv[0], args.input, err))
+        return 1
+    finally:
+        if args.output:
+            out.close()
+    return 0
+    
+if __name__ == '__main__':
+    sys.exit(main())